@@ -0,0 +1,93 @@
+"""Benchmark of the minimum volume ellipsoid against the number of atoms.
+
+Molecules of increasing size are built by tiling copies of a test receptor and the
+time and peak memory of MinimumVolumeEllipsoid, which iterates over the convex hull
+vertices, are compared to the dense Khachiyan iterations over all the atoms (only
+up to max_dense_atoms, as they use N x N matrices). Centers from both are checked to
+match.
+
+Usage: python benchmarks/ellipsoid_benchmark.py [max_copies] [max_dense_atoms]
+"""
+
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+import numpy as np
+from lightdock.pdbutil.PDBIO import parse_complex_from_file
+from lightdock.structure.complex import Complex
+from lightdock.mathutil.ellipsoid import MinimumVolumeEllipsoid
+from lightdock.test.mathutil.test_ellipsoid import dense_center
+
+TILE_OFFSET = 40.0
+
+
+def tiled_coordinates(coordinates, copies):
+    """Places copies of the coordinates on a square layer"""
+    side = int(np.ceil(np.sqrt(copies)))
+    return np.vstack(
+        [
+            coordinates + [(i % side) * TILE_OFFSET, (i // side) * TILE_OFFSET, 0.0]
+            for i in range(copies)
+        ]
+    )
+
+
+def measure(function, *args):
+    """Result, time and peak memory of function(*args)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024.0**2
+
+
+def run(max_copies=16, max_dense_atoms=4000):
+    golden_data_path = (
+        Path(__file__).absolute().parent.parent
+        / "lightdock"
+        / "test"
+        / "scoring"
+        / "golden_data"
+    )
+    atoms, _, chains = parse_complex_from_file(golden_data_path / "1EAWrec.pdb")
+    coordinates = Complex(chains, atoms).atom_coordinates[0].coordinates
+
+    print(
+        "%8s %8s %12s %12s %12s %12s %12s"
+        % (
+            "Atoms",
+            "Vertices",
+            "hull (s)",
+            "hull (MB)",
+            "dense (s)",
+            "dense (MB)",
+            "Center diff",
+        )
+    )
+    copies = 1
+    while copies <= max_copies:
+        points = tiled_coordinates(coordinates, copies)
+        ellipsoid, hull_time, hull_memory = measure(MinimumVolumeEllipsoid, points)
+        vertices = len(MinimumVolumeEllipsoid.hull_vertices(points))
+        if len(points) <= max_dense_atoms:
+            center, dense_time, dense_memory = measure(dense_center, points)
+            difference = np.max(np.abs(center - ellipsoid.center))
+            if difference > 1e-6:
+                raise SystemExit("Centers differ: %r %r" % (center, ellipsoid.center))
+            dense = "%12.3f %12.1f %12.2e" % (dense_time, dense_memory, difference)
+        else:
+            dense = "%12s %12s %12s" % ("-", "-", "-")
+        print(
+            "%8d %8d %12.3f %12.1f %s"
+            % (len(points), vertices, hull_time, hull_memory, dense)
+        )
+        copies *= 2
+
+
+if __name__ == "__main__":
+    max_copies = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    max_dense_atoms = int(sys.argv[2]) if len(sys.argv) > 2 else 4000
+    run(max_copies, max_dense_atoms)
@@ -0,0 +1,166 @@
+"""Benchmark of the fastdfire neighbor grid against receptor size.
+
+Receptors of increasing size are built by tiling copies of a test receptor and the
+time per ligand pose evaluation is compared between the original all-pairs C search
+and the neighbor grid (rebuilt on each call or reused as done in a swarm step). The
+all-pairs search is cdfire built with the DFIRE_ALL_PAIRS switch into a temporary
+directory. Energies from both searches are checked to be bit-identical.
+
+Usage: python benchmarks/fastdfire_benchmark.py [max_copies] [poses]
+"""
+
+import importlib.util
+import sys
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+from setuptools import Distribution, Extension
+from lightdock.pdbutil.PDBIO import parse_complex_from_file
+from lightdock.structure.complex import Complex
+from lightdock.structure.space import SpacePoints
+from lightdock.scoring.fastdfire.driver import DFIREAdapter, DFIREPotential
+from lightdock.scoring.fastdfire.c.cdfire import calculate_dfire, build_receptor_grid
+
+TILE_OFFSET = 60.0
+
+
+def build_all_pairs(build_path):
+    """Builds cdfire with the original all-pairs search and imports it"""
+    source = (
+        Path(__file__).absolute().parent.parent
+        / "lightdock"
+        / "scoring"
+        / "fastdfire"
+        / "c"
+        / "cdfire.c"
+    )
+    extension = Extension(
+        "cdfire",
+        [str(source)],
+        include_dirs=[np.get_include()],
+        define_macros=[("DFIRE_ALL_PAIRS", None)],
+    )
+    distribution = Distribution({"name": "cdfire", "ext_modules": [extension]})
+    command = distribution.get_command_obj("build_ext")
+    command.build_lib = build_path
+    command.build_temp = build_path
+    command.ensure_finalized()
+    command.run()
+    spec = importlib.util.spec_from_file_location(
+        "cdfire", command.get_ext_fullpath("cdfire")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def tiled_receptor(model, copies):
+    """Places copies of the receptor model along a line"""
+    coordinates = np.vstack(
+        [
+            model.coordinates[0].coordinates + [i * TILE_OFFSET, 0.0, 0.0]
+            for i in range(copies)
+        ]
+    )
+    objects = list(model.objects) * copies
+    return objects, SpacePoints(coordinates)
+
+
+class BenchmarkModel(object):
+    def __init__(self, objects):
+        self.objects = objects
+
+
+def run(all_pairs, max_copies=8, poses=20):
+    golden_data_path = (
+        Path(__file__).absolute().parent.parent
+        / "lightdock"
+        / "test"
+        / "scoring"
+        / "golden_data"
+    )
+    atoms, _, chains = parse_complex_from_file(golden_data_path / "1EAWrec.pdb")
+    receptor = Complex(chains, atoms)
+    atoms, _, chains = parse_complex_from_file(golden_data_path / "1EAWlig.pdb")
+    ligand = Complex(chains, atoms)
+    adapter = DFIREAdapter(receptor, ligand)
+    energies = DFIREPotential().dfire_energy
+    ligand_coordinates = adapter.ligand_model.coordinates[0]
+
+    print(
+        "%10s %16s %16s %16s %10s"
+        % (
+            "Rec. atoms",
+            "C all-pairs (ms)",
+            "grid (ms)",
+            "cached grid (ms)",
+            "Speedup",
+        )
+    )
+    copies = 1
+    while copies <= max_copies:
+        objects, receptor_coordinates = tiled_receptor(adapter.receptor_model, copies)
+        rec_model = BenchmarkModel(objects)
+
+        start = time.perf_counter()
+        for _ in range(poses):
+            reference, _, _ = all_pairs.calculate_dfire(
+                rec_model,
+                adapter.ligand_model,
+                energies,
+                receptor_coordinates,
+                ligand_coordinates,
+                3.9,
+            )
+        all_pairs_time = (time.perf_counter() - start) / poses
+
+        start = time.perf_counter()
+        for _ in range(poses):
+            energy, _, _ = calculate_dfire(
+                rec_model,
+                adapter.ligand_model,
+                energies,
+                receptor_coordinates,
+                ligand_coordinates,
+                3.9,
+            )
+        grid_time = (time.perf_counter() - start) / poses
+
+        grid = build_receptor_grid(receptor_coordinates)
+        start = time.perf_counter()
+        for _ in range(poses):
+            cached_energy, _, _ = calculate_dfire(
+                rec_model,
+                adapter.ligand_model,
+                energies,
+                receptor_coordinates,
+                ligand_coordinates,
+                3.9,
+                grid,
+            )
+        cached_time = (time.perf_counter() - start) / poses
+
+        if not (reference == energy == cached_energy):
+            raise SystemExit(
+                "Energies differ: %r %r %r" % (reference, energy, cached_energy)
+            )
+
+        print(
+            "%10d %16.3f %16.3f %16.3f %9.1fx"
+            % (
+                len(objects),
+                all_pairs_time * 1000.0,
+                grid_time * 1000.0,
+                cached_time * 1000.0,
+                all_pairs_time / cached_time,
+            )
+        )
+        copies *= 2
+
+
+if __name__ == "__main__":
+    max_copies = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    poses = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    with tempfile.TemporaryDirectory() as build_path:
+        run(build_all_pairs(build_path), max_copies, poses)
@@ -3,10 +3,9 @@
 """Calculates the diameter of a given PDB structure"""
 
 import argparse
-from scipy import spatial
-import numpy as np
 from lightdock.pdbutil.PDBIO import parse_complex_from_file
 from lightdock.structure.complex import Complex
+from lightdock.mathutil.geometry import max_diameter
 from lightdock.util.logger import LoggingManager
 
 
@@ -18,6 +17,13 @@ def parse_command_line():
     parser.add_argument(
         "pdb", help="PDB file for structure to calculate maximum diameter"
     )
+    parser.add_argument(
+        "--approximate",
+        help="Approximate diameter from the extreme atoms along a set of directions",
+        dest="approximate",
+        action="store_true",
+        default=False,
+    )
     parsed_args = parser.parse_args()
     return parsed_args
 
@@ -27,9 +33,8 @@ if __name__ == "__main__":
 
     atoms, residues, chains = parse_complex_from_file(args.pdb)
     structure = Complex(chains, atoms, structure_file_name=args.pdb)
-    distances_matrix = spatial.distance.squareform(
-        spatial.distance.pdist(structure.representative())
+    ligand_max_diameter = max_diameter(
+        structure.representative().coordinates, args.approximate
     )
-    ligand_max_diameter = np.max(distances_matrix)
 
     print(ligand_max_diameter)
@@ -17,6 +17,13 @@ def parse_command_line():
     parser.add_argument("scoring_function", help="scoring function")
     parser.add_argument("receptor", help="PDB receptor")
     parser.add_argument("ligand", help="PDB ligand")
+    parser.add_argument(
+        "--cache",
+        help="Store the docking models next to the PDB structures and reuse them",
+        dest="cache",
+        action="store_true",
+        default=False,
+    )
     script_args = parser.parse_args()
     return script_args
 
@@ -30,15 +37,15 @@ if __name__ == "__main__":
     except ImportError:
         raise SystemExit("Scoring function not found or not available")
 
-    atoms, residues, chains = parse_complex_from_file(args.receptor)
+    atoms, residues, chains = parse_complex_from_file(args.receptor, cache=args.cache)
     receptor = Complex(chains, atoms, structure_file_name=args.receptor)
-    atoms, residues, chains = parse_complex_from_file(args.ligand)
+    atoms, residues, chains = parse_complex_from_file(args.ligand, cache=args.cache)
     ligand = Complex(chains, atoms, structure_file_name=args.ligand)
 
     CurrentScoringFunction = getattr(module, "DefinedScoringFunction")
     CurrentModelAdapter = getattr(module, "DefinedModelAdapter")
 
-    adapter = CurrentModelAdapter(receptor, ligand)
+    adapter = CurrentModelAdapter(receptor, ligand, cache=args.cache)
     scoring_function = CurrentScoringFunction()
 
     energy = scoring_function(
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+"""Regenerates the gso_N.out files of a LightDock binary trajectory"""
+
+import argparse
+from lightdock.gso.trajectory import export_trajectory
+from lightdock.error.lightdock_errors import GSOError
+from lightdock.util.logger import LoggingManager
+
+
+log = LoggingManager.get_logger("lgd_export_trajectory")
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(prog="lgd_export_trajectory")
+    parser.add_argument(
+        "trajectory_files",
+        help="LightDock binary trajectory files",
+        metavar="trajectory_files",
+        nargs="+",
+    )
+    parser.add_argument(
+        "-s",
+        "--steps",
+        help="steps to export, all saved steps by default",
+        dest="steps",
+        type=int,
+        nargs="+",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    try:
+        args = parse_command_line()
+        for trajectory_file in args.trajectory_files:
+            written = export_trajectory(trajectory_file, steps=args.steps)
+            log.info("%d files written from %s" % (len(written), trajectory_file))
+        log.info("Done.")
+    except GSOError as e:
+        log.error(str(e))
+        raise SystemExit(1)
+    except KeyboardInterrupt:
+        log.info("Caught interrupt...")
+        log.info("bye.")
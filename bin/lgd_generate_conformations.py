@@ -20,15 +20,18 @@ from lightdock.structure.nm import read_nmodes
 from lightdock.prep.simulation import get_setup_from_file
 from lightdock.util.parser import (
     valid_file,
+    valid_lightdock_output,
     valid_integer_number,
     get_lightdock_structures,
 )
+from lightdock.util.analysis import read_lightdock_output
 
 
 log = LoggingManager.get_logger("generate_conformations")
 
 
 def parse_output_file(lightdock_output, num_anm_rec, num_anm_lig):
+    """Parses a GSO LightDock output, binary trajectories are read transparently"""
     translations = []
     rotations = []
     receptor_ids = []
@@ -36,32 +39,21 @@ def parse_output_file(lightdock_output, num_anm_rec, num_anm_lig):
     rec_extents = []
     lig_extents = []
 
-    data_file = open(lightdock_output)
-    lines = data_file.readlines()
-    data_file.close()
-
     counter = 0
-    for line in lines:
-        if line[0] == "(":
-            counter += 1
-            last = line.index(")")
-            coord = line[1:last].split(",")
-            translations.append([float(coord[0]), float(coord[1]), float(coord[2])])
-            rotations.append(
-                Quaternion(
-                    float(coord[3]), float(coord[4]), float(coord[5]), float(coord[6])
-                )
+    for result in read_lightdock_output(lightdock_output):
+        counter += 1
+        coord = result.pose
+        translations.append([float(coord[0]), float(coord[1]), float(coord[2])])
+        rotations.append(
+            Quaternion(
+                float(coord[3]), float(coord[4]), float(coord[5]), float(coord[6])
             )
-            if len(coord) > 7:
-                rec_extents.append(
-                    np.array([float(x) for x in coord[7 : 7 + num_anm_rec]])
-                )
-                lig_extents.append(np.array([float(x) for x in coord[-num_anm_lig:]]))
-            raw_data = line[last + 1 :].split()
-            receptor_id = int(raw_data[0])
-            ligand_id = int(raw_data[1])
-            receptor_ids.append(receptor_id)
-            ligand_ids.append(ligand_id)
+        )
+        if len(coord) > 7:
+            rec_extents.append(np.array([float(x) for x in coord[7 : 7 + num_anm_rec]]))
+            lig_extents.append(np.array([float(x) for x in coord[-num_anm_lig:]]))
+        receptor_ids.append(result.receptor_id)
+        ligand_ids.append(result.ligand_id)
     log.info("Read %s coordinate lines" % counter)
     return translations, rotations, receptor_ids, ligand_ids, rec_extents, lig_extents
 
@@ -123,8 +115,8 @@ if __name__ == "__main__":
     # Lightdock output file
     parser.add_argument(
         "lightdock_output",
-        help="lightdock output file",
-        type=valid_file,
+        help="lightdock output file (gso_N.out) or binary trajectory",
+        type=valid_lightdock_output,
         metavar="lightdock_output",
     )
     # Number of glowworms
@@ -158,7 +150,7 @@ if __name__ == "__main__":
     structures = []
     for structure in get_lightdock_structures(args.receptor_structures):
         log.info("Reading %s receptor PDB file..." % structure)
-        atoms, residues, chains = parse_complex_from_file(structure)
+        atoms, residues, chains = parse_complex_from_file(structure, cache=True)
         structures.append(
             {
                 "atoms": atoms,
@@ -174,7 +166,7 @@ if __name__ == "__main__":
     structures = []
     for structure in get_lightdock_structures(args.ligand_structures):
         log.info("Reading %s ligand PDB file..." % structure)
-        atoms, residues, chains = parse_complex_from_file(structure)
+        atoms, residues, chains = parse_complex_from_file(structure, cache=True)
         structures.append(
             {
                 "atoms": atoms,
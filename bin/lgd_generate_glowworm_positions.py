@@ -6,28 +6,24 @@ import argparse
 import os
 from lightdock.pdbutil.PDBIO import create_pdb_from_points
 from lightdock.util.logger import LoggingManager
-from lightdock.util.parser import valid_file
+from lightdock.util.parser import valid_lightdock_output
+from lightdock.util.analysis import read_lightdock_output
 
 
 log = LoggingManager.get_logger("generate_glowworm_positions")
 
 
 def parse_output_file(lightdock_output):
+    """Translations of the glowworms, binary trajectories are read transparently"""
     glowworm_translations = []
 
-    data_file = open(lightdock_output)
-    lines = data_file.readlines()
-    data_file.close()
-
     counter = 0
-    for line in lines:
-        if line[0] == "(":
-            counter += 1
-            last = line.index(")")
-            coord = line[1:last].split(",")
-            glowworm_translations.append(
-                [float(coord[0]), float(coord[1]), float(coord[2])]
-            )
+    for result in read_lightdock_output(lightdock_output):
+        counter += 1
+        coord = result.pose
+        glowworm_translations.append(
+            [float(coord[0]), float(coord[1]), float(coord[2])]
+        )
     log.info("Read %s coordinate lines" % counter)
     return glowworm_translations
 
@@ -38,8 +34,8 @@ if __name__ == "__main__":
     # Lightdock output file
     parser.add_argument(
         "lightdock_output",
-        help="lightdock output file",
-        type=valid_file,
+        help="lightdock output file (gso_N.out) or binary trajectory",
+        type=valid_lightdock_output,
         metavar="lightdock_output",
     )
     args = parser.parse_args()
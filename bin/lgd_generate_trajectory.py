@@ -10,6 +10,8 @@ from lightdock.constants import (
     DEFAULT_NMODES_LIG,
     DEFAULT_REC_NM_FILE,
     DEFAULT_LIG_NM_FILE,
+    GSO_OUTPUT_FILE,
+    GSO_TRAJECTORY_FILE,
 )
 from lightdock.structure.nm import read_nmodes
 from lightdock.util.logger import LoggingManager
@@ -18,6 +20,7 @@ from lightdock.pdbutil.PDBIO import parse_complex_from_file, write_pdb_to_file
 from lightdock.structure.complex import Complex
 from lightdock.prep.simulation import get_setup_from_file
 from lightdock.util.parser import valid_file
+from lightdock.util.analysis import read_lightdock_output
 
 
 log = LoggingManager.get_logger("lgd_generate_trajectory")
@@ -51,33 +54,27 @@ def parse_command_line():
 
 
 def parse_output_file(lightdock_output, glowworm_id, num_anm_rec, num_anm_lig):
-    """Parses a LightDock simulation output file and returns only data for given glowworm_id"""
-    with open(lightdock_output) as data_file:
-        lines = data_file.readlines()
-        num_glowworms = 0
-        for line in lines:
-            line = line.rstrip(os.linesep)
-            if line.startswith("("):
-                if num_glowworms == glowworm_id:
-                    last = line.index(")")
-                    coord = line[1:last].split(",")
-                    translation = [float(coord[0]), float(coord[1]), float(coord[2])]
-                    rotation = Quaternion(
-                        float(coord[3]),
-                        float(coord[4]),
-                        float(coord[5]),
-                        float(coord[6]),
-                    )
-                    rec_extent = None
-                    lig_extent = None
-                    if len(coord) > 7:
-                        rec_extent = np.array(
-                            [float(x) for x in coord[7 : 7 + num_anm_rec]]
-                        )
-                        lig_extent = np.array([float(x) for x in coord[-num_anm_lig:]])
-                    return translation, rotation, rec_extent, lig_extent
-                num_glowworms += 1
-    return None
+    """Parses a LightDock simulation output file and returns only data for given glowworm_id.
+
+    Binary trajectories are read transparently, see util.analysis.find_trajectory.
+    """
+    results = read_lightdock_output(lightdock_output)
+    if glowworm_id >= len(results):
+        return None
+    coord = results[glowworm_id].pose
+    translation = [float(coord[0]), float(coord[1]), float(coord[2])]
+    rotation = Quaternion(
+        float(coord[3]),
+        float(coord[4]),
+        float(coord[5]),
+        float(coord[6]),
+    )
+    rec_extent = None
+    lig_extent = None
+    if len(coord) > 7:
+        rec_extent = np.array([float(x) for x in coord[7 : 7 + num_anm_rec]])
+        lig_extent = np.array([float(x) for x in coord[-num_anm_lig:]])
+    return translation, rotation, rec_extent, lig_extent
 
 
 if __name__ == "__main__":
@@ -95,13 +92,13 @@ if __name__ == "__main__":
 
     # Read receptor
     log.info("Reading %s receptor PDB file..." % args.receptor_pdb)
-    atoms, residues, chains = parse_complex_from_file(args.receptor_pdb)
+    atoms, residues, chains = parse_complex_from_file(args.receptor_pdb, cache=True)
     receptor = Complex(chains, atoms)
     log.info("%s atoms, %s residues read." % (len(atoms), len(residues)))
 
     # Read ligand
     log.info("Reading %s ligand PDB file..." % args.ligand_pdb)
-    atoms, residues, chains = parse_complex_from_file(args.ligand_pdb)
+    atoms, residues, chains = parse_complex_from_file(args.ligand_pdb, cache=True)
     ligand = Complex(chains, atoms)
     log.info("%s atoms, %s residues read." % (len(atoms), len(residues)))
 
@@ -117,68 +114,77 @@ if __name__ == "__main__":
         nmodes_lig = None
 
     for step in range(0, args.steps + 1):
+        # Each stored step is read from its gso_N.out file or the binary trajectory
+        file_name = GSO_OUTPUT_FILE % step
         try:
-            # Parse each stored step file
-            file_name = "gso_%d.out" % step
-            if os.path.exists(file_name):
-                translation, rotation, rec_extent, lig_extent = parse_output_file(
-                    file_name, args.glowworm_id, num_anm_rec, num_anm_lig
+            pose = parse_output_file(
+                file_name, args.glowworm_id, num_anm_rec, num_anm_lig
+            )
+        except IOError:
+            # Not all the steps are saved, but the last one always is
+            if step == args.steps:
+                log.error(
+                    "Step %s found neither in %s nor in %s"
+                    % (step, file_name, GSO_TRAJECTORY_FILE)
                 )
-                receptor_pose = receptor.atom_coordinates[0].clone()
-                ligand_pose = ligand.atom_coordinates[0].clone()
-
-                if nmodes_rec is not None:
-                    try:
-                        for nm in range(num_anm_rec):
-                            receptor_pose.coordinates[receptor.nm_mask, :] += (
-                                nmodes_rec[nm] * rec_extent[nm]
-                            )
-                    except ValueError:
-                        log.error("Problem found on calculating ANM for receptor:")
-                        log.error(
-                            "Number of atom coordinates is: %s"
-                            % str(receptor_pose.coordinates.shape)
-                        )
-                        log.error("Number of ANM is: %s" % str(nmodes_rec.shape))
-                        raise SystemExit
-                    except IndexError:
-                        log.error("Problem found on calculating ANM for receptor:")
-                        log.error(
-                            "If you have used anm_rec different than default, please use --setup"
-                        )
-                        raise SystemExit
-                if nmodes_lig is not None:
-                    try:
-                        for nm in range(num_anm_lig):
-                            ligand_pose.coordinates[ligand.nm_mask, :] += (
-                                nmodes_lig[nm] * lig_extent[nm]
-                            )
-                    except ValueError:
-                        log.error("Problem found on calculating ANM for ligand:")
-                        log.error(
-                            "Number of atom coordinates is: %s"
-                            % str(receptor_pose.coordinates.shape)
-                        )
-                        log.error("Number of ANM is: %s" % str(nmodes_rec.shape))
-                        raise SystemExit
-                    except IndexError:
-                        log.error("Problem found on calculating ANM for ligand:")
-                        log.error(
-                            "If you have used anm_lig different than default, please use --setup"
-                        )
-                        raise SystemExit
-
-                # We rotate first, ligand it's at initial position
-                ligand_pose.rotate(rotation)
-                ligand_pose.translate(translation)
-
-                output_file_name = "trajectory_%s_step_%s.pdb" % (
-                    args.glowworm_id,
-                    step,
+                raise SystemExit
+            continue
+        if pose is None:
+            log.error("Glowworm %s not found in step %s" % (args.glowworm_id, step))
+            raise SystemExit
+        translation, rotation, rec_extent, lig_extent = pose
+        receptor_pose = receptor.atom_coordinates[0].clone()
+        ligand_pose = ligand.atom_coordinates[0].clone()
+
+        if nmodes_rec is not None:
+            try:
+                for nm in range(num_anm_rec):
+                    receptor_pose.coordinates[receptor.nm_mask, :] += (
+                        nmodes_rec[nm] * rec_extent[nm]
+                    )
+            except ValueError:
+                log.error("Problem found on calculating ANM for receptor:")
+                log.error(
+                    "Number of atom coordinates is: %s"
+                    % str(receptor_pose.coordinates.shape)
                 )
-                write_pdb_to_file(receptor, output_file_name, receptor_pose)
-                write_pdb_to_file(ligand, output_file_name, ligand_pose)
-                log.info("Generated trajectory for step %s" % (step))
-        except IOError:
-            # Ignore not generated steps
-            pass
+                log.error("Number of ANM is: %s" % str(nmodes_rec.shape))
+                raise SystemExit
+            except IndexError:
+                log.error("Problem found on calculating ANM for receptor:")
+                log.error(
+                    "If you have used anm_rec different than default, please use --setup"
+                )
+                raise SystemExit
+        if nmodes_lig is not None:
+            try:
+                for nm in range(num_anm_lig):
+                    ligand_pose.coordinates[ligand.nm_mask, :] += (
+                        nmodes_lig[nm] * lig_extent[nm]
+                    )
+            except ValueError:
+                log.error("Problem found on calculating ANM for ligand:")
+                log.error(
+                    "Number of atom coordinates is: %s"
+                    % str(receptor_pose.coordinates.shape)
+                )
+                log.error("Number of ANM is: %s" % str(nmodes_rec.shape))
+                raise SystemExit
+            except IndexError:
+                log.error("Problem found on calculating ANM for ligand:")
+                log.error(
+                    "If you have used anm_lig different than default, please use --setup"
+                )
+                raise SystemExit
+
+        # We rotate first, ligand it's at initial position
+        ligand_pose.rotate(rotation)
+        ligand_pose.translate(translation)
+
+        output_file_name = "trajectory_%s_step_%s.pdb" % (
+            args.glowworm_id,
+            step,
+        )
+        write_pdb_to_file(receptor, output_file_name, receptor_pose)
+        write_pdb_to_file(ligand, output_file_name, ligand_pose)
+        log.info("Generated trajectory for step %s" % (step))
@@ -18,8 +18,10 @@ from lightdock.structure.complex import Complex
 from lightdock.structure.nm import read_nmodes
 from lightdock.util.parser import (
     valid_file,
+    valid_lightdock_output,
     get_lightdock_structures,
 )
+from lightdock.util.analysis import read_lightdock_output
 from lightdock.prep.simulation import get_setup_from_file
 
 
@@ -59,33 +61,27 @@ def calculate_pose(
 
 
 def parse_output_file(lightdock_output, num_anm_rec, num_anm_lig):
-    """Parses a GSO LightDock output"""
+    """Parses a GSO LightDock output, binary trajectories are read transparently"""
     translations = []
     rotations = []
     rec_extents = []
     lig_extents = []
 
-    data_file = open(lightdock_output)
-    lines = data_file.readlines()
-    data_file.close()
-
     counter = 0
-    for line in lines:
-        if line[0] == "(":
-            counter += 1
-            last = line.index(")")
-            coord = line[1:last].split(",")
-            translations.append([float(coord[0]), float(coord[1]), float(coord[2])])
-            rotations.append(
-                Quaternion(
-                    float(coord[3]), float(coord[4]), float(coord[5]), float(coord[6])
-                )
+    for result in read_lightdock_output(lightdock_output):
+        counter += 1
+        coord = result.pose
+        translations.append([float(coord[0]), float(coord[1]), float(coord[2])])
+        rotations.append(
+            Quaternion(
+                float(coord[3]), float(coord[4]), float(coord[5]), float(coord[6])
+            )
+        )
+        if len(coord) > 7:
+            rec_extents.append(
+                np.array([float(x) for x in coord[7 : 7 + num_anm_rec]])
             )
-            if len(coord) > 7:
-                rec_extents.append(
-                    np.array([float(x) for x in coord[7 : 7 + num_anm_rec]])
-                )
-                lig_extents.append(np.array([float(x) for x in coord[-num_anm_lig:]]))
+            lig_extents.append(np.array([float(x) for x in coord[-num_anm_lig:]]))
 
     log.info("Read %s coordinate lines" % counter)
     return translations, rotations, rec_extents, lig_extents
@@ -133,7 +129,8 @@ if __name__ == "__main__":
     # GSO files
     parser.add_argument(
         "gso_files",
-        help="List of LightDock output files",
+        help="List of LightDock output files (gso_N.out) or binary trajectories",
+        type=valid_lightdock_output,
         nargs='+', default=[],
         metavar="gso_files",
     )
@@ -159,7 +156,7 @@ if __name__ == "__main__":
     structures = []
     for structure in get_lightdock_structures(args.receptor_structure):
         log.info("Reading %s receptor PDB file..." % structure)
-        atoms, residues, chains = parse_complex_from_file(structure)
+        atoms, residues, chains = parse_complex_from_file(structure, cache=True)
         structures.append(
             {
                 "atoms": atoms,
@@ -175,7 +172,7 @@ if __name__ == "__main__":
     structures = []
     for structure in get_lightdock_structures(args.ligand_structure):
         log.info("Reading %s ligand PDB file..." % structure)
-        atoms, residues, chains = parse_complex_from_file(structure)
+        atoms, residues, chains = parse_complex_from_file(structure, cache=True)
         structures.append(
             {
                 "atoms": atoms,
@@ -86,7 +86,7 @@ if __name__ == "__main__":
     structures = []
     for structure in get_lightdock_structures(args.receptor_structures):
         log.info("Reading %s receptor PDB file..." % structure)
-        atoms, residues, chains = parse_complex_from_file(structure)
+        atoms, residues, chains = parse_complex_from_file(structure, cache=True)
         structures.append(
             {
                 "atoms": atoms,
@@ -102,7 +102,7 @@ if __name__ == "__main__":
     structures = []
     for structure in get_lightdock_structures(args.ligand_structures):
         log.info("Reading %s ligand PDB file..." % structure)
-        atoms, residues, chains = parse_complex_from_file(structure)
+        atoms, residues, chains = parse_complex_from_file(structure, cache=True)
         structures.append(
             {
                 "atoms": atoms,
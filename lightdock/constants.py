@@ -11,6 +11,14 @@ MAX_ROTATION = 1.0
 """Quaternion default value for its components"""
 DEFAULT_STEP_SIZE = 0.03
 """Default generic GSO step (does only apply to J* functions"""
+DEFAULT_ENERGY_CACHE_DECIMALS = 7
+"""Decimals of the pose components used to identify poses in the energy cache"""
+DEFAULT_CONVERGENCE_TOLERANCE = 1e-3
+"""Relative improvement of the best scoring of a converged swarm"""
+DEFAULT_CONVERGENCE_SPREAD_TOLERANCE = 0.2
+"""Relative change of the mean luciferin spread of a converged swarm"""
+DEFAULT_CONVERGENCE_DISPLACEMENT = 0.75
+"""Mean displacement of the glowworms of a converged swarm, in Angstroms"""
 DEFAULT_TRANSLATION_STEP = 0.5
 """Interpolation step for translation (in %)"""
 DEFAULT_ROTATION_STEP = 0.5
@@ -62,6 +70,12 @@ DEFAULT_POSITIONS_FOLDER = "init"
 """Folder which contains the initial_positions files for each swarm"""
 GSO_OUTPUT_FILE = "gso_%s.out"
 """Simulation default output file"""
+GSO_TRAJECTORY_FILE = "gso_trajectory.bin"
+"""Simulation binary output file, one for each swarm"""
+GSO_CHECKPOINT_FILE = "gso_checkpoint.npz"
+"""Last checkpoint of the simulation of a swarm"""
+GSO_TIMING_FILE = "gso_timing.json"
+"""Wall time per phase and counters of the simulation of a swarm"""
 DEFAULT_SWARM_FOLDER = "swarm_"
 """Folder where GSO execution for a given swarm will be stored"""
 DEFAULT_SETUP_FILE = "setup.json"
@@ -85,6 +99,14 @@ CLUSTER_REPRESENTATIVES_FILE = CLUSTER_DEFAULT_NAME + DEFAULT_REPRESENTATIVES_EX
 DEFAULT_LIGHTDOCK_INFO = "lightdock.info"
 """Each independent simulation generates a new file"""
 DEFAULT_MASK_FILE = "lightdock_%s_mask" + NUMPY_FILE_SAVE_EXTENSION
+DEFAULT_GRID_FILE = "%s_%s_grid.npz"
+"""Potential grid of a receptor structure for a scoring function"""
+GRID_VALIDATION_FILE = "%s_%s_grid.list"
+"""Grid against exact energies of the starting poses of the first swarm"""
+DEFAULT_MODEL_CACHE_FILE = "%s_%s_model.pkl"
+"""Docking model of a structure prepared for a scoring function"""
+PDB_CACHE_FILE = "%s.cache.npz"
+"""Parsed atom records of a PDB file"""
 
 # Swarm calculations
 DEFAULT_SURFACE_DENSITY = 50.0
@@ -99,3 +121,5 @@ DEFAULT_SPHERES_PER_CENTROID = 100
 """Number of sampling points per centroid in automatic swarm calculation"""
 SWARM_DISTANCE_TO_SURFACE_CUTOFF = 3.0
 """Cutoff for filtering swarms too close to the surface"""
+DEFAULT_CROP_MARGIN = 5.0
+"""Translation allowed beyond the initial poses of a swarm before using the whole receptor"""
@@ -8,6 +8,15 @@ optima of multimodal functions. Swarm Intelligence, 3, 2, June 2009,
 """
 
 import os
+from pathlib import Path
+from lightdock.gso.checkpoint import save_checkpoint, load_checkpoint
+from lightdock.gso.trajectory import truncate_trajectory
+from lightdock.scoring.batch import score_requests
+from lightdock.constants import (
+    GSO_CHECKPOINT_FILE,
+    GSO_TRAJECTORY_FILE,
+    GSO_TIMING_FILE,
+)
 from lightdock.gso.initializer import (
     RandomInitializer,
     FromFileInitializer,
@@ -15,6 +24,17 @@ from lightdock.gso.initializer import (
 )
 
 
+def advance(simulation, energies=None):
+    """Sends the energies of the last scoring requests to a GSO.simulate generator.
+
+    Returns the scoring requests of its next step, or None if it has finished.
+    """
+    try:
+        return simulation.send(energies)
+    except StopIteration:
+        return None
+
+
 class GSO(object):
     """GSO is the main simulation object"""
 
@@ -31,6 +51,8 @@ class GSO(object):
         self.random_number_generator = random_number_generator
         self.initial_coordinates_file = initial_coordinates_file
         self.local_minimization = local_minimization
+        # Optional ConvergenceMonitor to stop the simulation early
+        self.convergence = None
 
     def run(
         self,
@@ -40,31 +62,140 @@ class GSO(object):
         saving_path=".",
         save_intermediary=False,
         save_all_intermediary=False,
+        binary_output=False,
+        checkpoint_frequency=0,
+        resume=False,
     ):
-        """Runs the simulation for the given simulation_steps"""
-        if save_intermediary:
-            self.swarm.save(0, saving_path)
+        """Runs the simulation for the given simulation_steps.
+
+        If binary_output is set, saved steps are appended to the binary trajectory
+        file of the swarm instead of being written as gso_N.out files.
+
+        If checkpoint_frequency is set, a checkpoint is saved in saving_path every
+        checkpoint_frequency steps. If resume is set and a checkpoint is found, the
+        simulation continues from its step.
+
+        If a convergence monitor is set, the simulation stops once the swarm has
+        converged and its final state is saved as the last step.
+
+        The wall time of each phase and the counters of the simulation are kept in the
+        timer of the swarm and, if save_intermediary is set, saved as JSON in
+        saving_path.
+        """
+        simulation = self.simulate(
+            simulation_steps,
+            cluster_id,
+            verbose,
+            saving_path,
+            save_intermediary,
+            save_all_intermediary,
+            binary_output,
+            checkpoint_frequency,
+            resume,
+        )
+        requests = advance(simulation)
+        while requests is not None:
+            with self.swarm.timer.phase("scoring"):
+                energies = score_requests(requests, self.swarm.scoring_threads)
+            requests = advance(simulation, energies)
+
+    def simulate(
+        self,
+        simulation_steps,
+        cluster_id=None,
+        verbose=False,
+        saving_path=".",
+        save_intermediary=False,
+        save_all_intermediary=False,
+        binary_output=False,
+        checkpoint_frequency=0,
+        resume=False,
+    ):
+        """Generator running the simulation as run does, but which yields the scoring
+        requests of the swarm at every step and expects to be sent their energies.
+        """
+        timer = self.swarm.timer
+        save = self.swarm.save_trajectory if binary_output else self.swarm.save
+        checkpoint_file = Path(saving_path) / GSO_CHECKPOINT_FILE
+        first_step = 1
+        if resume and checkpoint_file.exists():
+            first_step = load_checkpoint(checkpoint_file, self) + 1
+            trajectory_file = Path(saving_path) / GSO_TRAJECTORY_FILE
+            if binary_output and trajectory_file.exists():
+                truncate_trajectory(trajectory_file, first_step - 1)
+            if verbose:
+                if cluster_id is not None:
+                    print("[%d] resuming from step %d" % (cluster_id, first_step - 1))
+                else:
+                    print("resuming from step %d" % (first_step - 1))
+        elif save_intermediary:
+            with timer.phase("save"):
+                save(0, saving_path)
 
-        for step in range(1, simulation_steps + 1):
+        last_step = first_step - 1
+        for step in range(first_step, simulation_steps + 1):
+            if self.convergence is not None and self.convergence.converged:
+                break
+            last_step = step
             if verbose:
                 if cluster_id is not None:
                     print("[%d] step %d" % (cluster_id, step))
                 else:
                     print("step %d" % step)
+            timer.count("steps")
             # Evaluate energy and update luciferin accordingly:
-            self.swarm.update_luciferin()
+            with timer.phase("scoring"):
+                requests = self.swarm.scoring_requests()
+            timer.count("scoring_requests", len(requests))
+            timer.count("scored_poses", sum(len(request.poses) for request in requests))
+            energies = yield requests
+            with timer.phase("scoring"):
+                self.swarm.update_luciferin(energies)
             # Perform local minimization of the best
             if self.local_minimization:
-                self.swarm.minimize_best()
+                with timer.phase("minimization"):
+                    self.swarm.minimize_best()
             # Each glowworm move if required to the best neighbour
-            self.swarm.movement_phase(self.random_number_generator)
+            with timer.phase("movement"):
+                self.swarm.movement_phase(self.random_number_generator)
             if save_intermediary:
                 if (
                     save_all_intermediary
                     or (step % 10 == 0)
                     or step >= simulation_steps
                 ):
-                    self.swarm.save(step, saving_path)
+                    with timer.phase("save"):
+                        save(step, saving_path)
+            converged = self.convergence is not None and self.convergence.update(
+                self.swarm
+            )
+            if converged and verbose:
+                if cluster_id is not None:
+                    print("[%d] converged at step %d" % (cluster_id, step))
+                else:
+                    print("converged at step %d" % step)
+            if checkpoint_frequency and (
+                step % checkpoint_frequency == 0
+                or step >= simulation_steps
+                or converged
+            ):
+                with timer.phase("save"):
+                    save_checkpoint(checkpoint_file, self, step)
+        if (
+            save_intermediary
+            and self.convergence is not None
+            and self.convergence.converged
+            and last_step < simulation_steps
+        ):
+            with timer.phase("save"):
+                save(simulation_steps, saving_path)
+        if save_intermediary:
+            timer.save(Path(saving_path) / GSO_TIMING_FILE)
+        if verbose and self.swarm.energy_cache is not None:
+            if cluster_id is not None:
+                print("[%d] energy cache: %s" % (cluster_id, self.swarm.energy_cache))
+            else:
+                print("energy cache: %s" % self.swarm.energy_cache)
 
     def report(self, output_file_name=""):
         """Writes to output_file_name if defined or to standard output the result of a GSO execution."""
@@ -97,6 +228,13 @@ class GSO(object):
             self.parameters.max_neighbors,
             os.linesep,
         )
+        if self.convergence is not None:
+            output += "Convergence window: %s%s" % (
+                self.convergence.window,
+                os.linesep,
+            )
+        if self.swarm.energy_cache is not None:
+            output += "Energy cache: %s%s" % (self.swarm.energy_cache, os.linesep)
 
         if output_file_name:
             output_file = open(output_file_name, "w")
@@ -188,9 +326,12 @@ class LightdockGSOBuilder(object):
         local_minimization,
         anm_rec,
         anm_lig,
+        array_swarm=False,
     ):
         """Creates a new GSO instance of the algorithm reading the initial position of the glowworms
         agents from initial_population_file and using the scoring function adapter.
+
+        If array_swarm is set, glowworms are simulated as an ArraySwarm.
         """
         self._initializer = LightdockFromFileInitializer(
             adapters,
@@ -205,6 +346,7 @@ class LightdockGSOBuilder(object):
             step_nmodes,
             anm_rec,
             anm_lig,
+            array_swarm,
         )
         return GSO(
             self._initializer.generate_glowworms(),
@@ -0,0 +1,523 @@
+"""Docking swarm of glowworms stored as arrays.
+
+ArraySwarm is an alternative to Swarm for docking simulations. Instead of Glowworm
+and DockingLandscapePosition objects, the state of the swarm is kept as arrays (poses
+as optimization vectors, luciferin, vision ranges, scorings and neighbors) and every
+phase of a GSO step but the scoring runs as array operations over the whole swarm.
+
+All the operations follow the arithmetic of their Glowworm, DockingLandscapePosition
+and Quaternion counterparts, so given the same random number generator, an ArraySwarm
+follows the same trajectory as a Swarm.
+"""
+
+import math
+from pathlib import Path
+import numpy as np
+from lightdock.gso.searchspace.landscape import DockingLandscapePosition, ReceptorCrop
+from lightdock.gso.swarm import NEIGHBORS_BLOCK_SIZE
+from lightdock.gso.trajectory import (
+    append_to_trajectory,
+    swarm_to_array,
+    row_to_legacy,
+    TRAJECTORY_EXTRA_COLUMNS,
+)
+from lightdock.gso.timing import SimulationTimer
+from lightdock.mathutil.geometry import vector_norms
+from lightdock.scoring.batch import ScoringRequest, score_requests, gather_energies
+from lightdock.mathutil.constants import LINEAR_THRESHOLD
+from lightdock.structure.space import rotate_points
+from lightdock.constants import GSO_TRAJECTORY_FILE, DEFAULT_CROP_MARGIN
+from lightdock.error.lightdock_errors import GSOError
+
+# Precision of the quaternion components comparison in Quaternion.__eq__
+QUATERNION_PRECISION = 1e-7
+
+
+def elementwise(function, values):
+    """Applies a math module function to each value.
+
+    Used for the transcendental functions, as NumPy may round them differently.
+    """
+    return np.array([function(value) for value in values], dtype=np.float64)
+
+
+def normalize_quaternions(quaternions):
+    """Quaternion.normalize of each (w, x, y, z) row"""
+    w, x, y, z = quaternions.T
+    norm = np.sqrt((w * w) + (x * x) + (y * y) + (z * z))
+    return quaternions / norm[:, None]
+
+
+def slerp_quaternions(quaternions, others, t):
+    """Quaternion.slerp of each pair of (w, x, y, z) rows of quaternions and others"""
+    quaternions = normalize_quaternions(quaternions)
+    others = normalize_quaternions(others)
+    q_dot = (
+        quaternions[:, 0] * others[:, 0]
+        + quaternions[:, 1] * others[:, 1]
+        + quaternions[:, 2] * others[:, 2]
+        + quaternions[:, 3] * others[:, 3]
+    )
+    # Patch to avoid the long path
+    negative = q_dot < 0
+    quaternions[negative] = -quaternions[negative]
+    q_dot[negative] *= -1.0
+
+    result = np.empty_like(quaternions)
+    # Linear interpolation if quaternions are too close (not normalized afterwards,
+    # as in Quaternion.slerp)
+    linear = q_dot > LINEAR_THRESHOLD
+    result[linear] = quaternions[linear] + t * (others[linear] - quaternions[linear])
+    spherical = ~linear
+    omega = elementwise(math.acos, np.clip(q_dot[spherical], -1.0, 1.0))
+    so = elementwise(math.sin, omega)
+    start = elementwise(math.sin, (1.0 - t) * omega) / so
+    end = elementwise(math.sin, t * omega) / so
+    result[spherical] = (
+        start[:, None] * quaternions[spherical] + end[:, None] * others[spherical]
+    )
+    return result
+
+
+def step_towards(values, targets, step):
+    """Moves each row of values a fixed step towards the same row of targets.
+
+    Rows closer than the tolerance of np.allclose to their target are not moved.
+    """
+    delta = targets - values
+    norms = vector_norms(delta)
+    # Only move if required
+    moving = ~np.isclose(0.0, norms)
+    values[moving] += delta[moving] * (step / norms[moving])[:, None]
+
+
+class ArraySwarm(object):
+    """A docking swarm of glowworms stored as arrays.
+
+    poses holds the optimization vectors of the glowworms for each scoring function,
+    a (scoring functions, glowworms, pose length) array, and receptor_ids and
+    ligand_ids their conformers. Neighbors of every glowworm are stored concatenated
+    (as glowworm indexes), in the same order as num_neighbors.
+    """
+
+    def __init__(self, landscape_positions, parameters):
+        """Creates the arrays of a population using a landscape_positions list of
+        DockingLandscapePosition objects and parameters"""
+        if not isinstance(landscape_positions[0][0], DockingLandscapePosition):
+            raise GSOError("Array swarms are only supported for docking")
+        self.docking = True
+        self.rho = parameters.rho
+        self.gamma = parameters.gamma
+        self.beta = parameters.beta
+        self.max_neighbors = parameters.max_neighbors
+        self.max_vision_range = parameters.max_vision_range
+        # Scoring function, models and steps of each scoring function
+        self.templates = [positions[0] for positions in landscape_positions]
+        self.poses = np.array(
+            [
+                [position.get_optimization_vector() for position in positions]
+                for positions in landscape_positions
+            ]
+        )
+        self.receptor_ids = np.array(
+            [
+                [position.receptor_id for position in positions]
+                for positions in landscape_positions
+            ],
+            dtype=np.int64,
+        )
+        self.ligand_ids = np.array(
+            [
+                [position.ligand_id for position in positions]
+                for positions in landscape_positions
+            ],
+            dtype=np.int64,
+        )
+        # Ligand reference points of the first scoring function, used as distance
+        self.reference_points = np.array(
+            [
+                position.ligand_reference_points.coordinates
+                for position in landscape_positions[0]
+            ]
+        )
+        num_glowworms = self.get_size()
+        self.luciferin = np.full(num_glowworms, parameters.initial_luciferin)
+        self.vision_range = np.full(num_glowworms, parameters.initial_vision_range)
+        self.scoring = np.zeros(num_glowworms)
+        self.moved = np.zeros(num_glowworms, dtype=bool)
+        self.step = np.zeros(num_glowworms, dtype=np.int64)
+        self.num_neighbors = np.zeros(num_glowworms, dtype=np.int64)
+        self.neighbors = np.empty(0, dtype=np.int64)
+        # ReceptorCrop in use for each scoring function, if any
+        self.receptor_crops = [None] * len(self.templates)
+        # Optional EnergyCache of docking poses
+        self.energy_cache = None
+        # Glowworms and evaluations of the last scoring requests
+        self.pending = np.empty(0, dtype=np.int64)
+        self.evaluations = []
+        # Threads scoring the poses of each batch
+        self.scoring_threads = 1
+        # Wall time of the simulation phases and counters of its work
+        self.timer = SimulationTimer()
+
+    def scoring_requests(self):
+        """Scoring requests of the glowworms to be evaluated at this step.
+
+        Glowworms which moved (and all of them at the first step) are requested for
+        each scoring function, skipping the poses found in the energy cache. Energies
+        of the requests are given back to update_luciferin.
+        """
+        self.pending = np.flatnonzero(self.moved | (self.step == 0))
+        self.evaluations = []
+        requests = []
+        if len(self.pending):
+            for scoring_id in range(len(self.templates)):
+                indexes = self.pending
+                lookup = None
+                if self.energy_cache is not None:
+                    keys = [
+                        self.energy_cache.pose_key(
+                            scoring_id, receptor_id, ligand_id, pose
+                        )
+                        for receptor_id, ligand_id, pose in zip(
+                            self.receptor_ids[scoring_id, indexes],
+                            self.ligand_ids[scoring_id, indexes],
+                            self.poses[scoring_id, indexes],
+                        )
+                    ]
+                    lookup = (keys,) + self.energy_cache.lookup(keys)
+                    self.timer.count("cache_hits", len(keys) - len(lookup[2]))
+                    self.timer.count("cache_misses", len(lookup[2]))
+                    indexes = indexes[list(lookup[2].values())]
+                pose_requests, selections = self.pose_requests(scoring_id, indexes)
+                self.evaluations.append((len(indexes), selections, lookup))
+                requests.extend(pose_requests)
+        return requests
+
+    def update_luciferin(self, energies=None):
+        """Updates luciferin of each glowworm.
+
+        energies are the ones of the last scoring_requests. If not given, requests are
+        scored here, in a single batch call for each scoring function.
+        """
+        if energies is None:
+            energies = score_requests(self.scoring_requests(), self.scoring_threads)
+        if len(self.pending):
+            scoring = 0.0
+            first = 0
+            for num_poses, selections, lookup in self.evaluations:
+                calculated = gather_energies(
+                    num_poses, selections, energies[first : first + len(selections)]
+                )
+                first += len(selections)
+                if lookup is not None:
+                    calculated = np.array(
+                        self.energy_cache.complete(*lookup, calculated)
+                    )
+                scoring = scoring + calculated
+            self.scoring[self.pending] = scoring
+            self.update_reference_points(self.pending)
+        self.luciferin = (1.0 - self.rho) * self.luciferin + self.gamma * self.scoring
+        self.step += 1
+        self.pending = np.empty(0, dtype=np.int64)
+        self.evaluations = []
+
+    def pose_requests(self, scoring_id, indexes):
+        """Scoring requests of the poses of the given glowworms for a scoring function,
+        two if some of them use the cropped receptor. Returns the requests and the
+        positions in indexes of the poses of each one."""
+        template = self.templates[scoring_id]
+        poses = self.poses[scoring_id, indexes]
+        crop = self.receptor_crops[scoring_id]
+        cropped = np.zeros(len(indexes), dtype=bool)
+        if crop is not None:
+            cropped[:] = [
+                crop.contains(pose[:3], pose[7 + template.num_rec_nmodes :])
+                for pose in poses
+            ]
+        requests = []
+        selections = []
+        for receptor, selected in (
+            (template.receptor, ~cropped),
+            (crop and crop.model, cropped),
+        ):
+            if not selected.any():
+                continue
+            selected = np.flatnonzero(selected)
+            requests.append(
+                ScoringRequest(
+                    template.objective_function,
+                    receptor,
+                    template.ligand,
+                    poses[selected],
+                    template.num_rec_nmodes,
+                    template.num_lig_nmodes,
+                    self.receptor_ids[scoring_id, indexes[selected]].tolist(),
+                    self.ligand_ids[scoring_id, indexes[selected]].tolist(),
+                )
+            )
+            selections.append(selected)
+        return requests, selections
+
+    def update_reference_points(self, indexes):
+        """Moves the ligand reference points of the given glowworms to their poses"""
+        poses = self.poses[0, indexes]
+        self.reference_points[indexes] = (
+            rotate_points(
+                poses[:, 3:7], self.templates[0].ligand.reference_points.coordinates
+            )
+            + poses[:, None, :3]
+        )
+
+    def movement_phase(self, rnd_generator):
+        """Searches the neighbors of each glowworm, moves it towards one of them chosen
+        following GSO algorithm and updates its vision range"""
+        num_glowworms = self.get_size()
+        glowworm_ids = np.arange(num_glowworms)
+        random_numbers = np.array([rnd_generator() for _ in range(num_glowworms)])
+        with self.timer.phase("neighbors"):
+            selected = self.search_neighbors(random_numbers)
+        self.timer.count("neighbor_pairs", len(self.neighbors))
+
+        previous_poses = self.poses.copy()
+        self.moved = selected != glowworm_ids
+        for scoring_id, (poses, targets) in enumerate(
+            zip(previous_poses, previous_poses[:, selected])
+        ):
+            moving = self.moved & self.different_poses(poses, targets)
+            self.poses[scoring_id, moving] = self.move_poses(
+                scoring_id, poses[moving], targets[moving]
+            )
+
+        # Conformers are updated with the neighbor as found at its turn, i.e., already
+        # moved if it comes first. Random numbers are drawn although the update is
+        # disabled, as in DockingLandscapePosition.update_conformers
+        neighbor_poses = np.where(
+            (selected < glowworm_ids)[None, :, None],
+            self.poses[:, selected],
+            previous_poses[:, selected],
+        )
+        draws = self.different_poses(self.poses, neighbor_poses)
+        for _, scoring_id in np.argwhere(draws.T):
+            template = self.templates[scoring_id]
+            rnd_generator.randint(upper_limit=(len(template.receptor) - 1))
+            rnd_generator.randint(upper_limit=(len(template.ligand) - 1))
+
+        self.vision_range = np.minimum(
+            self.max_vision_range,
+            np.maximum(
+                0.0,
+                self.vision_range
+                + self.beta * (self.max_neighbors - self.num_neighbors),
+            ),
+        )
+
+    def search_neighbors(self, random_numbers):
+        """Searches the neighbors of each glowworm and selects the one to move toward.
+
+        Neighbors are chosen by roulette selection using the given random numbers and
+        the accumulated probabilities of moving toward each neighbor. Returns the index
+        of the glowworm selected by each glowworm (itself if it has no neighbors).
+        """
+        num_glowworms, num_points = self.reference_points.shape[:2]
+        reference_points = self.reference_points.reshape((num_glowworms, -1))
+        luciferin = self.luciferin
+        squared_vision_range = self.vision_range**2
+        selected = np.arange(num_glowworms)
+        num_neighbors = []
+        neighbors = []
+        for first in range(0, num_glowworms, NEIGHBORS_BLOCK_SIZE):
+            block = slice(first, first + NEIGHBORS_BLOCK_SIZE)
+            delta = reference_points[block, None, :] - reference_points[None, :, :]
+            distance2 = np.sum(delta**2, axis=-1) / num_points
+            # A glowworm is never brighter than itself
+            is_neighbor = (luciferin[block, None] < luciferin[None, :]) & (
+                distance2 < squared_vision_range[block, None]
+            )
+            num_neighbors.append(np.count_nonzero(is_neighbor, axis=1))
+            neighbors.append(np.nonzero(is_neighbor)[1])
+
+            # Accumulated probabilities, summed in the order of the neighbors
+            differences = np.where(
+                is_neighbor, luciferin[None, :] - luciferin[block, None], 0.0
+            )
+            has_neighbors = num_neighbors[-1] > 0
+            total = np.cumsum(differences, axis=1)[:, -1]
+            total[~has_neighbors] = 1.0
+            probabilities = np.cumsum(differences / total[:, None], axis=1)
+            random_number = random_numbers[block, None]
+            reached = is_neighbor & (probabilities >= random_number)
+            # The last neighbor is chosen if the random number is not positive
+            last = num_glowworms - 1 - np.argmax(is_neighbor[:, ::-1], axis=1)
+            choice = np.where(
+                reached.any(axis=1) & (random_number[:, 0] > 0.0),
+                np.argmax(reached, axis=1),
+                last,
+            )
+            selected[block] = np.where(has_neighbors, choice, selected[block])
+
+        self.num_neighbors = np.concatenate(num_neighbors)
+        self.neighbors = np.concatenate(neighbors).astype(np.int64)
+        return selected
+
+    @staticmethod
+    def different_poses(poses, others):
+        """Mask of the poses which are not equal to others, as compared by
+        DockingLandscapePosition.__eq__"""
+        return (
+            np.any(poses[..., :3] != others[..., :3], axis=-1)
+            | np.any(
+                ~(np.abs(poses[..., 3:7] - others[..., 3:7]) < QUATERNION_PRECISION),
+                axis=-1,
+            )
+            | np.any(poses[..., 7:] != others[..., 7:], axis=-1)
+        )
+
+    def move_poses(self, scoring_id, poses, targets):
+        """Poses moved a fixed step for translation, rotation and normal modes towards
+        targets, as DockingLandscapePosition.move"""
+        template = self.templates[scoring_id]
+        num_rec_nmodes = template.num_rec_nmodes
+        moved = poses.copy()
+        step_towards(moved[:, :3], targets[:, :3], template.step_translation)
+        moved[:, 3:7] = slerp_quaternions(
+            poses[:, 3:7], targets[:, 3:7], template.step_rotation
+        )
+        if num_rec_nmodes > 0:
+            step_towards(
+                moved[:, 7 : 7 + num_rec_nmodes],
+                targets[:, 7 : 7 + num_rec_nmodes],
+                template.step_nmodes,
+            )
+        if template.num_lig_nmodes > 0:
+            step_towards(
+                moved[:, 7 + num_rec_nmodes :],
+                targets[:, 7 + num_rec_nmodes :],
+                template.step_nmodes,
+            )
+        return moved
+
+    def landscape_position(self, scoring_id, index):
+        """DockingLandscapePosition of a glowworm for a scoring function"""
+        template = self.templates[scoring_id]
+        position = DockingLandscapePosition(
+            template.objective_function,
+            self.poses[scoring_id, index],
+            template.receptor,
+            template.ligand,
+            int(self.receptor_ids[scoring_id, index]),
+            int(self.ligand_ids[scoring_id, index]),
+            template.step_translation,
+            template.step_rotation,
+            template.step_nmodes,
+            template.num_rec_nmodes,
+            template.num_lig_nmodes,
+        )
+        position.receptor_crop = self.receptor_crops[scoring_id]
+        return position
+
+    def crop_receptors(self, margin=DEFAULT_CROP_MARGIN):
+        """Scores the glowworms against receptor models cropped to the region reachable
+        from the current poses plus a margin.
+
+        Receptors are only cropped for scoring functions with an interaction cutoff and
+        without receptor normal modes, and if some atoms are out of reach. Returns the
+        list of ReceptorCrop objects in use.
+        """
+        crops = []
+        translations = self.poses[0, :, :3].copy()
+        center = np.mean(translations, axis=0)
+        reach = np.max(np.linalg.norm(translations - center, axis=1)) + margin
+        for scoring_id, template in enumerate(self.templates):
+            cutoff = template.objective_function.interaction_cutoff
+            if cutoff is None or template.num_rec_nmodes > 0:
+                continue
+            crop = ReceptorCrop(
+                template.receptor, template.ligand, center, reach, cutoff
+            )
+            if len(crop.atoms) == crop.num_receptor_atoms:
+                # The whole receptor is within reach
+                continue
+            self.receptor_crops[scoring_id] = crop
+            crops.append(crop)
+        return crops
+
+    def minimize_best(self):
+        """Minimizes the glowworm with better energy using a local non-gradient
+        minimization method"""
+        best = int(np.argmax(self.scoring))
+        energies = []
+        for scoring_id in range(len(self.templates)):
+            position = self.landscape_position(scoring_id, best)
+            energies.append(position.minimize())
+            self.poses[scoring_id, best] = position.get_optimization_vector()
+            if self.energy_cache is not None:
+                self.energy_cache.put(
+                    self.energy_cache.key(scoring_id, position), energies[-1]
+                )
+            if scoring_id == 0:
+                # Reference points are left as in the last evaluation of the
+                # minimization, as the ones of a minimized DockingLandscapePosition
+                self.reference_points[best] = (
+                    position.ligand_reference_points.coordinates
+                )
+        self.scoring[best] = sum(energies)
+
+    def get_size(self):
+        """Gets the population size of this swarm of glowworms"""
+        return self.poses.shape[1]
+
+    def get_state(self):
+        """State of the swarm as arrays, in the same format as Swarm.get_state"""
+        return {
+            "poses": self.poses.transpose((1, 0, 2)).copy(),
+            "structure_ids": np.stack(
+                [self.receptor_ids.T, self.ligand_ids.T], axis=-1
+            ),
+            "luciferin": self.luciferin.copy(),
+            "vision_range": self.vision_range.copy(),
+            "scoring": self.scoring.copy(),
+            "moved": self.moved.copy(),
+            "glowworm_step": self.step.copy(),
+            "num_neighbors": self.num_neighbors.copy(),
+            "neighbors": self.neighbors.copy(),
+        }
+
+    def set_state(self, state):
+        """Restores the state returned by get_state"""
+        self.poses = np.ascontiguousarray(
+            state["poses"].transpose((1, 0, 2)), dtype=np.float64
+        )
+        self.receptor_ids = state["structure_ids"][:, :, 0].T.astype(np.int64)
+        self.ligand_ids = state["structure_ids"][:, :, 1].T.astype(np.int64)
+        self.luciferin = state["luciferin"].astype(np.float64)
+        self.vision_range = state["vision_range"].astype(np.float64)
+        self.scoring = state["scoring"].astype(np.float64)
+        self.moved = state["moved"].astype(bool)
+        self.step = state["glowworm_step"].astype(np.int64)
+        self.num_neighbors = state["num_neighbors"].astype(np.int64)
+        self.neighbors = state["neighbors"].astype(np.int64)
+        self.update_reference_points(np.arange(self.get_size()))
+
+    def save(self, step, destination_path, file_name=""):
+        """Saves actual population status to a file"""
+        if file_name:
+            dest_file_name = Path(destination_path) / file_name
+        else:
+            dest_file_name = Path(destination_path) / f"gso_{step:d}.out"
+
+        with open(dest_file_name, "w") as dest_file:
+            dest_file.write(str(self))
+
+    def save_trajectory(self, step, destination_path):
+        """Appends actual population status to the binary trajectory file"""
+        append_to_trajectory(Path(destination_path) / GSO_TRAJECTORY_FILE, self, step)
+
+    def __repr__(self):
+        """String representation of the population"""
+        rows = swarm_to_array(self, 0)
+        pose_length = rows.shape[1] - TRAJECTORY_EXTRA_COLUMNS
+        representation = "#Coordinates  RecID  LigID  Luciferin  Neighbor's number  Vision Range  Scoring\n"
+        for row in rows:
+            representation += row_to_legacy(row, pose_length) + "\n"
+        return representation
@@ -0,0 +1,112 @@
+"""Bounded cache of the energies of already scored docking poses"""
+
+from collections import OrderedDict
+import numpy as np
+from lightdock.constants import DEFAULT_ENERGY_CACHE_DECIMALS
+from lightdock.error.lightdock_errors import GSOError
+
+
+class EnergyCache(object):
+    """LRU cache of energies shared by the glowworms of a swarm.
+
+    Poses are identified by the scoring function, receptor and ligand conformers and
+    the optimization vector rounded to a number of decimals, so glowworms collapsing
+    onto the same pose are only scored once.
+    """
+
+    def __init__(self, max_size, decimals=DEFAULT_ENERGY_CACHE_DECIMALS):
+        if max_size < 1:
+            raise GSOError("Wrong energy cache size: %s" % max_size)
+        self.max_size = max_size
+        self.decimals = decimals
+        self.energies = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, scoring_id, position):
+        """Key of the pose of a docking landscape position"""
+        return self.pose_key(
+            scoring_id,
+            position.receptor_id,
+            position.ligand_id,
+            position.get_optimization_vector(),
+        )
+
+    def pose_key(self, scoring_id, receptor_id, ligand_id, optimization_vector):
+        """Key of a pose given by its conformers and optimization vector"""
+        # Adding 0.0 turns -0.0 into 0.0
+        vector = np.round(optimization_vector, self.decimals) + 0.0
+        return (scoring_id, int(receptor_id), int(ligand_id), vector.tobytes())
+
+    def lookup(self, keys):
+        """Cached energies of keys (None if not cached) and the first index of each
+        key to be calculated. Repeated keys are only calculated once.
+        """
+        energies = []
+        missing = OrderedDict()
+        for index, key in enumerate(keys):
+            energy = self.energies.get(key)
+            if energy is not None:
+                self.energies.move_to_end(key)
+                self.hits += 1
+            elif key in missing:
+                self.hits += 1
+            else:
+                missing[key] = index
+                self.misses += 1
+            energies.append(energy)
+        return energies, missing
+
+    def complete(self, keys, energies, missing, calculated):
+        """Fills the energies returned by lookup with the calculated energies of the
+        missing keys, which are stored in the cache"""
+        for (key, index), energy in zip(missing.items(), calculated):
+            energies[index] = float(energy)
+            self.put(key, energies[index])
+        for index, key in enumerate(keys):
+            if energies[index] is None:
+                # Repeated pose in this batch
+                energies[index] = energies[missing[key]]
+        return energies
+
+    def put(self, key, energy):
+        """Stores the energy of key, evicting the least recently used pose if full"""
+        self.energies[key] = energy
+        self.energies.move_to_end(key)
+        if len(self.energies) > self.max_size:
+            self.energies.popitem(last=False)
+
+    def get_state(self):
+        """Cached poses, in least recently used order, and counters as arrays"""
+        keys = list(self.energies)
+        return {
+            "cache_counters": np.array([self.hits, self.misses], dtype=np.int64),
+            "cache_ids": np.array([key[:3] for key in keys], dtype=np.int64),
+            "cache_vectors": np.array([np.frombuffer(key[3]) for key in keys]),
+            "cache_energies": np.array(list(self.energies.values())),
+        }
+
+    def set_state(self, state):
+        """Restores the cached poses and counters returned by get_state"""
+        self.hits, self.misses = (int(value) for value in state["cache_counters"])
+        self.energies = OrderedDict(
+            (
+                (int(scoring_id), int(receptor_id), int(ligand_id), vector.tobytes()),
+                float(energy),
+            )
+            for (scoring_id, receptor_id, ligand_id), vector, energy in zip(
+                state["cache_ids"], state["cache_vectors"], state["cache_energies"]
+            )
+        )
+
+    def __len__(self):
+        """Number of cached poses"""
+        return len(self.energies)
+
+    def __repr__(self):
+        """String representation of the cache counters"""
+        return "%d hits, %d misses, %d cached poses" % (
+            self.hits,
+            self.misses,
+            len(self),
+        )
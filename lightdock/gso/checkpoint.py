@@ -0,0 +1,70 @@
+"""Checkpoints of a running docking simulation.
+
+A checkpoint stores the state of a swarm after a given step (poses, luciferin, vision
+ranges, neighbors and the rest of the glowworm counters), the state of the random
+number generator and the content of the energy cache and convergence monitor, so a
+simulation resumed from it gives the same results as an uninterrupted one. Phase
+times and counters of the swarm timer are kept too, so they cover the whole run.
+"""
+
+import os
+from pathlib import Path
+import numpy as np
+from lightdock.error.lightdock_errors import GSOError
+
+
+def save_checkpoint(file_name, gso, step):
+    """Saves the state of a docking GSO simulation after step.
+
+    The file is replaced atomically, so a simulation killed while saving keeps the
+    previous checkpoint.
+    """
+    swarm = gso.swarm
+    if not swarm.docking:
+        raise GSOError("Checkpoints are only supported for docking swarms")
+    state = {
+        "step": np.array(step),
+        "seed": np.array(gso.random_number_generator.seed),
+        "random_state": gso.random_number_generator.get_state(),
+    }
+    state.update(swarm.get_state())
+    state.update(swarm.timer.get_state())
+    if swarm.energy_cache is not None:
+        state.update(swarm.energy_cache.get_state())
+    if gso.convergence is not None:
+        state.update(gso.convergence.get_state())
+
+    file_name = Path(file_name)
+    temporary_file_name = file_name.with_name(file_name.name + ".tmp")
+    with open(temporary_file_name, "wb") as output:
+        np.savez(output, **state)
+    os.replace(temporary_file_name, file_name)
+
+
+def load_checkpoint(file_name, gso):
+    """Restores the state of a docking GSO simulation saved by save_checkpoint.
+
+    The simulation has to be created with the same parameters, seed and initial
+    positions as the checkpointed one. Returns the last step completed.
+    """
+    swarm = gso.swarm
+    try:
+        with np.load(file_name) as data:
+            state = {name: data[name] for name in data.files}
+    except (IOError, ValueError) as e:
+        raise GSOError("Can not read checkpoint %s: %s" % (file_name, e))
+
+    if int(state["seed"]) != gso.random_number_generator.seed:
+        raise GSOError("Checkpoint %s was saved with another seed" % file_name)
+    if state["poses"].shape != swarm.get_state()["poses"].shape:
+        raise GSOError("Checkpoint %s was saved for another swarm" % file_name)
+
+    gso.random_number_generator.set_state(state["random_state"])
+    swarm.set_state(state)
+    if "timer_times" in state:
+        swarm.timer.set_state(state)
+    if swarm.energy_cache is not None and "cache_counters" in state:
+        swarm.energy_cache.set_state(state)
+    if gso.convergence is not None and "convergence_converged" in state:
+        gso.convergence.set_state(state)
+    return int(state["step"])
@@ -0,0 +1,114 @@
+"""Convergence monitor of a docking swarm"""
+
+import numpy as np
+from lightdock.constants import (
+    DEFAULT_CONVERGENCE_TOLERANCE,
+    DEFAULT_CONVERGENCE_SPREAD_TOLERANCE,
+    DEFAULT_CONVERGENCE_DISPLACEMENT,
+)
+from lightdock.error.lightdock_errors import GSOError
+
+
+class ConvergenceMonitor(object):
+    """Detects when a swarm stagnates.
+
+    After each step the best scoring found so far, the luciferin spread (maximum minus
+    minimum) and the glowworm translations are recorded. The swarm has converged when,
+    over the last window steps:
+
+        - the best scoring improved less than tolerance (relative to its magnitude,
+          if larger than 1),
+        - the mean luciferin spread changed less than spread_tolerance (relative to
+          the mean spread of the previous window steps) and
+        - the mean displacement of the glowworms was not larger than displacement
+          (in Angstroms). Glowworms keep oscillating around their neighbors, so the
+          displacement is measured over the whole window and not step by step.
+    """
+
+    def __init__(
+        self,
+        window,
+        tolerance=DEFAULT_CONVERGENCE_TOLERANCE,
+        spread_tolerance=DEFAULT_CONVERGENCE_SPREAD_TOLERANCE,
+        displacement=DEFAULT_CONVERGENCE_DISPLACEMENT,
+    ):
+        if window < 1:
+            raise GSOError("Wrong convergence window: %s" % window)
+        self.window = window
+        self.tolerance = tolerance
+        self.spread_tolerance = spread_tolerance
+        self.displacement = displacement
+        self.best_scoring = []
+        self.luciferin_spread = []
+        self.translations = []
+        self.converged = False
+
+    def stagnated(self):
+        """Checks the convergence criteria over the recorded steps"""
+        if len(self.luciferin_spread) < 2 * self.window:
+            return False
+        reference = self.best_scoring[0]
+        if self.best_scoring[-1] - reference > self.tolerance * max(
+            1.0, abs(reference)
+        ):
+            return False
+        previous_spread = np.mean(self.luciferin_spread[: self.window])
+        spread = np.mean(self.luciferin_spread[self.window :])
+        if abs(spread - previous_spread) > self.spread_tolerance * previous_spread:
+            return False
+        displacement = np.mean(
+            np.linalg.norm(self.translations[-1] - self.translations[0], axis=1)
+        )
+        return displacement <= self.displacement
+
+    def update(self, swarm):
+        """Records the current state of a docking swarm.
+
+        Returns True if the swarm has converged.
+        """
+        state = swarm.get_state()
+        best_scoring = float(np.max(state["scoring"]))
+        if self.best_scoring:
+            best_scoring = max(best_scoring, self.best_scoring[-1])
+        luciferin = state["luciferin"]
+        self.best_scoring.append(best_scoring)
+        self.luciferin_spread.append(float(np.max(luciferin) - np.min(luciferin)))
+        self.translations.append(state["poses"][:, 0, :3])
+        # Only the values of the last steps are needed
+        del self.best_scoring[: -self.window - 1]
+        del self.luciferin_spread[: -2 * self.window]
+        del self.translations[: -self.window - 1]
+
+        self.converged = self.stagnated()
+        return self.converged
+
+    def get_state(self):
+        """Recorded values as arrays"""
+        return {
+            "convergence_best_scoring": np.array(self.best_scoring),
+            "convergence_luciferin_spread": np.array(self.luciferin_spread),
+            "convergence_translations": np.array(self.translations).reshape(
+                (len(self.translations), -1, 3)
+            ),
+            "convergence_converged": np.array(self.converged),
+        }
+
+    def set_state(self, state):
+        """Restores the recorded values returned by get_state"""
+        self.best_scoring = [
+            float(value) for value in state["convergence_best_scoring"]
+        ]
+        self.luciferin_spread = [
+            float(value) for value in state["convergence_luciferin_spread"]
+        ]
+        self.translations = list(state["convergence_translations"])
+        self.converged = bool(state["convergence_converged"])
+
+    def __repr__(self):
+        """String representation of the last recorded values"""
+        if not self.best_scoring:
+            return "no steps recorded"
+        return "best scoring %.6f, luciferin spread %.6f" % (
+            self.best_scoring[-1],
+            self.luciferin_spread[-1],
+        )
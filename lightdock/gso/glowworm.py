@@ -47,13 +47,19 @@ class Glowworm(object):
         """Compares if this glowworm is not other"""
         return self.id != other.id
 
-    def compute_luciferin(self):
-        """Updates luciferin of the current glowworm and returns its value"""
+    def compute_luciferin(self, scoring=None):
+        """Updates luciferin of the current glowworm and returns its value.
+
+        If the glowworm needs to be evaluated and scoring is given (i.e. calculated for
+        the whole swarm at once), it is used instead of evaluating its positions.
+        """
         if self.moved or self.step == 0:
-            self.scoring = sum(
-                landscape_position.evaluate_objective_function()
-                for landscape_position in self.landscape_positions
-            )
+            if scoring is None:
+                scoring = sum(
+                    landscape_position.evaluate_objective_function()
+                    for landscape_position in self.landscape_positions
+                )
+            self.scoring = scoring
         self.luciferin = (1.0 - self.rho) * self.luciferin + self.gamma * self.scoring
         self.step += 1
         return self.luciferin
@@ -125,11 +131,16 @@ class Glowworm(object):
         )
 
     def minimize(self):
-        """Minimizes the glowworm's landscape position and updates its scoring"""
-        self.scoring = sum(
+        """Minimizes the glowworm's landscape position and updates its scoring.
+
+        Returns the energy of each landscape position.
+        """
+        energies = [
             landscape_position.minimize()
             for landscape_position in self.landscape_positions
-        )
+        ]
+        self.scoring = sum(energies)
+        return energies
 
     def __repr__(self):
         """String representation of a glowworm"""
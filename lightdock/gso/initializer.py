@@ -1,6 +1,7 @@
 """Module to generate initial populations of glowworms agents used by the GSO algorithm"""
 
 from lightdock.gso.swarm import Swarm
+from lightdock.gso.array_swarm import ArraySwarm
 from lightdock.gso.coordinates import CoordinatesFileReader, Coordinates
 from lightdock.error.lightdock_errors import GSOCoordinatesError
 from lightdock.gso.searchspace.landscape import (
@@ -22,11 +23,12 @@ class Initializer(object):
         self.number_of_glowworms = number_of_glowworms
         self.parameters = gso_parameters
         self.positions = []
+        self.swarm_class = Swarm
 
     def generate_glowworms(self):
         """Creates an initial population of glowworms"""
         self.positions = self.generate_landscape_positions()
-        return Swarm(self.positions, self.parameters)
+        return self.swarm_class(self.positions, self.parameters)
 
     def generate_landscape_positions(self):
         """Generates the initial positions of each glowworm"""
@@ -132,6 +134,7 @@ class LightdockFromFileInitializer(Initializer):
         step_nmodes,
         anm_rec,
         anm_lig,
+        array_swarm=False,
     ):
         super(LightdockFromFileInitializer, self).__init__(
             scoring_functions, number_of_glowworms, gso_parameters
@@ -146,6 +149,8 @@ class LightdockFromFileInitializer(Initializer):
         self.random_number_generator = MTGenerator(random_number_generator.seed)
         self.anm_rec = anm_rec
         self.anm_lig = anm_lig
+        if array_swarm:
+            self.swarm_class = ArraySwarm
 
     def generate_landscape_positions(self):
         """Generates a list of landscape positions that have been read
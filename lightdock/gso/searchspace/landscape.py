@@ -9,6 +9,7 @@ from lightdock.constants import (
     DEFAULT_ROTATION_STEP,
 )
 from lightdock.mathutil.cython.quaternion import Quaternion
+from lightdock.scoring.batch import ScoringRequest
 
 
 class LandscapePosition(object):
@@ -101,6 +102,54 @@ class LandscapePosition(object):
         return str(self.coordinates)
 
 
+class ReceptorCrop(object):
+    """Receptor model cropped to the atoms a ligand can reach from a region.
+
+    Ligand poses whose reference is within reach of center are scored against the
+    cropped model. Receptor atoms out of the crop are farther than the interaction
+    cutoff of the scoring function from any ligand atom of these poses.
+    """
+
+    def __init__(self, receptor, ligand, center, reach, cutoff):
+        self.center = np.array(center, dtype=np.float64)
+        self.cutoff = cutoff
+        # Ligands are rotated around the origin, so this radius holds for any pose
+        self.ligand_radius = max(
+            np.max(np.linalg.norm(coordinates.coordinates, axis=1))
+            for coordinates in ligand.coordinates
+        )
+        # Maximum displacement of a ligand atom for a unit extent of each mode
+        self.ligand_modes_reach = None
+        if ligand.n_modes is not None:
+            modes = ligand.modes_tensor
+            if modes is None:
+                modes = ligand.build_modes_tensor()
+            self.ligand_modes_reach = np.max(
+                np.linalg.norm(modes.reshape((len(modes), -1, 3)), axis=2), axis=1
+            )
+        self.radius = reach + self.ligand_radius + cutoff
+        inside = np.zeros(len(receptor.coordinates[0].coordinates), dtype=bool)
+        for coordinates in receptor.coordinates:
+            distances = np.linalg.norm(coordinates.coordinates - self.center, axis=1)
+            inside |= distances <= self.radius
+        self.atoms = np.flatnonzero(inside)
+        self.num_receptor_atoms = len(inside)
+        self.model = receptor.crop(self.atoms)
+
+    def contains(self, translation, lig_extent=()):
+        """Checks if the ligand pose with this translation and normal modes extent can
+        be scored against the cropped receptor"""
+        reach = np.linalg.norm(translation - self.center) + self.ligand_radius
+        if len(lig_extent):
+            reach += np.dot(
+                np.abs(lig_extent), self.ligand_modes_reach[: len(lig_extent)]
+            )
+        return reach + self.cutoff <= self.radius
+
+    def __repr__(self):
+        return "%d of %d receptor atoms" % (len(self.atoms), self.num_receptor_atoms)
+
+
 class DockingLandscapePosition(LandscapePosition):
     """Represents a current complex in the energy landscape.
 
@@ -151,6 +200,10 @@ class DockingLandscapePosition(LandscapePosition):
         self.receptor_pose = self.receptor.coordinates[self.receptor_id].clone()
         self.ligand_pose = self.ligand.coordinates[self.ligand_id].clone()
         self.ligand_reference_points = self.ligand.reference_points.clone()
+        # Receptor structure and extent of the current receptor_pose, None if not built
+        self.receptor_pose_key = None
+        # Optional ReceptorCrop used for the poses within its reach
+        self.receptor_crop = None
 
     def clone(self):
         """Creates a copy of this landscape position"""
@@ -165,7 +218,7 @@ class DockingLandscapePosition(LandscapePosition):
         ]
         coordinates.extend(self.rec_extent)
         coordinates.extend(self.lig_extent)
-        return DockingLandscapePosition(
+        position = DockingLandscapePosition(
             self.objective_function,
             coordinates,
             self.receptor,
@@ -178,48 +231,112 @@ class DockingLandscapePosition(LandscapePosition):
             self.num_rec_nmodes,
             self.num_lig_nmodes,
         )
+        position.receptor_crop = self.receptor_crop
+        return position
+
+    def cropped(self):
+        """Checks if the current pose is scored against the cropped receptor"""
+        return self.receptor_crop is not None and self.receptor_crop.contains(
+            self.translation, self.lig_extent
+        )
 
     def evaluate_objective_function(
         self, receptor_structure_id=None, ligand_structure_id=None
     ):
         """Evaluates the objective function at the given coordinates"""
-        # Copy of the coordinates
         if receptor_structure_id:
             rec_id = receptor_structure_id
         else:
             rec_id = self.receptor_id
-        self.receptor_pose = self.receptor.coordinates[rec_id].clone()
         if ligand_structure_id:
             lig_id = ligand_structure_id
         else:
             lig_id = self.ligand_id
-        self.ligand_pose = self.ligand.coordinates[lig_id].clone()
-        self.ligand_reference_points = self.ligand.reference_points.clone()
-
-        # Use normal modes if provided:
-        if self.num_rec_nmodes > 0:
-            for i in range(self.num_rec_nmodes):
-                # Only atoms as True in the mask are moved
-                self.receptor_pose.coordinates[self.receptor.nm_mask, :] += (
-                    self.receptor.n_modes[i] * self.rec_extent[i]
-                )
-        if self.num_lig_nmodes > 0:
-            for i in range(self.num_lig_nmodes):
-                # Only atoms as True in the mask are moved
-                self.ligand_pose.coordinates[self.ligand.nm_mask, :] += (
-                    self.ligand.n_modes[i] * self.lig_extent[i]
+        # Use normal modes if provided. Poses are built in place and the receptor
+        # pose is only rebuilt if its structure or extent changed
+        if self.cropped():
+            receptor = self.receptor_crop.model
+            receptor_pose = receptor.coordinates[rec_id]
+        else:
+            receptor_pose_key = (rec_id, tuple(self.rec_extent))
+            if receptor_pose_key != self.receptor_pose_key:
+                self.receptor.pose_coordinates(
+                    rec_id, self.rec_extent, self.receptor_pose
                 )
+                self.receptor_pose_key = receptor_pose_key
+            receptor = self.receptor
+            receptor_pose = self.receptor_pose
+        self.ligand.pose_coordinates(lig_id, self.lig_extent, self.ligand_pose)
 
         # We rotate first, ligand it's at initial position
         self.ligand_pose.rotate(self.rotation)
-        self.ligand_reference_points.rotate(self.rotation)
         # Then translate
         self.ligand_pose.translate(self.translation)
-        self.ligand_reference_points.translate(self.translation)
+        self.update_reference_points()
         return self.objective_function(
-            self.receptor, self.receptor_pose, self.ligand, self.ligand_pose
+            receptor, receptor_pose, self.ligand, self.ligand_pose
         )
 
+    @staticmethod
+    def scoring_requests(positions):
+        """Scoring requests of several positions.
+
+        All positions must share scoring function, receptor and ligand. Poses are
+        requested in a single ScoringRequest, or in two if some of them use the
+        cropped receptor. Returns the requests and the indexes of the positions in each
+        one.
+        """
+        requests = []
+        selections = []
+        if not positions:
+            return requests, selections
+        first = positions[0]
+        cropped = np.array([position.cropped() for position in positions], dtype=bool)
+        for receptor, selected in (
+            (first.receptor, ~cropped),
+            (first.receptor_crop and first.receptor_crop.model, cropped),
+        ):
+            if not selected.any():
+                continue
+            selected = np.flatnonzero(selected)
+            requests.append(
+                ScoringRequest(
+                    first.objective_function,
+                    receptor,
+                    first.ligand,
+                    np.array(
+                        [
+                            positions[index].get_optimization_vector()
+                            for index in selected
+                        ]
+                    ),
+                    first.num_rec_nmodes,
+                    first.num_lig_nmodes,
+                    [positions[index].receptor_id for index in selected],
+                    [positions[index].ligand_id for index in selected],
+                )
+            )
+            selections.append(selected)
+        return requests, selections
+
+    def update_reference_points(self):
+        """Moves the ligand reference points to the current pose"""
+        self.ligand_reference_points.coordinates[...] = (
+            self.ligand.reference_points.coordinates
+        )
+        self.ligand_reference_points.rotate(self.rotation)
+        self.ligand_reference_points.translate(self.translation)
+
+    def get_optimization_vector(self):
+        """Translation, rotation quaternion and normal modes extents of this position"""
+        optimization_vector = []
+        optimization_vector.extend(self.translation)
+        q = self.rotation
+        optimization_vector.extend([q.w, q.x, q.y, q.z])
+        optimization_vector.extend(self.rec_extent)
+        optimization_vector.extend(self.lig_extent)
+        return np.array(optimization_vector)
+
     def __eq__(self, other):
         """Compares for equality"""
         return (
@@ -319,13 +436,7 @@ class DockingLandscapePosition(LandscapePosition):
         """Returns the new scoring after minimizing this landscape position using a local non-grandient
         minimization method.
         """
-        optimization_vector = []
-        optimization_vector.extend(self.translation)
-        q = self.rotation
-        optimization_vector.extend([q.w, q.x, q.y, q.z])
-        optimization_vector.extend(self.rec_extent)
-        optimization_vector.extend(self.lig_extent)
-        optimization_vector = np.array(optimization_vector)
+        optimization_vector = self.get_optimization_vector()
 
         # Minimize using Powell algorythm
         result = fmin_powell(
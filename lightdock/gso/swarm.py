@@ -2,7 +2,18 @@
 
 from operator import attrgetter
 from pathlib import Path
+import numpy as np
 from lightdock.gso.glowworm import Glowworm
+from lightdock.gso.searchspace.landscape import DockingLandscapePosition, ReceptorCrop
+from lightdock.gso.trajectory import append_to_trajectory
+from lightdock.gso.timing import SimulationTimer
+from lightdock.mathutil.cython.quaternion import Quaternion
+from lightdock.scoring.batch import score_requests, gather_energies
+from lightdock.constants import GSO_TRAJECTORY_FILE, DEFAULT_CROP_MARGIN
+from lightdock.error.lightdock_errors import GSOError
+
+# Glowworms per block of pairwise distances in the neighbor search
+NEIGHBORS_BLOCK_SIZE = 256
 
 
 class Swarm(object):
@@ -20,11 +31,86 @@ class Swarm(object):
         self.docking = (
             landscape_positions[0][0].__class__.__name__ != "LandscapePosition"
         )
+        # Optional EnergyCache of docking poses
+        self.energy_cache = None
+        # Glowworms and evaluations of the last scoring requests
+        self.pending = []
+        self.evaluations = []
+        # Threads scoring the poses of each batch
+        self.scoring_threads = 1
+        # Wall time of the simulation phases and counters of its work
+        self.timer = SimulationTimer()
+
+    def scoring_requests(self):
+        """Scoring requests of the glowworms to be evaluated at this step.
+
+        In docking, glowworms which moved (and all of them at the first step) are
+        requested for each scoring function, skipping the poses found in the energy
+        cache. Energies of the requests are given back to update_luciferin.
+        """
+        self.pending = []
+        self.evaluations = []
+        requests = []
+        if self.docking:
+            self.pending = [
+                glowworm
+                for glowworm in self.glowworms
+                if glowworm.moved or glowworm.step == 0
+            ]
+        if self.pending:
+            for scoring_id in range(len(self.pending[0].landscape_positions)):
+                positions = [
+                    glowworm.landscape_positions[scoring_id]
+                    for glowworm in self.pending
+                ]
+                lookup = None
+                if self.energy_cache is not None:
+                    keys = [
+                        self.energy_cache.key(scoring_id, position)
+                        for position in positions
+                    ]
+                    lookup = (keys,) + self.energy_cache.lookup(keys)
+                    self.timer.count("cache_hits", len(keys) - len(lookup[2]))
+                    self.timer.count("cache_misses", len(lookup[2]))
+                    positions = [positions[index] for index in lookup[2].values()]
+                (
+                    position_requests,
+                    selections,
+                ) = DockingLandscapePosition.scoring_requests(positions)
+                self.evaluations.append((len(positions), selections, lookup))
+                requests.extend(position_requests)
+        return requests
+
+    def update_luciferin(self, energies=None):
+        """Updates luciferin of each glowworm.
 
-    def update_luciferin(self):
-        """Updates luciferin of each glowworm"""
+        energies are the ones of the last scoring_requests. If not given, requests are
+        scored here, in a single batch call for each scoring function.
+        """
+        if energies is None:
+            energies = score_requests(self.scoring_requests(), self.scoring_threads)
+        scorings = {}
+        if self.pending:
+            function_energies = []
+            first = 0
+            for num_poses, selections, lookup in self.evaluations:
+                calculated = gather_energies(
+                    num_poses, selections, energies[first : first + len(selections)]
+                )
+                first += len(selections)
+                if lookup is not None:
+                    calculated = self.energy_cache.complete(*lookup, calculated)
+                function_energies.append(calculated)
+            for i, glowworm in enumerate(self.pending):
+                scorings[glowworm.id] = sum(
+                    float(energy[i]) for energy in function_energies
+                )
+                for position in glowworm.landscape_positions:
+                    position.update_reference_points()
         for glowworm in self.glowworms:
-            glowworm.compute_luciferin()
+            glowworm.compute_luciferin(scorings.get(glowworm.id))
+        self.pending = []
+        self.evaluations = []
 
     def movement_phase(self, rnd_generator):
         """Updates luciferin and probabilities of each glowworm to move if required
@@ -33,9 +119,14 @@ class Swarm(object):
         selected = []
         positions = {}
         num_glowworms = self.get_size()
+        with self.timer.phase("neighbors"):
+            self.search_neighbors()
+        self.timer.count(
+            "neighbor_pairs",
+            sum(len(glowworm.neighbors) for glowworm in self.glowworms),
+        )
         for i in range(num_glowworms):
             glowworm = self.glowworms[i]
-            glowworm.search_neighbors(self.glowworms)
             glowworm.compute_probability_moving_toward_neighbor()
             selected.append(glowworm.select_random_neighbor(rnd_generator()))
             positions[i] = [
@@ -51,15 +142,168 @@ class Swarm(object):
             glowworm.update_conformers(neighbor, rnd_generator)
             glowworm.update_vision_range()
 
+    def crop_receptors(self, margin=DEFAULT_CROP_MARGIN):
+        """Scores the glowworms against receptor models cropped to the region reachable
+        from the current poses plus a margin.
+
+        Receptors are only cropped for scoring functions with an interaction cutoff and
+        without receptor normal modes, and if some atoms are out of reach. Returns the
+        list of ReceptorCrop objects in use.
+        """
+        crops = []
+        if not self.docking:
+            return crops
+        translations = np.array(
+            [glowworm.landscape_positions[0].translation for glowworm in self.glowworms]
+        )
+        center = np.mean(translations, axis=0)
+        reach = np.max(np.linalg.norm(translations - center, axis=1)) + margin
+        for scoring_id, position in enumerate(self.glowworms[0].landscape_positions):
+            cutoff = position.objective_function.interaction_cutoff
+            if cutoff is None or position.num_rec_nmodes > 0:
+                continue
+            crop = ReceptorCrop(
+                position.receptor, position.ligand, center, reach, cutoff
+            )
+            if len(crop.atoms) == crop.num_receptor_atoms:
+                # The whole receptor is within reach
+                continue
+            for glowworm in self.glowworms:
+                glowworm.landscape_positions[scoring_id].receptor_crop = crop
+            crops.append(crop)
+        return crops
+
+    def search_neighbors(self):
+        """Searches the neighbors of each glowworm.
+
+        In docking, distances between the ligand reference points of every pair of
+        glowworms are calculated at once, using the same arithmetic as
+        DockingLandscapePosition.distance2.
+        """
+        if not self.docking:
+            for glowworm in self.glowworms:
+                glowworm.search_neighbors(self.glowworms)
+            return
+
+        reference_points = np.array(
+            [
+                glowworm.landscape_positions[0].ligand_reference_points.coordinates
+                for glowworm in self.glowworms
+            ]
+        )
+        num_glowworms, num_points = reference_points.shape[:2]
+        reference_points = reference_points.reshape((num_glowworms, -1))
+        luciferin = np.array([glowworm.luciferin for glowworm in self.glowworms])
+        squared_vision_range = (
+            np.array([glowworm.vision_range for glowworm in self.glowworms]) ** 2
+        )
+        for first in range(0, num_glowworms, NEIGHBORS_BLOCK_SIZE):
+            block = slice(first, first + NEIGHBORS_BLOCK_SIZE)
+            delta = reference_points[block, None, :] - reference_points[None, :, :]
+            distance2 = np.sum(delta**2, axis=-1) / num_points
+            # A glowworm is never brighter than itself
+            neighbors = (luciferin[block, None] < luciferin[None, :]) & (
+                distance2 < squared_vision_range[block, None]
+            )
+            for glowworm, row in zip(self.glowworms[block], neighbors):
+                glowworm.neighbors = [self.glowworms[j] for j in np.flatnonzero(row)]
+
     def minimize_best(self):
         """Minimizes the glowworm with better energy using a local non-gradient minimization method"""
         best_glowworm = max(self.glowworms, key=attrgetter("scoring"))
-        best_glowworm.minimize()
+        energies = best_glowworm.minimize()
+        if self.energy_cache is not None:
+            for scoring_id, energy in enumerate(energies):
+                self.energy_cache.put(
+                    self.energy_cache.key(
+                        scoring_id, best_glowworm.landscape_positions[scoring_id]
+                    ),
+                    energy,
+                )
 
     def get_size(self):
         """Gets the population size of this swarm of glowworms"""
         return len(self.glowworms)
 
+    def get_state(self):
+        """State of a docking swarm as arrays.
+
+        Poses are given as a (glowworms, scoring functions, pose length) array of
+        optimization vectors and the neighbors of every glowworm are concatenated
+        (as glowworm indexes) in the same order as num_neighbors.
+        """
+        if not self.docking:
+            raise GSOError("Swarm state is only supported for docking swarms")
+        glowworms = self.glowworms
+        indexes = {glowworm.id: index for index, glowworm in enumerate(glowworms)}
+        return {
+            "poses": np.array(
+                [
+                    [
+                        position.get_optimization_vector()
+                        for position in glowworm.landscape_positions
+                    ]
+                    for glowworm in glowworms
+                ]
+            ),
+            "structure_ids": np.array(
+                [
+                    [
+                        (position.receptor_id, position.ligand_id)
+                        for position in glowworm.landscape_positions
+                    ]
+                    for glowworm in glowworms
+                ],
+                dtype=np.int64,
+            ),
+            "luciferin": np.array([glowworm.luciferin for glowworm in glowworms]),
+            "vision_range": np.array([glowworm.vision_range for glowworm in glowworms]),
+            "scoring": np.array([glowworm.scoring for glowworm in glowworms]),
+            "moved": np.array([glowworm.moved for glowworm in glowworms]),
+            "glowworm_step": np.array([glowworm.step for glowworm in glowworms]),
+            "num_neighbors": np.array(
+                [len(glowworm.neighbors) for glowworm in glowworms]
+            ),
+            "neighbors": np.array(
+                [
+                    indexes[neighbor.id]
+                    for glowworm in glowworms
+                    for neighbor in glowworm.neighbors
+                ],
+                dtype=np.int64,
+            ),
+        }
+
+    def set_state(self, state):
+        """Restores the state returned by get_state"""
+        glowworms = self.glowworms
+        first_neighbor = np.concatenate([[0], np.cumsum(state["num_neighbors"])])
+        for index, glowworm in enumerate(glowworms):
+            for position, pose, (receptor_id, ligand_id) in zip(
+                glowworm.landscape_positions,
+                state["poses"][index],
+                state["structure_ids"][index],
+            ):
+                position.translation = pose[:3].copy()
+                position.rotation = Quaternion(pose[3], pose[4], pose[5], pose[6])
+                position.rec_extent = pose[7 : 7 + position.num_rec_nmodes].copy()
+                position.lig_extent = pose[7 + position.num_rec_nmodes :].copy()
+                position.receptor_id = int(receptor_id)
+                position.ligand_id = int(ligand_id)
+                position.receptor_pose_key = None
+                position.update_reference_points()
+            glowworm.luciferin = float(state["luciferin"][index])
+            glowworm.vision_range = float(state["vision_range"][index])
+            glowworm.scoring = float(state["scoring"][index])
+            glowworm.moved = bool(state["moved"][index])
+            glowworm.step = int(state["glowworm_step"][index])
+            glowworm.neighbors = [
+                glowworms[neighbor]
+                for neighbor in state["neighbors"][
+                    first_neighbor[index] : first_neighbor[index + 1]
+                ]
+            ]
+
     def save(self, step, destination_path, file_name=""):
         """Saves actual population status to a file"""
         if file_name:
@@ -71,6 +315,10 @@ class Swarm(object):
         dest_file.write(str(self))
         dest_file.close()
 
+    def save_trajectory(self, step, destination_path):
+        """Appends actual population status to the binary trajectory file"""
+        append_to_trajectory(Path(destination_path) / GSO_TRAJECTORY_FILE, self, step)
+
     def __repr__(self):
         """String representation of the population"""
         if self.docking:
@@ -0,0 +1,108 @@
+"""Wall time of the phases of a GSO simulation and counters of its work"""
+
+import json
+import time
+from contextlib import contextmanager
+import numpy as np
+
+SIMULATION_PHASES = ("scoring", "neighbors", "movement", "minimization", "save")
+"""Phases timed in a simulation"""
+
+SIMULATION_COUNTERS = (
+    "steps",
+    "scoring_requests",
+    "scored_poses",
+    "neighbor_pairs",
+    "cache_hits",
+    "cache_misses",
+)
+"""Counters of a simulation"""
+
+
+class SimulationTimer(object):
+    """Accumulates the wall time spent in each phase of a simulation and its counters.
+
+    Phases may be nested, the time of an inner phase is not accounted to the outer one,
+    so the phase times add up to the time of the simulation.
+    """
+
+    def __init__(self):
+        self.times = dict.fromkeys(SIMULATION_PHASES, 0.0)
+        self.counters = dict.fromkeys(SIMULATION_COUNTERS, 0)
+        # Name and start of the phase being timed, if any
+        self.running = None
+
+    @contextmanager
+    def phase(self, name):
+        """Times the enclosed block as part of the phase name"""
+        start = time.perf_counter()
+        outer = self.running
+        if outer is not None:
+            self.times[outer[0]] += start - outer[1]
+        self.running = (name, start)
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.times[name] += end - self.running[1]
+            self.running = None if outer is None else (outer[0], end)
+
+    def add_time(self, name, elapsed):
+        """Adds elapsed seconds to the phase name"""
+        self.times[name] += elapsed
+
+    def count(self, name, value=1):
+        """Increments the counter name by value"""
+        self.counters[name] += int(value)
+
+    def get_state(self):
+        """Phase times and counters as arrays, in the order of SIMULATION_PHASES and
+        SIMULATION_COUNTERS"""
+        return {
+            "timer_times": np.array([self.times[name] for name in SIMULATION_PHASES]),
+            "timer_counters": np.array(
+                [self.counters[name] for name in SIMULATION_COUNTERS], dtype=np.int64
+            ),
+        }
+
+    def set_state(self, state):
+        """Restores the phase times and counters returned by get_state"""
+        self.times = {
+            name: float(value)
+            for name, value in zip(SIMULATION_PHASES, state["timer_times"])
+        }
+        self.counters = {
+            name: int(value)
+            for name, value in zip(SIMULATION_COUNTERS, state["timer_counters"])
+        }
+
+    def summary(self):
+        """Phase times and counters as a JSON serializable dictionary"""
+        return {
+            "times": dict(self.times),
+            "total_time": sum(self.times.values()),
+            "counters": dict(self.counters),
+        }
+
+    def save(self, file_name):
+        """Writes the summary to file_name as JSON"""
+        with open(file_name, "w") as output:
+            json.dump(self.summary(), output, indent=2, sort_keys=True)
+
+    @staticmethod
+    def merge(summaries):
+        """Sum of several summaries, e.g. the ones of the swarms of a docking"""
+        merged = SimulationTimer().summary()
+        for summary in summaries:
+            for name, value in summary["times"].items():
+                merged["times"][name] = merged["times"].get(name, 0.0) + value
+            for name, value in summary["counters"].items():
+                merged["counters"][name] = merged["counters"].get(name, 0) + value
+            merged["total_time"] += summary["total_time"]
+        return merged
+
+    def __repr__(self):
+        """String representation of the phase times"""
+        return ", ".join(
+            "%s %.3fs" % (name, elapsed) for name, elapsed in self.times.items()
+        )
@@ -0,0 +1,144 @@
+"""Binary trajectory of a docking swarm.
+
+A trajectory file stores the saved steps of a swarm as a flat float64 array with one
+row per glowworm and step, so it can be appended at each step and memory-mapped for
+reading. A row has the following columns:
+
+    step, glowworm, pose (translation, quaternion and ANM extents), receptor id,
+    ligand id, luciferin, number of neighbors, vision range, scoring
+
+The file starts with a header of 24 bytes: a magic string and the pose length and
+number of columns as int64 values.
+"""
+
+import os
+from pathlib import Path
+import numpy as np
+from lightdock.constants import GSO_OUTPUT_FILE
+from lightdock.error.lightdock_errors import GSOError
+
+TRAJECTORY_MAGIC = b"LDTRAJ01"
+TRAJECTORY_HEADER_SIZE = 24
+# Columns not including the pose
+TRAJECTORY_EXTRA_COLUMNS = 8
+
+
+def swarm_to_array(swarm, step):
+    """Rows of the trajectory for the current state of a docking swarm"""
+    if not swarm.docking:
+        raise GSOError("Binary trajectories are only supported for docking swarms")
+    state = swarm.get_state()
+    num_glowworms = len(state["poses"])
+    return np.column_stack(
+        [
+            np.full(num_glowworms, float(step)),
+            np.arange(num_glowworms, dtype=np.float64),
+            state["poses"][:, 0],
+            state["structure_ids"][:, 0],
+            state["luciferin"],
+            state["num_neighbors"],
+            state["vision_range"],
+            state["scoring"],
+        ]
+    )
+
+
+def append_to_trajectory(file_name, swarm, step):
+    """Appends the current state of a docking swarm to a trajectory file.
+
+    The file is created (or truncated) when step is 0.
+    """
+    rows = swarm_to_array(swarm, step)
+    pose_length = rows.shape[1] - TRAJECTORY_EXTRA_COLUMNS
+    new_file = step == 0 or not os.path.exists(file_name)
+    with open(file_name, "wb" if new_file else "ab") as output:
+        if new_file:
+            output.write(TRAJECTORY_MAGIC)
+            output.write(np.array([pose_length, rows.shape[1]], dtype=np.int64))
+        output.write(rows.tobytes())
+
+
+def is_trajectory(file_name):
+    """Checks if file_name is a binary trajectory file"""
+    try:
+        with open(file_name, "rb") as trajectory:
+            return trajectory.read(len(TRAJECTORY_MAGIC)) == TRAJECTORY_MAGIC
+    except IOError:
+        return False
+
+
+def read_trajectory(file_name):
+    """Memory-maps a trajectory file.
+
+    Returns the pose length and a read-only (rows, columns) array.
+    """
+    if not is_trajectory(file_name):
+        raise GSOError("%s is not a LightDock trajectory file" % file_name)
+    pose_length, num_columns = np.fromfile(
+        file_name, dtype=np.int64, count=2, offset=len(TRAJECTORY_MAGIC)
+    )
+    if os.path.getsize(file_name) == TRAJECTORY_HEADER_SIZE:
+        return int(pose_length), np.empty((0, num_columns))
+    data = np.memmap(
+        file_name, dtype=np.float64, mode="r", offset=TRAJECTORY_HEADER_SIZE
+    )
+    return int(pose_length), data.reshape((-1, num_columns))
+
+
+def truncate_trajectory(file_name, step):
+    """Removes the rows saved after step from a trajectory file"""
+    _, data = read_trajectory(file_name)
+    num_rows = int(np.searchsorted(data[:, 0], step, side="right"))
+    row_size = data.shape[1] * data.itemsize
+    del data
+    os.truncate(file_name, TRAJECTORY_HEADER_SIZE + num_rows * row_size)
+
+
+def get_step(data, step=None):
+    """Rows of the given step of a trajectory, the last saved step if None"""
+    if step is None:
+        step = data[-1, 0] if len(data) else 0
+    return data[data[:, 0] == step]
+
+
+def row_to_legacy(row, pose_length):
+    """String representation of a trajectory row as found in a gso_N.out file"""
+    pose = row[2 : 2 + pose_length]
+    receptor_id, ligand_id, luciferin, neighbors, vision_range, scoring = row[
+        2 + pose_length :
+    ]
+    return "(%s) %4d %4d %12.8f %2d %5.3f %12.8f" % (
+        ", ".join(["%10.7f" % v for v in pose]),
+        receptor_id,
+        ligand_id,
+        luciferin,
+        neighbors,
+        vision_range,
+        scoring,
+    )
+
+
+def export_trajectory(file_name, destination_path=None, steps=None):
+    """Writes the gso_N.out text files of the given steps (all by default) of a trajectory.
+
+    Returns the list of files written.
+    """
+    pose_length, data = read_trajectory(file_name)
+    if destination_path is None:
+        destination_path = Path(file_name).parent
+    if steps is None:
+        steps = np.unique(data[:, 0])
+    written = []
+    for step in steps:
+        rows = get_step(data, step)
+        if not len(rows):
+            raise GSOError("Step %d not found in %s" % (step, file_name))
+        output_file_name = Path(destination_path) / (GSO_OUTPUT_FILE % int(step))
+        with open(output_file_name, "w") as output:
+            output.write(
+                "#Coordinates  RecID  LigID  Luciferin  Neighbor's number  Vision Range  Scoring\n"
+            )
+            for row in rows:
+                output.write(row_to_legacy(row, pose_length) + "\n")
+        written.append(output_file_name)
+    return written
@@ -5,6 +5,12 @@ Adapted from https://github.com/minillinim/ellipsoid/blob/master/ellipsoid.py
 
 import numpy as np
 from numpy import linalg
+from scipy.spatial import ConvexHull
+
+try:
+    from scipy.spatial import QhullError
+except ImportError:
+    from scipy.spatial.qhull import QhullError
 from lightdock.error.lightdock_errors import MinimumVolumeEllipsoidError
 
 
@@ -24,41 +30,73 @@ class MinimumVolumeEllipsoid(object):
                 "Can not build minimum volume ellipsoid. Reason: %s" % str(e)
             )
 
+    @staticmethod
+    def hull_vertices(points):
+        """Indexes of the vertices of the convex hull of points, or of all the points
+        if the hull can not be built (i.e., few or coplanar points)"""
+        try:
+            return np.sort(ConvexHull(points).vertices)
+        except (QhullError, ValueError):
+            return np.arange(len(points))
+
     def _get_min_vol_ellipsoid(self):
-        """Finds the minimum volume ellipsoid which contains the set of given points"""
-        (N, d) = np.shape(self._points)
+        """Finds the minimum volume ellipsoid which contains the set of given points.
+
+        Khachiyan's algorithm only increases the weight of the point maximizing a
+        convex quadratic form, which is always a vertex of the convex hull. Points
+        inside the hull keep the same weight, scaled at each iteration, so they are
+        accounted for by their moments and the iterations run over the hull vertices.
+        """
+        points = np.asarray(self._points, dtype=np.float64)
+        (N, d) = np.shape(points)
         d = float(d)
 
+        vertices = self.hull_vertices(points)
+        interior = np.ones(N, dtype=bool)
+        interior[vertices] = False
+        num_interior = N - len(vertices)
+        hull_points = points[vertices]
+        interior_points = points[interior]
+
         # Q will be our working array
-        Q = np.vstack([np.copy(self._points.T), np.ones(N)])
-        QT = Q.T
+        Q = np.vstack([hull_points.T, np.ones(len(vertices))])
+        interior_Q = np.vstack([interior_points.T, np.ones(num_interior)])
+        interior_moments = np.dot(interior_Q, interior_Q.T)
 
         # initializations
         err = 1.0 + self._precision
-        u = (1.0 / N) * np.ones(N)
+        u = (1.0 / N) * np.ones(len(vertices))
+        interior_u = 1.0 / N
 
         # Khachiyan Algorithm
         while err > self._precision:
-            V = np.dot(Q, np.dot(np.diag(u), QT))
-            M = np.diag(
-                np.dot(QT, np.dot(linalg.inv(V), Q))
-            )  # M the diagonal vector of an NxN matrix
+            V = np.dot(Q * u, Q.T) + interior_u * interior_moments
+            # M the diagonal of QT·inv(V)·Q
+            M = np.einsum("ij,ij->j", Q, np.dot(linalg.inv(V), Q))
             j = np.argmax(M)
             maximum = M[j]
             step_size = (maximum - d - 1.0) / ((d + 1.0) * (maximum - 1.0))
             new_u = (1.0 - step_size) * u
             new_u[j] += step_size
-            err = np.linalg.norm(new_u - u)
+            new_interior_u = (1.0 - step_size) * interior_u
+            err = np.sqrt(
+                np.sum((new_u - u) ** 2)
+                + num_interior * (new_interior_u - interior_u) ** 2
+            )
             u = new_u
+            interior_u = new_interior_u
 
         # center of the ellipsoid
-        self.center = np.dot(self._points.T, u)
+        self.center = np.dot(hull_points.T, u) + interior_u * interior_points.sum(
+            axis=0
+        )
 
         # the A matrix for the ellipsoid
         A = (
             linalg.inv(
-                np.dot(self._points.T, np.dot(np.diag(u), self._points))
-                - np.array([[a * b for b in self.center] for a in self.center])
+                np.dot(hull_points.T * u, hull_points)
+                + interior_u * np.dot(interior_points.T, interior_points)
+                - np.outer(self.center, self.center)
             )
             / d
         )
@@ -0,0 +1,62 @@
+"""Geometric properties of sets of 3D points"""
+
+import numpy as np
+from scipy.spatial import ConvexHull, distance
+
+try:
+    from scipy.spatial import QhullError
+except ImportError:
+    from scipy.spatial.qhull import QhullError
+
+DIAMETER_DIRECTIONS = 32
+"""Number of directions sampled by the approximate maximum diameter"""
+
+
+def vector_norms(vectors):
+    """Euclidean norm of each row, rounded as np.linalg.norm of a single vector"""
+    vectors = np.asarray(vectors, dtype=np.float64)
+    return np.sqrt(np.matmul(vectors[:, None, :], vectors[:, :, None])[:, 0, 0])
+
+
+def sphere_directions(num_directions):
+    """Unit vectors evenly spread over a sphere (Fibonacci lattice)"""
+    index = np.arange(num_directions) + 0.5
+    polar = np.arccos(1.0 - 2.0 * index / num_directions)
+    azimuth = np.pi * (1.0 + 5.0**0.5) * index
+    return np.column_stack(
+        [
+            np.cos(azimuth) * np.sin(polar),
+            np.sin(azimuth) * np.sin(polar),
+            np.cos(polar),
+        ]
+    )
+
+
+def extreme_points(points, num_directions=DIAMETER_DIRECTIONS):
+    """Points with the minimum and maximum projection along a set of directions"""
+    projections = np.dot(sphere_directions(num_directions), points.T)
+    indexes = np.concatenate([projections.argmin(axis=1), projections.argmax(axis=1)])
+    return points[np.unique(indexes)]
+
+
+def max_diameter(points, approximate=False):
+    """Maximum distance between two of the given points.
+
+    The farthest pair of points are vertices of their convex hull, so the exact
+    diameter only compares the hull vertices (all the points if the hull can not be
+    built, i.e., few or coplanar points). The approximate diameter compares the
+    extreme points along DIAMETER_DIRECTIONS directions instead, a lower bound
+    which is usually within 1% of the exact one.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if approximate:
+        candidates = extreme_points(points)
+    else:
+        try:
+            candidates = points[ConvexHull(points).vertices]
+        except (QhullError, ValueError):
+            candidates = points
+    # All the points coincide (or there is only one)
+    if len(candidates) < 2:
+        return 0.0
+    return np.max(distance.pdist(candidates))
@@ -29,6 +29,17 @@ class MTGenerator(RandomNumberGenerator):
     def randint(self, lower_limit=0, upper_limit=9):
         return int(self() * (upper_limit + 1)) + lower_limit
 
+    def get_state(self):
+        """Internal state of the generator as an array of integers"""
+        version, internal_state, _ = self.random.getstate()
+        return np.array((version,) + internal_state, dtype=np.int64)
+
+    def set_state(self, state):
+        """Restores an internal state returned by get_state"""
+        state = [int(value) for value in state]
+        # Only uniform numbers are drawn, so there is no pending gaussian number
+        self.random.setstate((state[0], tuple(state[1:]), None))
+
 
 class RandomNumberGeneratorFromFile(RandomNumberGenerator):
     """Class to interact with a previously generated list of random numbers
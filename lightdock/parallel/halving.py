@@ -0,0 +1,99 @@
+"""Successive halving of the swarms of a docking simulation.
+
+Swarms are simulated in rounds. The first round runs every swarm for a fraction of
+the steps, then only the best half of the swarms (by the best scoring of their
+glowworms) continues from its checkpoint for twice the steps, and so on until the
+remaining swarms complete the simulation. Swarms dropped at a round keep their last
+state as the final step.
+
+Once fewer swarms than cores remain, the cores freed by the dropped swarms are given
+to the scoring thread pools of the remaining ones.
+"""
+
+import math
+from multiprocessing import cpu_count
+from lightdock.parallel.kraken import Kraken
+from lightdock.util.logger import LoggingManager
+
+log = LoggingManager.get_logger("halving")
+
+
+def halving_rounds(steps, fraction):
+    """Last step of each round of successive halving"""
+    rounds = []
+    round_steps = max(1, int(math.ceil(steps * fraction)))
+    while round_steps < steps:
+        rounds.append(round_steps)
+        round_steps *= 2
+    rounds.append(steps)
+    return rounds
+
+
+def available_cores(num_cpus):
+    """Number of cores used by a Kraken of num_cpus cores, all of them if not valid"""
+    try:
+        num_cores = int(num_cpus)
+    except (ValueError, TypeError):
+        num_cores = 0
+    return num_cores if 0 < num_cores <= cpu_count() else cpu_count()
+
+
+def share_cores(tasks, num_cores, lockstep=1, scoring_threads=None):
+    """Gives the cores not needed by the tasks of a round to their scoring threads.
+
+    Each tentacle runs a group of up to lockstep tasks. If there are fewer groups than
+    cores, the tasks score their poses with num_cores // groups threads, or with the
+    threads given in scoring_threads ({task id: threads}) if more.
+
+    Returns the number of tentacles to use.
+    """
+    scoring_threads = scoring_threads or {}
+    num_groups = max(1, int(math.ceil(len(tasks) / float(max(1, lockstep)))))
+    threads = max(1, num_cores // num_groups)
+    for task in tasks:
+        task.gso.swarm.scoring_threads = max(scoring_threads.get(task.id, 1), threads)
+    return min(num_cores, num_groups)
+
+
+def successive_halving(tasks, steps, fraction, num_cpus=0, profiling=False, lockstep=1):
+    """Runs the GSOClusterTask tasks using successive halving.
+
+    Returns the reports of the last round.
+    """
+    running = list(tasks)
+    rounds = halving_rounds(steps, fraction)
+    num_cores = available_cores(num_cpus)
+    scoring_threads = {task.id: task.gso.swarm.scoring_threads for task in running}
+    for round_id, round_steps in enumerate(rounds):
+        log.info(
+            "Round %d: %d swarms up to step %d" % (round_id, len(running), round_steps)
+        )
+        for task in running:
+            task.steps = round_steps
+            if not task.checkpoint_frequency:
+                task.checkpoint_frequency = round_steps
+            task.resume = task.resume or round_id > 0
+        num_tentacles = share_cores(running, num_cores, lockstep, scoring_threads)
+        if num_tentacles < num_cores:
+            log.info(
+                "%d scoring threads per swarm"
+                % max(task.gso.swarm.scoring_threads for task in running)
+            )
+        kraken = Kraken(running, num_tentacles, profiling, lockstep)
+        reports = kraken.release()
+        if round_steps == steps:
+            return reports
+
+        best_scoring = {}
+        for task in running:
+            task.load_checkpoint()
+            best_scoring[task.id] = float(max(task.gso.swarm.get_state()["scoring"]))
+        running.sort(key=lambda task: best_scoring[task.id], reverse=True)
+        num_kept = (len(running) + 1) // 2
+        for task in running[num_kept:]:
+            log.info(
+                "Swarm %d dropped at step %d (best scoring %.6f)"
+                % (task.id, round_steps, best_scoring[task.id])
+            )
+            task.finish(steps)
+        running = running[:num_kept]
@@ -1,30 +1,88 @@
 """Module in charge of parallelizing the execution of the GSO algorithm in different clusters."""
 
-from multiprocessing import Process, cpu_count
+from multiprocessing import Process, Queue, cpu_count
+from queue import Empty
+import json
+import time
 import cProfile
+from lightdock.gso.timing import SimulationTimer
+from lightdock.parallel.util import run_lockstep
 from lightdock.util.logger import LoggingManager
 
 
 class Tentacle(Process):
-    """A Kraken without tentacles would be a sea serpent, right?"""
+    """A Kraken without tentacles would be a sea serpent, right?
 
-    def __init__(self, tasks, profiling=False):
+    Tasks are pulled by index from a shared queue until a None sentinel is found.
+    The wall time and the timer summary of each task and the total busy time of the
+    tentacle are sent back through the results queue.
+
+    If lockstep is greater than one, up to lockstep tasks are pulled at once and run
+    together (see run_lockstep), each of them taking the wall time of the group.
+    """
+
+    def __init__(self, tasks, task_queue, results, profiling=False, lockstep=1):
         super(Tentacle, self).__init__()
         self.tasks = tasks
+        self.task_queue = task_queue
+        self.results = results
         self.profiling = profiling
+        self.lockstep = max(1, int(lockstep))
+        self.exhausted = False
         self.log = LoggingManager.get_logger("kraken")
-        self.log.info("Tentacle ready with %d tasks" % len(self.tasks))
+        self.log.info("Tentacle ready")
 
     def run(self):
-        for task in self.tasks:
-            if not self.profiling:
-                task.run()
-            else:
-                cProfile.runctx(
-                    "task.run()", globals(), locals(), "process_%s.out" % self.name
-                )
+        busy_time = 0.0
+        num_tasks = 0
+        try:
+            for tasks in iter(self.next_tasks, []):
+                task_start = time.perf_counter()
+                if not self.profiling:
+                    self.execute(tasks)
+                else:
+                    cProfile.runctx(
+                        "self.execute(tasks)",
+                        globals(),
+                        locals(),
+                        "process_%s.out" % self.name,
+                    )
+                task_time = time.perf_counter() - task_start
+                busy_time += task_time
+                num_tasks += len(tasks)
+                for task in tasks:
+                    self.results.put(
+                        (
+                            "task",
+                            task.id,
+                            self.name,
+                            task_time,
+                            task.gso.swarm.timer.summary(),
+                        )
+                    )
+        finally:
+            self.results.put(("tentacle", self.name, num_tasks, busy_time))
         self.log.info("folding tentacle %s" % self.name)
 
+    def next_tasks(self):
+        """Pulls the next tasks to run, an empty list once the sentinel is found"""
+        tasks = []
+        while not self.exhausted and len(tasks) < self.lockstep:
+            task_index = self.task_queue.get()
+            if task_index is None:
+                self.exhausted = True
+                break
+            tasks.append(self.tasks[task_index])
+        return tasks
+
+    @staticmethod
+    def execute(tasks):
+        """Runs the tasks, in lockstep if there are several of them"""
+        if len(tasks) == 1:
+            tasks[0].run()
+        else:
+            run_lockstep(tasks)
+
 
 class Kraken(object):
     """Below the thunders of the upper deep;
@@ -35,7 +93,9 @@ class Kraken(object):
     The Kraken 1830, Alfred Tennyson
     """
 
-    def __init__(self, tasks, num_cpus=0, profiling=False):
+    def __init__(self, tasks, num_cpus=0, profiling=False, lockstep=1):
+        """If lockstep is greater than one, each tentacle runs up to lockstep tasks
+        together, scoring the poses of their swarms in the same batch calls"""
         self.log = LoggingManager.get_logger("kraken")
         try:
             self.num_processes = int(num_cpus)
@@ -56,13 +116,25 @@ class Kraken(object):
 
         self.tasks = tasks
         self.num_tasks = len(tasks)
-        self.tentacles = []
-        tentacle_tasks = [
-            tasks[i :: self.num_processes] for i in range(self.num_processes)
-        ]
+        self.task_times = {}
+        self.utilization = {}
+        # Timer summaries of each task and their sum
+        self.timings = {}
+        self.timing = SimulationTimer.merge([])
+
+        # Tentacles pull the next task when they finish one
+        self.task_queue = Queue()
+        for task_index in range(self.num_tasks):
+            self.task_queue.put(task_index)
+        for _ in range(self.num_processes):
+            self.task_queue.put(None)
+        self.results = Queue()
 
-        for i in range(self.num_processes):
-            tentacle = Tentacle(tentacle_tasks[i], profiling)
+        self.tentacles = []
+        for _ in range(self.num_processes):
+            tentacle = Tentacle(
+                tasks, self.task_queue, self.results, profiling, lockstep
+            )
             self.tentacles.append(tentacle)
 
         self.log.info("%d ships ready to be smashed" % self.num_tasks)
@@ -70,18 +142,56 @@ class Kraken(object):
     def release(self):
         """Unleash the wrath of this monster"""
         self.log.info("Release the Kraken!")
+        start = time.perf_counter()
         for tentacle in self.tentacles:
             tentacle.start()
 
+        # Results must be consumed before joining the tentacles
+        tentacle_stats = []
+        while len(tentacle_stats) < self.num_processes:
+            try:
+                message = self.results.get(timeout=1.0)
+            except Empty:
+                if not any(tentacle.is_alive() for tentacle in self.tentacles):
+                    break
+                continue
+            if message[0] == "task":
+                _, task_id, _, task_time, timing = message
+                self.task_times[task_id] = task_time
+                self.timings[task_id] = timing
+            else:
+                tentacle_stats.append(message[1:])
+
         for tentacle in self.tentacles:
             tentacle.join()
 
+        elapsed = time.perf_counter() - start
         self.log.info("%d ships destroyed" % self.num_tasks)
+        self.report_times(tentacle_stats, elapsed)
+        self.timing = SimulationTimer.merge(self.timings.values())
+        self.log.info("Simulation timing: %s" % json.dumps(self.timing, sort_keys=True))
 
         reports = [task.gso.report() for task in self.tasks]
 
         return reports
 
+    def report_times(self, tentacle_stats, elapsed):
+        """Logs the wall time of each task and the utilization of each tentacle"""
+        for task_id, task_time in sorted(self.task_times.items()):
+            self.log.info("Ship %s destroyed in %.3fs" % (str(task_id), task_time))
+        for name, num_tasks, busy_time in tentacle_stats:
+            self.utilization[name] = busy_time / elapsed if elapsed > 0.0 else 0.0
+            self.log.info(
+                "Tentacle %s smashed %d ships, busy %.3fs of %.3fs (%.1f%%)"
+                % (
+                    name,
+                    num_tasks,
+                    busy_time,
+                    elapsed,
+                    self.utilization[name] * 100.0,
+                )
+            )
+
     def sink(self):
         """Sink this monster"""
         for tentacle in self.tentacles:
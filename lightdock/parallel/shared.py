@@ -0,0 +1,75 @@
+"""Docking model arrays shared by all the Kraken tentacles"""
+
+import numpy as np
+from lightdock.util.logger import LoggingManager
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    # Python < 3.8
+    shared_memory = None
+
+
+log = LoggingManager.get_logger("kraken")
+
+
+class SharedModels(object):
+    """Moves the arrays of docking models to shared memory blocks.
+
+    Tentacles are forked from the main process, so they attach to the same blocks
+    without copying them. Shared arrays are read-only: poses are always calculated
+    on copies of the model coordinates.
+    """
+
+    def __init__(self):
+        self.blocks = []
+
+    def share_array(self, array):
+        """Copy of array backed by a new shared memory block"""
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.blocks.append(block)
+        shared = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+        shared[...] = array
+        shared.flags.writeable = False
+        return shared
+
+    def share_model(self, model):
+        """Moves coordinates, normal modes and per-atom arrays of model to shared memory"""
+        if model.n_modes is not None and model.modes_tensor is None:
+            model.build_modes_tensor()
+        for coordinates in model.coordinates:
+            coordinates.coordinates = self.share_array(coordinates.coordinates)
+        model.reference_points.coordinates = self.share_array(
+            model.reference_points.coordinates
+        )
+        for name, value in vars(model).items():
+            if isinstance(value, np.ndarray) and value.dtype != object:
+                setattr(model, name, self.share_array(value))
+
+    def share(self, adapters):
+        """Shares receptor and ligand models of the given adapters"""
+        if shared_memory is None:
+            log.warning("Shared memory not available, models will be copied")
+            return
+        models = []
+        for adapter in adapters:
+            for model in (adapter.receptor_model, adapter.ligand_model):
+                if all(model is not other for other in models):
+                    models.append(model)
+        for model in models:
+            self.share_model(model)
+        log.info(
+            "%.1f MB of docking models in shared memory"
+            % (sum(block.size for block in self.blocks) / 1024.0**2)
+        )
+
+    def release(self):
+        """Frees the shared memory blocks"""
+        for block in self.blocks:
+            block.unlink()
+            try:
+                block.close()
+            except BufferError:
+                # Models still in use, memory is freed when they are collected
+                pass
+        self.blocks = []
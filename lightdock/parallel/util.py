@@ -1,17 +1,104 @@
+import time
+from pathlib import Path
+from lightdock.gso.algorithm import advance
+from lightdock.gso.checkpoint import load_checkpoint
+from lightdock.gso.trajectory import truncate_trajectory
+from lightdock.scoring.batch import score_requests
+from lightdock.constants import GSO_CHECKPOINT_FILE, GSO_TRAJECTORY_FILE
+
+
 class GSOClusterTask(object):
     """A GSO execution in a given cluster"""
 
-    def __init__(self, id_cluster, gso, steps, dest_folder):
+    def __init__(
+        self,
+        id_cluster,
+        gso,
+        steps,
+        dest_folder,
+        binary_output=False,
+        checkpoint_frequency=0,
+    ):
         self.id = id_cluster
         self.gso = gso
         self.steps = steps
         self.saving_path = dest_folder
+        self.binary_output = binary_output
+        self.checkpoint_frequency = checkpoint_frequency
+        # Simulations with checkpoints continue from the last one found
+        self.resume = checkpoint_frequency > 0
 
     def run(self):
-        self.gso.run(
-            self.steps,
-            cluster_id=self.id,
-            verbose=True,
-            saving_path=self.saving_path,
-            save_intermediary=True,
+        self.gso.run(**self.run_options())
+
+    def simulate(self):
+        """GSO.simulate generator of this execution"""
+        return self.gso.simulate(**self.run_options())
+
+    def run_options(self):
+        """Arguments of the GSO run of this execution"""
+        return {
+            "simulation_steps": self.steps,
+            "cluster_id": self.id,
+            "verbose": True,
+            "saving_path": self.saving_path,
+            "save_intermediary": True,
+            "binary_output": self.binary_output,
+            "checkpoint_frequency": self.checkpoint_frequency,
+            "resume": self.resume,
+        }
+
+    def load_checkpoint(self):
+        """Restores the last checkpoint of this execution, returns its step"""
+        return load_checkpoint(Path(self.saving_path) / GSO_CHECKPOINT_FILE, self.gso)
+
+    def finish(self, steps):
+        """Saves the last checkpoint of an execution stopped early as its final step"""
+        step = self.load_checkpoint()
+        if self.binary_output:
+            truncate_trajectory(Path(self.saving_path) / GSO_TRAJECTORY_FILE, step)
+            self.gso.swarm.save_trajectory(steps, self.saving_path)
+        else:
+            self.gso.swarm.save(steps, self.saving_path)
+
+
+def run_lockstep(tasks):
+    """Runs the GSO executions of several tasks advancing them step by step together.
+
+    At every step the scoring requests of all the running swarms are scored at once, so
+    poses of different swarms sharing scoring function and models are evaluated in a
+    single batch_score call. Each execution keeps its own random number generator and
+    output, the results are the same as running the tasks one after another.
+
+    The wall time of each shared scoring is accounted to the swarms in proportion to
+    the number of their poses.
+    """
+    num_threads = max([task.gso.swarm.scoring_threads for task in tasks] or [1])
+    running = []
+    for task in tasks:
+        simulation = task.simulate()
+        requests = advance(simulation)
+        if requests is not None:
+            running.append((task, simulation, requests))
+    while running:
+        start = time.perf_counter()
+        energies = score_requests(
+            [request for _, _, requests in running for request in requests],
+            num_threads,
         )
+        elapsed = time.perf_counter() - start
+        num_poses = [
+            sum(len(request.poses) for request in requests)
+            for _, _, requests in running
+        ]
+        total_poses = max(1, sum(num_poses))
+        first = 0
+        advanced = []
+        for (task, simulation, requests), poses in zip(running, num_poses):
+            task.gso.swarm.timer.add_time("scoring", elapsed * poses / total_poses)
+            last = first + len(requests)
+            requests = advance(simulation, energies[first:last])
+            if requests is not None:
+                advanced.append((task, simulation, requests))
+            first = last
+        running = advanced
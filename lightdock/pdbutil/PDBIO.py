@@ -1,7 +1,12 @@
 """Parses Atomic coordinates entries from PDB files"""
 
+import os
 import math
+import hashlib
 from os import linesep
+from pathlib import Path
+import numpy as np
+from lightdock.constants import PDB_CACHE_FILE
 from lightdock.error.lightdock_errors import PDBParsingError, PDBParsingWarning
 from lightdock.structure.atom import Atom, HetAtom
 from lightdock.structure.residue import Residue
@@ -108,68 +113,310 @@ def read_atom_line(line, line_type="", atoms_to_ignore=None, residues_to_ignore=
         )
 
 
+ATOM_TABLE_COLUMNS = (
+    "hetatm",
+    "number",
+    "name",
+    "alternative",
+    "residue_name",
+    "chain_id",
+    "residue_number",
+    "residue_insertion",
+    "coordinates",
+    "occupancy",
+    "b_factor",
+    "element",
+)
+"""Arrays of an atom table, one entry per ATOM or HETATM record"""
+
+WHITESPACE = np.frombuffer(b" \t\n\r", dtype=np.uint8)
+"""Characters stripped from the PDB columns"""
+
+
+def _atom_records(lines):
+    """ATOM and HETATM lines of the first model and the number of models found"""
+    records = []
+    num_models = 0
+    for line in lines:
+        line_type = line[0:6].strip()
+        if line_type == "MODEL":
+            num_models += 1
+            if num_models > 1:
+                break
+        elif line_type == "ATOM" or line_type == "HETATM":
+            records.append(line)
+    return records, num_models
+
+
+def _float_column(column, default):
+    """Parses a column of floats, taking default for the wrong values"""
+    try:
+        return column.astype(np.float64)
+    except ValueError:
+        values = []
+        for value in column:
+            try:
+                values.append(float(value))
+            except ValueError:
+                values.append(default)
+        return np.array(values, dtype=np.float64)
+
+
+def _strip_columns(characters):
+    """Strips the whitespace around the strings given as rows of a bytes matrix"""
+    num_rows, width = characters.shape
+    filled = ~np.isin(characters, WHITESPACE)
+    start = np.where(filled.any(axis=1), filled.argmax(axis=1), width)
+    end = width - filled[:, ::-1].argmax(axis=1)
+    positions = np.arange(width) + start[:, None]
+    stripped = np.take_along_axis(characters, np.minimum(positions, width - 1), axis=1)
+    stripped[positions >= end[:, None]] = 0
+    return stripped.view("S%d" % width).reshape(num_rows).astype("U%d" % width)
+
+
+def read_atom_table(records):
+    """Parses ATOM and HETATM records into an atom table.
+
+    The fixed-width columns are sliced and converted for all the records at once.
+    Returns None if any record has wrong coordinates, atom or residue numbers or
+    non-ASCII characters, so it can be parsed by read_atom_line.
+    """
+    width = 80
+    num_records = len(records)
+    try:
+        text = "".join(
+            [line.rstrip("\n")[:width].ljust(width) for line in records]
+        ).encode("ascii")
+    except UnicodeEncodeError:
+        return None
+    characters = np.frombuffer(text, dtype=np.uint8).reshape((num_records, width))
+
+    def column(start, end):
+        return (
+            np.ascontiguousarray(characters[:, start:end])
+            .view("S%d" % (end - start))
+            .reshape(num_records)
+        )
+
+    def stripped(start, end):
+        return _strip_columns(characters[:, start:end])
+
+    try:
+        coordinates = np.empty((num_records, 3))
+        for axis, start in enumerate((30, 38, 46)):
+            coordinates[:, axis] = column(start, start + 8).astype(np.float64)
+        if np.isnan(coordinates).any():
+            return None
+        number = column(6, 11).astype(np.int64)
+        residue_number = column(22, 26).astype(np.int64)
+    except ValueError:
+        return None
+
+    name = stripped(12, 16)
+    if np.any(name == ""):
+        return None
+
+    return {
+        "hetatm": np.all(characters[:, 0:6] == np.frombuffer(b"HETATM", np.uint8), 1),
+        "number": number,
+        "name": name,
+        "alternative": stripped(16, 17),
+        "residue_name": stripped(17, 21),
+        "chain_id": stripped(21, 22),
+        "residue_number": residue_number,
+        "residue_insertion": column(26, 27).astype("U1"),
+        "coordinates": coordinates,
+        "occupancy": _float_column(column(54, 60), 1.0),
+        "b_factor": _float_column(column(60, 66), 0.0),
+        "element": stripped(76, 78),
+    }
+
+
+def atoms_from_table(table, atoms_to_ignore, residues_to_ignore, verbose=False):
+    """Creates the atoms of an atom table, skipping the ignored ones"""
+    names = table["name"]
+    ignored = np.isin(table["residue_name"], residues_to_ignore) | np.isin(
+        names, atoms_to_ignore
+    )
+    if "H" in atoms_to_ignore:
+        ignored |= np.char.startswith(names, "H")
+
+    if verbose:
+        for index in np.flatnonzero(ignored):
+            print(
+                PDBParsingWarning(
+                    "Ignored atom %s.%s.%s %s"
+                    % (
+                        table["chain_id"][index],
+                        table["residue_name"][index],
+                        table["residue_number"][index],
+                        names[index],
+                    )
+                )
+            )
+
+    kept = ~ignored
+    atoms = []
+    for (
+        hetatm,
+        number,
+        name,
+        alternative,
+        residue_name,
+        chain_id,
+        residue_number,
+        residue_insertion,
+        (x, y, z),
+        occupancy,
+        b_factor,
+        element,
+    ) in zip(*[table[name][kept].tolist() for name in ATOM_TABLE_COLUMNS]):
+        atom_class = HetAtom if hetatm else Atom
+        atoms.append(
+            atom_class(
+                number,
+                name,
+                alternative,
+                chain_id,
+                residue_name,
+                residue_number,
+                residue_insertion,
+                x,
+                y,
+                z,
+                occupancy,
+                b_factor,
+                element,
+            )
+        )
+    return atoms
+
+
+def atom_table_cache_file(input_file_name):
+    """Name of the atom table cache of a PDB file"""
+    input_file_name = Path(input_file_name)
+    return input_file_name.with_name(PDB_CACHE_FILE % input_file_name.name)
+
+
+def file_checksum(input_file_name):
+    """SHA-256 digest of the content of a file"""
+    with open(input_file_name, "rb") as handle:
+        return hashlib.sha256(handle.read()).hexdigest()
+
+
+def load_atom_table(input_file_name, checksum):
+    """Atom table cached for a PDB file, or None if missing or not matching checksum"""
+    cache_file_name = atom_table_cache_file(input_file_name)
+    try:
+        with np.load(cache_file_name) as data:
+            if str(data["checksum"]) != checksum:
+                return None
+            table = {name: data[name] for name in ATOM_TABLE_COLUMNS}
+            table["num_models"] = int(data["num_models"])
+            return table
+    except (IOError, ValueError, KeyError):
+        return None
+
+
+def save_atom_table(input_file_name, checksum, table):
+    """Caches the atom table of a PDB file next to it.
+
+    Failing to write the cache (i.e., a read-only folder) is not an error.
+    """
+    cache_file_name = atom_table_cache_file(input_file_name)
+    temporary_file_name = cache_file_name.with_name(
+        "%s.%d.tmp" % (cache_file_name.name, os.getpid())
+    )
+    try:
+        with open(temporary_file_name, "wb") as output:
+            np.savez(output, checksum=np.array(checksum), **table)
+        os.replace(temporary_file_name, cache_file_name)
+    except OSError as e:
+        log.warning("Can not write atom table cache %s: %s" % (cache_file_name, e))
+
+
 def parse_complex_from_file(
-    input_file_name, atoms_to_ignore=None, residues_to_ignore=None, verbose=False
+    input_file_name,
+    atoms_to_ignore=None,
+    residues_to_ignore=None,
+    verbose=False,
+    cache=False,
 ):
     """Reads and parses a given input_file_name PDB file.
 
+    If cache is enabled, the parsed ATOM and HETATM records are stored in a file next
+    to the PDB file and reused while the content of the PDB file does not change.
+
     TODO: Check if chain have been already created and insert it into the first one
     """
     if atoms_to_ignore is None:
         atoms_to_ignore = []
     if residues_to_ignore is None:
         residues_to_ignore = []
-    lines = open(input_file_name).readlines()
-    atoms = []
+
+    table = None
+    if cache:
+        checksum = file_checksum(input_file_name)
+        table = load_atom_table(input_file_name, checksum)
+        if table:
+            num_models = table["num_models"]
+    if table is None:
+        lines = open(input_file_name).readlines()
+        records, num_models = _atom_records(lines)
+        table = read_atom_table(records)
+        if table is not None and cache:
+            table["num_models"] = num_models
+            save_atom_table(input_file_name, checksum, table)
+
+    if table is None:
+        # Line by line parsing, reporting the wrong records
+        atoms = []
+        for line in records:
+            try:
+                atom = read_atom_line(
+                    line, line[0:6].strip(), atoms_to_ignore, residues_to_ignore
+                )
+                atoms.append(atom)
+            except PDBParsingWarning as warning:
+                if verbose:
+                    print(warning)
+    else:
+        atoms = atoms_from_table(table, atoms_to_ignore, residues_to_ignore, verbose)
+
+    # Warned once the first model is read, after its ignored atoms
+    if num_models > 1:
+        log.warning(
+            "Multiple models found in %s. Only first model will be used."
+            % input_file_name
+        )
+
     residues = []
     chains = []
-    num_models = 0
     last_chain_id = "#"
     last_residue_name = "#"
     last_residue_number = "#"
     last_residue_insertion = "#"
     current_chain = None
     current_residue = None
-    for line in lines:
-        # Only first model is going to be read
-        if num_models <= 1:
-            line_type = line[0:6].strip()
-            if line_type == "MODEL":
-                num_models += 1
-                if num_models > 1:
-                    log.warning(
-                        "Multiple models found in %s. Only first model will be used."
-                        % input_file_name
-                    )
-            elif line_type == "ATOM" or line_type == "HETATM":
-                try:
-                    atom = read_atom_line(
-                        line, line_type, atoms_to_ignore, residues_to_ignore
-                    )
-                    atoms.append(atom)
-                except PDBParsingWarning as warning:
-                    if verbose:
-                        print(warning)
-                    continue
-
-                if last_chain_id != atom.chain_id:
-                    last_chain_id = atom.chain_id
-                    current_chain = Chain(last_chain_id)
-                    chains.append(current_chain)
-                if (
-                    last_residue_name != atom.residue_name
-                    or last_residue_number != atom.residue_number
-                    or last_residue_insertion != atom.residue_insertion
-                ):
-                    last_residue_name = atom.residue_name
-                    last_residue_number = atom.residue_number
-                    last_residue_insertion = atom.residue_insertion
-                    current_residue = Residue(
-                        atom.residue_name, atom.residue_number, atom.residue_insertion
-                    )
-                    residues.append(current_residue)
-                    current_chain.residues.append(current_residue)
-                current_residue.atoms.append(atom)
+    for atom in atoms:
+        if last_chain_id != atom.chain_id:
+            last_chain_id = atom.chain_id
+            current_chain = Chain(last_chain_id)
+            chains.append(current_chain)
+        if (
+            last_residue_name != atom.residue_name
+            or last_residue_number != atom.residue_number
+            or last_residue_insertion != atom.residue_insertion
+        ):
+            last_residue_name = atom.residue_name
+            last_residue_number = atom.residue_number
+            last_residue_insertion = atom.residue_insertion
+            current_residue = Residue(
+                atom.residue_name, atom.residue_number, atom.residue_insertion
+            )
+            residues.append(current_residue)
+            current_chain.residues.append(current_residue)
+        current_residue.atoms.append(atom)
 
     # Set backbone and side-chain atoms
     for residue in residues:
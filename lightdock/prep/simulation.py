@@ -28,7 +28,7 @@ from lightdock.constants import (
 )
 from lightdock.util.logger import LoggingManager
 from lightdock.pdbutil.PDBIO import parse_complex_from_file, write_pdb_to_file
-from lightdock.structure.complex import Complex
+from lightdock.structure.complex import Complex, atom_coordinates
 from lightdock.structure.nm import calculate_nmodes, write_nmodes
 from lightdock.gso.boundaries import Boundary, BoundingBox
 from lightdock.error.lightdock_errors import LightDockError
@@ -55,13 +55,15 @@ def read_input_structure(
     ignore_hydrogens=False,
     ignore_water=False,
     verbose_parser=False,
+    cache=False,
 ):
     """Reads the input structure.
 
     The arguments pdb_file_name can be a PDB file or a file
     containing a list of PDB files.
 
-    ignore_oxt flag avoids saving OXT atoms.
+    ignore_oxt flag avoids saving OXT atoms. If cache is enabled, the parsed
+    PDB files are cached (see parse_complex_from_file).
     """
     atoms_to_ignore = []
     residues_to_ignore = []
@@ -85,16 +87,22 @@ def read_input_structure(
     for file_name in file_names:
         log.info(f"Reading structure from {file_name} PDB file...")
         atoms, residues, chains = parse_complex_from_file(
-            file_name, atoms_to_ignore, residues_to_ignore, verbose_parser
-        )
-        structures.append(
-            {
-                "atoms": atoms,
-                "residues": residues,
-                "chains": chains,
-                "file_name": file_name,
-            }
+            file_name, atoms_to_ignore, residues_to_ignore, verbose_parser, cache
         )
+        if structures:
+            # Only the coordinates of the other conformers are kept
+            structures.append(
+                {"coordinates": atom_coordinates(atoms), "file_name": file_name}
+            )
+        else:
+            structures.append(
+                {
+                    "atoms": atoms,
+                    "residues": residues,
+                    "chains": chains,
+                    "file_name": file_name,
+                }
+            )
         log.info(f"{len(atoms)} atoms, {len(residues)} residues read.")
 
     # Representatives are now the first structure, but this could change in the future
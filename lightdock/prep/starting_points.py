@@ -18,6 +18,7 @@ from lightdock.constants import (
     DEFAULT_SWARM_RADIUS,
     SWARM_DISTANCE_TO_SURFACE_CUTOFF,
 )
+from lightdock.mathutil.geometry import max_diameter, vector_norms
 from lightdock.error.lightdock_errors import SetupError
 from lightdock.util.logger import LoggingManager
 
@@ -40,6 +41,53 @@ def equidistant_points(p1, p2, parts):
                     )
 
 
+def incompatible_points(sampling, centroids, surface_distance, neighbor_distance=20.0):
+    """Mask of the sphere points too close to a neighbor centroid.
+
+    sampling holds the sphere of points (centroids x points x 3) placed around each
+    of the centroids. A point is incompatible if it is within surface_distance of a
+    different centroid which is within neighbor_distance of its own centroid.
+    """
+    num_centroids, num_sphere_points, _ = sampling.shape
+    points = sampling.reshape((-1, 3))
+    owners = np.repeat(np.arange(num_centroids), num_sphere_points)
+    centroids_kd_tree = KDTree(centroids)
+
+    # Neighbor centroids of each centroid, encoded as owner * num_centroids + neighbor
+    neighbors = centroids_kd_tree.query_ball_point(centroids, r=neighbor_distance)
+    neighbor_pairs = np.concatenate(
+        [
+            i_centroid * num_centroids + np.array(centroid_neighbors, dtype=np.int64)
+            for i_centroid, centroid_neighbors in enumerate(neighbors)
+        ]
+        + [np.empty(0, dtype=np.int64)]
+    )
+
+    # Candidate centroids close to each point, the distance is checked again below
+    # with the same rounding as the original comparison
+    candidates = centroids_kd_tree.query_ball_point(
+        points, r=surface_distance * (1.0 + 1e-6) + 1e-6
+    )
+    lengths = np.array([len(candidate) for candidate in candidates], dtype=np.int64)
+    point_ids = np.repeat(np.arange(len(points)), lengths)
+    centroid_ids = np.concatenate(
+        [np.array(candidate, dtype=np.int64) for candidate in candidates]
+        + [np.empty(0, dtype=np.int64)]
+    )
+    point_owners = owners[point_ids]
+    close = (
+        (centroid_ids != point_owners)
+        & (
+            vector_norms(points[point_ids] - centroids[centroid_ids])
+            <= surface_distance
+        )
+        & np.isin(point_owners * num_centroids + centroid_ids, neighbor_pairs)
+    )
+    mask = np.zeros(len(points), dtype=bool)
+    mask[point_ids[close]] = True
+    return mask.reshape((num_centroids, num_sphere_points))
+
+
 def points_on_sphere(number_of_points):
     """Creates a list of points using a spiral method.
 
@@ -99,10 +147,8 @@ def calculate_surface_points(
     receptor_atom_coordinates = receptor.representative(has_membrane)
 
     # Calculate receptor and ligand max diameters
-    distances_matrix_rec = distance.pdist(receptor_atom_coordinates)
-    receptor_max_diameter = np.max(distances_matrix_rec)
-    distances_matrix_lig = distance.pdist(ligand.representative())
-    ligand_max_diameter = np.max(distances_matrix_lig)
+    receptor_max_diameter = max_diameter(receptor_atom_coordinates.coordinates)
+    ligand_max_diameter = max_diameter(ligand.representative().coordinates)
 
     log.info(f"  * Ligand Max Diameter: {ligand_max_diameter:.2f} Å")
     if swarms_at_fixed_distance > 0.:
@@ -163,47 +209,23 @@ def calculate_surface_points(
         surface_centroids = coords
 
     # Create points over the surface of each surface cluster
-    sampling = []
-    for sc in surface_centroids:
-        sphere_points = np.array(points_on_sphere(num_sphere_points))
-        surface_points = sphere_points * surface_distance + sc
-        sampling.append(surface_points)
+    sphere_points = np.array(points_on_sphere(num_sphere_points))
+    sampling = sphere_points * surface_distance + surface_centroids[:, None, :]
 
     # Filter out not compatible points
-    centroids_kd_tree = KDTree(surface_centroids)
-    for i_centroid in range(len(sampling)):
-        # print('.', end="", flush=True)
-        centroid = surface_centroids[i_centroid]
-        # Search for this centroid neighbors
-        centroid_neighbors = centroids_kd_tree.query_ball_point(centroid, r=20.0)
-        # For each neighbor, remove points too close
-        for n in centroid_neighbors:
-            points_to_remove = []
-            if n != i_centroid:
-                for i_p, p in enumerate(sampling[i_centroid]):
-                    if np.linalg.norm(p - surface_centroids[n]) <= surface_distance:
-                        points_to_remove.append(i_p)
-                points_to_remove = list(set(points_to_remove))
-                sampling[i_centroid] = [
-                    sampling[i_centroid][i_p]
-                    for i_p in range(len(sampling[i_centroid]))
-                    if i_p not in points_to_remove
-                ]
-
-    s = []
-    for points in sampling:
-        s.extend(points)
+    s = sampling[~incompatible_points(sampling, surface_centroids, surface_distance)]
 
     if verbose:
         log.info(f"Swarms after incompatible filter: {len(s)}")
 
     # Filter interior points
-    surface_swarms = []
     molecule_kd_tree = KDTree(molecule.getCoords())
-    for swarm in s:
-        if not molecule_kd_tree.query_ball_point(swarm, SWARM_DISTANCE_TO_SURFACE_CUTOFF):
-            surface_swarms.append(swarm)
-    s = surface_swarms
+    s = s[
+        molecule_kd_tree.query_ball_point(
+            s, SWARM_DISTANCE_TO_SURFACE_CUTOFF, return_length=True
+        )
+        == 0
+    ]
 
     if verbose:
         log.info(f"Swarms after interior points filter: {len(s)}")
@@ -213,24 +235,31 @@ def calculate_surface_points(
     if receptor_restraints:
         # Calculate convex hull of surface atoms
         hull = ConvexHull(surface_centroids)
-        swarms_with_visibility = []
-        for swarm in s:
-            # Find nearest restraint
-            rst_centroids = [residue.get_central_atom() for residue in receptor_restraints]
-            rst_centroid_coords = [[a.x, a.y, a.z] for a in rst_centroids]
-            near_rst_centroid = np.array(rst_centroid_coords[np.argmin(distance.cdist(np.array([swarm]), rst_centroid_coords, 'euclidean'))])
-
-            # Calculate probe positions between swarm and closest restraint
-            p1 = np.array(swarm)
-            p2 = near_rst_centroid
-
-            num_probes = int(np.ceil(np.linalg.norm(p1 - p2)))
-            p = equidistant_points(p1, p2, num_probes)
-
-            # Calculate fraction of probes inside the convex hull described by the surface atoms
-            a = points_in_hull(p, hull)
+        # Find nearest restraint of each swarm
+        rst_centroids = [residue.get_central_atom() for residue in receptor_restraints]
+        rst_centroid_coords = np.array([[a.x, a.y, a.z] for a in rst_centroids])
+        near_rst_centroids = rst_centroid_coords[
+            np.argmin(distance.cdist(s, rst_centroid_coords, "euclidean"), axis=1)
+        ]
+
+        # Calculate probe positions between each swarm and its closest restraint
+        num_probes = np.ceil(vector_norms(s - near_rst_centroids)).astype(int)
+        probes = [
+            equidistant_points(p1, p2, parts)
+            for p1, p2, parts in zip(s, near_rst_centroids, num_probes)
+        ]
+
+        # Probes inside the convex hull described by the surface atoms
+        if probes:
+            inside = np.split(
+                points_in_hull(np.concatenate(probes), hull),
+                np.cumsum(num_probes + 1)[:-1],
+            )
+        else:
+            inside = []
 
-            #num_inside = np.count_nonzero(a)
+        swarms_with_visibility = []
+        for swarm, a, parts in zip(s, inside, num_probes):
             try:
                 max_consecutive_inside = max(
                     sum(1 for _ in group)
@@ -241,11 +270,11 @@ def calculate_surface_points(
                 max_consecutive_inside = 0
 
             # Accept swarm depending on the ratio of probes found inside
-            if max_consecutive_inside <= probe_tolerance * num_probes:
+            if max_consecutive_inside <= probe_tolerance * parts:
                 swarms_with_visibility.append(swarm)
 
         # Update set of swarms
-        s = swarms_with_visibility
+        s = np.array(swarms_with_visibility).reshape((-1, 3))
 
         if verbose:
             log.info(f"Swarms after occlusion filter: {len(s)}")
@@ -262,7 +291,6 @@ def calculate_surface_points(
         log.info("Dense sampling is enabled, ignoring user specified number of swarms")
 
     # Account for translation to origin of coordinates
-    for p in s:
-        p += rec_translation
+    s = s + rec_translation
 
     return s, receptor_max_diameter, ligand_max_diameter
@@ -0,0 +1,128 @@
+"""Batches of docking poses scored together.
+
+Simulations ask for the energies of their poses as ScoringRequest objects. Requests
+sharing scoring function, receptor and ligand models, even from different swarms,
+are concatenated and scored in a single batch_score call of the scoring function.
+Large batches can be split in chunks scored by a pool of threads, which run in
+parallel in the C scoring kernels as they release the GIL.
+"""
+
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+ScoringRequest = namedtuple(
+    "ScoringRequest",
+    [
+        "scoring_function",
+        "receptor",
+        "ligand",
+        "poses",
+        "num_rec_nmodes",
+        "num_lig_nmodes",
+        "receptor_ids",
+        "ligand_ids",
+    ],
+)
+"""Poses to be scored, a (N, pose length) array of optimization vectors, with the
+lists of their receptor and ligand conformers"""
+
+
+_pools = {}
+
+
+def thread_pool(num_threads):
+    """Thread pool of num_threads workers shared by the simulations of this process.
+
+    Pools are created on first use and never shared with forked processes.
+    """
+    key = (os.getpid(), num_threads)
+    if key not in _pools:
+        _pools[key] = ThreadPoolExecutor(max_workers=num_threads)
+    return _pools[key]
+
+
+def batch_score(request):
+    """Energies of the poses of a single request"""
+    return request.scoring_function.batch_score(
+        request.receptor,
+        request.ligand,
+        request.poses,
+        request.num_rec_nmodes,
+        request.num_lig_nmodes,
+        request.receptor_ids,
+        request.ligand_ids,
+    )
+
+
+def split_request(request, num_chunks):
+    """Request split in at most num_chunks requests of consecutive poses"""
+    num_chunks = min(num_chunks, len(request.poses))
+    if num_chunks < 2:
+        return [request]
+    bounds = np.cumsum(
+        [0] + [len(c) for c in np.array_split(request.poses, num_chunks)]
+    )
+    return [
+        request._replace(
+            poses=request.poses[start:end],
+            receptor_ids=request.receptor_ids[start:end],
+            ligand_ids=request.ligand_ids[start:end],
+        )
+        for start, end in zip(bounds[:-1], bounds[1:])
+    ]
+
+
+def score_requests(requests, num_threads=1):
+    """Energies of the poses of each request.
+
+    If num_threads is greater than 1, the poses of each batch are scored in chunks by
+    a pool of num_threads threads. Batches are scored one after the other.
+
+    Returns a list with an array of energies per request, in the same order.
+    """
+    groups = {}
+    for index, request in enumerate(requests):
+        key = (
+            id(request.scoring_function),
+            id(request.receptor),
+            id(request.ligand),
+            request.num_rec_nmodes,
+            request.num_lig_nmodes,
+        )
+        groups.setdefault(key, []).append(index)
+
+    energies = [None] * len(requests)
+    for indexes in groups.values():
+        batch = [requests[index] for index in indexes]
+        first = batch[0]
+        merged = first._replace(
+            poses=np.concatenate([request.poses for request in batch]),
+            receptor_ids=[
+                receptor_id for request in batch for receptor_id in request.receptor_ids
+            ],
+            ligand_ids=[
+                ligand_id for request in batch for ligand_id in request.ligand_ids
+            ],
+        )
+        chunks = split_request(merged, num_threads)
+        if len(chunks) > 1:
+            batch_energies = np.concatenate(
+                list(thread_pool(num_threads).map(batch_score, chunks))
+            )
+        else:
+            batch_energies = batch_score(merged)
+        sizes = np.cumsum([len(request.poses) for request in batch])[:-1]
+        for index, request_energies in zip(indexes, np.split(batch_energies, sizes)):
+            energies[index] = request_energies
+    return energies
+
+
+def gather_energies(num_poses, selections, energies):
+    """Energies of num_poses poses scored as several requests, each one with the poses
+    at the indexes of its selection"""
+    gathered = np.empty(num_poses)
+    for selected, request_energies in zip(selections, energies):
+        gathered[selected] = request_energies
+    return gathered
@@ -9,6 +9,7 @@ import freesasa
 from freesasa import Structure
 from lightdock.scoring.functions import ScoringFunction, ModelAdapter
 from lightdock.structure.model import DockingModel
+from lightdock.scoring.grid import load_grid
 import lightdock.scoring.cpydock.energy.c.cpydock as cpydock
 import lightdock.scoring.cpydock.energy.parameters as parameters
 from lightdock.util.logger import LoggingManager
@@ -22,6 +23,30 @@ from lightdock.error.lightdock_errors import NotSupportedInScoringError
 log = LoggingManager.get_logger("cpydock")
 freesasa.setVerbosity(freesasa.silent)
 
+# Same constants as in the contact solvation of the C kernel
+SOLVATION_DISTANCE = 6.4
+HUGE_DISTANCE = 10000.0
+
+
+def hydrogen_flags(hydrogens):
+    """Hydrogen flags of the atoms as read by the C kernel"""
+    return np.ascontiguousarray(hydrogens).view(np.uintc)[: len(hydrogens)]
+
+
+def contact_solvation(num_atoms, atom_index, distance2, sasa, des_energy):
+    """Contact desolvation energy of a molecule given the squared distances of the
+    pairs of atoms (atom_index) within SOLVATION_DISTANCE"""
+    min_distance = np.full(num_atoms, HUGE_DISTANCE)
+    np.minimum.at(min_distance, atom_index, distance2)
+    in_contact = (
+        (min_distance <= SOLVATION_DISTANCE * SOLVATION_DISTANCE)
+        & (min_distance > 0.0)
+        & (sasa > 0)
+    )
+    solvation = np.where(in_contact, -10.0 * np.sqrt(min_distance) + 65.0, 0.0)
+    solvation = np.minimum(solvation, sasa)
+    return float(np.dot(solvation, des_energy))
+
 
 class CPyDockModel(DockingModel):
     """Prepares the structure necessary for the C-implementation of the pyDock scoring function"""
@@ -184,35 +209,93 @@ class CPyDock(ScoringFunction):
             log.warning("Error (%s), using default VDW cutoff" % str(e))
             self.scoring_vdw_weight = parameters.scoring_vdw_weight
         log.info("PyDock VDW cutoff is: %3.2f" % self.scoring_vdw_weight)
+        self.grid = None
 
-    def __call__(self, receptor, receptor_coordinates, ligand, ligand_coordinates):
-        """Computes the pyDock scoring energy using receptor and ligand which are
-        instances of DockingModel.
+    def use_grid(self, receptor, ligand, spacing, file_name=None):
+        """Scores the poses using precomputed potential grids of the receptor"""
+        self.grid = load_grid(receptor, ligand, spacing, file_name)
+
+    def grid_energy(self, receptor, receptor_coordinates, ligand, ligand_coordinates):
+        """Energy terms of a pose using the potential grids of the receptor.
+
+        Desolvation and interface are calculated exactly from the contacts of the pose.
         """
-        (
+        receptor_coordinates = receptor_coordinates.coordinates
+        ligand_coordinates = ligand_coordinates.coordinates
+        elec, vdw, (rec_index, lig_index, distance2) = self.grid.energy(
+            receptor, ligand, receptor_coordinates, ligand_coordinates
+        )
+        # Atoms taken into account for the minimum distances, read as the C kernel
+        # does (unsigned int)
+        rec_flags = hydrogen_flags(receptor.hydrogens)
+        lig_flags = hydrogen_flags(ligand.hydrogens)
+        paired = (rec_flags[rec_index] == 0) & (lig_flags[lig_index] == 0)
+        solv_rec = contact_solvation(
+            len(receptor_coordinates),
+            rec_index[paired],
+            distance2[paired],
+            receptor.sasa,
+            receptor.des_energy,
+        )
+        solv_lig = contact_solvation(
+            len(ligand_coordinates),
+            lig_index[paired],
+            distance2[paired],
+            ligand.sasa,
+            ligand.des_energy,
+        )
+        interface = distance2 <= (
+            DEFAULT_CONTACT_RESTRAINTS_CUTOFF * DEFAULT_CONTACT_RESTRAINTS_CUTOFF
+        )
+        return (
             elec,
             vdw,
             solv_rec,
             solv_lig,
-            interface_receptor,
-            interface_ligand,
-        ) = cpydock.calculate_energy(
-            receptor_coordinates,
-            ligand_coordinates,
-            receptor.charges,
-            ligand.charges,
-            receptor.vdw_energy,
-            ligand.vdw_energy,
-            receptor.vdw_radii,
-            ligand.vdw_radii,
-            receptor.hydrogens,
-            ligand.hydrogens,
-            receptor.sasa,
-            ligand.sasa,
-            receptor.des_energy,
-            ligand.des_energy,
-            DEFAULT_CONTACT_RESTRAINTS_CUTOFF,
+            rec_index[interface],
+            lig_index[interface],
         )
+
+    def __call__(self, receptor, receptor_coordinates, ligand, ligand_coordinates):
+        """Computes the pyDock scoring energy using receptor and ligand which are
+        instances of DockingModel.
+        """
+        if self.grid is not None:
+            (
+                elec,
+                vdw,
+                solv_rec,
+                solv_lig,
+                interface_receptor,
+                interface_ligand,
+            ) = self.grid_energy(
+                receptor, receptor_coordinates, ligand, ligand_coordinates
+            )
+        else:
+            (
+                elec,
+                vdw,
+                solv_rec,
+                solv_lig,
+                interface_receptor,
+                interface_ligand,
+            ) = cpydock.calculate_energy(
+                receptor_coordinates,
+                ligand_coordinates,
+                receptor.charges,
+                ligand.charges,
+                receptor.vdw_energy,
+                ligand.vdw_energy,
+                receptor.vdw_radii,
+                ligand.vdw_radii,
+                receptor.hydrogens,
+                ligand.hydrogens,
+                receptor.sasa,
+                ligand.sasa,
+                receptor.des_energy,
+                ligand.des_energy,
+                DEFAULT_CONTACT_RESTRAINTS_CUTOFF,
+            )
         solv = -1 * (solv_rec + solv_lig)
         energy = (elec + parameters.scoring_vdw_weight * vdw + solv) * -1.0
         perc_receptor_restraints = ScoringFunction.restraints_satisfied(
@@ -88,6 +88,9 @@ static PyObject * cpydock_calculate_energy(PyObject *self, PyObject *args) {
         interface_receptor = malloc(lig_len*sizeof(unsigned int));
         interface_ligand  = malloc(lig_len*sizeof(unsigned int));
 
+        // Python objects are not used in the energy loops
+        Py_BEGIN_ALLOW_THREADS
+
         for (i = 0; i < rec_len; i++) min_rec_distance[i] = HUGE_DISTANCE;
         for (j = 0; j < lig_len; j++) min_lig_distance[j] = HUGE_DISTANCE;
 
@@ -162,6 +165,8 @@ static PyObject * cpydock_calculate_energy(PyObject *self, PyObject *args) {
             total_solvation_lig += solv_lig * lig_c_des_energy[j];
         }
 
+        Py_END_ALLOW_THREADS
+
         // Free structures
         PyArray_Free(tmp0, rec_array);
         PyArray_Free(tmp1, lig_array);
@@ -186,6 +191,168 @@ static PyObject * cpydock_calculate_energy(PyObject *self, PyObject *args) {
 }
 
 
+/**
+ *
+ * Electrostatics potential map of a receptor on a regular lattice. Distances shorter
+ * than min_distance are taken as min_distance, so the map is continuous.
+ *
+ **/
+static PyObject * cpydock_calculate_electrostatics_map(PyObject *self, PyObject *args) {
+    PyObject *coordinates_obj, *charges_obj, *origin_obj = NULL;
+    PyArrayObject *coordinates, *charges, *origin, *potential_map = NULL;
+    double *rec, *q, *o, *values, spacing, min_distance, min_distance2, x, y, z, dx, dy, dz, distance2, total;
+    unsigned int nx, ny, nz, i, j, k, n, rec_len;
+    npy_intp dims[3];
+
+    if (!PyArg_ParseTuple(args, "OOOIIIdd", &coordinates_obj, &charges_obj, &origin_obj,
+            &nx, &ny, &nz, &spacing, &min_distance)) {
+        return NULL;
+    }
+    min_distance2 = min_distance*min_distance;
+    coordinates = (PyArrayObject *) PyArray_FROM_OTF(coordinates_obj, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    charges = (PyArrayObject *) PyArray_FROM_OTF(charges_obj, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    origin = (PyArrayObject *) PyArray_FROM_OTF(origin_obj, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    if (coordinates == NULL || charges == NULL || origin == NULL) {
+        Py_XDECREF(coordinates);
+        Py_XDECREF(charges);
+        Py_XDECREF(origin);
+        return NULL;
+    }
+    rec = PyArray_DATA(coordinates);
+    q = PyArray_DATA(charges);
+    o = PyArray_DATA(origin);
+    rec_len = PyArray_DIM(coordinates, 0);
+
+    dims[0] = nx;
+    dims[1] = ny;
+    dims[2] = nz;
+    potential_map = (PyArrayObject *) PyArray_ZEROS(3, dims, NPY_DOUBLE, 0);
+    values = PyArray_DATA(potential_map);
+
+    Py_BEGIN_ALLOW_THREADS
+    for (i = 0; i < nx; i++) {
+        x = o[0] + i * spacing;
+        for (j = 0; j < ny; j++) {
+            y = o[1] + j * spacing;
+            for (k = 0; k < nz; k++) {
+                z = o[2] + k * spacing;
+                total = 0.0;
+                for (n = 0; n < rec_len; n++) {
+                    dx = rec[n*3] - x;
+                    dy = rec[n*3+1] - y;
+                    dz = rec[n*3+2] - z;
+                    distance2 = dx*dx + dy*dy + dz*dz;
+                    if (distance2 <= ELEC_DIST_CUTOFF2) {
+                        if (distance2 < min_distance2) distance2 = min_distance2;
+                        total += q[n] / distance2;
+                    }
+                }
+                values[(i*ny + j)*nz + k] = total;
+            }
+        }
+    }
+    Py_END_ALLOW_THREADS
+
+    Py_DECREF(coordinates);
+    Py_DECREF(charges);
+    Py_DECREF(origin);
+    return (PyObject *) potential_map;
+}
+
+
+/**
+ *
+ * VdW potential maps of a receptor on a regular lattice, one for each ligand atom type.
+ * Distances shorter than min_distance are taken as min_distance.
+ *
+ **/
+static PyObject * cpydock_calculate_vdw_maps(PyObject *self, PyObject *args) {
+    PyObject *coordinates_obj, *vdw_obj, *radii_obj, *origin_obj, *type_vdw_obj, *type_radii_obj = NULL;
+    PyArrayObject *coordinates, *rec_vdw, *rec_radii, *origin, *type_vdw, *type_radii, *vdw_maps = NULL;
+    double *rec, *e, *r, *o, *te, *tr, *values, spacing, min_distance, min_distance2;
+    double x, y, z, dx, dy, dz, distance2, distance6;
+    double vdw_energy, vdw_radius, p6, energy;
+    unsigned int nx, ny, nz, i, j, k, n, t, rec_len, num_types, map_size;
+    npy_intp dims[4];
+
+    if (!PyArg_ParseTuple(args, "OOOOIIIdOOd", &coordinates_obj, &vdw_obj, &radii_obj, &origin_obj,
+            &nx, &ny, &nz, &spacing, &type_vdw_obj, &type_radii_obj, &min_distance)) {
+        return NULL;
+    }
+    min_distance2 = min_distance*min_distance;
+    coordinates = (PyArrayObject *) PyArray_FROM_OTF(coordinates_obj, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    rec_vdw = (PyArrayObject *) PyArray_FROM_OTF(vdw_obj, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    rec_radii = (PyArrayObject *) PyArray_FROM_OTF(radii_obj, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    origin = (PyArrayObject *) PyArray_FROM_OTF(origin_obj, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    type_vdw = (PyArrayObject *) PyArray_FROM_OTF(type_vdw_obj, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    type_radii = (PyArrayObject *) PyArray_FROM_OTF(type_radii_obj, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    if (coordinates == NULL || rec_vdw == NULL || rec_radii == NULL || origin == NULL
+            || type_vdw == NULL || type_radii == NULL) {
+        Py_XDECREF(coordinates);
+        Py_XDECREF(rec_vdw);
+        Py_XDECREF(rec_radii);
+        Py_XDECREF(origin);
+        Py_XDECREF(type_vdw);
+        Py_XDECREF(type_radii);
+        return NULL;
+    }
+    rec = PyArray_DATA(coordinates);
+    e = PyArray_DATA(rec_vdw);
+    r = PyArray_DATA(rec_radii);
+    o = PyArray_DATA(origin);
+    te = PyArray_DATA(type_vdw);
+    tr = PyArray_DATA(type_radii);
+    rec_len = PyArray_DIM(coordinates, 0);
+    num_types = PyArray_DIM(type_vdw, 0);
+
+    dims[0] = num_types;
+    dims[1] = nx;
+    dims[2] = ny;
+    dims[3] = nz;
+    vdw_maps = (PyArrayObject *) PyArray_ZEROS(4, dims, NPY_DOUBLE, 0);
+    values = PyArray_DATA(vdw_maps);
+    map_size = nx * ny * nz;
+
+    Py_BEGIN_ALLOW_THREADS
+    for (i = 0; i < nx; i++) {
+        x = o[0] + i * spacing;
+        for (j = 0; j < ny; j++) {
+            y = o[1] + j * spacing;
+            for (k = 0; k < nz; k++) {
+                z = o[2] + k * spacing;
+                for (n = 0; n < rec_len; n++) {
+                    dx = rec[n*3] - x;
+                    dy = rec[n*3+1] - y;
+                    dz = rec[n*3+2] - z;
+                    distance2 = dx*dx + dy*dy + dz*dz;
+                    if (distance2 <= VDW_DIST_CUTOFF2) {
+                        if (distance2 < min_distance2) distance2 = min_distance2;
+                        distance6 = pow(distance2, 3);
+                        for (t = 0; t < num_types; t++) {
+                            vdw_energy = sqrt(e[n] * te[t]);
+                            vdw_radius = r[n] + tr[t];
+                            p6 = pow(vdw_radius, 6) / distance6;
+                            energy = vdw_energy * (p6*p6 - 2.0 * p6);
+                            if (energy > VDW_CUTOFF) energy = VDW_CUTOFF;
+                            values[t*map_size + (i*ny + j)*nz + k] += energy;
+                        }
+                    }
+                }
+            }
+        }
+    }
+    Py_END_ALLOW_THREADS
+
+    Py_DECREF(coordinates);
+    Py_DECREF(rec_vdw);
+    Py_DECREF(rec_radii);
+    Py_DECREF(origin);
+    Py_DECREF(type_vdw);
+    Py_DECREF(type_radii);
+    return (PyObject *) vdw_maps;
+}
+
+
 /**
  *
  * Module methods table
@@ -193,6 +360,8 @@ static PyObject * cpydock_calculate_energy(PyObject *self, PyObject *args) {
  **/
 static PyMethodDef module_methods[] = {
     {"calculate_energy", (PyCFunction)cpydock_calculate_energy, METH_VARARGS, "pyDock C implementation"},
+    {"calculate_electrostatics_map", (PyCFunction)cpydock_calculate_electrostatics_map, METH_VARARGS, "Receptor electrostatics potential map"},
+    {"calculate_vdw_maps", (PyCFunction)cpydock_calculate_vdw_maps, METH_VARARGS, "Receptor VdW potential maps for each ligand atom type"},
     {NULL}
 };
 
@@ -12,3 +12,25 @@ def calculate_energy(receptor_coordinates: SpacePoints, ligand_coordinates: Spac
     tuple[energy,vdw,solv_rec,solv_lig,interface_receptor,interface_ligand]
     """
     ...
+
+
+def calculate_electrostatics_map(coordinates, charges, origin, nx: int, ny: int, nz: int, spacing: float, min_distance: float):
+    """
+    Electrostatics potential map of a receptor on a regular lattice.
+
+    Returns
+    -------
+    numpy.ndarray of shape (nx, ny, nz)
+    """
+    ...
+
+
+def calculate_vdw_maps(coordinates, rec_vdw, rec_vdw_radii, origin, nx: int, ny: int, nz: int, spacing: float, type_vdw, type_vdw_radii, min_distance: float):
+    """
+    VdW potential maps of a receptor on a regular lattice, one for each ligand atom type.
+
+    Returns
+    -------
+    numpy.ndarray of shape (types, nx, ny, nz)
+    """
+    ...
@@ -450,6 +450,8 @@ class DFIREAdapter(ModelAdapter):
 class DFIRE(ScoringFunction):
     """Implements DFIRE potential"""
 
+    interaction_cutoff = 15.0
+
     def __init__(self, weight=1.0):
         super(DFIRE, self).__init__(weight)
         self.potential = DFIREPotential()
@@ -5,6 +5,74 @@
 #include "structmember.h"
 
 
+/**
+ *
+ * DFIRE2 energy of a molecule given as a C-contiguous (mol_length, 3) array of coordinates.
+ * Interface pairs are stored in the growable interface_receptor and interface_ligand buffers.
+ *
+ **/
+static double molecule_energy(double *mol_array, unsigned int mol_length, int *res_indexes, int *atom_indexes,
+                              double *energies, double interface_cutoff, unsigned int **interface_receptor,
+                              unsigned int **interface_ligand, unsigned int *interface_len) {
+    unsigned int i, j, b, atom1, atom2, index, interface_size;
+    double energy, dist;
+
+    energy = 0.;
+    *interface_len = 0;
+    interface_size = mol_length > 0 ? mol_length : 1;
+    *interface_receptor = malloc(interface_size*sizeof(unsigned int));
+    *interface_ligand = malloc(interface_size*sizeof(unsigned int));
+
+    // Calculate euclidean distance
+    for (i = 0; i < mol_length; i++) {
+        for (j = i+1; j < mol_length; j++) {
+            if (res_indexes[i] != res_indexes[j]) {
+                // Euclidean distance * 2
+                dist = sqrt(pow((mol_array[3*i] - mol_array[3*j]), 2.0) +
+                            pow((mol_array[3*i+1] - mol_array[3*j+1]), 2.0) +
+                            pow((mol_array[3*i+2] - mol_array[3*j+2]), 2.0))*2;
+                if (dist <= interface_cutoff) {
+                    if (*interface_len == interface_size) {
+                        interface_size *= 2;
+                        *interface_receptor = realloc(*interface_receptor, interface_size*sizeof(unsigned int));
+                        *interface_ligand = realloc(*interface_ligand, interface_size*sizeof(unsigned int));
+                    }
+                    (*interface_receptor)[*interface_len] = i;
+                    (*interface_ligand)[(*interface_len)++] = j;
+                }
+                // Distance to bin
+                b = (int)dist;
+                if (b < 30) {
+                    atom1 = atom_indexes[i];
+                    atom2 = atom_indexes[j];
+                    // 1D energies array, original shape was (167, 167, 30)
+                    index = atom1*167*30 + atom2*30 + b;
+                    energy += energies[index];
+                }
+            }
+        }
+    }
+
+    return energy/100.;
+}
+
+
+/**
+ *
+ * Interface buffer as a new NumPy array
+ *
+ **/
+static PyObject * interface_to_array(unsigned int *interface, unsigned int interface_len) {
+    PyObject *array;
+    npy_intp dims[1];
+
+    dims[0] = interface_len;
+    array = PyArray_SimpleNew(1, dims, NPY_UINT);
+    memcpy(PyArray_DATA((PyArrayObject *)array), interface, interface_len*sizeof(unsigned int));
+    return array;
+}
+
+
 /**
  *
  * calculate_dfire2 C implementation
@@ -12,86 +80,135 @@
  **/
 static PyObject * cdfire2_calculate_dfire2(PyObject *self, PyObject *args) {
     PyObject *res_index, *atom_index, *coordinates, *dfire2_energy, *result = NULL;
-    unsigned int mol_length, i, j, b, atom1, atom2, index, interface_len, *interface_receptor = NULL, *interface_ligand = NULL;
-    double energy, dist, **mol_array, *energies, interface_cutoff;
-    int *atom_indexes, *res_indexes;
+    PyObject *res_array, *atom_array, *energy_array, *coordinates_array;
+    unsigned int mol_length, interface_len, *interface_receptor = NULL, *interface_ligand = NULL;
+    double energy, interface_cutoff, *coordinates_data, *energies_data;
+    int *res_data, *atom_data;
 
-    npy_intp dims[2];
+    interface_cutoff = 3.9;
+
+    if (!PyArg_ParseTuple(args, "OOOOI|d", &res_index, &atom_index, &coordinates, &dfire2_energy, &mol_length, &interface_cutoff)) {
+        return NULL;
+    }
 
-    PyObject *res_array;
-    PyObject *atom_array;
-    PyObject *energy_array;
+    coordinates_array = PyArray_FROM_OTF(coordinates, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    res_array = PyArray_FROM_OTF(res_index, NPY_INT32, NPY_ARRAY_IN_ARRAY);
+    atom_array = PyArray_FROM_OTF(atom_index, NPY_INT32, NPY_ARRAY_IN_ARRAY);
+    energy_array = PyArray_FROM_OTF(dfire2_energy, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+
+    coordinates_data = PyArray_DATA((PyArrayObject *)coordinates_array);
+    res_data = PyArray_DATA((PyArrayObject *)res_array);
+    atom_data = PyArray_DATA((PyArrayObject *)atom_array);
+    energies_data = PyArray_DATA((PyArrayObject *)energy_array);
+
+    Py_BEGIN_ALLOW_THREADS
+    energy = molecule_energy(coordinates_data, mol_length, res_data, atom_data, energies_data, interface_cutoff,
+                             &interface_receptor, &interface_ligand, &interface_len);
+    Py_END_ALLOW_THREADS
+
+    result = PyTuple_New(3);
+    PyTuple_SET_ITEM(result, 0, PyFloat_FromDouble(energy));
+    PyTuple_SET_ITEM(result, 1, interface_to_array(interface_receptor, interface_len));
+    PyTuple_SET_ITEM(result, 2, interface_to_array(interface_ligand, interface_len));
+
+    free(interface_receptor);
+    free(interface_ligand);
+    Py_DECREF(coordinates_array);
+    Py_DECREF(res_array);
+    Py_DECREF(atom_array);
+    Py_DECREF(energy_array);
+
+    return result;
+}
+
+
+/**
+ *
+ * calculate_dfire2_batch C implementation. Scores N ligand poses in a single call, the
+ * receptor pose used for each ligand pose is given by receptor_index.
+ *
+ **/
+static PyObject * cdfire2_calculate_dfire2_batch(PyObject *self, PyObject *args) {
+    PyObject *res_index, *atom_index, *rec_coordinates, *receptor_index, *lig_coordinates, *dfire2_energy, *result = NULL;
+    PyObject *res_array, *atom_array, *energy_array, *rec_array, *rec_index_array, *lig_array;
+    PyObject *energies, *interfaces_receptor, *interfaces_ligand;
+    unsigned int p, num_poses, rec_len, lig_len, *interface_lens, **interface_receptor, **interface_ligand;
+    double interface_cutoff, *mol_array, *rec_data, *lig_data, *pose_energies, *energies_data;
+    int *rec_index, *res_data, *atom_data;
+    npy_intp dims[1];
 
     interface_cutoff = 3.9;
-    energy = 0.;
-    interface_len = 0;
-
-    if (PyArg_ParseTuple(args, "OOOOi|d", &res_index, &atom_index, &coordinates, &dfire2_energy, &mol_length, &interface_cutoff)) {
-        PyArray_Descr *descr;
-
-        // Coordinates to C Array
-        descr = PyArray_DescrFromType(NPY_DOUBLE);
-        dims[1] = 3;
-        dims[0] = mol_length;
-        PyArray_AsCArray((PyObject **)&coordinates, (void **)&mol_array, dims, 2, descr);
-
-        // Residue indexes
-        res_array = PyArray_FROM_OTF(res_index, NPY_INT32, NPY_ARRAY_IN_ARRAY);
-        res_indexes = (int*)PyArray_DATA(res_array);
-
-        // Atom type indexes
-        atom_array = PyArray_FROM_OTF(atom_index, NPY_INT32, NPY_ARRAY_IN_ARRAY);
-        atom_indexes = (int*)PyArray_DATA(atom_array);
-
-        // DFIRE2 potentials
-        energy_array = PyArray_FROM_OTF(dfire2_energy, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
-        //int N = (int)PyArray_DIM(energy_array, 0);
-        //printf("%d", N);
-        energies = (double*)PyArray_DATA(energy_array);
-
-        interface_receptor = malloc(mol_length*sizeof(unsigned int));
-        interface_ligand = malloc(mol_length*sizeof(unsigned int));
-
-        // Calculate euclidean distance
-        for (i = 0; i < mol_length; i++) {
-            for (j = i+1; j < mol_length; j++) {
-                if (res_indexes[i] != res_indexes[j]) {
-                    // Euclidean distance * 2
-                    dist = sqrt(pow((mol_array[i][0] - mol_array[j][0]), 2.0) +
-                                pow((mol_array[i][1] - mol_array[j][1]), 2.0) +
-                                pow((mol_array[i][2] - mol_array[j][2]), 2.0))*2;
-                    if (dist <= interface_cutoff) {
-                        interface_receptor[interface_len] = i;
-                        interface_ligand[interface_len++] = j;
-                    }
-                    // Distance to bin
-                    b = (int)dist;
-                    if (b < 30) {
-                        atom1 = atom_indexes[i];
-                        atom2 = atom_indexes[j];
-                        // 1D energies array, original shape was (167, 167, 30)
-                        index = atom1*167*30 + atom2*30 + b;
-                        //printf("%d %d %f %d %f\n", res_indexes[i], res_indexes[j], dist, b, energies[index]);
-                        energy += energies[index];
-                    }
-                }
-            }
-        }
 
-        // Free memory
-        Py_DECREF(res_array);
-        Py_DECREF(atom_array);
-        Py_DECREF(energy_array);
-        PyArray_Free(coordinates, mol_array);
+    if (!PyArg_ParseTuple(args, "OOOOOO|d", &res_index, &atom_index, &rec_coordinates, &receptor_index,
+                          &lig_coordinates, &dfire2_energy, &interface_cutoff)) {
+        return NULL;
+    }
+
+    res_array = PyArray_FROM_OTF(res_index, NPY_INT32, NPY_ARRAY_IN_ARRAY);
+    atom_array = PyArray_FROM_OTF(atom_index, NPY_INT32, NPY_ARRAY_IN_ARRAY);
+    energy_array = PyArray_FROM_OTF(dfire2_energy, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    rec_array = PyArray_FROM_OTF(rec_coordinates, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    rec_index_array = PyArray_FROM_OTF(receptor_index, NPY_INT32, NPY_ARRAY_IN_ARRAY);
+    lig_array = PyArray_FROM_OTF(lig_coordinates, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+
+    rec_data = (double *)PyArray_DATA((PyArrayObject *)rec_array);
+    lig_data = (double *)PyArray_DATA((PyArrayObject *)lig_array);
+    rec_index = (int *)PyArray_DATA((PyArrayObject *)rec_index_array);
+    res_data = (int *)PyArray_DATA((PyArrayObject *)res_array);
+    atom_data = (int *)PyArray_DATA((PyArrayObject *)atom_array);
+    energies_data = (double *)PyArray_DATA((PyArrayObject *)energy_array);
+    rec_len = PyArray_DIM((PyArrayObject *)rec_array, 1);
+    num_poses = PyArray_DIM((PyArrayObject *)lig_array, 0);
+    lig_len = PyArray_DIM((PyArrayObject *)lig_array, 1);
+
+    dims[0] = num_poses;
+    energies = PyArray_SimpleNew(1, dims, NPY_DOUBLE);
+    pose_energies = (double *)PyArray_DATA((PyArrayObject *)energies);
+    interface_lens = malloc((num_poses > 0 ? num_poses : 1)*sizeof(unsigned int));
+    interface_receptor = malloc((num_poses > 0 ? num_poses : 1)*sizeof(unsigned int *));
+    interface_ligand = malloc((num_poses > 0 ? num_poses : 1)*sizeof(unsigned int *));
+
+    // Poses are scored without the GIL, the interfaces are converted to arrays afterwards
+    Py_BEGIN_ALLOW_THREADS
+
+    // Receptor and ligand poses are joined as a single molecule
+    mol_array = malloc(((rec_len + lig_len)*3 > 0 ? (rec_len + lig_len)*3 : 1)*sizeof(double));
+
+    for (p = 0; p < num_poses; p++) {
+        memcpy(mol_array, rec_data + 3*rec_len*rec_index[p], 3*rec_len*sizeof(double));
+        memcpy(mol_array + 3*rec_len, lig_data + 3*lig_len*p, 3*lig_len*sizeof(double));
+
+        pose_energies[p] = molecule_energy(mol_array, rec_len + lig_len, res_data, atom_data, energies_data,
+                                           interface_cutoff, &interface_receptor[p], &interface_ligand[p],
+                                           &interface_lens[p]);
     }
 
-    interface_receptor = realloc(interface_receptor, interface_len*sizeof(unsigned int));
-    interface_ligand = realloc(interface_ligand, interface_len*sizeof(unsigned int));
+    free(mol_array);
+
+    Py_END_ALLOW_THREADS
+
+    interfaces_receptor = PyList_New(num_poses);
+    interfaces_ligand = PyList_New(num_poses);
+    for (p = 0; p < num_poses; p++) {
+        PyList_SET_ITEM(interfaces_receptor, p, interface_to_array(interface_receptor[p], interface_lens[p]));
+        PyList_SET_ITEM(interfaces_ligand, p, interface_to_array(interface_ligand[p], interface_lens[p]));
+        free(interface_receptor[p]);
+        free(interface_ligand[p]);
+    }
+    free(interface_receptor);
+    free(interface_ligand);
+    free(interface_lens);
+    Py_DECREF(res_array);
+    Py_DECREF(atom_array);
+    Py_DECREF(energy_array);
+    Py_DECREF(rec_array);
+    Py_DECREF(rec_index_array);
+    Py_DECREF(lig_array);
 
     result = PyTuple_New(3);
-    PyTuple_SET_ITEM(result, 0, PyFloat_FromDouble(energy/100.));
-    PyTuple_SET_ITEM(result, 1, PyArray_SimpleNewFromData(1, dims, NPY_UINT, interface_receptor));
-    PyTuple_SET_ITEM(result, 2, PyArray_SimpleNewFromData(1, dims, NPY_UINT, interface_ligand));
+    PyTuple_SET_ITEM(result, 0, energies);
+    PyTuple_SET_ITEM(result, 1, interfaces_receptor);
+    PyTuple_SET_ITEM(result, 2, interfaces_ligand);
 
     return result;
 }
@@ -104,6 +221,7 @@ static PyObject * cdfire2_calculate_dfire2(PyObject *self, PyObject *args) {
  **/
 static PyMethodDef module_methods[] = {
     {"calculate_dfire2", (PyCFunction)cdfire2_calculate_dfire2, METH_VARARGS, "calculate_dfire2 C implementation"},
+    {"calculate_dfire2_batch", (PyCFunction)cdfire2_calculate_dfire2_batch, METH_VARARGS, "calculate_dfire2_batch C implementation"},
     {NULL}
 };
 
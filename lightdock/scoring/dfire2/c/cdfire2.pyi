@@ -9,3 +9,17 @@ def calculate_dfire2(res_index, atom_index, coordinates, dfire2_energy, mol_leng
     -------
     tuple[energy,interface_receptor,interface_ligand]
     """
+
+
+def calculate_dfire2_batch(res_index, atom_index, receptor_coordinates, receptor_index, ligand_coordinates, dfire2_energy, interface_cutoff: float) -> tuple:
+    """
+    calculate_dfire2_batch C implementation.
+
+    receptor_coordinates is a (R, N_rec, 3) array of receptor poses and ligand_coordinates
+    a (N, N_lig, 3) array of ligand poses. The receptor pose of each ligand pose is given
+    by receptor_index.
+
+    Returns
+    -------
+    tuple[energies,interfaces_receptor,interfaces_ligand]
+    """
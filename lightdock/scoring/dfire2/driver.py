@@ -10,7 +10,7 @@ import numpy as np
 from lightdock.structure.model import DockingModel
 from lightdock.scoring.functions import ModelAdapter, ScoringFunction
 from lightdock.structure.space import SpacePoints
-from lightdock.scoring.dfire2.c.cdfire2 import calculate_dfire2
+from lightdock.scoring.dfire2.c.cdfire2 import calculate_dfire2, calculate_dfire2_batch
 from lightdock.constants import DEFAULT_CONTACT_RESTRAINTS_CUTOFF
 
 # Potential constants
@@ -248,21 +248,26 @@ class DFIRE2(ScoringFunction):
         self.cached = False
         self.potential = DFIRE2Potential()
 
-    def __call__(self, receptor, receptor_coordinates, ligand, ligand_coordinates):
+    def cache_indexes(self, receptor, ligand):
+        """Residue and atom type indexes of the receptor and ligand joined molecule"""
         if not self.cached:
-            self.res_index = []
-            self.atom_index = []
+            # Built apart and assigned at the end, as threads may score in parallel
+            res_index = []
+            atom_index = []
             for o in receptor.objects:
-                self.res_index.append(o.residue_index)
-                self.atom_index.append(o.atom_index)
-            last = self.res_index[-1]
+                res_index.append(o.residue_index)
+                atom_index.append(o.atom_index)
+            last = res_index[-1]
             for o in ligand.objects:
-                self.res_index.append(o.residue_index + last)
-                self.atom_index.append(o.atom_index)
-            self.res_index = np.array(self.res_index, dtype=np.int32)
-            self.atom_index = np.array(self.atom_index, dtype=np.int32)
+                res_index.append(o.residue_index + last)
+                atom_index.append(o.atom_index)
+            self.res_index = np.array(res_index, dtype=np.int32)
+            self.atom_index = np.array(atom_index, dtype=np.int32)
             self.molecule_length = len(self.res_index)
             self.cached = True
+
+    def __call__(self, receptor, receptor_coordinates, ligand, ligand_coordinates):
+        self.cache_indexes(receptor, ligand)
         return self.evaluate_energy(
             receptor, receptor_coordinates, ligand, ligand_coordinates
         )
@@ -281,7 +286,59 @@ class DFIRE2(ScoringFunction):
             self.molecule_length,
             DEFAULT_CONTACT_RESTRAINTS_CUTOFF,
         )
+        return self.weighted_energy(
+            receptor, ligand, energy, interface_receptor, interface_ligand
+        )
+
+    def batch_score(
+        self,
+        receptor,
+        ligand,
+        poses,
+        num_rec_nmodes=0,
+        num_lig_nmodes=0,
+        receptor_ids=None,
+        ligand_ids=None,
+    ):
+        """Calculates the DFIRE2 energy of a set of poses in a single native call"""
+        self.cache_indexes(receptor, ligand)
+        (
+            receptor_coordinates,
+            receptor_index,
+            ligand_coordinates,
+        ) = ScoringFunction.stack_poses(
+            receptor,
+            ligand,
+            poses,
+            num_rec_nmodes,
+            num_lig_nmodes,
+            receptor_ids,
+            ligand_ids,
+        )
+        energies, interfaces_receptor, interfaces_ligand = calculate_dfire2_batch(
+            self.res_index,
+            self.atom_index,
+            receptor_coordinates,
+            receptor_index,
+            ligand_coordinates,
+            self.potential.energy,
+            DEFAULT_CONTACT_RESTRAINTS_CUTOFF,
+        )
+        return np.array(
+            [
+                self.weighted_energy(
+                    receptor, ligand, energy, interface_receptor, interface_ligand
+                )
+                for energy, interface_receptor, interface_ligand in zip(
+                    energies, interfaces_receptor, interfaces_ligand
+                )
+            ]
+        )
 
+    def weighted_energy(
+        self, receptor, ligand, energy, interface_receptor, interface_ligand
+    ):
+        """Weighted energy considering restraints"""
         # Code to consider contacts in the interface
         perc_receptor_restraints = ScoringFunction.restraints_satisfied(
             receptor.restraints, set(interface_receptor)
@@ -7,6 +7,7 @@ custom VdW weight.
 import numpy as np
 from lightdock.scoring.functions import ScoringFunction, ModelAdapter
 from lightdock.structure.model import DockingModel
+from lightdock.scoring.grid import load_grid
 import lightdock.scoring.dna.energy.c.cdna as cdna
 import lightdock.scoring.dna.energy.parameters as parameters
 from lightdock.util.logger import LoggingManager
@@ -136,6 +137,8 @@ class DNAAdapter(ModelAdapter):
 
 
 class DNA(ScoringFunction):
+    interaction_cutoff = 30.0
+
     def __init__(self, weight=1.0):
         super(DNA, self).__init__(weight)
         try:
@@ -145,22 +148,42 @@ class DNA(ScoringFunction):
             log.warning("Error (%s), using default VdW cutoff" % str(e))
             self.scoring_vdw_weight = parameters.scoring_vdw_weight
         log.info("DNA VdW cutoff is: %3.2f" % self.scoring_vdw_weight)
+        self.grid = None
+
+    def use_grid(self, receptor, ligand, spacing, file_name=None):
+        """Scores the poses using precomputed potential grids of the receptor"""
+        self.grid = load_grid(receptor, ligand, spacing, file_name)
+        # Grids are built for the whole receptor
+        self.interaction_cutoff = None
 
     def __call__(self, receptor, receptor_coordinates, ligand, ligand_coordinates):
         """Computes the pyDockDNA scoring energy using receptor and ligand which are
         instances of DockingModel.
         """
-        elec, vdw, interface_receptor, interface_ligand = cdna.calculate_energy(
-            receptor_coordinates,
-            ligand_coordinates,
-            receptor.charges,
-            ligand.charges,
-            receptor.vdw_energy,
-            ligand.vdw_energy,
-            receptor.vdw_radii,
-            ligand.vdw_radii,
-            DEFAULT_CONTACT_RESTRAINTS_CUTOFF,
-        )
+        if self.grid is not None:
+            elec, vdw, (rec_index, lig_index, distance2) = self.grid.energy(
+                receptor,
+                ligand,
+                receptor_coordinates.coordinates,
+                ligand_coordinates.coordinates,
+            )
+            interface = distance2 <= (
+                DEFAULT_CONTACT_RESTRAINTS_CUTOFF * DEFAULT_CONTACT_RESTRAINTS_CUTOFF
+            )
+            interface_receptor = rec_index[interface]
+            interface_ligand = lig_index[interface]
+        else:
+            elec, vdw, interface_receptor, interface_ligand = cdna.calculate_energy(
+                receptor_coordinates,
+                ligand_coordinates,
+                receptor.charges,
+                ligand.charges,
+                receptor.vdw_energy,
+                ligand.vdw_energy,
+                receptor.vdw_radii,
+                ligand.vdw_radii,
+                DEFAULT_CONTACT_RESTRAINTS_CUTOFF,
+            )
         energy = (elec + parameters.scoring_vdw_weight * vdw) * -1.0
         perc_receptor_restraints = ScoringFunction.restraints_satisfied(
             receptor.restraints, set(interface_receptor)
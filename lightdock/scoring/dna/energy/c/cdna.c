@@ -74,6 +74,9 @@ static PyObject * cdna_calculate_energy(PyObject *self, PyObject *args) {
         interface_receptor = malloc(lig_len*sizeof(unsigned int));
         interface_ligand  = malloc(lig_len*sizeof(unsigned int));
 
+        // Python objects are not used in the energy loops
+        Py_BEGIN_ALLOW_THREADS
+
         // For all atoms in receptor
         for (i = 0; i < rec_len; i++) {
             // For all atoms in ligand
@@ -120,6 +123,8 @@ static PyObject * cdna_calculate_energy(PyObject *self, PyObject *args) {
         //      - charges are in e (elementary charge units)
         total_elec = total_elec * FACTOR / EPSILON;
 
+        Py_END_ALLOW_THREADS
+
         // Free structures
         PyArray_Free(tmp0, rec_array);
         PyArray_Free(tmp1, lig_array);
@@ -20,31 +20,368 @@ static unsigned int dist_to_bins[50] = {
 
 /**
  *
- * Auxiliary function
+ * Neighbor grid (cell list) parameters. The cell side is slightly larger than the
+ * DFIRE cutoff so any pair within the cutoff lies in adjacent cells.
  *
  **/
-int compare(const void *a, const void *b) {
-    const unsigned int *da = (const unsigned int *) a;
-    const unsigned int *db = (const unsigned int *) b;
+#define DFIRE_CUTOFF2 225.
+#define GRID_CELL_SIZE 15.01
 
-    return (*da > *db) - (*da < *db);
+
+/**
+ *
+ * Builds a cell list of the given coordinates: atoms are bucketed by cell and
+ * cell_start[c]..cell_start[c+1] are the positions in cell_atoms of the atoms in cell c.
+ *
+ **/
+void build_grid(double **coordinates, unsigned int num_atoms, double *origin, int *grid_dims,
+                int **cell_start, int **cell_atoms) {
+    unsigned int i, k, num_cells, *atom_cells;
+    double max_coord[3];
+    int cell, c[3];
+
+    for (k = 0; k < 3; k++) {
+        origin[k] = 0.;
+        max_coord[k] = 0.;
+    }
+    if (num_atoms > 0) {
+        for (k = 0; k < 3; k++) {
+            origin[k] = max_coord[k] = coordinates[0][k];
+        }
+    }
+    for (i = 1; i < num_atoms; i++) {
+        for (k = 0; k < 3; k++) {
+            if (coordinates[i][k] < origin[k]) origin[k] = coordinates[i][k];
+            if (coordinates[i][k] > max_coord[k]) max_coord[k] = coordinates[i][k];
+        }
+    }
+    for (k = 0; k < 3; k++) {
+        grid_dims[k] = (int)((max_coord[k] - origin[k]) / GRID_CELL_SIZE) + 1;
+    }
+    num_cells = grid_dims[0] * grid_dims[1] * grid_dims[2];
+
+    *cell_start = calloc(num_cells + 1, sizeof(int));
+    *cell_atoms = malloc((num_atoms > 0 ? num_atoms : 1) * sizeof(int));
+    atom_cells = malloc((num_atoms > 0 ? num_atoms : 1) * sizeof(unsigned int));
+
+    // Counting sort of atoms by cell, atoms keep ascending order inside each cell
+    for (i = 0; i < num_atoms; i++) {
+        for (k = 0; k < 3; k++) {
+            c[k] = (int)((coordinates[i][k] - origin[k]) / GRID_CELL_SIZE);
+            if (c[k] >= grid_dims[k]) c[k] = grid_dims[k] - 1;
+        }
+        cell = (c[0] * grid_dims[1] + c[1]) * grid_dims[2] + c[2];
+        atom_cells[i] = cell;
+        (*cell_start)[cell + 1]++;
+    }
+    for (i = 0; i < num_cells; i++) {
+        (*cell_start)[i + 1] += (*cell_start)[i];
+    }
+    for (i = 0; i < num_atoms; i++) {
+        (*cell_atoms)[(*cell_start)[atom_cells[i]]++] = i;
+    }
+    // Restore cell starts after the scatter
+    for (i = num_cells; i > 0; i--) {
+        (*cell_start)[i] = (*cell_start)[i - 1];
+    }
+    (*cell_start)[0] = 0;
+
+    free(atom_cells);
 }
 
 
+#ifdef DFIRE_ALL_PAIRS
 /**
  *
- * Computation of Euclidean distances and selection of nearest atoms
+ * All-pairs selection of the original implementation, the neighbor grid is ignored.
+ * Only built to benchmark the grid (see benchmarks/fastdfire_benchmark.py).
  *
  **/
-void euclidean_dist(PyObject *receptor_coordinates, PyObject *ligand_coordinates,
-                    unsigned int **indexes, unsigned int *indexes_len) {
-    PyObject *tmp0, *tmp1;
-    unsigned int rec_len, lig_len, i, j, n;
-    double dist, **rec_array, **lig_array;
-    npy_intp dims[2];
+void grid_pairs(double **rec_array, unsigned int rec_len, double **lig_array, unsigned int lig_len,
+                double *origin, int *grid_dims, int *cell_start, int *cell_atoms,
+                unsigned int **indexes, unsigned int *indexes_len) {
+    unsigned int i, j, n;
+    double dist;
 
     *indexes_len = 0;
     n = 0;
+    *indexes = malloc(3*(rec_len*lig_len > 0 ? rec_len*lig_len : 1)*sizeof(unsigned int));
+
+    for (i = 0; i < rec_len; i++) {
+        for (j = 0; j < lig_len; j++) {
+            dist = pow((rec_array[i][0] - lig_array[j][0]), 2.0) +
+                   pow((rec_array[i][1] - lig_array[j][1]), 2.0) +
+                   pow((rec_array[i][2] - lig_array[j][2]), 2.0);
+            if (dist <= DFIRE_CUTOFF2) {
+                (*indexes)[n++] = i;
+                (*indexes)[n++] = j;
+                (*indexes)[n++] = (sqrt(dist)*2.0 - 1.0);
+                (*indexes_len)++;
+            }
+        }
+    }
+    *indexes = realloc(*indexes, (n > 0 ? n : 1)*sizeof(unsigned int));
+}
+#else
+/**
+ *
+ * Selection of the receptor-ligand atom pairs within the DFIRE cutoff using the receptor
+ * neighbor grid. Pairs are returned as (i, j, d) triplets sorted by receptor and then by
+ * ligand index, which is the same order of an all-pairs double loop.
+ *
+ **/
+void grid_pairs(double **rec_array, unsigned int rec_len, double **lig_array, unsigned int lig_len,
+                double *origin, int *grid_dims, int *cell_start, int *cell_atoms,
+                unsigned int **indexes, unsigned int *indexes_len) {
+    unsigned int i, j, k, n, p, capacity, *found, *counts;
+    int cx, cy, cz, x, low[3], high[3], c, cell;
+    double dist, f;
+
+    *indexes_len = 0;
+    capacity = 1024;
+    found = malloc(3*capacity*sizeof(unsigned int));
+
+    for (j = 0; j < lig_len; j++) {
+        for (k = 0; k < 3; k++) {
+            f = floor((lig_array[j][k] - origin[k]) / GRID_CELL_SIZE);
+            if (f < -1. || f > grid_dims[k]) break;
+            c = (int)f;
+            low[k] = (c - 1 < 0) ? 0 : c - 1;
+            high[k] = (c + 1 >= grid_dims[k]) ? grid_dims[k] - 1 : c + 1;
+        }
+        // Ligand atom too far from the receptor box
+        if (k < 3) continue;
+
+        for (cx = low[0]; cx <= high[0]; cx++) {
+            for (cy = low[1]; cy <= high[1]; cy++) {
+                for (cz = low[2]; cz <= high[2]; cz++) {
+                    cell = (cx * grid_dims[1] + cy) * grid_dims[2] + cz;
+                    for (x = cell_start[cell]; x < cell_start[cell + 1]; x++) {
+                        i = cell_atoms[x];
+                        dist = (rec_array[i][0] - lig_array[j][0])*(rec_array[i][0] - lig_array[j][0]) +
+                               (rec_array[i][1] - lig_array[j][1])*(rec_array[i][1] - lig_array[j][1]) +
+                               (rec_array[i][2] - lig_array[j][2])*(rec_array[i][2] - lig_array[j][2]);
+                        if (dist <= DFIRE_CUTOFF2) {
+                            if (*indexes_len == capacity) {
+                                capacity *= 2;
+                                found = realloc(found, 3*capacity*sizeof(unsigned int));
+                            }
+                            n = 3*(*indexes_len);
+                            found[n] = i;
+                            found[n+1] = j;
+                            found[n+2] = (sqrt(dist)*2.0 - 1.0);
+                            (*indexes_len)++;
+                        }
+                    }
+                }
+            }
+        }
+    }
+
+    // Stable counting sort by receptor index (ligand indexes are already ascending)
+    counts = calloc(rec_len + 1, sizeof(unsigned int));
+    for (n = 0; n < *indexes_len; n++) {
+        counts[found[3*n] + 1]++;
+    }
+    for (i = 0; i < rec_len; i++) {
+        counts[i + 1] += counts[i];
+    }
+    *indexes = malloc(3*((*indexes_len) > 0 ? *indexes_len : 1)*sizeof(unsigned int));
+    for (n = 0; n < *indexes_len; n++) {
+        p = 3*counts[found[3*n]]++;
+        (*indexes)[p] = found[3*n];
+        (*indexes)[p+1] = found[3*n+1];
+        (*indexes)[p+2] = found[3*n+2];
+    }
+    free(counts);
+    free(found);
+}
+#endif
+
+
+/**
+ *
+ * Receptor neighbor grid as a tuple of NumPy arrays (origin, dimensions, cell_start, cell_atoms)
+ *
+ **/
+PyObject * grid_to_tuple(double *origin, int *grid_dims, int *cell_start, int *cell_atoms, unsigned int num_atoms) {
+    PyObject *grid, *array;
+    npy_intp dims[1];
+    int num_cells;
+
+    num_cells = grid_dims[0] * grid_dims[1] * grid_dims[2];
+    grid = PyTuple_New(4);
+
+    dims[0] = 3;
+    array = PyArray_SimpleNew(1, dims, NPY_DOUBLE);
+    memcpy(PyArray_DATA((PyArrayObject *)array), origin, 3*sizeof(double));
+    PyTuple_SET_ITEM(grid, 0, array);
+
+    array = PyArray_SimpleNew(1, dims, NPY_INT32);
+    memcpy(PyArray_DATA((PyArrayObject *)array), grid_dims, 3*sizeof(int));
+    PyTuple_SET_ITEM(grid, 1, array);
+
+    dims[0] = num_cells + 1;
+    array = PyArray_SimpleNew(1, dims, NPY_INT32);
+    memcpy(PyArray_DATA((PyArrayObject *)array), cell_start, (num_cells + 1)*sizeof(int));
+    PyTuple_SET_ITEM(grid, 2, array);
+
+    dims[0] = num_atoms;
+    array = PyArray_SimpleNew(1, dims, NPY_INT32);
+    memcpy(PyArray_DATA((PyArrayObject *)array), cell_atoms, num_atoms*sizeof(int));
+    PyTuple_SET_ITEM(grid, 3, array);
+
+    return grid;
+}
+
+
+/**
+ *
+ * Converts object to a C-contiguous NumPy array of the given type and number of
+ * dimensions. Returns NULL with a Python exception set if it is not possible.
+ *
+ **/
+PyObject * as_array(PyObject *object, int type, int ndim, const char *name) {
+    PyObject *array;
+
+    array = PyArray_FROM_OTF(object, type, NPY_ARRAY_IN_ARRAY);
+    if (array != NULL && PyArray_NDIM((PyArrayObject *)array) != ndim) {
+        PyErr_Format(PyExc_ValueError, "%s must be a %d-dimensional array", name, ndim);
+        Py_DECREF(array);
+        return NULL;
+    }
+    return array;
+}
+
+
+/**
+ *
+ * Checks the DFIRE energy table is a 168x168x20 array, sets a ValueError otherwise
+ *
+ **/
+int valid_dfire_energy(PyObject *energy_array) {
+    if (PyArray_DIM((PyArrayObject *)energy_array, 0) != 168 || PyArray_DIM((PyArrayObject *)energy_array, 1) != 168 ||
+        PyArray_DIM((PyArrayObject *)energy_array, 2) != 20) {
+        PyErr_SetString(PyExc_ValueError, "dfire_energy must be a 168x168x20 array");
+        return 0;
+    }
+    return 1;
+}
+
+
+/**
+ *
+ * Checks there is a DFIRE atom type (lower than 168) for each of the num_atoms atoms,
+ * sets a ValueError otherwise
+ *
+ **/
+int valid_types(PyObject *types_array, npy_intp num_atoms) {
+    unsigned int *types;
+    npy_intp i;
+
+    if (PyArray_DIM((PyArrayObject *)types_array, 0) != num_atoms) {
+        PyErr_SetString(PyExc_ValueError, "there must be an atom type per atom of the coordinates");
+        return 0;
+    }
+    types = (unsigned int *)PyArray_DATA((PyArrayObject *)types_array);
+    for (i = 0; i < num_atoms; i++) {
+        if (types[i] >= 168) {
+            PyErr_SetString(PyExc_ValueError, "atom types must be lower than 168");
+            return 0;
+        }
+    }
+    return 1;
+}
+
+
+/**
+ *
+ * DFIRE atom types of a docking model (its objects, an array or a list) as an array,
+ * checked against the number of atoms of coordinates. Returns NULL with a Python
+ * exception set if they are not valid.
+ *
+ **/
+PyObject * model_types(PyObject *model, PyObject *coordinates, const char *name) {
+    PyObject *objects, *types_array;
+    Py_ssize_t num_atoms;
+
+    objects = PyObject_GetAttrString(model, "objects");
+    if (objects == NULL) return NULL;
+    types_array = as_array(objects, NPY_UINT32, 1, name);
+    Py_DECREF(objects);
+    if (types_array == NULL) return NULL;
+    num_atoms = PyObject_Length(coordinates);
+    if (num_atoms < 0 || !valid_types(types_array, num_atoms)) {
+        Py_DECREF(types_array);
+        return NULL;
+    }
+    return types_array;
+}
+
+
+/**
+ *
+ * Converts a receptor neighbor grid tuple (see grid_to_tuple) to NumPy arrays, checking
+ * it is the grid of a receptor of rec_len atoms. Sets a ValueError and returns 0 if not.
+ *
+ **/
+int read_receptor_grid(PyObject *receptor_grid, unsigned int rec_len, PyObject **arrays) {
+    static const int types[4] = {NPY_DOUBLE, NPY_INT32, NPY_INT32, NPY_INT32};
+    int k, *grid_dims;
+    npy_intp num_cells;
+
+    if (!PyTuple_Check(receptor_grid) || PyTuple_GET_SIZE(receptor_grid) != 4) {
+        PyErr_SetString(PyExc_ValueError, "receptor_grid must be a tuple of 4 arrays");
+        return 0;
+    }
+    for (k = 0; k < 4; k++) {
+        arrays[k] = NULL;
+    }
+    for (k = 0; k < 4; k++) {
+        arrays[k] = as_array(PyTuple_GET_ITEM(receptor_grid, k), types[k], 1, "receptor_grid item");
+        if (arrays[k] == NULL) goto error;
+    }
+    if (PyArray_DIM((PyArrayObject *)arrays[0], 0) != 3 || PyArray_DIM((PyArrayObject *)arrays[1], 0) != 3) {
+        PyErr_SetString(PyExc_ValueError, "receptor_grid origin and dimensions must have 3 values");
+        goto error;
+    }
+    grid_dims = (int *)PyArray_DATA((PyArrayObject *)arrays[1]);
+    if (grid_dims[0] < 1 || grid_dims[1] < 1 || grid_dims[2] < 1) {
+        PyErr_SetString(PyExc_ValueError, "receptor_grid dimensions must be positive");
+        goto error;
+    }
+    num_cells = (npy_intp)grid_dims[0] * grid_dims[1] * grid_dims[2];
+    if (PyArray_DIM((PyArrayObject *)arrays[2], 0) != num_cells + 1 ||
+        PyArray_DIM((PyArrayObject *)arrays[3], 0) != rec_len ||
+        ((int *)PyArray_DATA((PyArrayObject *)arrays[2]))[0] != 0 ||
+        ((int *)PyArray_DATA((PyArrayObject *)arrays[2]))[num_cells] != (int)rec_len) {
+        PyErr_SetString(PyExc_ValueError, "receptor_grid does not match the receptor coordinates");
+        goto error;
+    }
+    return 1;
+
+error:
+    for (k = 0; k < 4; k++) {
+        Py_XDECREF(arrays[k]);
+    }
+    return 0;
+}
+
+
+/**
+ *
+ * Computation of Euclidean distances and selection of nearest atoms. If receptor_grid
+ * is NULL, the neighbor grid is built for this call only. Returns 0 with a Python
+ * exception set if receptor_grid is not valid.
+ *
+ **/
+int euclidean_dist(PyObject *receptor_coordinates, PyObject *ligand_coordinates, PyObject *receptor_grid,
+                    unsigned int **indexes, unsigned int *indexes_len) {
+    PyObject *tmp0, *tmp1, *grid_arrays[4];
+    unsigned int rec_len, lig_len;
+    double **rec_array, **lig_array, grid_origin[3], *origin = grid_origin;
+    int grid_shape[3], *grid_dims = grid_shape, *cell_start, *cell_atoms;
+    npy_intp dims[2];
 
     tmp0 = PyObject_GetAttrString(receptor_coordinates, "coordinates");
     tmp1 = PyObject_GetAttrString(ligand_coordinates, "coordinates");
@@ -52,6 +389,12 @@ void euclidean_dist(PyObject *receptor_coordinates, PyObject *ligand_coordinates
     rec_len = PySequence_Size(tmp0);
     lig_len = PySequence_Size(tmp1);
 
+    if (receptor_grid != NULL && receptor_grid != Py_None && !read_receptor_grid(receptor_grid, rec_len, grid_arrays)) {
+        Py_DECREF(tmp0);
+        Py_DECREF(tmp1);
+        return 0;
+    }
+
     dims[1] = 3;
     dims[0] = rec_len;
     PyArray_AsCArray((PyObject **)&tmp0, (void **)&rec_array, dims, 2, PyArray_DescrFromType(NPY_DOUBLE));
@@ -59,26 +402,68 @@ void euclidean_dist(PyObject *receptor_coordinates, PyObject *ligand_coordinates
     dims[0] = lig_len;
     PyArray_AsCArray((PyObject **)&tmp1, (void **)&lig_array, dims, 2, PyArray_DescrFromType(NPY_DOUBLE));
 
-    *indexes = malloc(3*rec_len*lig_len*sizeof(unsigned int));
-
-    for (i = 0; i < rec_len; i++) {
-        for (j = 0; j < lig_len; j++) {
-            dist = pow((rec_array[i][0] - lig_array[j][0]), 2.0) +
-                   pow((rec_array[i][1] - lig_array[j][1]), 2.0) +
-                   pow((rec_array[i][2] - lig_array[j][2]), 2.0);
-            if (dist <= 225.) {
-                (*indexes)[n++] = i;
-                (*indexes)[n++] = j;
-                (*indexes)[n++] = (sqrt(dist)*2.0 - 1.0);
-                (*indexes_len)++;
-            }
-        }
+    if (receptor_grid == NULL || receptor_grid == Py_None) {
+        Py_BEGIN_ALLOW_THREADS
+        build_grid(rec_array, rec_len, origin, grid_dims, &cell_start, &cell_atoms);
+        grid_pairs(rec_array, rec_len, lig_array, lig_len, origin, grid_dims, cell_start, cell_atoms,
+                   indexes, indexes_len);
+        free(cell_start);
+        free(cell_atoms);
+        Py_END_ALLOW_THREADS
+    } else {
+        origin = (double *)PyArray_DATA((PyArrayObject *)grid_arrays[0]);
+        grid_dims = (int *)PyArray_DATA((PyArrayObject *)grid_arrays[1]);
+        cell_start = (int *)PyArray_DATA((PyArrayObject *)grid_arrays[2]);
+        cell_atoms = (int *)PyArray_DATA((PyArrayObject *)grid_arrays[3]);
+        Py_BEGIN_ALLOW_THREADS
+        grid_pairs(rec_array, rec_len, lig_array, lig_len, origin, grid_dims, cell_start, cell_atoms,
+                   indexes, indexes_len);
+        Py_END_ALLOW_THREADS
+        Py_DECREF(grid_arrays[0]);
+        Py_DECREF(grid_arrays[1]);
+        Py_DECREF(grid_arrays[2]);
+        Py_DECREF(grid_arrays[3]);
     }
-    *indexes = realloc(*indexes, n*sizeof(unsigned int));
+
     PyArray_Free(tmp0, rec_array);
     PyArray_Free(tmp1, lig_array);
     Py_DECREF(tmp0);
     Py_DECREF(tmp1);
+    return 1;
+}
+
+
+/**
+ *
+ * build_receptor_grid C implementation
+ *
+ **/
+static PyObject * cdfire_build_receptor_grid(PyObject *self, PyObject *args) {
+    PyObject *receptor_coordinates, *tmp0, *result = NULL;
+    unsigned int rec_len;
+    double **rec_array, origin[3];
+    int grid_dims[3], *cell_start, *cell_atoms;
+    npy_intp dims[2];
+
+    if (PyArg_ParseTuple(args, "O", &receptor_coordinates)) {
+        tmp0 = PyObject_GetAttrString(receptor_coordinates, "coordinates");
+        rec_len = PySequence_Size(tmp0);
+        dims[1] = 3;
+        dims[0] = rec_len;
+        PyArray_AsCArray((PyObject **)&tmp0, (void **)&rec_array, dims, 2, PyArray_DescrFromType(NPY_DOUBLE));
+
+        Py_BEGIN_ALLOW_THREADS
+        build_grid(rec_array, rec_len, origin, grid_dims, &cell_start, &cell_atoms);
+        Py_END_ALLOW_THREADS
+        result = grid_to_tuple(origin, grid_dims, cell_start, cell_atoms, rec_len);
+
+        free(cell_start);
+        free(cell_atoms);
+        PyArray_Free(tmp0, rec_array);
+        Py_DECREF(tmp0);
+    }
+
+    return result;
 }
 
 
@@ -88,36 +473,37 @@ void euclidean_dist(PyObject *receptor_coordinates, PyObject *ligand_coordinates
  *
  **/
 static PyObject * cdfire_calculate_dfire(PyObject *self, PyObject *args) {
-    PyObject *receptor, *ligand, *dfire_energy, *receptor_coordinates, *ligand_coordinates;
-    PyObject *take, *intf_rec_array_object, *intf_lig_array_object, *array_object, *tmp0, *tmp1, **rec_objects, **lig_objects, *result = NULL;
-    PyArrayObject *df_en_array;
-    unsigned int n, m, i, j, d, dfire_bin, atoma, atomb, indexes_len, interface_len, *array, *interface_receptor, *interface_ligand, *indexes;
+    PyObject *receptor, *ligand, *dfire_energy, *receptor_coordinates, *ligand_coordinates, *receptor_grid = NULL;
+    PyObject *energy_array, *rec_types_array, *lig_types_array, *result = NULL;
+    unsigned int n, m, i, j, d, dfire_bin, atoma, atomb, indexes_len, interface_len, *interface_receptor, *interface_ligand, *indexes;
+    unsigned int *rec_types, *lig_types;
     double interface_cutoff, energy, *dfire_en_array;
     npy_intp dims[1];
 
     interface_cutoff = 3.9;
     energy = 0.;
     interface_len = 0;
+    interface_receptor = interface_ligand = NULL;
+
+    if (PyArg_ParseTuple(args, "OOOOO|dO", &receptor, &ligand, &dfire_energy, &receptor_coordinates, &ligand_coordinates, &interface_cutoff, &receptor_grid)) {
+        energy_array = rec_types_array = lig_types_array = NULL;
+        if ((energy_array = as_array(dfire_energy, NPY_DOUBLE, 3, "dfire_energy")) == NULL ||
+            !valid_dfire_energy(energy_array) ||
+            (rec_types_array = model_types(receptor, receptor_coordinates, "receptor objects")) == NULL ||
+            (lig_types_array = model_types(ligand, ligand_coordinates, "ligand objects")) == NULL ||
+            !euclidean_dist(receptor_coordinates, ligand_coordinates, receptor_grid, &indexes, &indexes_len)) {
+            Py_XDECREF(energy_array);
+            Py_XDECREF(rec_types_array);
+            Py_XDECREF(lig_types_array);
+            return NULL;
+        }
 
-    if (PyArg_ParseTuple(args, "OOOOO|d", &receptor, &ligand, &dfire_energy, &receptor_coordinates, &ligand_coordinates, &interface_cutoff)) {
-        euclidean_dist(receptor_coordinates, ligand_coordinates, &indexes, &indexes_len);
-
-        array = malloc(indexes_len*sizeof(unsigned int));
         interface_receptor = malloc(indexes_len*sizeof(unsigned int));
         interface_ligand = malloc(indexes_len*sizeof(unsigned int));
 
-        // Do not need to free rec_objects and lig_objects
-        tmp0 = PyObject_GetAttrString(receptor, "objects");
-        tmp1 = PySequence_Fast(tmp0, "");
-        Py_DECREF(tmp0);
-        rec_objects = PySequence_Fast_ITEMS(tmp1);
-        Py_DECREF(tmp1);
-
-        tmp0 = PyObject_GetAttrString(ligand, "objects");
-        tmp1 = PySequence_Fast(tmp0, "");
-        Py_DECREF(tmp0);
-        lig_objects = PySequence_Fast_ITEMS(tmp1);
-        Py_DECREF(tmp1);
+        rec_types = (unsigned int *)PyArray_DATA((PyArrayObject *)rec_types_array);
+        lig_types = (unsigned int *)PyArray_DATA((PyArrayObject *)lig_types_array);
+        dfire_en_array = (double *)PyArray_DATA((PyArrayObject *)energy_array);
 
         for (n = m = 0; n < indexes_len; n++) {
 
@@ -130,33 +516,18 @@ static PyObject * cdfire_calculate_dfire(PyObject *self, PyObject *args) {
                 interface_ligand[interface_len++] = j;
             }
 
-            atoma = PyInt_AsUnsignedLongMask(rec_objects[i]);
-            atomb = PyInt_AsUnsignedLongMask(lig_objects[j]);
+            atoma = rec_types[i];
+            atomb = lig_types[j];
 
             dfire_bin = dist_to_bins[d] - 1;
 
-            array[n] = atoma*168*20 + atomb*20 + dfire_bin;
+            energy += dfire_en_array[atoma*168*20 + atomb*20 + dfire_bin];
         }
 
-        dims[0] = indexes_len;
-        tmp0 = PyImport_ImportModule("numpy");
-        take = PyObject_GetAttrString(tmp0, "take");
-        Py_DECREF(tmp0);
-        array_object = PyArray_SimpleNewFromData(1, dims, NPY_UINT, array);
-        df_en_array = (PyArrayObject *)PyObject_CallFunctionObjArgs(take, dfire_energy, array_object, NULL);
-        dfire_en_array = PyArray_GETPTR1(df_en_array, 0);
-
-        for (n = 0; n < dims[0]; n++) {
-            energy += dfire_en_array[n];
-        }
-        
-        free(array);
         free(indexes);
-
-        Py_DECREF(df_en_array);
-        Py_DECREF(array_object);
-        Py_DECREF(take);
-
+        Py_DECREF(energy_array);
+        Py_DECREF(rec_types_array);
+        Py_DECREF(lig_types_array);
     }
 
     dims[0] = interface_len;
@@ -173,6 +544,215 @@ static PyObject * cdfire_calculate_dfire(PyObject *self, PyObject *args) {
 }
 
 
+/**
+ *
+ * Row pointers over a C-contiguous array of 3D points
+ *
+ **/
+double ** as_rows(double *data, unsigned int num_rows) {
+    unsigned int i;
+    double **rows;
+
+    rows = malloc((num_rows > 0 ? num_rows : 1)*sizeof(double *));
+    for (i = 0; i < num_rows; i++) {
+        rows[i] = data + 3*i;
+    }
+    return rows;
+}
+
+
+/**
+ *
+ * Checks the shapes of the calculate_dfire_batch arrays and that the atom types and
+ * receptor indexes are within range, sets a ValueError otherwise
+ *
+ **/
+int valid_batch(PyObject *rec_types_array, PyObject *lig_types_array, PyObject *rec_coords_array,
+                PyObject *rec_index_array, PyObject *lig_coords_array) {
+    npy_intp i, num_receptors, num_poses, rec_len, lig_len;
+    int *rec_index;
+
+    num_receptors = PyArray_DIM((PyArrayObject *)rec_coords_array, 0);
+    rec_len = PyArray_DIM((PyArrayObject *)rec_coords_array, 1);
+    num_poses = PyArray_DIM((PyArrayObject *)lig_coords_array, 0);
+    lig_len = PyArray_DIM((PyArrayObject *)lig_coords_array, 1);
+
+    if (PyArray_DIM((PyArrayObject *)rec_coords_array, 2) != 3 || PyArray_DIM((PyArrayObject *)lig_coords_array, 2) != 3) {
+        PyErr_SetString(PyExc_ValueError, "coordinates must be (poses, atoms, 3) arrays");
+        return 0;
+    }
+    if (!valid_types(rec_types_array, rec_len) || !valid_types(lig_types_array, lig_len)) {
+        return 0;
+    }
+    if (PyArray_DIM((PyArrayObject *)rec_index_array, 0) != num_poses) {
+        PyErr_SetString(PyExc_ValueError, "there must be a receptor index per ligand pose");
+        return 0;
+    }
+    rec_index = (int *)PyArray_DATA((PyArrayObject *)rec_index_array);
+    for (i = 0; i < num_poses; i++) {
+        if (rec_index[i] < 0 || rec_index[i] >= num_receptors) {
+            PyErr_SetString(PyExc_ValueError, "receptor index out of range");
+            return 0;
+        }
+    }
+    return 1;
+}
+
+
+/**
+ *
+ * calculate_dfire_batch C implementation. Scores N ligand poses in a single call, the
+ * receptor pose used for each ligand pose is given by receptor_index. A neighbor grid
+ * is built once for each receptor pose and reused by all the ligand poses.
+ *
+ **/
+static PyObject * cdfire_calculate_dfire_batch(PyObject *self, PyObject *args) {
+    PyObject *rec_types_obj, *lig_types_obj, *dfire_energy, *rec_coords_obj, *lig_coords_obj, *rec_index_obj;
+    PyObject *rec_types_array, *lig_types_array, *energy_array, *rec_coords_array, *lig_coords_array, *rec_index_array;
+    PyObject *energies, *interfaces_receptor, *interfaces_ligand, *intf_array, *result = NULL;
+    unsigned int n, m, i, j, d, p, r, num_receptors, num_poses, rec_len, lig_len, indexes_len, interface_len;
+    unsigned int *rec_types, *lig_types, *indexes, *interface_receptor, *interface_ligand;
+    unsigned int *interface_lens, **interfaces_rec, **interfaces_lig;
+    int *rec_index, *grid_dims, **cell_start, **cell_atoms;
+    double interface_cutoff, energy, *dfire_en_array, *rec_data, *lig_data, *origin, *pose_energies, ***rec_rows, **lig_rows;
+    npy_intp dims[1];
+
+    interface_cutoff = 3.9;
+
+    if (!PyArg_ParseTuple(args, "OOOOOO|d", &rec_types_obj, &lig_types_obj, &dfire_energy, &rec_coords_obj,
+                          &rec_index_obj, &lig_coords_obj, &interface_cutoff)) {
+        return NULL;
+    }
+
+    rec_types_array = lig_types_array = energy_array = rec_coords_array = rec_index_array = lig_coords_array = NULL;
+    if ((rec_types_array = as_array(rec_types_obj, NPY_UINT32, 1, "receptor types")) == NULL ||
+        (lig_types_array = as_array(lig_types_obj, NPY_UINT32, 1, "ligand types")) == NULL ||
+        (energy_array = as_array(dfire_energy, NPY_DOUBLE, 3, "dfire_energy")) == NULL ||
+        (rec_coords_array = as_array(rec_coords_obj, NPY_DOUBLE, 3, "receptor coordinates")) == NULL ||
+        (rec_index_array = as_array(rec_index_obj, NPY_INT32, 1, "receptor index")) == NULL ||
+        (lig_coords_array = as_array(lig_coords_obj, NPY_DOUBLE, 3, "ligand coordinates")) == NULL ||
+        !valid_dfire_energy(energy_array) ||
+        !valid_batch(rec_types_array, lig_types_array, rec_coords_array, rec_index_array, lig_coords_array)) {
+        Py_XDECREF(rec_types_array);
+        Py_XDECREF(lig_types_array);
+        Py_XDECREF(energy_array);
+        Py_XDECREF(rec_coords_array);
+        Py_XDECREF(rec_index_array);
+        Py_XDECREF(lig_coords_array);
+        return NULL;
+    }
+
+    rec_types = (unsigned int *)PyArray_DATA((PyArrayObject *)rec_types_array);
+    lig_types = (unsigned int *)PyArray_DATA((PyArrayObject *)lig_types_array);
+    dfire_en_array = (double *)PyArray_DATA((PyArrayObject *)energy_array);
+    rec_data = (double *)PyArray_DATA((PyArrayObject *)rec_coords_array);
+    rec_index = (int *)PyArray_DATA((PyArrayObject *)rec_index_array);
+    lig_data = (double *)PyArray_DATA((PyArrayObject *)lig_coords_array);
+
+    num_receptors = PyArray_DIM((PyArrayObject *)rec_coords_array, 0);
+    rec_len = PyArray_DIM((PyArrayObject *)rec_coords_array, 1);
+    num_poses = PyArray_DIM((PyArrayObject *)lig_coords_array, 0);
+    lig_len = PyArray_DIM((PyArrayObject *)lig_coords_array, 1);
+
+    dims[0] = num_poses;
+    energies = PyArray_SimpleNew(1, dims, NPY_DOUBLE);
+    pose_energies = (double *)PyArray_DATA((PyArrayObject *)energies);
+    interface_lens = malloc((num_poses > 0 ? num_poses : 1)*sizeof(unsigned int));
+    interfaces_rec = malloc((num_poses > 0 ? num_poses : 1)*sizeof(unsigned int *));
+    interfaces_lig = malloc((num_poses > 0 ? num_poses : 1)*sizeof(unsigned int *));
+
+    // Poses are scored without the GIL, the interfaces are converted to arrays afterwards
+    Py_BEGIN_ALLOW_THREADS
+
+    // One neighbor grid per receptor pose
+    origin = malloc(3*(num_receptors > 0 ? num_receptors : 1)*sizeof(double));
+    grid_dims = malloc(3*(num_receptors > 0 ? num_receptors : 1)*sizeof(int));
+    cell_start = malloc((num_receptors > 0 ? num_receptors : 1)*sizeof(int *));
+    cell_atoms = malloc((num_receptors > 0 ? num_receptors : 1)*sizeof(int *));
+    rec_rows = malloc((num_receptors > 0 ? num_receptors : 1)*sizeof(double **));
+    for (r = 0; r < num_receptors; r++) {
+        rec_rows[r] = as_rows(rec_data + 3*r*rec_len, rec_len);
+        build_grid(rec_rows[r], rec_len, origin + 3*r, grid_dims + 3*r, &cell_start[r], &cell_atoms[r]);
+    }
+
+    for (p = 0; p < num_poses; p++) {
+        r = rec_index[p];
+        lig_rows = as_rows(lig_data + 3*p*lig_len, lig_len);
+        grid_pairs(rec_rows[r], rec_len, lig_rows, lig_len, origin + 3*r, grid_dims + 3*r,
+                   cell_start[r], cell_atoms[r], &indexes, &indexes_len);
+
+        interface_receptor = malloc((indexes_len > 0 ? indexes_len : 1)*sizeof(unsigned int));
+        interface_ligand = malloc((indexes_len > 0 ? indexes_len : 1)*sizeof(unsigned int));
+        interface_len = 0;
+        energy = 0.;
+
+        for (n = m = 0; n < indexes_len; n++) {
+            i = indexes[m++];
+            j = indexes[m++];
+            d = indexes[m++];
+
+            if (d <= interface_cutoff) {
+                interface_receptor[interface_len] = i;
+                interface_ligand[interface_len++] = j;
+            }
+
+            energy += dfire_en_array[rec_types[i]*168*20 + lig_types[j]*20 + dist_to_bins[d] - 1];
+        }
+        pose_energies[p] = (energy*0.0157 - 4.7)*-1;
+        interface_lens[p] = interface_len;
+        interfaces_rec[p] = interface_receptor;
+        interfaces_lig[p] = interface_ligand;
+
+        free(indexes);
+        free(lig_rows);
+    }
+
+    for (r = 0; r < num_receptors; r++) {
+        free(rec_rows[r]);
+        free(cell_start[r]);
+        free(cell_atoms[r]);
+    }
+    free(rec_rows);
+    free(cell_start);
+    free(cell_atoms);
+    free(origin);
+    free(grid_dims);
+
+    Py_END_ALLOW_THREADS
+
+    interfaces_receptor = PyList_New(num_poses);
+    interfaces_ligand = PyList_New(num_poses);
+    for (p = 0; p < num_poses; p++) {
+        dims[0] = interface_lens[p];
+        intf_array = PyArray_SimpleNew(1, dims, NPY_UINT);
+        memcpy(PyArray_DATA((PyArrayObject *)intf_array), interfaces_rec[p], interface_lens[p]*sizeof(unsigned int));
+        PyList_SET_ITEM(interfaces_receptor, p, intf_array);
+        intf_array = PyArray_SimpleNew(1, dims, NPY_UINT);
+        memcpy(PyArray_DATA((PyArrayObject *)intf_array), interfaces_lig[p], interface_lens[p]*sizeof(unsigned int));
+        PyList_SET_ITEM(interfaces_ligand, p, intf_array);
+        free(interfaces_rec[p]);
+        free(interfaces_lig[p]);
+    }
+    free(interfaces_rec);
+    free(interfaces_lig);
+    free(interface_lens);
+
+    Py_DECREF(rec_types_array);
+    Py_DECREF(lig_types_array);
+    Py_DECREF(energy_array);
+    Py_DECREF(rec_coords_array);
+    Py_DECREF(rec_index_array);
+    Py_DECREF(lig_coords_array);
+
+    result = PyTuple_New(3);
+    PyTuple_SET_ITEM(result, 0, energies);
+    PyTuple_SET_ITEM(result, 1, interfaces_receptor);
+    PyTuple_SET_ITEM(result, 2, interfaces_ligand);
+
+    return result;
+}
+
+
 /**
  *
  * Module methods table
@@ -180,6 +760,8 @@ static PyObject * cdfire_calculate_dfire(PyObject *self, PyObject *args) {
  **/
 static PyMethodDef module_methods[] = {
     {"calculate_dfire", (PyCFunction)cdfire_calculate_dfire, METH_VARARGS, "calculate_dfire C implementation"},
+    {"build_receptor_grid", (PyCFunction)cdfire_build_receptor_grid, METH_VARARGS, "build_receptor_grid C implementation"},
+    {"calculate_dfire_batch", (PyCFunction)cdfire_calculate_dfire_batch, METH_VARARGS, "calculate_dfire_batch C implementation"},
     {NULL}
 };
 
@@ -4,12 +4,42 @@ from lightdock.structure.model import DockingModel
 from lightdock.structure.space import SpacePoints
 
 
-def calculate_dfire(receptor, ligand, dfire_energy, receptor_coordinates: SpacePoints, ligand_coordinates: SpacePoints, interface_cutoff: float):
+def calculate_dfire(receptor, ligand, dfire_energy, receptor_coordinates: SpacePoints, ligand_coordinates: SpacePoints, interface_cutoff: float, receptor_grid=None):
     """
     calculate_dfire C implementation
+
+    Atom pairs within the DFIRE cutoff (15 A) are found using the receptor neighbor
+    grid given by build_receptor_grid. If receptor_grid is None, a grid is built
+    for this call only.
     
     Returns
     -------
     tuple[energy,interface_receptor,interface_ligand]
     """
     ...
+
+
+def build_receptor_grid(receptor_coordinates: SpacePoints):
+    """
+    build_receptor_grid C implementation
+
+    Returns
+    -------
+    tuple[origin,dimensions,cell_start,cell_atoms]
+    """
+    ...
+
+
+def calculate_dfire_batch(rec_types, lig_types, dfire_energy, receptor_coordinates, receptor_index, ligand_coordinates, interface_cutoff: float):
+    """
+    calculate_dfire_batch C implementation
+
+    receptor_coordinates is a (R, N_rec, 3) array of receptor poses and ligand_coordinates
+    a (N, N_lig, 3) array of ligand poses. The receptor pose of each ligand pose is given
+    by receptor_index.
+
+    Returns
+    -------
+    tuple[energies,interfaces_receptor,interfaces_ligand]
+    """
+    ...
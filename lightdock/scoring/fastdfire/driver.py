@@ -8,7 +8,11 @@ import os
 import numpy as np
 from lightdock.structure.model import DockingModel
 from lightdock.scoring.functions import ModelAdapter, ScoringFunction
-from lightdock.scoring.fastdfire.c.cdfire import calculate_dfire
+from lightdock.scoring.fastdfire.c.cdfire import (
+    calculate_dfire,
+    calculate_dfire_batch,
+    build_receptor_grid,
+)
 from lightdock.constants import DEFAULT_CONTACT_RESTRAINTS_CUTOFF
 from lightdock.error.lightdock_errors import NotSupportedInScoringError
 
@@ -403,6 +407,9 @@ class DFIREAdapter(ModelAdapter):
                             )
                             + "DFIRE only supports standard aminoacids without hydrogens."
                         )
+        # Atom types as an array, so it is read directly by the C implementation and
+        # moved to shared memory with the rest of the model arrays
+        dfire_objects = np.array(dfire_objects, dtype=np.uint32)
         try:
             return DockingModel(
                 dfire_objects,
@@ -425,9 +432,26 @@ class DFIREAdapter(ModelAdapter):
 class DFIRE(ScoringFunction):
     """Implements DFIRE potential"""
 
+    interaction_cutoff = 15.0
+
     def __init__(self, weight=1.0):
         super(DFIRE, self).__init__(weight)
         self.potential = DFIREPotential()
+        self.receptor_grid = None
+        self.grid_coordinates = None
+
+    def get_receptor_grid(self, receptor_coordinates):
+        """Gets the neighbor grid of the receptor pose.
+
+        The grid is only rebuilt if the receptor coordinates have changed (i.e. ANM),
+        so it is reused for every ligand pose evaluated against the same receptor.
+        """
+        if self.grid_coordinates is None or not np.array_equal(
+            self.grid_coordinates, receptor_coordinates.coordinates
+        ):
+            self.receptor_grid = build_receptor_grid(receptor_coordinates)
+            self.grid_coordinates = receptor_coordinates.coordinates.copy()
+        return self.receptor_grid
 
     def __call__(self, receptor, receptor_coordinates, ligand, ligand_coordinates):
         energy, interface_receptor, interface_ligand = calculate_dfire(
@@ -437,7 +461,60 @@ class DFIRE(ScoringFunction):
             receptor_coordinates,
             ligand_coordinates,
             DEFAULT_CONTACT_RESTRAINTS_CUTOFF,
+            self.get_receptor_grid(receptor_coordinates),
+        )
+        return self.weighted_energy(
+            receptor, ligand, energy, interface_receptor, interface_ligand
+        )
+
+    def batch_score(
+        self,
+        receptor,
+        ligand,
+        poses,
+        num_rec_nmodes=0,
+        num_lig_nmodes=0,
+        receptor_ids=None,
+        ligand_ids=None,
+    ):
+        """Calculates the DFIRE energy of a set of poses in a single native call"""
+        (
+            receptor_coordinates,
+            receptor_index,
+            ligand_coordinates,
+        ) = ScoringFunction.stack_poses(
+            receptor,
+            ligand,
+            poses,
+            num_rec_nmodes,
+            num_lig_nmodes,
+            receptor_ids,
+            ligand_ids,
         )
+        energies, interfaces_receptor, interfaces_ligand = calculate_dfire_batch(
+            receptor.objects,
+            ligand.objects,
+            self.potential.dfire_energy,
+            receptor_coordinates,
+            receptor_index,
+            ligand_coordinates,
+            DEFAULT_CONTACT_RESTRAINTS_CUTOFF,
+        )
+        return np.array(
+            [
+                self.weighted_energy(
+                    receptor, ligand, energy, interface_receptor, interface_ligand
+                )
+                for energy, interface_receptor, interface_ligand in zip(
+                    energies, interfaces_receptor, interfaces_ligand
+                )
+            ]
+        )
+
+    def weighted_energy(
+        self, receptor, ligand, energy, interface_receptor, interface_ligand
+    ):
+        """Weighted energy considering restraints and membrane penalty"""
         interface_receptor = set(interface_receptor)
         interface_ligand = set(interface_ligand)
 
@@ -5,11 +5,17 @@ from lightdock.constants import (
     NUMPY_FILE_SAVE_EXTENSION,
 )
 from lightdock.gso.searchspace.ofunction import ObjectiveFunction
+from lightdock.mathutil.cython.quaternion import Quaternion
+from lightdock.scoring.model_cache import load_docking_model
 
 
 class ScoringFunction(ObjectiveFunction):
     """Scoring Functions interface"""
 
+    # Distance beyond which receptor atoms do not contribute to the energy of a pose,
+    # None if unknown. Receptor models are only cropped for scoring functions with it
+    interaction_cutoff = None
+
     def __init__(self, weight=1.0, anm_support=True):
         self.weight = float(weight)
         self.anm_support = anm_support
@@ -22,6 +28,113 @@ class ScoringFunction(ObjectiveFunction):
         """
         raise NotImplementedError()
 
+    def batch_score(
+        self,
+        receptor,
+        ligand,
+        poses,
+        num_rec_nmodes=0,
+        num_lig_nmodes=0,
+        receptor_ids=None,
+        ligand_ids=None,
+    ):
+        """Calculates the value of the scoring function for a set of poses.
+
+        poses is a (N, 7 + num_rec_nmodes + num_lig_nmodes) array of optimization vectors
+        and N energies are returned. Scoring functions without a native batch
+        implementation evaluate each pose in turn.
+        """
+        return np.array(
+            [
+                self(receptor, receptor_pose, ligand, ligand_pose)
+                for receptor_pose, ligand_pose in ScoringFunction.build_poses(
+                    receptor,
+                    ligand,
+                    poses,
+                    num_rec_nmodes,
+                    num_lig_nmodes,
+                    receptor_ids,
+                    ligand_ids,
+                )
+            ]
+        )
+
+    @staticmethod
+    def build_poses(
+        receptor,
+        ligand,
+        poses,
+        num_rec_nmodes=0,
+        num_lig_nmodes=0,
+        receptor_ids=None,
+        ligand_ids=None,
+    ):
+        """Yields the receptor and ligand coordinates of each pose.
+
+        Each pose is an optimization vector: translation, rotation quaternion, receptor
+        normal modes extents and ligand normal modes extents.
+        """
+        for pose_id, pose in enumerate(poses):
+            receptor_id = receptor_ids[pose_id] if receptor_ids is not None else 0
+            ligand_id = ligand_ids[pose_id] if ligand_ids is not None else 0
+            receptor_pose = receptor.pose_coordinates(
+                receptor_id, pose[7 : 7 + num_rec_nmodes]
+            )
+            ligand_pose = ligand.pose_coordinates(
+                ligand_id,
+                pose[7 + num_rec_nmodes : 7 + num_rec_nmodes + num_lig_nmodes],
+            )
+            # We rotate first, ligand it's at initial position
+            ligand_pose.rotate(Quaternion(pose[3], pose[4], pose[5], pose[6]))
+            ligand_pose.translate(pose[:3])
+            yield receptor_pose, ligand_pose
+
+    @staticmethod
+    def stack_poses(
+        receptor,
+        ligand,
+        poses,
+        num_rec_nmodes=0,
+        num_lig_nmodes=0,
+        receptor_ids=None,
+        ligand_ids=None,
+    ):
+        """Receptor and ligand coordinates of a set of poses as arrays.
+
+        Returns a (R, N_rec, 3) array of receptor poses, the index of the receptor pose
+        used by each pose and a (N, N_lig, 3) array of ligand poses. Without receptor
+        normal modes, poses on the same receptor structure share its receptor pose.
+        """
+        receptor_coordinates = []
+        receptor_index = np.empty(len(poses), dtype=np.int32)
+        ligand_coordinates = np.empty(
+            (len(poses), len(ligand.coordinates[0].coordinates), 3)
+        )
+        receptor_poses = {}
+        for pose_id, (receptor_pose, ligand_pose) in enumerate(
+            ScoringFunction.build_poses(
+                receptor,
+                ligand,
+                poses,
+                num_rec_nmodes,
+                num_lig_nmodes,
+                receptor_ids,
+                ligand_ids,
+            )
+        ):
+            key = pose_id
+            if num_rec_nmodes == 0:
+                key = receptor_ids[pose_id] if receptor_ids is not None else 0
+            if key not in receptor_poses:
+                receptor_poses[key] = len(receptor_coordinates)
+                receptor_coordinates.append(receptor_pose.coordinates)
+            receptor_index[pose_id] = receptor_poses[key]
+            ligand_coordinates[pose_id] = ligand_pose.coordinates
+        receptor_coordinates = np.array(receptor_coordinates).reshape(
+            (-1, len(receptor.coordinates[0].coordinates), 3)
+        )
+        return receptor_coordinates, receptor_index, ligand_coordinates
+
     @staticmethod
     def restraints_satisfied(restraints, interface):
         """Calculates the percentage of satisfied restraints"""
@@ -43,26 +156,50 @@ class ModelAdapter(object):
     """
 
     def __init__(
-        self, receptor, ligand, receptor_restraints=None, ligand_restraints=None
+        self,
+        receptor,
+        ligand,
+        receptor_restraints=None,
+        ligand_restraints=None,
+        cache=False,
     ):
-        self.receptor_model = self._get_docking_model(receptor, receptor_restraints)
-        self.ligand_model = self._get_docking_model(ligand, ligand_restraints)
+        """If cache is enabled, the docking models are stored next to the structure
+        files and reused while their input does not change (see model_cache)
+        """
+        self.receptor_model = self.get_docking_model(
+            receptor, receptor_restraints, cache
+        )
+        self.ligand_model = self.get_docking_model(ligand, ligand_restraints, cache)
+
+    def get_docking_model(self, molecule, restraints, cache=False):
+        """DockingModel of molecule, prepared or loaded from the cache"""
+        if cache:
+            return load_docking_model(self, molecule, restraints)
+        return self._get_docking_model(molecule, restraints)
 
     def _get_docking_model(self, molecule, restraints):
         """Complex -> DockingModel interface"""
         raise NotImplementedError()
 
+    def input_files(self, molecule):
+        """Files read by _get_docking_model besides the molecule"""
+        return [ModelAdapter.reference_points_file(molecule)]
+
+    @staticmethod
+    def reference_points_file(molecule):
+        """File of the reference points of molecule"""
+        return "%s%s%s" % (
+            DEFAULT_LIGHTDOCK_PREFIX % molecule.structure_file_names[0],
+            DEFAULT_ELLIPSOID_DATA_EXTENSION,
+            NUMPY_FILE_SAVE_EXTENSION,
+        )
+
     @staticmethod
     def load_reference_points(molecule):
         """Load reference points if exist"""
         reference_points = None
         try:
-            ellipsoid_data_file = "%s%s%s" % (
-                DEFAULT_LIGHTDOCK_PREFIX % molecule.structure_file_names[0],
-                DEFAULT_ELLIPSOID_DATA_EXTENSION,
-                NUMPY_FILE_SAVE_EXTENSION,
-            )
-            reference_points = np.load(ellipsoid_data_file)
+            reference_points = np.load(ModelAdapter.reference_points_file(molecule))
         except (IOError, ValueError):
             pass
         return reference_points
@@ -0,0 +1,363 @@
+"""Precomputed receptor potential grids for pyDock-like scoring functions.
+
+Electrostatics and VdW terms of a rigid receptor are split in two ranges:
+
+- The potentials of the receptor are sampled once on regular lattices, taking
+  distances shorter than a near cutoff as the near cutoff so the maps are smooth.
+  A pose is scored by trilinear interpolation of the maps at the ligand atoms.
+  There is an electrostatics potential map and a VdW map for each ligand atom
+  type (VdW energy and radius).
+- Receptor-ligand atom pairs closer than the near cutoff are corrected exactly
+  using the contacts of the pose, found with a k-d tree of the receptor. The near
+  cutoff is wide enough for the electrostatics pair caps of the pyDock kernels to
+  never apply beyond it, and it also covers the contact terms of the scoring
+  functions (interface and desolvation).
+"""
+
+import hashlib
+import os
+import numpy as np
+from scipy.spatial import cKDTree
+import lightdock.scoring.cpydock.energy.c.cpydock as cpydock
+from lightdock.constants import DEFAULT_GRID_FILE, GRID_VALIDATION_FILE
+from lightdock.util.logger import LoggingManager
+from lightdock.error.lightdock_errors import NotSupportedInScoringError
+
+log = LoggingManager.get_logger("grid")
+
+# Constants of the pyDock electrostatics and VdW C kernels
+EPSILON = 4.0
+FACTOR = 332.0
+MAX_ES_CUTOFF = 1.0
+VDW_CUTOFF = 1.0
+ELEC_DIST_CUTOFF = 30.0
+VDW_DIST_CUTOFF = 10.0
+# Covers the contact terms (interface and desolvation) of the scoring functions
+MIN_NEAR_CUTOFF = 6.4
+
+
+def receptor_checksum(receptor, ligand, spacing):
+    """Identifies the receptor and ligand data used to build a grid"""
+    checksum = hashlib.md5()
+    for array in (
+        receptor.coordinates[0].coordinates,
+        receptor.charges,
+        receptor.vdw_energy,
+        receptor.vdw_radii,
+        ligand.charges,
+        ligand.vdw_energy,
+        ligand.vdw_radii,
+        [spacing],
+    ):
+        checksum.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+    return checksum.hexdigest()
+
+
+class PotentialMaps(object):
+    """A set of maps sampled on the same regular lattice"""
+
+    def __init__(self, origin, spacing, maps):
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.spacing = float(spacing)
+        # (maps, nx, ny, nz) array
+        self.maps = maps
+
+    @staticmethod
+    def lattice(coordinates, spacing, margin):
+        """Origin and number of points of a lattice covering coordinates plus a margin"""
+        lower = coordinates.min(axis=0) - margin
+        upper = coordinates.max(axis=0) + margin
+        shape = np.ceil((upper - lower) / spacing).astype(int) + 1
+        return lower, shape
+
+    def interpolate(self, coordinates, map_index=None):
+        """Trilinear interpolation of the maps at coordinates.
+
+        map_index is the map used for each point (the first map if None). Points out
+        of the lattice get a value of zero.
+        """
+        shape = np.array(self.maps.shape[1:])
+        position = (coordinates - self.origin) / self.spacing
+        corner = np.floor(position).astype(int)
+        inside = np.all((corner >= 0) & (corner < shape - 1), axis=1)
+        values = np.zeros(len(coordinates))
+        if not inside.any():
+            return values
+        corner = corner[inside]
+        t = position[inside] - corner
+        if map_index is None:
+            maps = np.zeros(len(corner), dtype=int)
+        else:
+            maps = np.asarray(map_index)[inside]
+        i, j, k = corner.T
+        tx, ty, tz = t.T
+        interpolated = np.zeros(len(corner))
+        for di, wx in ((0, 1.0 - tx), (1, tx)):
+            for dj, wy in ((0, 1.0 - ty), (1, ty)):
+                for dk, wz in ((0, 1.0 - tz), (1, tz)):
+                    interpolated += (
+                        wx * wy * wz * self.maps[maps, i + di, j + dj, k + dk]
+                    )
+        values[inside] = interpolated
+        return values
+
+
+class ReceptorGrid(object):
+    """Electrostatics and VdW potential maps of a rigid receptor for a given ligand"""
+
+    def __init__(
+        self, spacing, near_cutoff, electrostatics, vdw, ligand_types, checksum
+    ):
+        self.spacing = spacing
+        self.near_cutoff = near_cutoff
+        self.electrostatics = electrostatics
+        self.vdw = vdw
+        # VdW map of each ligand atom
+        self.ligand_types = ligand_types
+        self.checksum = checksum
+        self.receptor_tree = None
+
+    @staticmethod
+    def near_distance(receptor, ligand):
+        """Distance beyond which no electrostatics pair cap applies"""
+        max_charge = np.max(np.abs(receptor.charges)) * np.max(np.abs(ligand.charges))
+        cap_distance = np.sqrt(max_charge * FACTOR / (MAX_ES_CUTOFF * EPSILON))
+        return float(max(cap_distance, MIN_NEAR_CUTOFF))
+
+    @staticmethod
+    def build(receptor, ligand, spacing):
+        """Samples the potentials of the receptor structure on lattices of the given
+        spacing"""
+        coordinates = receptor.coordinates[0].coordinates
+        near_cutoff = ReceptorGrid.near_distance(receptor, ligand)
+        origin, shape = PotentialMaps.lattice(coordinates, spacing, ELEC_DIST_CUTOFF)
+        log.info(
+            "Calculating electrostatics map of %d x %d x %d points..." % tuple(shape)
+        )
+        electrostatics = cpydock.calculate_electrostatics_map(
+            coordinates, receptor.charges, origin, *shape, spacing, near_cutoff
+        )
+        electrostatics = PotentialMaps(origin, spacing, electrostatics[np.newaxis])
+
+        ligand_vdw = np.column_stack((ligand.vdw_energy, ligand.vdw_radii))
+        vdw_types, ligand_types = np.unique(ligand_vdw, axis=0, return_inverse=True)
+        origin, shape = PotentialMaps.lattice(coordinates, spacing, VDW_DIST_CUTOFF)
+        log.info(
+            "Calculating %d VdW maps of %d x %d x %d points..."
+            % ((len(vdw_types),) + tuple(shape))
+        )
+        vdw = cpydock.calculate_vdw_maps(
+            coordinates,
+            receptor.vdw_energy,
+            receptor.vdw_radii,
+            origin,
+            *shape,
+            spacing,
+            vdw_types[:, 0].copy(),
+            vdw_types[:, 1].copy(),
+            near_cutoff,
+        )
+        vdw = PotentialMaps(origin, spacing, vdw)
+        return ReceptorGrid(
+            spacing,
+            near_cutoff,
+            electrostatics,
+            vdw,
+            ligand_types.reshape(-1),
+            receptor_checksum(receptor, ligand, spacing),
+        )
+
+    def save(self, file_name):
+        """Saves the grid maps to a NumPy .npz file.
+
+        The file is replaced at once, so concurrent simulations never read a partial
+        grid.
+        """
+        temporary_file = "%s.%d" % (file_name, os.getpid())
+        with open(temporary_file, "wb") as output:
+            np.savez(
+                output,
+                spacing=self.spacing,
+                near_cutoff=self.near_cutoff,
+                electrostatics_origin=self.electrostatics.origin,
+                electrostatics=self.electrostatics.maps,
+                vdw_origin=self.vdw.origin,
+                vdw=self.vdw.maps,
+                ligand_types=self.ligand_types,
+                checksum=self.checksum,
+            )
+        os.replace(temporary_file, file_name)
+
+    @staticmethod
+    def load(file_name):
+        """Loads a grid saved with ReceptorGrid.save"""
+        with np.load(file_name) as data:
+            spacing = float(data["spacing"])
+            return ReceptorGrid(
+                spacing,
+                float(data["near_cutoff"]),
+                PotentialMaps(
+                    data["electrostatics_origin"], spacing, data["electrostatics"]
+                ),
+                PotentialMaps(data["vdw_origin"], spacing, data["vdw"]),
+                data["ligand_types"],
+                str(data["checksum"]),
+            )
+
+    def attach(self, receptor):
+        """Builds the k-d tree used for the near contacts of the receptor structure"""
+        self.receptor_tree = cKDTree(receptor.coordinates[0].coordinates)
+
+    def contacts(self, receptor_coordinates, ligand_coordinates):
+        """Receptor and ligand atom indexes and squared distances of the pairs of atoms
+        within the near cutoff"""
+        ligand_tree = cKDTree(ligand_coordinates)
+        pairs = ligand_tree.sparse_distance_matrix(
+            self.receptor_tree, self.near_cutoff, output_type="ndarray"
+        )
+        lig_index = pairs["i"]
+        rec_index = pairs["j"]
+        delta = receptor_coordinates[rec_index] - ligand_coordinates[lig_index]
+        distance2 = np.sum(delta * delta, axis=1)
+        return rec_index, lig_index, distance2
+
+    def energy(self, receptor, ligand, receptor_coordinates, ligand_coordinates):
+        """Electrostatics (in Kcal/mol) and VdW energies of a pose.
+
+        The contacts of the near range are also returned to calculate other terms.
+        """
+        contacts = self.contacts(receptor_coordinates, ligand_coordinates)
+        rec_index, lig_index, distance2 = contacts
+        near_cutoff2 = self.near_cutoff * self.near_cutoff
+
+        # Near pairs replace the value of the maps at the near cutoff
+        charges = receptor.charges[rec_index] * ligand.charges[lig_index]
+        max_elec = MAX_ES_CUTOFF * EPSILON / FACTOR
+        elec = np.sum(np.clip(charges / distance2, -max_elec, max_elec))
+        elec -= np.sum(charges) / near_cutoff2
+        potential = self.electrostatics.interpolate(ligand_coordinates)
+        elec += np.dot(ligand.charges, potential)
+
+        vdw_energy = np.sqrt(
+            receptor.vdw_energy[rec_index] * ligand.vdw_energy[lig_index]
+        )
+        vdw_radius6 = (receptor.vdw_radii[rec_index] + ligand.vdw_radii[lig_index]) ** 6
+        p6 = vdw_radius6 / distance2**3
+        vdw = np.sum(np.minimum(vdw_energy * (p6 * p6 - 2.0 * p6), VDW_CUTOFF))
+        p6 = vdw_radius6 / near_cutoff2**3
+        vdw -= np.sum(np.minimum(vdw_energy * (p6 * p6 - 2.0 * p6), VDW_CUTOFF))
+        vdw += np.sum(self.vdw.interpolate(ligand_coordinates, self.ligand_types))
+        return float(elec) * FACTOR / EPSILON, float(vdw), contacts
+
+
+def load_grid(receptor, ligand, spacing, file_name=None):
+    """Loads the grid of the receptor from file_name if it exists and matches receptor,
+    ligand and spacing. Otherwise the grid is built (and saved to file_name if given).
+    """
+    if len(receptor) > 1:
+        raise NotSupportedInScoringError(
+            "Potential grids are not supported for multiple receptor structures"
+        )
+    checksum = receptor_checksum(receptor, ligand, spacing)
+    grid = None
+    if file_name and os.path.exists(file_name):
+        try:
+            grid = ReceptorGrid.load(file_name)
+        except (IOError, ValueError, KeyError) as e:
+            log.warning("Error reading grid %s (%s)" % (file_name, str(e)))
+        if grid is not None and grid.checksum != checksum:
+            log.warning("Grid %s does not match the input structures" % file_name)
+            grid = None
+        if grid is not None:
+            log.info("Potential grid loaded from %s" % file_name)
+    if grid is None:
+        grid = ReceptorGrid.build(receptor, ligand, spacing)
+        if file_name:
+            grid.save(file_name)
+            log.info("Potential grid saved to %s" % file_name)
+    grid.attach(receptor)
+    return grid
+
+
+def validation_report(scoring_function, receptor, ligand, poses, num_lig_nmodes=0):
+    """Compares the energies of the grid of scoring_function against the exact kernel
+    for a set of poses.
+
+    Returns the report as a string and the (exact, grid) energies.
+    """
+    grid = scoring_function.grid
+    exact = []
+    interpolated = []
+    for receptor_pose, ligand_pose in scoring_function.build_poses(
+        receptor, ligand, poses, 0, num_lig_nmodes
+    ):
+        scoring_function.grid = None
+        exact.append(scoring_function(receptor, receptor_pose, ligand, ligand_pose))
+        scoring_function.grid = grid
+        interpolated.append(
+            scoring_function(receptor, receptor_pose, ligand, ligand_pose)
+        )
+    exact = np.array(exact)
+    interpolated = np.array(interpolated)
+    error = np.abs(interpolated - exact)
+    lines = ["#%11s %12s %12s" % ("Exact", "Grid", "Error")]
+    lines.extend(
+        "%12.5f %12.5f %12.5f" % values for values in zip(exact, interpolated, error)
+    )
+    correlation = (
+        np.corrcoef(exact, interpolated)[0, 1]
+        if len(exact) > 1 and np.std(exact) > 0.0 and np.std(interpolated) > 0.0
+        else 1.0
+    )
+    lines.append(
+        "# Grid spacing %.2f: mean absolute error %.5f, maximum error %.5f, Pearson r %.4f"
+        % (grid.spacing, np.mean(error), np.max(error), correlation)
+    )
+    return os.linesep.join(lines) + os.linesep, (exact, interpolated)
+
+
+def setup_grids(
+    scoring_functions,
+    adapters,
+    spacing,
+    receptor_file_name,
+    validation_poses=None,
+    num_lig_nmodes=0,
+):
+    """Enables the potential grids of the scoring functions supporting them.
+
+    Grids are stored next to receptor_file_name. If validation_poses are given, the
+    grid energies of these poses are compared against the exact ones and the report
+    is saved next to the grid.
+    """
+    path = os.path.dirname(receptor_file_name)
+    receptor_name = os.path.splitext(os.path.basename(receptor_file_name))[0]
+    for scoring_function, adapter in zip(scoring_functions, adapters):
+        if not hasattr(scoring_function, "use_grid"):
+            log.warning(
+                "%s has no support for potential grids"
+                % type(scoring_function).__name__
+            )
+            continue
+        scoring_name = type(scoring_function).__module__.split(".")[-2]
+        grid_file = os.path.join(
+            path, DEFAULT_GRID_FILE % (receptor_name, scoring_name)
+        )
+        scoring_function.use_grid(
+            adapter.receptor_model, adapter.ligand_model, spacing, grid_file
+        )
+        if validation_poses is not None:
+            report, _ = validation_report(
+                scoring_function,
+                adapter.receptor_model,
+                adapter.ligand_model,
+                validation_poses,
+                num_lig_nmodes,
+            )
+            report_file = os.path.join(
+                path, GRID_VALIDATION_FILE % (receptor_name, scoring_name)
+            )
+            with open(report_file, "w") as output:
+                output.write(report)
+            log.info(report.splitlines()[-1].lstrip("# "))
+            log.info("Grid validation saved to %s" % report_file)
@@ -9,6 +9,7 @@ equilibrium mixture approximation of residues. Proteins 1999;34:49-68.
 """
 
 import os
+import numpy as np
 from lightdock.error.lightdock_errors import PotentialsParsingError
 from lightdock.structure.model import DockingModel
 from lightdock.structure.space import SpacePoints
@@ -82,6 +83,15 @@ class MJPotential(object):
         return potentials
 
 
+class MJ3hModel(DockingModel):
+    """Docking model with the MJ potential index of each residue"""
+
+    def __init__(self, objects, coordinates, restraints, residue_types):
+        super(MJ3hModel, self).__init__(objects, coordinates, restraints)
+        # -1 for residues not found in the potentials
+        self.residue_types = residue_types
+
+
 class MJ3hAdapter(ModelAdapter):
     """Adapts a given Complex to a DockingModel object suitable for this
     MJ3h scoring function.
@@ -129,12 +139,20 @@ class MJ3hAdapter(ModelAdapter):
 
             list_of_coordinates.append(SpacePoints(coordinates))
 
-        return DockingModel(residues, list_of_coordinates, parsed_restraints)
+        residue_types = np.array(
+            [MJPotential.residues.get(residue.name, -1) for residue in residues],
+            dtype=np.intp,
+        )
+        return MJ3hModel(
+            residues, list_of_coordinates, parsed_restraints, residue_types
+        )
 
 
 class MJ3h(ScoringFunction):
     """Implements MJ3h potential"""
 
+    interaction_cutoff = 6.5
+
     potentials_dict = {
         "LEU": 0,
         "PHE": 1,
@@ -166,6 +184,7 @@ class MJ3h(ScoringFunction):
         self.penalization = penalization
         self.potential = MJPotential()
         self.potentials = self.potential.potentials["MJ3h"]
+        self.potentials_table = np.array(self.potentials)
         self.cutoff = (
             DEFAULT_CONTACT_RESTRAINTS_CUTOFF * DEFAULT_CONTACT_RESTRAINTS_CUTOFF
         )
@@ -174,29 +193,28 @@ class MJ3h(ScoringFunction):
         """Calculates the MJ3h potential taking into account the contacts between receptor
         and ligand. Receptor and ligand are DockingModel objects.
         """
-        energy = 0.0
-        interface_receptor = []
-        interface_ligand = []
-        for index_rec, res1 in enumerate(receptor.objects):
-            for index_lig, res2 in enumerate(ligand.objects):
-                [x1, y1, z1] = receptor_coordinates[index_rec]
-                [x2, y2, z2] = ligand_coordinates[index_lig]
-                distance = (x1 - x2) ** 2 + (y1 - y2) ** 2 + (z1 - z2) ** 2
-                if distance < MJ3h.max_distance_cutoff:
-                    if distance < MJ3h.min_distance_cutoff:
-                        energy += self.penalization
-                    else:
-                        try:
-                            i_rec = MJ3h.potentials_dict[res1.name]
-                            i_lig = MJ3h.potentials_dict[res2.name]
-                            energy += self.potentials[i_rec][i_lig]
-                        except:
-                            pass
-                    if distance <= self.cutoff:
-                        interface_receptor.append(index_rec)
-                        interface_ligand.append(index_lig)
-        interface_receptor = set(interface_receptor)
-        interface_ligand = set(interface_ligand)
+        delta = (
+            np.asarray(receptor_coordinates[:])[:, None, :]
+            - np.asarray(ligand_coordinates[:])[None, :, :]
+        )
+        distances = delta[..., 0] ** 2 + delta[..., 1] ** 2 + delta[..., 2] ** 2
+        # Contacts in the same order as a receptor-ligand double loop
+        index_rec, index_lig = np.nonzero(distances < MJ3h.max_distance_cutoff)
+        distances = distances[index_rec, index_lig]
+        rec_types = receptor.residue_types[index_rec]
+        lig_types = ligand.residue_types[index_lig]
+        penalized = distances < MJ3h.min_distance_cutoff
+        scored = penalized | ((rec_types >= 0) & (lig_types >= 0))
+        pair_energies = np.where(
+            penalized, self.penalization, self.potentials_table[rec_types, lig_types]
+        )[scored]
+        # Accumulated sequentially as in the original loop
+        energy = (
+            float(np.cumsum(pair_energies)[-1]) + 0.0 if len(pair_energies) else 0.0
+        )
+        interface = distances <= self.cutoff
+        interface_receptor = set(index_rec[interface].tolist())
+        interface_ligand = set(index_lig[interface].tolist())
         energy *= -1.0
         perc_receptor_restraints = ScoringFunction.restraints_satisfied(
             receptor.restraints, interface_receptor
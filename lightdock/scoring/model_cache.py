@@ -0,0 +1,129 @@
+"""Persistent cache of the docking models prepared by the scoring adapters.
+
+Preparing the docking model of a molecule (atom typing, charges, radii, reference
+SASA, reference points, restraints) is done at the start of every simulation and
+tool. Cached models are stored next to the structure file, one per structure and
+scoring function, together with a checksum of everything the adapter reads: the
+atoms and coordinates of the molecule, its normal modes, the restraints and the
+content of the auxiliary input files of the adapter. A cached model is only used
+if its checksum and the version of the cache format match.
+"""
+
+import hashlib
+import os
+import pickle
+import numpy as np
+from lightdock.constants import DEFAULT_MODEL_CACHE_FILE
+from lightdock.version import CURRENT_VERSION
+from lightdock.util.logger import LoggingManager
+
+log = LoggingManager.get_logger("model_cache")
+
+MODEL_CACHE_VERSION = 2
+
+
+def model_cache_file(adapter, molecule):
+    """Name of the cached docking model of molecule for the scoring function of
+    adapter"""
+    structure_file_name = str(molecule.structure_file_names[0])
+    structure_name = os.path.splitext(os.path.basename(structure_file_name))[0]
+    scoring_name = type(adapter).__module__.split(".")[-2]
+    return os.path.join(
+        os.path.dirname(structure_file_name),
+        DEFAULT_MODEL_CACHE_FILE % (structure_name, scoring_name),
+    )
+
+
+def model_checksum(adapter, molecule, restraints):
+    """Identifies the input data of the docking model of molecule"""
+    checksum = hashlib.md5()
+
+    def update(value):
+        checksum.update(repr(value).encode("utf-8"))
+
+    update((MODEL_CACHE_VERSION, CURRENT_VERSION))
+    update((type(adapter).__module__, type(adapter).__qualname__))
+    for atom in molecule.atoms:
+        update(
+            (
+                type(atom).__name__,
+                atom.number,
+                atom.name,
+                atom.alternative,
+                atom.chain_id,
+                atom.residue_name,
+                atom.residue_number,
+                atom.residue_insertion,
+                atom.element,
+                atom.mass,
+                atom.occupancy,
+                atom.b_factor,
+            )
+        )
+    update([(residue.name, len(residue.atoms)) for residue in molecule.residues])
+    update([(chain.cid, len(chain.residues)) for chain in molecule.chains])
+    for coordinates in molecule.atom_coordinates:
+        checksum.update(np.ascontiguousarray(coordinates.coordinates).tobytes())
+    for array in (getattr(molecule, "n_modes", None), molecule.nm_mask):
+        if array is None:
+            update(None)
+        else:
+            checksum.update(np.ascontiguousarray(array).tobytes())
+    update(sorted(restraints) if restraints else None)
+    for file_name in adapter.input_files(molecule):
+        update(str(file_name))
+        try:
+            with open(file_name, "rb") as handle:
+                checksum.update(handle.read())
+        except IOError:
+            update(None)
+    return checksum.hexdigest()
+
+
+def load_model(file_name, checksum):
+    """Loads the cached docking model in file_name if it matches checksum"""
+    try:
+        with open(file_name, "rb") as handle:
+            header = pickle.load(handle)
+            if (
+                header.get("version") != MODEL_CACHE_VERSION
+                or header.get("checksum") != checksum
+            ):
+                log.warning("Docking model %s does not match the input" % file_name)
+                return None
+            return pickle.load(handle)
+    except (IOError, EOFError, pickle.UnpicklingError, AttributeError) as e:
+        log.warning("Error reading docking model %s (%s)" % (file_name, str(e)))
+        return None
+
+
+def save_model(file_name, checksum, model):
+    """Saves a docking model to file_name, replacing it atomically"""
+    temporary_file_name = "%s.%d.tmp" % (file_name, os.getpid())
+    try:
+        with open(temporary_file_name, "wb") as output:
+            header = {"version": MODEL_CACHE_VERSION, "checksum": checksum}
+            pickle.dump(header, output, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(model, output, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_file_name, file_name)
+    except OSError as e:
+        log.warning("Can not write docking model %s (%s)" % (file_name, str(e)))
+
+
+def load_docking_model(adapter, molecule, restraints):
+    """Docking model of molecule from the cache of the adapter scoring function.
+
+    If there is no valid cached model, it is prepared by the adapter and saved.
+    """
+    file_name = model_cache_file(adapter, molecule)
+    checksum = model_checksum(adapter, molecule, restraints)
+    model = None
+    if os.path.exists(file_name):
+        model = load_model(file_name, checksum)
+        if model is not None:
+            log.info("Docking model loaded from %s" % file_name)
+    if model is None:
+        model = adapter._get_docking_model(molecule, restraints)
+        save_model(file_name, checksum, model)
+        log.info("Docking model saved to %s" % file_name)
+    return model
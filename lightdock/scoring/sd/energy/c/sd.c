@@ -73,6 +73,9 @@ static PyObject * sd_calculate_energy(PyObject *self, PyObject *args) {
         interface_receptor = malloc(lig_len*sizeof(unsigned int));
         interface_ligand  = malloc(lig_len*sizeof(unsigned int));
 
+        // Python objects are not used in the energy loops
+        Py_BEGIN_ALLOW_THREADS
+
         for (i = 0; i < rec_len; i++) {
             atom_vdw = 0.0;
             for (j = 0; j < lig_len; j++) {
@@ -120,6 +123,8 @@ static PyObject * sd_calculate_energy(PyObject *self, PyObject *args) {
             }
         }
 
+        Py_END_ALLOW_THREADS
+
         // Free structures
         PyArray_Free(tmp0, rec_array);
         PyArray_Free(tmp1, lig_array);
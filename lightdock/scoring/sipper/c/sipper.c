@@ -67,6 +67,9 @@ static PyObject * calculate_sipper(PyObject *self, PyObject *args) {
         interface_receptor = malloc(lig_len*sizeof(unsigned int));
         interface_ligand  = malloc(lig_len*sizeof(unsigned int));
 
+        // Python objects are not used in the energy loops
+        Py_BEGIN_ALLOW_THREADS
+
         // For all residues in receptor
         receptor_init = 0;
         for (i = 0; i < rec_res_len; i++) {
@@ -109,6 +112,8 @@ static PyObject * calculate_sipper(PyObject *self, PyObject *args) {
             receptor_init += rec_c_res_atoms[i];
         }
 
+        Py_END_ALLOW_THREADS
+
         // Free structures
         PyArray_Free(tmp0, rec_array);
         PyArray_Free(tmp1, lig_array);
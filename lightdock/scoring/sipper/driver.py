@@ -115,6 +115,17 @@ class SIPPERAdapter(ModelAdapter):
                 reference_points=reference_points,
             )
 
+    def input_files(self, molecule):
+        """Files read by _get_docking_model besides the molecule"""
+        return super(SIPPERAdapter, self).input_files(molecule) + [
+            SIPPERAdapter._oda_file(molecule)
+        ]
+
+    @staticmethod
+    def _oda_file(molecule):
+        """ODA file of molecule"""
+        return DEFAULT_LIGHTDOCK_PREFIX % (molecule.structure_file_names[0] + ".oda")
+
     @staticmethod
     def _read_oda_values(molecule):
         """Reads a ODA file with four fields per line. First field is the id of the residue,
@@ -123,9 +134,7 @@ class SIPPERAdapter(ModelAdapter):
         Returns None if no ODA file is found
         """
         oda_values = None
-        oda_file_name = DEFAULT_LIGHTDOCK_PREFIX % (
-            molecule.structure_file_names[0] + ".oda"
-        )
+        oda_file_name = SIPPERAdapter._oda_file(molecule)
         if os.path.exists(oda_file_name):
             log.info("ODA %s file found" % oda_file_name)
             with open(oda_file_name) as oda_input:
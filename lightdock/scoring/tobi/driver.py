@@ -7,6 +7,7 @@ Designing coarse grained-and atom based-potentials for protein-protein docking'
 """
 
 import os
+import numpy as np
 import scipy.spatial
 
 from lightdock.error.lightdock_errors import PotentialsParsingError
@@ -139,6 +140,14 @@ class TOBIPotential(object):
         return potentials
 
 
+class TOBIModel(DockingModel):
+    """Docking model with the TOBI potential index of each object as an array"""
+
+    def __init__(self, objects, coordinates, restraints):
+        super(TOBIModel, self).__init__(objects, coordinates, restraints)
+        self.tobi_types = np.array(objects, dtype=np.intp)
+
+
 class TOBIAdapter(ModelAdapter):
     """Adapts a given Complex to a DockingModel object suitable for this
     TOBI scoring function.
@@ -202,64 +211,62 @@ class TOBIAdapter(ModelAdapter):
                     continue
             list_of_coordinates.append(SpacePoints(coordinates))
 
-        return DockingModel(tobi_residues, list_of_coordinates, parsed_restraints)
+        return TOBIModel(tobi_residues, list_of_coordinates, parsed_restraints)
 
 
 class TOBI(ScoringFunction):
     """Implements TOBI potential"""
 
+    interaction_cutoff = 8.0
+
     def __init__(self, weight=1.0):
         super(TOBI, self).__init__(weight, anm_support=False)
         self.function = self._default
         self.potential = TOBIPotential()
+        self.tobi_sc_1 = np.array(self.potential.tobi_sc_1)
+        self.tobi_sc_2 = np.array(self.potential.tobi_sc_2)
         self.cutoff = DEFAULT_CONTACT_RESTRAINTS_CUTOFF
 
     def __call__(self, receptor, receptor_coordinates, ligand, ligand_coordinates):
         return self.function(receptor, receptor_coordinates, ligand, ligand_coordinates)
 
     def _default(self, receptor, receptor_coordinates, ligand, ligand_coordinates):
-        energy = 0.0
-
         dist_matrix = scipy.spatial.distance.cdist(
             receptor_coordinates, ligand_coordinates
         )
 
-        interface_receptor = []
-        interface_ligand = []
-        for rec_index, rec_tobi in enumerate(receptor.objects):
-            for lig_index, lig_tobi in enumerate(ligand.objects):
-                d = dist_matrix[rec_index][lig_index]
-
-                if d <= 8.0:
-                    if rec_tobi >= 20 and lig_tobi >= 20:
-                        # Small distance, backbone-backbone
-                        if d <= 4.5:
-                            energy += self.potential.tobi_sc_1[rec_tobi][lig_tobi]
-                        else:
-                            if d <= 6.0:
-                                energy += self.potential.tobi_sc_2[rec_tobi][lig_tobi]
-                    else:
-                        # Medium distance, backbone-sidechain
-                        if rec_tobi >= 20 or lig_tobi >= 20:
-                            if d <= 5.5:
-                                energy += self.potential.tobi_sc_1[rec_tobi][lig_tobi]
-                            else:
-                                if d <= 7.0:
-                                    energy += self.potential.tobi_sc_2[rec_tobi][
-                                        lig_tobi
-                                    ]
-                        else:
-                            # Large distance, sidechain-sidechain
-                            if d <= 6.5:
-                                energy += self.potential.tobi_sc_1[rec_tobi][lig_tobi]
-                            else:
-                                if d <= 8.0:
-                                    energy += self.potential.tobi_sc_2[rec_tobi][
-                                        lig_tobi
-                                    ]
-                if d <= self.cutoff:
-                    interface_receptor.append(rec_index)
-                    interface_ligand.append(lig_index)
+        # Contacts in the same order as a receptor-ligand double loop
+        rec_index, lig_index = np.nonzero(dist_matrix <= 8.0)
+        d = dist_matrix[rec_index, lig_index]
+        rec_tobi = receptor.tobi_types[rec_index]
+        lig_tobi = ligand.tobi_types[lig_index]
+        rec_backbone = rec_tobi >= 20
+        lig_backbone = lig_tobi >= 20
+        # Backbone-backbone, backbone-sidechain and sidechain-sidechain cutoffs
+        short_cutoff = np.where(
+            rec_backbone & lig_backbone,
+            4.5,
+            np.where(rec_backbone | lig_backbone, 5.5, 6.5),
+        )
+        long_cutoff = np.where(
+            rec_backbone & lig_backbone,
+            6.0,
+            np.where(rec_backbone | lig_backbone, 7.0, 8.0),
+        )
+        scored = d <= long_cutoff
+        pair_energies = np.where(
+            d <= short_cutoff,
+            self.tobi_sc_1[rec_tobi, lig_tobi],
+            self.tobi_sc_2[rec_tobi, lig_tobi],
+        )[scored]
+        # Accumulated sequentially as in the original loop
+        energy = (
+            float(np.cumsum(pair_energies)[-1]) + 0.0 if len(pair_energies) else 0.0
+        )
+
+        interface = d <= self.cutoff
+        interface_receptor = rec_index[interface].tolist()
+        interface_ligand = lig_index[interface].tolist()
 
         interface_receptor = set(interface_receptor)
         interface_ligand = set(interface_ligand)
@@ -102,6 +102,8 @@ class VdWAdapter(ModelAdapter):
 
 
 class VdW(ScoringFunction):
+    interaction_cutoff = 10.0
+
     def __init__(self, weight=1.0):
         super(VdW, self).__init__(weight)
 
@@ -116,6 +118,58 @@ class VdW(ScoringFunction):
             receptor.vdw_radii,
             ligand.vdw_radii,
         )
+        return self.weighted_energy(
+            receptor, ligand, vdw_energy, interface_receptor, interface_ligand
+        )
+
+    def batch_score(
+        self,
+        receptor,
+        ligand,
+        poses,
+        num_rec_nmodes=0,
+        num_lig_nmodes=0,
+        receptor_ids=None,
+        ligand_ids=None,
+    ):
+        """Computes the truncated VdW energy of a set of poses in a single native call"""
+        (
+            receptor_coordinates,
+            receptor_index,
+            ligand_coordinates,
+        ) = ScoringFunction.stack_poses(
+            receptor,
+            ligand,
+            poses,
+            num_rec_nmodes,
+            num_lig_nmodes,
+            receptor_ids,
+            ligand_ids,
+        )
+        vdw_energies, interfaces_receptor, interfaces_ligand = cvdw.calculate_vdw_batch(
+            receptor_coordinates,
+            receptor_index,
+            ligand_coordinates,
+            receptor.vdw_energy,
+            ligand.vdw_energy,
+            receptor.vdw_radii,
+            ligand.vdw_radii,
+        )
+        return np.array(
+            [
+                self.weighted_energy(
+                    receptor, ligand, vdw_energy, interface_receptor, interface_ligand
+                )
+                for vdw_energy, interface_receptor, interface_ligand in zip(
+                    vdw_energies, interfaces_receptor, interfaces_ligand
+                )
+            ]
+        )
+
+    def weighted_energy(
+        self, receptor, ligand, vdw_energy, interface_receptor, interface_ligand
+    ):
+        """Weighted energy considering restraints"""
         energy = vdw_energy * -1.0
         perc_receptor_restraints = ScoringFunction.restraints_satisfied(
             receptor.restraints, set(interface_receptor)
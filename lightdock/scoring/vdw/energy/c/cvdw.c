@@ -12,106 +12,232 @@
 
 /**
  *
- * VdW energy calculation
+ * Truncated VdW energy between C-contiguous (rec_len, 3) and (lig_len, 3) arrays of coordinates.
+ * Interface pairs are stored in the growable interface_receptor and interface_ligand buffers.
  *
  **/
-static PyObject * calculate_vdw(PyObject *self, PyObject *args) {
-    PyObject *receptor_coordinates, *ligand_coordinates = NULL;
-    PyObject *tmp0, *tmp1 = NULL;
-    PyArrayObject *rec_vdw, *lig_vdw, *rec_vdw_radii, *lig_vdw_radii = NULL;
-    double total_vdw, vdw_energy, vdw_radius, p6, k;
-    unsigned int rec_len, lig_len, i, j;
-    unsigned int interface_len, intf_array_size, *interface_receptor = NULL, *interface_ligand = NULL;
-    double **rec_array, **lig_array, x, y, z, distance2, interface_cutoff, interface_cutoff2;
-    npy_intp dims[2];
-    PyArray_Descr *descr;
-    double *rec_c_vdw, *lig_c_vdw, *rec_c_vdw_radii, *lig_c_vdw_radii = NULL;
-    PyObject *result = PyTuple_New(3);
+static double vdw_energy_pairs(double *rec_array, unsigned int rec_len, double *lig_array, unsigned int lig_len,
+                               double *rec_c_vdw, double *lig_c_vdw, double *rec_c_vdw_radii, double *lig_c_vdw_radii,
+                               double interface_cutoff2, unsigned int **interface_receptor,
+                               unsigned int **interface_ligand, unsigned int *interface_len) {
+    double total_vdw, vdw_energy, vdw_radius, p6, k, x, y, z, distance2;
+    unsigned int i, j, intf_array_size;
 
     total_vdw = 0.0;
-    interface_cutoff = 3.9;
-    interface_len = 0;
+    *interface_len = 0;
     intf_array_size = 1;
 
-    if (PyArg_ParseTuple(args, "OOOOOO|d",
-            &receptor_coordinates, &ligand_coordinates,
-            &rec_vdw, &lig_vdw, &rec_vdw_radii, &lig_vdw_radii)) {
-
-        interface_cutoff2 = interface_cutoff*interface_cutoff;
-
-        tmp0 = PyObject_GetAttrString(receptor_coordinates, "coordinates");
-        tmp1 = PyObject_GetAttrString(ligand_coordinates, "coordinates");
-
-        rec_len = PySequence_Size(tmp0);
-        lig_len = PySequence_Size(tmp1);
-
-        dims[1] = 3;
-        dims[0] = rec_len;
-        descr = PyArray_DescrFromType(NPY_DOUBLE);
-        PyArray_AsCArray((PyObject **)&tmp0, (void **)&rec_array, dims, 2, descr);
-
-        dims[0] = lig_len;
-        descr = PyArray_DescrFromType(NPY_DOUBLE);
-        PyArray_AsCArray((PyObject **)&tmp1, (void **)&lig_array, dims, 2, descr);
-
-        // Get pointers to the Python array structures
-        rec_c_vdw = PyArray_GETPTR1(rec_vdw, 0);
-        lig_c_vdw = PyArray_GETPTR1(lig_vdw, 0);
-        rec_c_vdw_radii = PyArray_GETPTR1(rec_vdw_radii, 0);
-        lig_c_vdw_radii = PyArray_GETPTR1(lig_vdw_radii, 0);
-
-        interface_receptor = malloc(lig_len*sizeof(unsigned int));
-        interface_ligand  = malloc(lig_len*sizeof(unsigned int));
-
-        // For all atoms in receptor
-        for (i = 0; i < rec_len; i++) {
-            // For all atoms in ligand
-            for (j = 0; j < lig_len; j++) {
-                // Euclidean^2 distance
-                x = rec_array[i][0] - lig_array[j][0];
-                y = rec_array[i][1] - lig_array[j][1];
-                z = rec_array[i][2] - lig_array[j][2];
-                distance2 = x*x + y*y + z*z;
-
-                // Van der Waals energy
-                if (distance2 <= VDW_DIST_CUTOFF2){
-                    vdw_energy = sqrt(rec_c_vdw[i] * lig_c_vdw[j]);
-                    vdw_radius = rec_c_vdw_radii[i] + lig_c_vdw_radii[j];
-                    p6 = pow(vdw_radius, 6) / pow(distance2, 3);
-                    k = vdw_energy * (p6*p6 - 2.0 * p6);
-                    if (k > VDW_CUTOFF) k = VDW_CUTOFF;
-                    total_vdw += k;
-                }
-
-                if (distance2 <= interface_cutoff2) {
-                   interface_receptor[interface_len] = i;
-                   interface_ligand[interface_len++] = j;
-                }
+    *interface_receptor = malloc((lig_len > 0 ? lig_len : 1)*sizeof(unsigned int));
+    *interface_ligand  = malloc((lig_len > 0 ? lig_len : 1)*sizeof(unsigned int));
+
+    // For all atoms in receptor
+    for (i = 0; i < rec_len; i++) {
+        // For all atoms in ligand
+        for (j = 0; j < lig_len; j++) {
+            // Euclidean^2 distance
+            x = rec_array[3*i] - lig_array[3*j];
+            y = rec_array[3*i+1] - lig_array[3*j+1];
+            z = rec_array[3*i+2] - lig_array[3*j+2];
+            distance2 = x*x + y*y + z*z;
+
+            // Van der Waals energy
+            if (distance2 <= VDW_DIST_CUTOFF2){
+                vdw_energy = sqrt(rec_c_vdw[i] * lig_c_vdw[j]);
+                vdw_radius = rec_c_vdw_radii[i] + lig_c_vdw_radii[j];
+                p6 = pow(vdw_radius, 6) / pow(distance2, 3);
+                k = vdw_energy * (p6*p6 - 2.0 * p6);
+                if (k > VDW_CUTOFF) k = VDW_CUTOFF;
+                total_vdw += k;
             }
 
-            if (((interface_len + lig_len - 1)/lig_len + 1) > intf_array_size) {
-                intf_array_size++;
-                interface_receptor = realloc(interface_receptor, intf_array_size*lig_len*sizeof(unsigned int));
-                interface_ligand = realloc(interface_ligand, intf_array_size*lig_len*sizeof(unsigned int));
+            if (distance2 <= interface_cutoff2) {
+               (*interface_receptor)[*interface_len] = i;
+               (*interface_ligand)[(*interface_len)++] = j;
             }
         }
 
-        // Free structures
-        PyArray_Free(tmp0, rec_array);
-        PyArray_Free(tmp1, lig_array);
-        Py_DECREF(tmp0);
-        Py_DECREF(tmp1);
+        if (((*interface_len + lig_len - 1)/lig_len + 1) > intf_array_size) {
+            intf_array_size++;
+            *interface_receptor = realloc(*interface_receptor, intf_array_size*lig_len*sizeof(unsigned int));
+            *interface_ligand = realloc(*interface_ligand, intf_array_size*lig_len*sizeof(unsigned int));
+        }
     }
 
-    // Return a tuple with the following values for calculated energies:
-    interface_receptor = realloc(interface_receptor, interface_len*sizeof(unsigned int));
-    interface_ligand = realloc(interface_ligand, interface_len*sizeof(unsigned int));
+    return total_vdw;
+}
+
+
+/**
+ *
+ * Interface buffer as a new NumPy array
+ *
+ **/
+static PyObject * interface_to_array(unsigned int *interface, unsigned int interface_len) {
+    PyObject *array;
+    npy_intp dims[1];
+
     dims[0] = interface_len;
+    array = PyArray_SimpleNew(1, dims, NPY_UINT);
+    memcpy(PyArray_DATA((PyArrayObject *)array), interface, interface_len*sizeof(unsigned int));
+    return array;
+}
+
+
+/**
+ *
+ * VdW energy calculation
+ *
+ **/
+static PyObject * calculate_vdw(PyObject *self, PyObject *args) {
+    PyObject *receptor_coordinates, *ligand_coordinates = NULL;
+    PyObject *tmp0, *tmp1, *rec_array, *lig_array = NULL;
+    PyObject *rec_vdw, *lig_vdw, *rec_vdw_radii, *lig_vdw_radii = NULL;
+    PyObject *rec_vdw_array, *lig_vdw_array, *rec_vdw_radii_array, *lig_vdw_radii_array = NULL;
+    double total_vdw, interface_cutoff, *rec_data, *lig_data, *rec_c_vdw, *lig_c_vdw, *rec_c_vdw_radii, *lig_c_vdw_radii;
+    unsigned int rec_len, lig_len, interface_len, *interface_receptor = NULL, *interface_ligand = NULL;
+    PyObject *result = NULL;
+
+    interface_cutoff = 3.9;
+
+    if (!PyArg_ParseTuple(args, "OOOOOO|d",
+            &receptor_coordinates, &ligand_coordinates,
+            &rec_vdw, &lig_vdw, &rec_vdw_radii, &lig_vdw_radii, &interface_cutoff)) {
+        return NULL;
+    }
+
+    tmp0 = PyObject_GetAttrString(receptor_coordinates, "coordinates");
+    tmp1 = PyObject_GetAttrString(ligand_coordinates, "coordinates");
+    rec_array = PyArray_FROM_OTF(tmp0, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    lig_array = PyArray_FROM_OTF(tmp1, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    rec_vdw_array = PyArray_FROM_OTF(rec_vdw, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    lig_vdw_array = PyArray_FROM_OTF(lig_vdw, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    rec_vdw_radii_array = PyArray_FROM_OTF(rec_vdw_radii, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    lig_vdw_radii_array = PyArray_FROM_OTF(lig_vdw_radii, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+
+    rec_data = PyArray_DATA((PyArrayObject *)rec_array);
+    lig_data = PyArray_DATA((PyArrayObject *)lig_array);
+    rec_len = PyArray_DIM((PyArrayObject *)rec_array, 0);
+    lig_len = PyArray_DIM((PyArrayObject *)lig_array, 0);
+    rec_c_vdw = PyArray_DATA((PyArrayObject *)rec_vdw_array);
+    lig_c_vdw = PyArray_DATA((PyArrayObject *)lig_vdw_array);
+    rec_c_vdw_radii = PyArray_DATA((PyArrayObject *)rec_vdw_radii_array);
+    lig_c_vdw_radii = PyArray_DATA((PyArrayObject *)lig_vdw_radii_array);
+
+    Py_BEGIN_ALLOW_THREADS
+    total_vdw = vdw_energy_pairs(rec_data, rec_len, lig_data, lig_len, rec_c_vdw, lig_c_vdw, rec_c_vdw_radii,
+                                 lig_c_vdw_radii, interface_cutoff*interface_cutoff, &interface_receptor,
+                                 &interface_ligand, &interface_len);
+    Py_END_ALLOW_THREADS
 
     // Return a tuple with the following values for calculated energies:
-    PyTuple_SetItem(result, 0, PyFloat_FromDouble(total_vdw));
-    PyTuple_SetItem(result, 1, PyArray_SimpleNewFromData(1, dims, NPY_UINT, interface_receptor));
-    PyTuple_SetItem(result, 2, PyArray_SimpleNewFromData(1, dims, NPY_UINT, interface_ligand));
+    result = PyTuple_New(3);
+    PyTuple_SET_ITEM(result, 0, PyFloat_FromDouble(total_vdw));
+    PyTuple_SET_ITEM(result, 1, interface_to_array(interface_receptor, interface_len));
+    PyTuple_SET_ITEM(result, 2, interface_to_array(interface_ligand, interface_len));
+
+    // Free structures
+    free(interface_receptor);
+    free(interface_ligand);
+    Py_DECREF(rec_array);
+    Py_DECREF(lig_array);
+    Py_DECREF(rec_vdw_array);
+    Py_DECREF(lig_vdw_array);
+    Py_DECREF(rec_vdw_radii_array);
+    Py_DECREF(lig_vdw_radii_array);
+    Py_DECREF(tmp0);
+    Py_DECREF(tmp1);
+
+    return result;
+}
+
+
+/**
+ *
+ * VdW energy calculation of N ligand poses in a single call, the receptor pose used for
+ * each ligand pose is given by receptor_index.
+ *
+ **/
+static PyObject * calculate_vdw_batch(PyObject *self, PyObject *args) {
+    PyObject *rec_coordinates, *receptor_index, *lig_coordinates = NULL;
+    PyObject *rec_array, *rec_index_array, *lig_array = NULL;
+    PyObject *rec_vdw, *lig_vdw, *rec_vdw_radii, *lig_vdw_radii = NULL;
+    PyObject *rec_vdw_array, *lig_vdw_array, *rec_vdw_radii_array, *lig_vdw_radii_array = NULL;
+    PyObject *energies, *interfaces_receptor, *interfaces_ligand, *result = NULL;
+    double interface_cutoff, *rec_data, *lig_data, *pose_energies;
+    double *rec_c_vdw, *lig_c_vdw, *rec_c_vdw_radii, *lig_c_vdw_radii;
+    unsigned int p, num_poses, rec_len, lig_len, *interface_lens, **interface_receptor, **interface_ligand;
+    int *rec_index;
+    npy_intp dims[1];
+
+    interface_cutoff = 3.9;
+
+    if (!PyArg_ParseTuple(args, "OOOOOOO|d",
+            &rec_coordinates, &receptor_index, &lig_coordinates,
+            &rec_vdw, &lig_vdw, &rec_vdw_radii, &lig_vdw_radii, &interface_cutoff)) {
+        return NULL;
+    }
+
+    rec_array = PyArray_FROM_OTF(rec_coordinates, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    rec_index_array = PyArray_FROM_OTF(receptor_index, NPY_INT32, NPY_ARRAY_IN_ARRAY);
+    lig_array = PyArray_FROM_OTF(lig_coordinates, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    rec_vdw_array = PyArray_FROM_OTF(rec_vdw, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    lig_vdw_array = PyArray_FROM_OTF(lig_vdw, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    rec_vdw_radii_array = PyArray_FROM_OTF(rec_vdw_radii, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    lig_vdw_radii_array = PyArray_FROM_OTF(lig_vdw_radii, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+
+    rec_data = (double *)PyArray_DATA((PyArrayObject *)rec_array);
+    lig_data = (double *)PyArray_DATA((PyArrayObject *)lig_array);
+    rec_index = (int *)PyArray_DATA((PyArrayObject *)rec_index_array);
+    rec_len = PyArray_DIM((PyArrayObject *)rec_array, 1);
+    num_poses = PyArray_DIM((PyArrayObject *)lig_array, 0);
+    lig_len = PyArray_DIM((PyArrayObject *)lig_array, 1);
+
+    rec_c_vdw = PyArray_DATA((PyArrayObject *)rec_vdw_array);
+    lig_c_vdw = PyArray_DATA((PyArrayObject *)lig_vdw_array);
+    rec_c_vdw_radii = PyArray_DATA((PyArrayObject *)rec_vdw_radii_array);
+    lig_c_vdw_radii = PyArray_DATA((PyArrayObject *)lig_vdw_radii_array);
+
+    dims[0] = num_poses;
+    energies = PyArray_SimpleNew(1, dims, NPY_DOUBLE);
+    pose_energies = (double *)PyArray_DATA((PyArrayObject *)energies);
+    interface_lens = malloc((num_poses > 0 ? num_poses : 1)*sizeof(unsigned int));
+    interface_receptor = malloc((num_poses > 0 ? num_poses : 1)*sizeof(unsigned int *));
+    interface_ligand = malloc((num_poses > 0 ? num_poses : 1)*sizeof(unsigned int *));
+
+    // Poses are scored without the GIL, the interfaces are converted to arrays afterwards
+    Py_BEGIN_ALLOW_THREADS
+    for (p = 0; p < num_poses; p++) {
+        pose_energies[p] = vdw_energy_pairs(rec_data + 3*rec_len*rec_index[p], rec_len, lig_data + 3*lig_len*p, lig_len,
+                                            rec_c_vdw, lig_c_vdw, rec_c_vdw_radii, lig_c_vdw_radii,
+                                            interface_cutoff*interface_cutoff, &interface_receptor[p],
+                                            &interface_ligand[p], &interface_lens[p]);
+    }
+    Py_END_ALLOW_THREADS
+
+    interfaces_receptor = PyList_New(num_poses);
+    interfaces_ligand = PyList_New(num_poses);
+    for (p = 0; p < num_poses; p++) {
+        PyList_SET_ITEM(interfaces_receptor, p, interface_to_array(interface_receptor[p], interface_lens[p]));
+        PyList_SET_ITEM(interfaces_ligand, p, interface_to_array(interface_ligand[p], interface_lens[p]));
+        free(interface_receptor[p]);
+        free(interface_ligand[p]);
+    }
+    free(interface_receptor);
+    free(interface_ligand);
+    free(interface_lens);
+
+    Py_DECREF(rec_array);
+    Py_DECREF(rec_index_array);
+    Py_DECREF(lig_array);
+    Py_DECREF(rec_vdw_array);
+    Py_DECREF(lig_vdw_array);
+    Py_DECREF(rec_vdw_radii_array);
+    Py_DECREF(lig_vdw_radii_array);
+
+    result = PyTuple_New(3);
+    PyTuple_SET_ITEM(result, 0, energies);
+    PyTuple_SET_ITEM(result, 1, interfaces_receptor);
+    PyTuple_SET_ITEM(result, 2, interfaces_ligand);
     return result;
 }
 
@@ -123,6 +249,7 @@ static PyObject * calculate_vdw(PyObject *self, PyObject *args) {
  **/
 static PyMethodDef module_methods[] = {
     {"calculate_vdw", (PyCFunction)calculate_vdw, METH_VARARGS, "VdW C implementation"},
+    {"calculate_vdw_batch", (PyCFunction)calculate_vdw_batch, METH_VARARGS, "Batched VdW C implementation"},
     {NULL}
 };
 
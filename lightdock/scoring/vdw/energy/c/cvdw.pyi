@@ -11,3 +11,19 @@ def calculate_vdw(receptor_coordinates, ligand_coordinates,
     tuple[vdw_energy,interface_receptor,interface_ligand]
     """
     ...
+
+
+def calculate_vdw_batch(receptor_coordinates, receptor_index, ligand_coordinates,
+           rec_vdw, lig_vdw, rec_vdw_radii, lig_vdw_radii):
+    """
+    Batched VdW energy C calculation
+
+    receptor_coordinates is a (R, N_rec, 3) array of receptor poses and ligand_coordinates
+    a (N, N_lig, 3) array of ligand poses. The receptor pose of each ligand pose is given
+    by receptor_index.
+
+    Returns
+    -------
+    tuple[vdw_energies,interfaces_receptor,interfaces_ligand]
+    """
+    ...
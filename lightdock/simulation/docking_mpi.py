@@ -2,7 +2,8 @@
 
 import os
 import importlib
-import glob
+import time
+import numpy as np
 from mpi4py import MPI
 
 from lightdock.util.logger import LoggingManager
@@ -17,6 +18,8 @@ from lightdock.prep.simulation import (
 from lightdock.gso.algorithm import LightdockGSOBuilder
 from lightdock.mathutil.lrandom import MTGenerator
 from lightdock.gso.parameters import GSOParameters
+from lightdock.gso.cache import EnergyCache
+from lightdock.gso.convergence import ConvergenceMonitor
 from lightdock.constants import (
     DEFAULT_SCORING_FUNCTION,
     DEFAULT_SWARM_FOLDER,
@@ -29,12 +32,17 @@ from lightdock.constants import (
 )
 from lightdock.parallel.util import GSOClusterTask
 from lightdock.scoring.multiple import ScoringConfiguration
+from lightdock.scoring.grid import setup_grids
 from lightdock.structure.nm import read_nmodes
 from lightdock.error.lightdock_errors import NotSupportedInScoringError, SwarmNumError
 
 
 log = LoggingManager.get_logger("lightdock")
 
+# Tags of the messages between the first minion and the rest
+SWARM_REQUEST_TAG = 1
+SWARM_TAG = 2
+
 
 def set_gso(
     number_of_glowworms,
@@ -50,6 +58,11 @@ def set_gso(
     anm_rec=DEFAULT_NMODES_REC,
     anm_lig=DEFAULT_NMODES_LIG,
     local_minimization=False,
+    energy_cache=0,
+    crop_receptor=False,
+    convergence_window=0,
+    array_swarm=False,
+    scoring_threads=1,
 ):
     """Creates a lightdock GSO simulation object"""
 
@@ -77,7 +90,16 @@ def set_gso(
         local_minimization,
         anm_rec,
         anm_lig,
+        array_swarm,
     )
+    if energy_cache:
+        gso.swarm.energy_cache = EnergyCache(energy_cache)
+    gso.swarm.scoring_threads = scoring_threads
+    if crop_receptor:
+        for crop in gso.swarm.crop_receptors():
+            log.info("Receptor cropped to %s" % crop)
+    if convergence_window:
+        gso.convergence = ConvergenceMonitor(convergence_window)
     return gso
 
 
@@ -116,7 +138,7 @@ def set_scoring_function(parser, receptor, ligand, minion_id):
         except:
             pass
         adapter = CurrentModelAdapter(
-            receptor, ligand, receptor_restraints, ligand_restraints
+            receptor, ligand, receptor_restraints, ligand_restraints, cache=True
         )
         scoring_function = CurrentScoringFunction(weight)
         adapters.append(adapter)
@@ -125,8 +147,187 @@ def set_scoring_function(parser, receptor, ligand, minion_id):
     return scoring_functions, adapters
 
 
+def prepare_simulation(parser, minion_id):
+    """Reads the input structures and normal modes and prepares the scoring functions,
+    adapters and starting positions of the simulation.
+
+    Returns the scoring functions, adapters and starting positions files.
+    """
+    args = parser.args
+
+    # Read input structures (use parsed ones)
+    parsed_lightdock_receptor = os.path.join(
+        os.path.dirname(args.receptor_pdb),
+        DEFAULT_LIGHTDOCK_PREFIX % os.path.basename(args.receptor_pdb),
+    )
+    receptor = read_input_structure(
+        parsed_lightdock_receptor,
+        args.noxt,
+        args.noh,
+        args.now,
+        args.verbose_parser,
+        cache=True,
+    )
+    parsed_lightdock_ligand = os.path.join(
+        os.path.dirname(args.ligand_pdb),
+        DEFAULT_LIGHTDOCK_PREFIX % os.path.basename(args.ligand_pdb),
+    )
+    ligand = read_input_structure(
+        parsed_lightdock_ligand,
+        args.noxt,
+        args.noh,
+        args.now,
+        args.verbose_parser,
+        cache=True,
+    )
+
+    # CRITICAL to not break compatibility with previous results
+    receptor.move_to_origin()
+    ligand.move_to_origin()
+
+    if args.use_anm:
+        try:
+            receptor.n_modes = read_nmodes(
+                "%s%s" % (DEFAULT_REC_NM_FILE, NUMPY_FILE_SAVE_EXTENSION)
+            )
+        except:
+            log.warning("No ANM found for receptor molecule")
+            receptor.n_modes = None
+        try:
+            ligand.n_modes = read_nmodes(
+                "%s%s" % (DEFAULT_LIG_NM_FILE, NUMPY_FILE_SAVE_EXTENSION)
+            )
+        except:
+            log.warning("No ANM found for ligand molecule")
+            ligand.n_modes = None
+
+    starting_points_files = load_starting_positions(
+        args.swarms, args.glowworms, args.use_anm, args.anm_rec, args.anm_lig
+    )
+
+    scoring_functions, adapters = set_scoring_function(
+        parser, receptor, ligand, minion_id
+    )
+
+    # Check if scoring functions are compatible with ANM if activated
+    if args.use_anm:
+        for s in scoring_functions:
+            if not s.anm_support:
+                raise NotSupportedInScoringError(
+                    f"ANM is activated while {type(s).__name__} has no support for it"
+                )
+
+    # Precomputed receptor potential grids
+    if args.grid_spacing:
+        if args.use_anm and args.anm_rec > 0:
+            raise NotSupportedInScoringError(
+                "Potential grids are not supported for receptor ANM"
+            )
+        setup_grids(
+            scoring_functions,
+            adapters,
+            args.grid_spacing,
+            parsed_lightdock_receptor,
+            np.loadtxt(starting_points_files[0], ndmin=2),
+            args.anm_lig if args.use_anm else 0,
+        )
+
+    return scoring_functions, adapters, starting_points_files
+
+
+def get_swarm_ids(parser):
+    """Swarms to simulate"""
+    if parser.args.swarm_list:
+        swarm_ids = parser.args.swarm_list
+        if min(swarm_ids) < 0 or max(swarm_ids) >= parser.args.swarms:
+            raise SwarmNumError("Wrong list of swarms")
+    else:
+        swarm_ids = list(range(parser.args.swarms))
+    return swarm_ids
+
+
+def run_swarm(
+    parser, id_swarm, scoring_functions, adapters, starting_points_files, minion_id
+):
+    """Simulates the swarm id_swarm"""
+    print("GSO cluster %d - Minion %d" % (id_swarm, minion_id))
+    gso = set_gso(
+        parser.args.glowworms,
+        adapters,
+        scoring_functions,
+        starting_points_files[id_swarm],
+        parser.args.gso_seed,
+        parser.args.translation_step,
+        parser.args.rotation_step,
+        parser.args.configuration_file,
+        parser.args.use_anm,
+        parser.args.nmodes_step,
+        parser.args.anm_rec,
+        parser.args.anm_lig,
+        parser.args.local_minimization,
+        parser.args.energy_cache,
+        parser.args.crop_receptor,
+        parser.args.convergence_window,
+        parser.args.array_swarm,
+        parser.args.scoring_threads,
+    )
+    saving_path = "%s%d" % (DEFAULT_SWARM_FOLDER, id_swarm)
+    task = GSOClusterTask(
+        id_swarm,
+        gso,
+        parser.args.steps,
+        saving_path,
+        parser.args.binary_output,
+        parser.args.checkpoint_frequency,
+    )
+    task.run()
+
+
+def dispatch_swarms(comm, swarm_ids):
+    """Sends the next swarm to simulate to each minion asking for it, or None when
+    there are no swarms left, until all the minions are done.
+    """
+    status = MPI.Status()
+    pending = list(swarm_ids)
+    num_working = comm.size - 1
+    while num_working:
+        finished = comm.recv(
+            source=MPI.ANY_SOURCE, tag=SWARM_REQUEST_TAG, status=status
+        )
+        minion_id = status.Get_source()
+        if finished is not None:
+            id_swarm, elapsed = finished
+            log.info(
+                "Swarm %d simulated by minion %d in %.3fs"
+                % (id_swarm, minion_id, elapsed)
+            )
+        if pending:
+            comm.send(pending.pop(0), dest=minion_id, tag=SWARM_TAG)
+        else:
+            comm.send(None, dest=minion_id, tag=SWARM_TAG)
+            num_working -= 1
+
+
+def request_swarms(comm):
+    """Yields the swarms sent by the master minion until there are no swarms left"""
+    finished = None
+    while True:
+        comm.send(finished, dest=0, tag=SWARM_REQUEST_TAG)
+        id_swarm = comm.recv(source=0, tag=SWARM_TAG)
+        if id_swarm is None:
+            return
+        start = time.perf_counter()
+        yield id_swarm
+        finished = (id_swarm, time.perf_counter() - start)
+
+
 def run_simulation(parser):
-    """Main program, includes MPI directives"""
+    """Main program, includes MPI directives.
+
+    The first minion prepares the simulation and broadcasts the scoring functions and
+    adapters to the rest of minions. If there is more than one minion, the first one
+    only sends the swarms to simulate to the others as they ask for them.
+    """
     try:
         comm = MPI.COMM_WORLD
 
@@ -139,104 +340,51 @@ def run_simulation(parser):
             setattr(args, k, v)
 
         minion_id = comm.rank
+        simulation = None
         if minion_id == 0:
-            info_file = create_simulation_info_file(args)
-            log.info("simulation parameters saved to %s" % info_file)
-        comm.Barrier()
-
-        # Read input structures (use parsed ones)
-        parsed_lightdock_receptor = os.path.join(
-            os.path.dirname(args.receptor_pdb),
-            DEFAULT_LIGHTDOCK_PREFIX % os.path.basename(args.receptor_pdb),
-        )
-        receptor = read_input_structure(
-            parsed_lightdock_receptor,
-            args.noxt,
-            args.noh,
-            args.now,
-            args.verbose_parser,
-        )
-        parsed_lightdock_ligand = os.path.join(
-            os.path.dirname(args.ligand_pdb),
-            DEFAULT_LIGHTDOCK_PREFIX % os.path.basename(args.ligand_pdb),
-        )
-        ligand = read_input_structure(
-            parsed_lightdock_ligand, args.noxt, args.noh, args.now, args.verbose_parser
-        )
-
-        # CRITICAL to not break compatibility with previous results
-        receptor.move_to_origin()
-        ligand.move_to_origin()
-
-        if args.use_anm:
-            try:
-                receptor.n_modes = read_nmodes(
-                    "%s%s" % (DEFAULT_REC_NM_FILE, NUMPY_FILE_SAVE_EXTENSION)
-                )
-            except:
-                log.warning("No ANM found for receptor molecule")
-                receptor.n_modes = None
             try:
-                ligand.n_modes = read_nmodes(
-                    "%s%s" % (DEFAULT_LIG_NM_FILE, NUMPY_FILE_SAVE_EXTENSION)
-                )
-            except:
-                log.warning("No ANM found for ligand molecule")
-                ligand.n_modes = None
-
-        starting_points_files = load_starting_positions(
-            args.swarms, args.glowworms, args.use_anm, args.anm_rec, args.anm_lig
-        )
+                info_file = create_simulation_info_file(args)
+                log.info("simulation parameters saved to %s" % info_file)
+                if args.successive_halving:
+                    log.warning(
+                        "Successive halving is only run by the multiprocessing "
+                        "driver, ignoring it"
+                    )
+                if args.lockstep > 1:
+                    log.warning("Lockstep is not supported with MPI, ignoring it")
+                swarm_ids = get_swarm_ids(parser)
+                simulation = prepare_simulation(parser, minion_id)
+            except BaseException:
+                # Release the rest of minions
+                comm.bcast(None, root=0)
+                raise
+        simulation = comm.bcast(simulation, root=0)
+        if simulation is None:
+            return
+        scoring_functions, adapters, starting_points_files = simulation
 
-        comm.Barrier()
-
-        num_workers = comm.size
-        for worker_id in range(num_workers):
-            if worker_id == minion_id:
-                starting_points_files = glob.glob("init/initial_positions*.dat")
-                scoring_functions, adapters = set_scoring_function(
-                    parser, receptor, ligand, minion_id
+        if comm.size == 1:
+            for id_swarm in swarm_ids:
+                run_swarm(
+                    parser,
+                    id_swarm,
+                    scoring_functions,
+                    adapters,
+                    starting_points_files,
+                    minion_id,
+                )
+        elif minion_id == 0:
+            dispatch_swarms(comm, swarm_ids)
+        else:
+            for id_swarm in request_swarms(comm):
+                run_swarm(
+                    parser,
+                    id_swarm,
+                    scoring_functions,
+                    adapters,
+                    starting_points_files,
+                    minion_id,
                 )
-
-                # Check if scoring functions are compatible with ANM if activated
-                if args.use_anm and minion_id == 0:
-                    for s in scoring_functions:
-                        if not s.anm_support:
-                            raise NotSupportedInScoringError(
-                                f"ANM is activated while {type(s).__name__} has no support for it"
-                            )
-
-                # Prepare tasks depending on swarms to simulate
-                if parser.args.swarm_list:
-                    swarm_ids = parser.args.swarm_list
-                    if min(swarm_ids) < 0 or max(swarm_ids) >= parser.args.swarms:
-                        raise SwarmNumError("Wrong list of swarms")
-                else:
-                    swarm_ids = list(range(parser.args.swarms))
-
-                for id_swarm in swarm_ids:
-                    if worker_id == (id_swarm % num_workers):
-                        print("GSO cluster %d - Minion %d" % (id_swarm, minion_id))
-                        gso = set_gso(
-                            parser.args.glowworms,
-                            adapters,
-                            scoring_functions,
-                            starting_points_files[id_swarm],
-                            parser.args.gso_seed,
-                            parser.args.translation_step,
-                            parser.args.rotation_step,
-                            parser.args.configuration_file,
-                            parser.args.use_anm,
-                            parser.args.nmodes_step,
-                            parser.args.anm_rec,
-                            parser.args.anm_lig,
-                            parser.args.local_minimization,
-                        )
-                        saving_path = "%s%d" % (DEFAULT_SWARM_FOLDER, id_swarm)
-                        task = GSOClusterTask(
-                            id_swarm, gso, parser.args.steps, saving_path
-                        )
-                        task.run()
         comm.Barrier()
 
     except NotSupportedInScoringError as score_error:
@@ -2,6 +2,7 @@
 
 import os
 import importlib
+import numpy as np
 
 from lightdock.util.logger import LoggingManager
 from lightdock.util.parser import CommandLineParser
@@ -15,6 +16,8 @@ from lightdock.prep.simulation import (
 from lightdock.gso.algorithm import LightdockGSOBuilder
 from lightdock.mathutil.lrandom import MTGenerator
 from lightdock.gso.parameters import GSOParameters
+from lightdock.gso.cache import EnergyCache
+from lightdock.gso.convergence import ConvergenceMonitor
 from lightdock.constants import (
     DEFAULT_SCORING_FUNCTION,
     DEFAULT_SWARM_FOLDER,
@@ -26,8 +29,11 @@ from lightdock.constants import (
     DEFAULT_LIGHTDOCK_PREFIX,
 )
 from lightdock.parallel.kraken import Kraken
+from lightdock.parallel.halving import successive_halving
 from lightdock.parallel.util import GSOClusterTask
+from lightdock.parallel.shared import SharedModels
 from lightdock.scoring.multiple import ScoringConfiguration
+from lightdock.scoring.grid import setup_grids
 from lightdock.structure.nm import read_nmodes
 from lightdock.error.lightdock_errors import NotSupportedInScoringError, SwarmNumError
 
@@ -49,6 +55,11 @@ def set_gso(
     anm_rec=DEFAULT_NMODES_REC,
     anm_lig=DEFAULT_NMODES_LIG,
     local_minimization=False,
+    energy_cache=0,
+    crop_receptor=False,
+    convergence_window=0,
+    array_swarm=False,
+    scoring_threads=1,
 ):
     """Creates a lightdock GSO simulation object"""
 
@@ -76,7 +87,16 @@ def set_gso(
         local_minimization,
         anm_rec,
         anm_lig,
+        array_swarm,
     )
+    if energy_cache:
+        gso.swarm.energy_cache = EnergyCache(energy_cache)
+    gso.swarm.scoring_threads = scoring_threads
+    if crop_receptor:
+        for crop in gso.swarm.crop_receptors():
+            log.info("Receptor cropped to %s" % crop)
+    if convergence_window:
+        gso.convergence = ConvergenceMonitor(convergence_window)
     return gso
 
 
@@ -111,7 +131,7 @@ def set_scoring_function(parser, receptor, ligand):
         except:
             pass
         adapter = CurrentModelAdapter(
-            receptor, ligand, receptor_restraints, ligand_restraints
+            receptor, ligand, receptor_restraints, ligand_restraints, cache=True
         )
         scoring_function = CurrentScoringFunction(weight)
         adapters.append(adapter)
@@ -146,15 +166,28 @@ def prepare_gso_tasks(parser, adapters, scoring_functions, starting_points_files
             parser.args.anm_rec,
             parser.args.anm_lig,
             parser.args.local_minimization,
+            parser.args.energy_cache,
+            parser.args.crop_receptor,
+            parser.args.convergence_window,
+            parser.args.array_swarm,
+            parser.args.scoring_threads,
         )
         saving_path = "%s%d" % (DEFAULT_SWARM_FOLDER, id_swarm)
-        task = GSOClusterTask(id_swarm, gso, parser.args.steps, saving_path)
+        task = GSOClusterTask(
+            id_swarm,
+            gso,
+            parser.args.steps,
+            saving_path,
+            parser.args.binary_output,
+            parser.args.checkpoint_frequency,
+        )
         tasks.append(task)
     return tasks
 
 
 def run_simulation(parser):
     """Main program"""
+    shared_models = SharedModels()
     try:
         parser = CommandLineParser()
         args = parser.args
@@ -178,13 +211,19 @@ def run_simulation(parser):
             args.noh,
             args.now,
             args.verbose_parser,
+            cache=True,
         )
         parsed_lightdock_ligand = os.path.join(
             os.path.dirname(args.ligand_pdb),
             DEFAULT_LIGHTDOCK_PREFIX % os.path.basename(args.ligand_pdb),
         )
         ligand = read_input_structure(
-            parsed_lightdock_ligand, args.noxt, args.noh, args.now, args.verbose_parser
+            parsed_lightdock_ligand,
+            args.noxt,
+            args.noh,
+            args.now,
+            args.verbose_parser,
+            cache=True,
         )
 
         # CRITICAL to not break compatibility with previous results
@@ -221,14 +260,44 @@ def run_simulation(parser):
                         f"ANM is activated while {type(s).__name__} has no support for it"
                     )
 
+        # Precomputed receptor potential grids
+        if args.grid_spacing:
+            if args.use_anm and args.anm_rec > 0:
+                raise NotSupportedInScoringError(
+                    "Potential grids are not supported for receptor ANM"
+                )
+            setup_grids(
+                scoring_functions,
+                adapters,
+                args.grid_spacing,
+                parsed_lightdock_receptor,
+                np.loadtxt(starting_points_files[0], ndmin=2),
+                args.anm_lig if args.use_anm else 0,
+            )
+
+        # Tentacles attach to the same receptor and ligand arrays
+        shared_models.share(adapters)
+
         tasks = prepare_gso_tasks(
             parser, adapters, scoring_functions, starting_points_files
         )
 
         # Preparing the parallel execution
-        kraken = Kraken(tasks, parser.args.cores, parser.args.profiling)
-        log.info("Monster spotted")
-        _ = kraken.release()
+        if args.successive_halving:
+            _ = successive_halving(
+                tasks,
+                args.steps,
+                args.successive_halving,
+                args.cores,
+                args.profiling,
+                args.lockstep,
+            )
+        else:
+            kraken = Kraken(
+                tasks, parser.args.cores, parser.args.profiling, parser.args.lockstep
+            )
+            log.info("Monster spotted")
+            _ = kraken.release()
         log.info("Finished.")
 
     except NotSupportedInScoringError as score_error:
@@ -250,3 +319,6 @@ def run_simulation(parser):
         except:
             pass
         raise e
+
+    finally:
+        shared_models.release()
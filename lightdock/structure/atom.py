@@ -7,8 +7,45 @@ from lightdock.error.lightdock_errors import AtomError
 class Atom(object):
     """Represents a chemical atom"""
 
+    __slots__ = (
+        "number",
+        "name",
+        "alternative",
+        "chain_id",
+        "residue_name",
+        "residue_number",
+        "residue_insertion",
+        "x",
+        "y",
+        "z",
+        "occupancy",
+        "b_factor",
+        "element",
+        "mass",
+        "index",
+        # Set by the adapters of the scoring functions
+        "amber_type",
+        "charge",
+        "vdw_energy",
+        "vdw_radius",
+        "pisa_type",
+    )
+
     BACKBONE_ATOMS = ["CA", "C", "N", "O"]
-    RECOGNIZED_ELEMENTS = ["C", "N", "O", "H", "S", "P", "CL", "MG", "FE", "PB", "SE", "F"]
+    RECOGNIZED_ELEMENTS = [
+        "C",
+        "N",
+        "O",
+        "H",
+        "S",
+        "P",
+        "CL",
+        "MG",
+        "FE",
+        "PB",
+        "SE",
+        "F",
+    ]
     MASSES = {
         "H": 1.007825,
         "C": 12.01,
@@ -151,6 +188,8 @@ class Atom(object):
 class HetAtom(Atom):
     """Represents an heterogeneous atom"""
 
+    __slots__ = ()
+
     def __init__(
         self,
         atom_number=99999,
@@ -4,6 +4,8 @@
 class Chain(object):
     """Represents a complex chain"""
 
+    __slots__ = ("cid", "residues", "peptide")
+
     def __init__(self, cid="", residues=None, only_peptide=True):
         """Creates a new chain"""
         self.cid = cid
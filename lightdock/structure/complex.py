@@ -3,6 +3,14 @@ import numpy as np
 from lightdock.structure.space import SpacePoints
 
 
+def atom_coordinates(atoms):
+    """(N, 3) array with the coordinates of atoms"""
+    coordinates = np.empty((len(atoms), 3))
+    for index, atom in enumerate(atoms):
+        coordinates[index] = atom.x, atom.y, atom.z
+    return coordinates
+
+
 class Complex(object):
     """Represents a molecular complex"""
 
@@ -45,16 +53,19 @@ class Complex(object):
             self.structure_file_names = [
                 structure["file_name"] for structure in structures
             ]
+            # Structures can be given by their atoms or only by their coordinates
             self.atom_coordinates = [
-                SpacePoints([[atom.x, atom.y, atom.z] for atom in structure["atoms"]])
+                SpacePoints(
+                    structure["coordinates"]
+                    if "coordinates" in structure
+                    else atom_coordinates(structure["atoms"])
+                )
                 for structure in structures
             ]
         else:
             self.num_structures = 1
             self.structure_file_names = [str(structure_file_name)]
-            self.atom_coordinates = [
-                SpacePoints([[atom.x, atom.y, atom.z] for atom in self.atoms])
-            ]
+            self.atom_coordinates = [SpacePoints(atom_coordinates(self.atoms))]
 
         self.num_atoms = len(self.atoms)
         self.protein_num_atoms = sum(
@@ -113,21 +124,33 @@ class Complex(object):
                 atoms.extend(residue.atoms)
         return atoms
 
+    def atom_property(self, name, dtype=np.float64):
+        """Array with the given attribute of each atom"""
+        return np.fromiter(
+            (getattr(atom, name) for atom in self.atoms),
+            dtype=dtype,
+            count=self.num_atoms,
+        )
+
+    def hydrogen_mask(self):
+        """Array of booleans telling which atoms are hydrogens"""
+        return np.fromiter(
+            (atom.element == "H" for atom in self.atoms),
+            dtype=bool,
+            count=self.num_atoms,
+        )
+
     def center_of_mass(self, structure=None):
         """Calculates the center of mass"""
         if not structure:
             structure = self.representative_id
         if len(self.atoms):
-            total_x = 0.0
-            total_y = 0.0
-            total_z = 0.0
-            total_mass = 0.0
-            for atom in self.atoms:
-                total_x += self.atom_coordinates[structure][atom.index][0] * atom.mass
-                total_y += self.atom_coordinates[structure][atom.index][1] * atom.mass
-                total_z += self.atom_coordinates[structure][atom.index][2] * atom.mass
-                total_mass += atom.mass
-            return [total_x / total_mass, total_y / total_mass, total_z / total_mass]
+            masses = self.atom_property("mass")
+            coordinates = self.atom_coordinates[structure].coordinates
+            # Cumulative sums add the atoms in order, as a plain loop would
+            total = (coordinates * masses[:, None]).cumsum(axis=0)[-1]
+            total_mass = masses.cumsum()[-1]
+            return [float(value) / total_mass for value in total]
         else:
             return [0.0, 0.0, 0.0]
 
@@ -135,17 +158,13 @@ class Complex(object):
         """Calculates the center of coordinates"""
         if not structure:
             structure = self.representative_id
-        atoms = [atom for atom in self.atoms if not atom.is_hydrogen()]
-        dimension = len(atoms)
+        coordinates = self.atom_coordinates[structure].coordinates[
+            ~self.hydrogen_mask()
+        ]
+        dimension = len(coordinates)
         if dimension:
-            total_x = 0.0
-            total_y = 0.0
-            total_z = 0.0
-            for atom in atoms:
-                total_x += self.atom_coordinates[structure][atom.index][0]
-                total_y += self.atom_coordinates[structure][atom.index][1]
-                total_z += self.atom_coordinates[structure][atom.index][2]
-            return [total_x / dimension, total_y / dimension, total_z / dimension]
+            total = coordinates.cumsum(axis=0)[-1]
+            return [float(value) / dimension for value in total]
         else:
             return [0.0, 0.0, 0.0]
 
@@ -193,10 +212,11 @@ class Complex(object):
     def representative(self, is_membrane=False):
         coordinates = self.atom_coordinates[self.representative_id]
         if is_membrane:
-            transmembrane = []
-            for atom_id, atom in enumerate(self.atoms):
-                if atom.residue_name != "MMB":
-                    transmembrane.append(coordinates[atom_id])
-            return transmembrane
+            transmembrane = np.fromiter(
+                (atom.residue_name != "MMB" for atom in self.atoms),
+                dtype=bool,
+                count=self.num_atoms,
+            )
+            return SpacePoints(coordinates.coordinates[transmembrane])
         else:
             return coordinates
@@ -1,3 +1,4 @@
+import copy
 import numpy as np
 from lightdock.mathutil.ellipsoid import MinimumVolumeEllipsoid
 from lightdock.structure.space import SpacePoints
@@ -38,6 +39,8 @@ class DockingModel(object):
         self.restraints = restraints
         self.membrane = membrane
         self.nm_mask = nm_mask
+        # Normal modes as a (modes, 3 * atoms) array, see build_modes_tensor
+        self.modes_tensor = None
 
     def translate(self, vector):
         """Translates coordinates based on vector"""
@@ -51,5 +54,92 @@ class DockingModel(object):
             coordinates.rotate(q)
         self.reference_points.rotate(q)
 
+    def build_modes_tensor(self):
+        """Precomputes the normal modes as a (modes, 3 * atoms) array.
+
+        Atoms not in nm_mask have zero displacement in all the modes.
+        """
+        num_atoms = len(self.coordinates[0].coordinates)
+        n_modes = np.asarray(self.n_modes, dtype=np.float64)
+        n_modes = n_modes.reshape((len(n_modes), -1, 3))
+        modes = np.zeros((len(n_modes), num_atoms, 3))
+        if self.nm_mask is None:
+            modes[...] = n_modes
+        else:
+            modes[:, self.nm_mask, :] = n_modes
+        self.modes_tensor = modes.reshape((len(n_modes), -1))
+        return self.modes_tensor
+
+    def pose_coordinates(self, structure_id=0, extent=None, pose=None):
+        """Coordinates of the given structure moved along the normal modes by the given
+        extent.
+
+        If pose is given, the coordinates are written in place on this SpacePoints
+        object instead of a new copy.
+        """
+        coordinates = self.coordinates[structure_id]
+        if pose is None:
+            pose = coordinates.clone()
+        else:
+            pose.coordinates[...] = coordinates.coordinates
+        if extent is not None and len(extent):
+            if self.modes_tensor is None:
+                self.build_modes_tensor()
+            deformed = pose.coordinates.reshape(-1)
+            np.dot(extent, self.modes_tensor[: len(extent)], out=deformed)
+            deformed += coordinates.coordinates.reshape(-1)
+        return pose
+
+    def crop(self, indexes):
+        """Copy of this model keeping only the atoms (or objects) in indexes.
+
+        Per-atom arrays and lists are sliced and the atom indexes of restraints and
+        membrane are renumbered, keeping residues without atoms left. Normal modes
+        are not kept.
+        """
+        indexes = np.asarray(indexes, dtype=int)
+        num_atoms = len(self.coordinates[0].coordinates)
+        renumbered = {old: new for new, old in enumerate(indexes)}
+        not_per_atom = {
+            "coordinates",
+            "reference_points",
+            "n_modes",
+            "nm_mask",
+            "modes_tensor",
+        }
+
+        cropped = copy.copy(self)
+        for name, value in vars(self).items():
+            if name in not_per_atom:
+                continue
+            if isinstance(value, np.ndarray) and value.ndim and len(value) == num_atoms:
+                setattr(cropped, name, value[indexes])
+            elif isinstance(value, list) and len(value) == num_atoms:
+                setattr(cropped, name, [value[index] for index in indexes])
+        cropped.coordinates = [
+            SpacePoints(coordinates.coordinates[indexes])
+            for coordinates in self.coordinates
+        ]
+        cropped.reference_points = self.reference_points.clone()
+        for name in ("restraints", "membrane"):
+            atoms = getattr(self, name)
+            if atoms:
+                setattr(
+                    cropped,
+                    name,
+                    {
+                        residue: [
+                            renumbered[index]
+                            for index in residue_atoms
+                            if index in renumbered
+                        ]
+                        for residue, residue_atoms in atoms.items()
+                    },
+                )
+        cropped.n_modes = None
+        cropped.nm_mask = None
+        cropped.modes_tensor = None
+        return cropped
+
     def __len__(self):
         return len(self.coordinates)
@@ -48,6 +48,8 @@ bond_length = {
 class Residue(object):
     """Represents a chemical residue in a complex"""
 
+    __slots__ = ("name", "number", "insertion", "atoms", "backbone", "sidechain", "index")
+
     STANDARD_TYPES = {
         "ALA": "A",
         "ARG": "R",
@@ -222,16 +224,16 @@ class Residue(object):
 class AminoAcid(Residue):
     """Amino acid residue type"""
 
-    pass
+    __slots__ = ()
 
 
 class Cofactor(Residue):
     """Non-protein chemical compound type"""
 
-    pass
+    __slots__ = ()
 
 
 class Ion(Residue):
     """Charged chemical compound type"""
 
-    pass
+    __slots__ = ()
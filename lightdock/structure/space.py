@@ -1,6 +1,35 @@
 import numpy as np
 
 
+def rotation_matrices(quaternions):
+    """Rotation matrices of a (M, 4) array of (w, x, y, z) quaternions.
+
+    Quaternions do not need to be normalized, as in Quaternion.rotate.
+    """
+    quaternions = np.asarray(quaternions, dtype=np.float64).reshape((-1, 4))
+    w, x, y, z = quaternions.T
+    norm2 = w * w + x * x + y * y + z * z
+    matrices = np.empty((len(quaternions), 3, 3))
+    matrices[:, 0, 0] = w * w + x * x - y * y - z * z
+    matrices[:, 0, 1] = 2.0 * (x * y - w * z)
+    matrices[:, 0, 2] = 2.0 * (x * z + w * y)
+    matrices[:, 1, 0] = 2.0 * (x * y + w * z)
+    matrices[:, 1, 1] = w * w - x * x + y * y - z * z
+    matrices[:, 1, 2] = 2.0 * (y * z - w * x)
+    matrices[:, 2, 0] = 2.0 * (x * z - w * y)
+    matrices[:, 2, 1] = 2.0 * (y * z + w * x)
+    matrices[:, 2, 2] = w * w - x * x - y * y + z * z
+    return matrices / norm2[:, None, None]
+
+
+def rotate_points(quaternions, coordinates):
+    """Rotates a (N, 3) array of coordinates by each of the (M, 4) quaternions.
+
+    Returns a (M, N, 3) array with the rotated coordinates for each quaternion.
+    """
+    return np.matmul(coordinates, rotation_matrices(quaternions).transpose((0, 2, 1)))
+
+
 class SpacePoints(object):
     """A collection of spatial points"""
 
@@ -16,8 +45,7 @@ class SpacePoints(object):
 
     def rotate(self, q):
         """Rotates coordinates using a quaternion q"""
-        for i in range(self.coordinates.shape[0]):
-            self.coordinates[i, ...] = q.rotate(self.coordinates[i, ...])
+        self.coordinates[...] = rotate_points([q.w, q.x, q.y, q.z], self.coordinates)[0]
 
     def __getitem__(self, item):
         return self.coordinates[item]
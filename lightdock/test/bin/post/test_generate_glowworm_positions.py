@@ -4,7 +4,8 @@ import os
 import filecmp
 import shutil
 from pathlib import Path
-from lightdock.test.bin.regression import RegressionTest
+from lightdock.constants import GSO_TRAJECTORY_FILE
+from lightdock.test.bin.regression import RegressionTest, text_to_trajectory
 
 
 class TestGenerateGlowwormPositions(RegressionTest):
@@ -34,3 +35,17 @@ class TestGenerateGlowwormPositions(RegressionTest):
         assert filecmp.cmp(
             self.golden_data_path / "gso_10.pdb", self.test_path / "gso_10.pdb"
         )
+
+    def test_generate_glowworm_positions_binary(self):
+        os.chdir(self.test_path)
+        text_to_trajectory(
+            {10: self.golden_data_path / "gso_10.out"},
+            self.test_path / GSO_TRAJECTORY_FILE,
+        )
+
+        command = f"lgd_generate_glowworm_positions.py {self.test_path / 'gso_10.out'} > test.out"
+        os.system(command)
+
+        assert filecmp.cmp(
+            self.golden_data_path / "gso_10.pdb", self.test_path / "gso_10.pdb"
+        )
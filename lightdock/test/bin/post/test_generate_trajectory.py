@@ -4,7 +4,8 @@ import os
 import filecmp
 import shutil
 from pathlib import Path
-from lightdock.test.bin.regression import RegressionTest
+from lightdock.constants import GSO_TRAJECTORY_FILE
+from lightdock.test.bin.regression import RegressionTest, text_to_trajectory
 
 
 class TestGenerateTrajectory(RegressionTest):
@@ -20,19 +21,28 @@ class TestGenerateTrajectory(RegressionTest):
     def teardown(self):
         self.clean_path()
 
-    def test_generate_trajectory(self):
+    def generate_trajectory(self, binary=False):
         # Prepare folder structure for this test
         os.chdir(self.test_path)
         swarm_dir = "swarm_0"
         os.mkdir(swarm_dir)
-        shutil.copyfile(
-            self.golden_data_path / swarm_dir / "gso_0.out",
-            self.test_path / swarm_dir / "gso_0.out",
-        )
-        shutil.copyfile(
-            self.golden_data_path / swarm_dir / "gso_10.out",
-            self.test_path / swarm_dir / "gso_10.out",
-        )
+        if binary:
+            text_to_trajectory(
+                {
+                    step: self.golden_data_path / swarm_dir / f"gso_{step}.out"
+                    for step in [0, 10]
+                },
+                self.test_path / swarm_dir / GSO_TRAJECTORY_FILE,
+            )
+        else:
+            shutil.copyfile(
+                self.golden_data_path / swarm_dir / "gso_0.out",
+                self.test_path / swarm_dir / "gso_0.out",
+            )
+            shutil.copyfile(
+                self.golden_data_path / swarm_dir / "gso_10.out",
+                self.test_path / swarm_dir / "gso_10.out",
+            )
         shutil.copyfile(
             self.golden_data_path / "lightdock_4IZ7_A_noh.pdb",
             self.test_path / "lightdock_4IZ7_A_noh.pdb",
@@ -70,3 +80,9 @@ class TestGenerateTrajectory(RegressionTest):
             self.golden_data_path / "swarm_0" / "trajectory_4_step_10.pdb",
             self.test_path / "swarm_0" / "trajectory_4_step_10.pdb",
         )
+
+    def test_generate_trajectory(self):
+        self.generate_trajectory()
+
+    def test_generate_trajectory_binary(self):
+        self.generate_trajectory(binary=True)
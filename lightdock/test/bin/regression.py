@@ -1,5 +1,37 @@
 import shutil
 import os
+import numpy as np
+from lightdock.gso.trajectory import TRAJECTORY_MAGIC, TRAJECTORY_EXTRA_COLUMNS
+from lightdock.util.analysis import read_lightdock_output
+
+
+def text_to_trajectory(output_files, trajectory_file):
+    """Writes the glowworms of the given {step: gso_N.out file} as a binary trajectory"""
+    rows = []
+    for step, output_file in sorted(output_files.items()):
+        for result in read_lightdock_output(output_file):
+            rows.append(
+                [step, result.id_glowworm]
+                + list(result.pose)
+                + [
+                    result.receptor_id,
+                    result.ligand_id,
+                    result.luciferin,
+                    result.num_neighbors,
+                    result.vision_range,
+                    result.scoring,
+                ]
+            )
+    rows = np.array(rows, dtype=np.float64)
+    with open(trajectory_file, "wb") as output:
+        output.write(TRAJECTORY_MAGIC)
+        output.write(
+            np.array(
+                [rows.shape[1] - TRAJECTORY_EXTRA_COLUMNS, rows.shape[1]],
+                dtype=np.int64,
+            )
+        )
+        output.write(rows.tobytes())
 
 
 class RegressionTest(object):
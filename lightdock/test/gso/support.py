@@ -0,0 +1,117 @@
+"""Docking simulations of 1PPE scored with MJ3h shared by the GSO and parallel tests"""
+
+import os
+import shutil
+from pathlib import Path
+from lightdock.parallel.util import GSOClusterTask
+from lightdock.gso.parameters import GSOParameters
+from lightdock.gso.algorithm import LightdockGSOBuilder
+from lightdock.gso.boundaries import Boundary, BoundingBox
+from lightdock.mathutil.lrandom import MTGenerator
+from lightdock.mathutil.cython.quaternion import Quaternion
+from lightdock.constants import MAX_TRANSLATION, MAX_ROTATION
+from lightdock.structure.complex import Complex
+from lightdock.pdbutil.PDBIO import parse_complex_from_file
+from lightdock.scoring.mj3h.driver import MJ3h, MJ3hAdapter
+
+GOLDEN_DATA_PATH = Path(__file__).absolute().parent / "golden_data"
+
+
+class DockingFixture(object):
+    """Builds docking simulations of the 1PPE receptor and ligand.
+
+    If test_path is given, it is created empty with the given folders before each test
+    and removed after it.
+    """
+
+    def __init__(self, test_path=None, folders=()):
+        self.test_path = test_path
+        self.folders = folders
+        self.golden_data_path = GOLDEN_DATA_PATH
+        self.gso_parameters = GSOParameters()
+        self.bounding_box = BoundingBox(
+            [Boundary(-MAX_TRANSLATION, MAX_TRANSLATION)] * 3
+            + [Boundary(-MAX_ROTATION, MAX_ROTATION)] * 4
+        )
+        atoms, _, chains = parse_complex_from_file(
+            self.golden_data_path / "1PPErec.pdb"
+        )
+        receptor = Complex(chains, atoms)
+        atoms, _, chains = parse_complex_from_file(
+            self.golden_data_path / "1PPElig.pdb"
+        )
+        ligand = Complex(chains, atoms)
+        self.adapter = MJ3hAdapter(receptor, ligand)
+
+    def setup(self):
+        if self.test_path is None:
+            return
+        try:
+            shutil.rmtree(self.test_path)
+        except OSError:
+            pass
+        os.mkdir(self.test_path)
+        for folder in self.folders:
+            os.mkdir(self.test_path / folder)
+
+    def teardown(self):
+        if self.test_path is None:
+            return
+        try:
+            shutil.rmtree(self.test_path)
+        except OSError:
+            pass
+
+    def write_positions(self, num_glowworms, spread):
+        """Random poses within spread Angstroms of a point close to the receptor"""
+        rng = MTGenerator(1234)
+        file_name = self.test_path / "initial_positions.txt"
+        with open(file_name, "w") as output:
+            for _ in range(num_glowworms):
+                q = Quaternion.random(rng)
+                pose = [
+                    rng(20.0 - spread, 20.0 + spread),
+                    rng(5.0 - spread, 5.0 + spread),
+                    rng(-spread, spread),
+                ]
+                pose.extend([q.w, q.x, q.y, q.z])
+                output.write(" ".join("%.8f" % value for value in pose) + "\n")
+        return file_name
+
+    def create_gso(
+        self,
+        num_glowworms=5,
+        seed=324324,
+        positions_file=None,
+        scoring_functions=None,
+        local_minimization=False,
+        array_swarm=False,
+    ):
+        """Simulation of num_glowworms glowworms, scored by a MJ3h function if no
+        scoring_functions are given"""
+        scoring_functions = scoring_functions or [MJ3h()]
+        builder = LightdockGSOBuilder()
+        return builder.create_from_file(
+            num_glowworms,
+            MTGenerator(seed),
+            self.gso_parameters,
+            [self.adapter] * len(scoring_functions),
+            scoring_functions,
+            self.bounding_box,
+            positions_file or self.golden_data_path / "initial_positions_1PPE.txt",
+            0.5,
+            0.5,
+            0.5,
+            local_minimization,
+            0,
+            0,
+            array_swarm,
+        )
+
+    def create_task(self, id_task, folder, steps, **options):
+        """GSOClusterTask of steps steps saving in folder/swarm_<id_task>, its
+        simulation is seeded with id_task"""
+        gso = self.create_gso(seed=id_task, **options)
+        saving_path = self.test_path / folder / ("swarm_%d" % id_task)
+        os.makedirs(saving_path)
+        return GSOClusterTask(id_task, gso, steps, saving_path)
@@ -0,0 +1,127 @@
+"""Tests for ArraySwarm class"""
+
+import filecmp
+from pathlib import Path
+import numpy as np
+from nose.tools import raises
+from lightdock.gso.array_swarm import ArraySwarm, slerp_quaternions
+from lightdock.gso.boundaries import Boundary, BoundingBox
+from lightdock.gso.initializer import RandomInitializer
+from lightdock.gso.searchspace.benchmark_ofunctions import J1
+from lightdock.mathutil.lrandom import MTGenerator
+from lightdock.mathutil.cython.quaternion import Quaternion
+from lightdock.scoring.mj3h.driver import MJ3h
+from lightdock.error.lightdock_errors import GSOError
+from lightdock.test.gso.support import DockingFixture
+
+
+class TestArraySwarm(DockingFixture):
+    def __init__(self):
+        super(TestArraySwarm, self).__init__(
+            Path(__file__).absolute().parent / "scratch_array_swarm",
+            ("objects", "arrays"),
+        )
+
+    def create_gso(self, array_swarm, **kwargs):
+        return super(TestArraySwarm, self).create_gso(
+            scoring_functions=[MJ3h(), MJ3h()], array_swarm=array_swarm, **kwargs
+        )
+
+    def run_both(self, steps, **kwargs):
+        simulations = []
+        for array_swarm, folder in ((False, "objects"), (True, "arrays")):
+            gso = self.create_gso(array_swarm, **kwargs)
+            gso.run(
+                steps,
+                saving_path=self.test_path / folder,
+                save_intermediary=True,
+                save_all_intermediary=True,
+            )
+            simulations.append(gso)
+        return simulations
+
+    def assert_same_output(self, steps):
+        for step in range(steps + 1):
+            assert filecmp.cmp(
+                self.test_path / "objects" / f"gso_{step}.out",
+                self.test_path / "arrays" / f"gso_{step}.out",
+                shallow=False,
+            )
+
+    def test_same_trajectory(self):
+        positions_file = self.write_positions(30, 8.0)
+
+        objects, arrays = self.run_both(
+            15, num_glowworms=30, positions_file=positions_file
+        )
+
+        assert isinstance(arrays.swarm, ArraySwarm)
+        self.assert_same_output(15)
+        expected = objects.swarm.get_state()
+        for name, value in arrays.swarm.get_state().items():
+            assert np.array_equal(expected[name], value)
+        assert np.any(expected["num_neighbors"])
+        assert (
+            objects.random_number_generator.get_state()
+            == arrays.random_number_generator.get_state()
+        ).all()
+
+    def test_same_trajectory_with_minimization(self):
+        self.run_both(3, local_minimization=True)
+
+        self.assert_same_output(3)
+
+    def test_resume_from_swarm_checkpoint(self):
+        self.create_gso(False).run(
+            10,
+            saving_path=self.test_path / "objects",
+            save_intermediary=True,
+            save_all_intermediary=True,
+        )
+        self.create_gso(False).run(
+            5,
+            saving_path=self.test_path / "arrays",
+            save_intermediary=True,
+            save_all_intermediary=True,
+            checkpoint_frequency=5,
+        )
+
+        self.create_gso(True).run(
+            10,
+            saving_path=self.test_path / "arrays",
+            save_intermediary=True,
+            save_all_intermediary=True,
+            checkpoint_frequency=5,
+            resume=True,
+        )
+
+        self.assert_same_output(10)
+
+    def test_slerp_quaternions(self):
+        rng = MTGenerator(25)
+        quaternions = [Quaternion.random(rng) for _ in range(50)]
+        others = [Quaternion.random(rng) for _ in range(50)]
+        # Close quaternions are linearly interpolated and the long path is avoided
+        others[:10] = [Quaternion(q.w + 0.001, q.x, q.y, q.z) for q in quaternions[:10]]
+        others[10:20] = [-q for q in others[10:20]]
+
+        result = slerp_quaternions(
+            np.array([[q.w, q.x, q.y, q.z] for q in quaternions]),
+            np.array([[q.w, q.x, q.y, q.z] for q in others]),
+            0.5,
+        )
+
+        for row, q, other in zip(result, quaternions, others):
+            expected = q.slerp(other, 0.5)
+            assert list(row) == [expected.w, expected.x, expected.y, expected.z]
+
+    @raises(GSOError)
+    def test_not_docking(self):
+        initializer = RandomInitializer(
+            [J1()],
+            5,
+            self.gso_parameters,
+            BoundingBox([Boundary(-3.0, 3.0), Boundary(-3.0, 3.0)]),
+            MTGenerator(324324),
+        )
+        ArraySwarm(initializer.generate_landscape_positions(), self.gso_parameters)
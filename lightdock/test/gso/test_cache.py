@@ -0,0 +1,81 @@
+"""Tests for EnergyCache class"""
+
+from nose.tools import raises
+from lightdock.gso.cache import EnergyCache
+from lightdock.error.lightdock_errors import GSOError
+from lightdock.test.gso.support import DockingFixture
+
+
+class TestEnergyCache(DockingFixture):
+    def test_lookup(self):
+        cache = EnergyCache(10)
+        cache.put("a", 1.0)
+
+        energies, missing = cache.lookup(["a", "b", "c", "b"])
+
+        assert energies == [1.0, None, None, None]
+        assert list(missing.items()) == [("b", 1), ("c", 2)]
+        assert cache.hits == 2
+        assert cache.misses == 2
+
+    def test_lru_eviction(self):
+        cache = EnergyCache(2)
+        cache.put("a", 1.0)
+        cache.put("b", 2.0)
+        cache.lookup(["a"])
+        cache.put("c", 3.0)
+
+        energies, _ = cache.lookup(["a", "b", "c"])
+
+        assert len(cache) == 2
+        assert energies == [1.0, None, 3.0]
+
+    def test_key(self):
+        cache = EnergyCache(10, decimals=3)
+        gso = self.create_gso()
+        position = gso.swarm.glowworms[0].landscape_positions[0]
+        other = position.clone()
+        other.translation[0] += 0.0001
+
+        assert cache.key(0, position) == cache.key(0, other)
+        assert cache.key(0, position) != cache.key(1, position)
+        other.translation[0] += 0.01
+        assert cache.key(0, position) != cache.key(0, other)
+
+    @raises(GSOError)
+    def test_wrong_size(self):
+        EnergyCache(0)
+
+    def test_swarm_cache(self):
+        expected = self.create_gso()
+        expected.run(5)
+        gso = self.create_gso()
+        gso.swarm.energy_cache = EnergyCache(100)
+
+        gso.run(5)
+
+        assert gso.swarm.energy_cache.misses > 0
+        for glowworm, other in zip(gso.swarm.glowworms, expected.swarm.glowworms):
+            assert glowworm.scoring == other.scoring
+            assert glowworm.luciferin == other.luciferin
+            assert str(glowworm) == str(other)
+        assert "Energy cache" in gso.report()
+
+    def test_swarm_cache_repeated_pose(self):
+        gso = self.create_gso()
+        cache = gso.swarm.energy_cache = EnergyCache(100)
+        first, second = gso.swarm.glowworms[:2]
+        second.landscape_positions[0].translation = first.landscape_positions[
+            0
+        ].translation.copy()
+        second.landscape_positions[0].rotation = first.landscape_positions[0].rotation
+
+        gso.swarm.update_luciferin()
+
+        assert cache.hits == 1
+        assert cache.misses == 4
+        assert first.scoring == second.scoring
+        assert (
+            first.landscape_positions[0].ligand_reference_points.coordinates
+            == second.landscape_positions[0].ligand_reference_points.coordinates
+        ).all()
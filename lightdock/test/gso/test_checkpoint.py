@@ -0,0 +1,106 @@
+"""Tests for the checkpoints of a docking simulation"""
+
+import filecmp
+from pathlib import Path
+from nose.tools import raises
+from lightdock.gso.cache import EnergyCache
+from lightdock.gso.checkpoint import save_checkpoint, load_checkpoint
+from lightdock.gso.trajectory import append_to_trajectory
+from lightdock.constants import GSO_CHECKPOINT_FILE, GSO_TRAJECTORY_FILE
+from lightdock.error.lightdock_errors import GSOError
+from lightdock.test.gso.support import DockingFixture
+
+
+class TestCheckpoint(DockingFixture):
+    def __init__(self):
+        super(TestCheckpoint, self).__init__(
+            Path(__file__).absolute().parent / "scratch_checkpoint",
+            ("full", "resumed"),
+        )
+
+    def test_resume(self):
+        self.create_gso().run(
+            12,
+            saving_path=self.test_path / "full",
+            save_intermediary=True,
+            save_all_intermediary=True,
+        )
+        self.create_gso().run(
+            5,
+            saving_path=self.test_path / "resumed",
+            save_intermediary=True,
+            save_all_intermediary=True,
+            checkpoint_frequency=5,
+        )
+
+        gso = self.create_gso()
+        gso.run(
+            12,
+            saving_path=self.test_path / "resumed",
+            save_intermediary=True,
+            save_all_intermediary=True,
+            checkpoint_frequency=5,
+            resume=True,
+        )
+
+        for step in range(13):
+            assert filecmp.cmp(
+                self.test_path / "full" / f"gso_{step}.out",
+                self.test_path / "resumed" / f"gso_{step}.out",
+                shallow=False,
+            )
+        assert (
+            load_checkpoint(self.test_path / "resumed" / GSO_CHECKPOINT_FILE, gso) == 12
+        )
+
+    def test_resume_binary_output_and_cache(self):
+        gso = self.create_gso()
+        gso.swarm.energy_cache = EnergyCache(100)
+        gso.run(
+            12,
+            saving_path=self.test_path / "full",
+            save_intermediary=True,
+            save_all_intermediary=True,
+            binary_output=True,
+        )
+        expected_cache = str(gso.swarm.energy_cache)
+        gso = self.create_gso()
+        gso.swarm.energy_cache = EnergyCache(100)
+        gso.run(
+            5,
+            saving_path=self.test_path / "resumed",
+            save_intermediary=True,
+            save_all_intermediary=True,
+            binary_output=True,
+            checkpoint_frequency=5,
+        )
+        # A step saved after the last checkpoint
+        append_to_trajectory(
+            self.test_path / "resumed" / GSO_TRAJECTORY_FILE, gso.swarm, 6
+        )
+
+        gso = self.create_gso()
+        gso.swarm.energy_cache = EnergyCache(100)
+        gso.run(
+            12,
+            saving_path=self.test_path / "resumed",
+            save_intermediary=True,
+            save_all_intermediary=True,
+            binary_output=True,
+            checkpoint_frequency=5,
+            resume=True,
+        )
+
+        assert filecmp.cmp(
+            self.test_path / "full" / GSO_TRAJECTORY_FILE,
+            self.test_path / "resumed" / GSO_TRAJECTORY_FILE,
+            shallow=False,
+        )
+        assert str(gso.swarm.energy_cache) == expected_cache
+
+    @raises(GSOError)
+    def test_wrong_seed(self):
+        checkpoint_file = self.test_path / GSO_CHECKPOINT_FILE
+        save_checkpoint(checkpoint_file, self.create_gso(), 0)
+
+        load_checkpoint(checkpoint_file, self.create_gso(seed=1))
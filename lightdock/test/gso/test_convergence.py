@@ -0,0 +1,139 @@
+"""Tests for ConvergenceMonitor class"""
+
+import shutil
+import filecmp
+from pathlib import Path
+import numpy as np
+from nose.tools import raises
+from lightdock.gso.convergence import ConvergenceMonitor
+from lightdock.constants import GSO_CHECKPOINT_FILE
+from lightdock.error.lightdock_errors import GSOError
+from lightdock.test.gso.support import DockingFixture
+
+
+class FakeSwarm(object):
+    def __init__(self, scorings, spread, shift):
+        self.state = {
+            "scoring": np.array(scorings),
+            "luciferin": np.array([5.0, 5.0 + spread]),
+            "poses": np.array(
+                [
+                    [[shift, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0]],
+                    [[0.0, shift, 0.0, 1.0, 0.0, 0.0, 0.0]],
+                ]
+            ),
+        }
+
+    def get_state(self):
+        return self.state
+
+
+class TestConvergenceMonitor(DockingFixture):
+    def __init__(self):
+        super(TestConvergenceMonitor, self).__init__(
+            Path(__file__).absolute().parent / "scratch_convergence",
+            ("full", "resumed"),
+        )
+
+    def test_update(self):
+        monitor = ConvergenceMonitor(3)
+        # Best scoring keeps improving
+        converged = [
+            monitor.update(FakeSwarm([step, 1.0], 10.0, 0.0)) for step in range(8)
+        ]
+        assert not any(converged)
+
+        # The best scoring found so far does not decrease
+        converged = [
+            monitor.update(FakeSwarm([1.0, 2.0], 10.0, 0.1 * step)) for step in range(6)
+        ]
+
+        assert converged == [False, False, True, True, True, True]
+        assert monitor.best_scoring == [7.0] * 4
+        assert monitor.converged
+
+    def test_update_spread_and_displacement(self):
+        spreads = ConvergenceMonitor(2)
+        displacements = ConvergenceMonitor(2)
+
+        for step in range(6):
+            spreads.update(FakeSwarm([1.0, 2.0], 10.0 * step, 0.0))
+            displacements.update(FakeSwarm([1.0, 2.0], 10.0, 2.0 * step))
+
+        assert not spreads.converged
+        assert not displacements.converged
+
+    @raises(GSOError)
+    def test_wrong_window(self):
+        ConvergenceMonitor(0)
+
+    def test_early_stop(self):
+        gso = self.create_gso()
+        gso.convergence = ConvergenceMonitor(
+            2, tolerance=100.0, spread_tolerance=100.0, displacement=100.0
+        )
+
+        gso.run(
+            10,
+            saving_path=self.test_path / "full",
+            save_intermediary=True,
+            save_all_intermediary=True,
+            checkpoint_frequency=5,
+        )
+
+        assert gso.convergence.converged
+        assert all(glowworm.step == 4 for glowworm in gso.swarm.glowworms)
+        assert (self.test_path / "full" / "gso_4.out").exists()
+        assert not (self.test_path / "full" / "gso_5.out").exists()
+        assert filecmp.cmp(
+            self.test_path / "full" / "gso_4.out",
+            self.test_path / "full" / "gso_10.out",
+            shallow=False,
+        )
+        assert "Convergence window: 2" in gso.report()
+
+        # A converged simulation is not resumed
+        shutil.copyfile(
+            self.test_path / "full" / GSO_CHECKPOINT_FILE,
+            self.test_path / "resumed" / GSO_CHECKPOINT_FILE,
+        )
+        gso = self.create_gso()
+        gso.convergence = ConvergenceMonitor(2)
+        gso.run(
+            20,
+            saving_path=self.test_path / "resumed",
+            save_intermediary=True,
+            checkpoint_frequency=5,
+            resume=True,
+        )
+
+        assert all(glowworm.step == 4 for glowworm in gso.swarm.glowworms)
+        assert filecmp.cmp(
+            self.test_path / "full" / "gso_4.out",
+            self.test_path / "resumed" / "gso_20.out",
+            shallow=False,
+        )
+
+    def test_resume(self):
+        expected = self.create_gso()
+        expected.convergence = ConvergenceMonitor(3)
+        expected.run(8)
+        gso = self.create_gso()
+        gso.convergence = ConvergenceMonitor(3)
+        gso.run(5, saving_path=self.test_path / "resumed", checkpoint_frequency=5)
+
+        gso = self.create_gso()
+        gso.convergence = ConvergenceMonitor(3)
+        gso.run(
+            8,
+            saving_path=self.test_path / "resumed",
+            checkpoint_frequency=5,
+            resume=True,
+        )
+
+        assert gso.convergence.best_scoring == expected.convergence.best_scoring
+        assert gso.convergence.luciferin_spread == expected.convergence.luciferin_spread
+        assert np.all(
+            np.array(gso.convergence.translations)
+            == np.array(expected.convergence.translations)
+        )
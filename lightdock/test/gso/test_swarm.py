@@ -0,0 +1,83 @@
+"""Tests for the neighbor search and receptor cropping of a docking swarm"""
+
+import lightdock.gso.swarm as swarm_module
+from lightdock.test.gso.support import DockingFixture
+
+
+class TestSwarmNeighbors(DockingFixture):
+    def create_swarm(self):
+        gso = self.create_gso()
+        swarm = gso.swarm
+        swarm.update_luciferin()
+        # Wide vision ranges so every brighter glowworm can be a neighbor
+        for glowworm_id, glowworm in enumerate(swarm.glowworms):
+            glowworm.vision_range = 10.0 + 10.0 * glowworm_id
+        return swarm
+
+    def expected_neighbors(self, swarm):
+        expected = []
+        for glowworm in swarm.glowworms:
+            glowworm.search_neighbors(swarm.glowworms)
+            expected.append(list(glowworm.neighbors))
+        return expected
+
+    def test_search_neighbors(self):
+        swarm = self.create_swarm()
+        expected = self.expected_neighbors(swarm)
+
+        swarm.search_neighbors()
+
+        assert any(expected)
+        for glowworm, neighbors in zip(swarm.glowworms, expected):
+            assert glowworm.neighbors == neighbors
+
+    def test_search_neighbors_in_blocks(self):
+        swarm = self.create_swarm()
+        expected = self.expected_neighbors(swarm)
+        block_size = swarm_module.NEIGHBORS_BLOCK_SIZE
+        swarm_module.NEIGHBORS_BLOCK_SIZE = 2
+
+        try:
+            swarm.search_neighbors()
+        finally:
+            swarm_module.NEIGHBORS_BLOCK_SIZE = block_size
+
+        for glowworm, neighbors in zip(swarm.glowworms, expected):
+            assert glowworm.neighbors == neighbors
+
+
+class TestSwarmCrop(DockingFixture):
+    def test_crop_receptors(self):
+        expected = self.create_gso()
+        expected.run(5)
+        gso = self.create_gso()
+
+        crops = gso.swarm.crop_receptors(margin=0.0)
+        gso.run(5)
+
+        assert len(crops) == 1
+        assert 0 < len(crops[0].atoms) < len(self.adapter.receptor_model.objects)
+        assert len(crops[0].model.objects) == len(crops[0].atoms)
+        for glowworm, other in zip(gso.swarm.glowworms, expected.swarm.glowworms):
+            assert glowworm.landscape_positions[0].receptor_crop is crops[0]
+            assert glowworm.scoring == other.scoring
+            assert str(glowworm) == str(other)
+
+    def test_crop_fallback(self):
+        gso = self.create_gso()
+        crop = gso.swarm.crop_receptors()[0]
+        position = gso.swarm.glowworms[0].landscape_positions[0]
+        expected = position.evaluate_objective_function()
+        assert position.cropped()
+
+        position.translation += 2.0 * crop.radius
+        far = position.clone()
+        far.receptor_crop = None
+
+        assert not position.cropped()
+        assert position.receptor_crop is position.clone().receptor_crop
+        assert (
+            position.evaluate_objective_function() == far.evaluate_objective_function()
+        )
+        position.translation -= 2.0 * crop.radius
+        assert position.evaluate_objective_function() == expected
@@ -0,0 +1,111 @@
+"""Tests for SimulationTimer class"""
+
+import json
+import time
+from pathlib import Path
+from nose.tools import assert_almost_equal
+from lightdock.gso.timing import SimulationTimer
+from lightdock.constants import GSO_TIMING_FILE
+from lightdock.test.gso.support import DockingFixture
+
+
+class TestSimulationTimer(DockingFixture):
+    def __init__(self):
+        super(TestSimulationTimer, self).__init__(
+            Path(__file__).absolute().parent / "scratch_timing", ("full", "resumed")
+        )
+
+    def test_nested_phases(self):
+        timer = SimulationTimer()
+
+        with timer.phase("movement"):
+            time.sleep(0.05)
+            with timer.phase("neighbors"):
+                time.sleep(0.1)
+            time.sleep(0.05)
+
+        # Inner phases are not accounted to the outer one
+        assert 0.1 <= timer.times["movement"] < 0.15
+        assert 0.1 <= timer.times["neighbors"] < 0.15
+        assert timer.times["scoring"] == 0.0
+        assert timer.running is None
+
+    def test_count(self):
+        timer = SimulationTimer()
+
+        timer.count("steps")
+        timer.count("scored_poses", 10)
+        timer.count("scored_poses", 5)
+
+        assert timer.counters["steps"] == 1
+        assert timer.counters["scored_poses"] == 15
+        assert timer.counters["cache_hits"] == 0
+
+    def test_save(self):
+        timer = SimulationTimer()
+        timer.add_time("scoring", 1.5)
+        timer.add_time("save", 0.5)
+        timer.count("steps", 3)
+        file_name = self.test_path / "timing.json"
+
+        timer.save(file_name)
+
+        with open(file_name) as input_file:
+            summary = json.load(input_file)
+        assert summary == timer.summary()
+        assert summary["total_time"] == 2.0
+        assert summary["counters"]["steps"] == 3
+
+    def test_merge(self):
+        first = SimulationTimer()
+        first.add_time("scoring", 1.25)
+        first.count("steps", 2)
+        second = SimulationTimer()
+        second.add_time("scoring", 0.5)
+        second.add_time("movement", 0.25)
+        second.count("steps", 3)
+
+        merged = SimulationTimer.merge([first.summary(), second.summary()])
+
+        assert_almost_equal(1.75, merged["times"]["scoring"])
+        assert_almost_equal(0.25, merged["times"]["movement"])
+        assert_almost_equal(2.0, merged["total_time"])
+        assert merged["counters"]["steps"] == 5
+
+    def test_merge_nothing(self):
+        merged = SimulationTimer.merge([])
+
+        assert merged["total_time"] == 0.0
+        assert set(merged["counters"].values()) == {0}
+
+    def read_timing(self, folder):
+        with open(self.test_path / folder / GSO_TIMING_FILE) as input_file:
+            return json.load(input_file)
+
+    def test_resume(self):
+        self.create_gso().run(
+            12, saving_path=self.test_path / "full", save_intermediary=True
+        )
+        self.create_gso().run(
+            6,
+            saving_path=self.test_path / "resumed",
+            save_intermediary=True,
+            checkpoint_frequency=4,
+        )
+
+        gso = self.create_gso()
+        gso.run(
+            12,
+            saving_path=self.test_path / "resumed",
+            save_intermediary=True,
+            checkpoint_frequency=4,
+            resume=True,
+        )
+
+        # Phase times and counters of the first run are restored from the checkpoint
+        expected = self.read_timing("full")
+        timing = self.read_timing("resumed")
+        assert timing["counters"]["steps"] == 12
+        assert timing["counters"] == expected["counters"]
+        assert timing == gso.swarm.timer.summary()
+        assert timing["times"]["scoring"] > 0.0
@@ -0,0 +1,101 @@
+"""Tests for the binary trajectory of a swarm"""
+
+import os
+import argparse
+import filecmp
+from pathlib import Path
+from nose.tools import raises
+from lightdock.gso.algorithm import GSOBuilder
+from lightdock.gso.boundaries import Boundary, BoundingBox
+from lightdock.gso.searchspace.benchmark_ofunctions import J1
+from lightdock.gso.trajectory import (
+    read_trajectory,
+    get_step,
+    export_trajectory,
+    append_to_trajectory,
+)
+from lightdock.mathutil.lrandom import MTGenerator
+from lightdock.constants import GSO_TRAJECTORY_FILE
+from lightdock.util.analysis import read_lightdock_output
+from lightdock.util.parser import valid_lightdock_output
+from lightdock.error.lightdock_errors import GSOError
+from lightdock.test.gso.support import DockingFixture
+
+
+class TestTrajectory(DockingFixture):
+    def __init__(self):
+        super(TestTrajectory, self).__init__(
+            Path(__file__).absolute().parent / "scratch_trajectory", ("text", "binary")
+        )
+
+    def test_binary_output(self):
+        self.create_gso().run(
+            12, saving_path=self.test_path / "text", save_intermediary=True
+        )
+        self.create_gso().run(
+            12,
+            saving_path=self.test_path / "binary",
+            save_intermediary=True,
+            binary_output=True,
+        )
+        trajectory_file = self.test_path / "binary" / GSO_TRAJECTORY_FILE
+
+        pose_length, data = read_trajectory(trajectory_file)
+
+        assert pose_length == 7
+        assert data.shape == (15, 15)
+        assert list(get_step(data)[:, 0]) == [12.0] * 5
+        assert list(get_step(data, 10)[:, 1]) == [0.0, 1.0, 2.0, 3.0, 4.0]
+        assert not os.path.exists(self.test_path / "binary" / "gso_10.out")
+
+        # Transparent reading of the trajectory
+        for step in [0, 10, 12]:
+            text = read_lightdock_output(self.test_path / "text" / f"gso_{step}.out")
+            binary = read_lightdock_output(
+                self.test_path / "binary" / f"gso_{step}.out"
+            )
+            assert len(text) == len(binary) == 5
+            for expected, result in zip(text, binary):
+                assert expected.id_glowworm == result.id_glowworm
+                assert expected.num_neighbors == result.num_neighbors
+                assert abs(expected.scoring - result.scoring) < 1e-7
+                assert expected.coord == result.coord
+        last = read_lightdock_output(trajectory_file)
+        assert [g.scoring for g in last] == [
+            g.scoring
+            for g in read_lightdock_output(self.test_path / "binary" / "gso_12.out")
+        ]
+
+        # Command line arguments of the analysis scripts
+        binary_file = self.test_path / "binary" / "gso_10.out"
+        assert valid_lightdock_output(binary_file) == binary_file
+        assert valid_lightdock_output(trajectory_file) == trajectory_file
+
+        written = export_trajectory(trajectory_file)
+
+        assert len(written) == 3
+        for step in [0, 10, 12]:
+            assert filecmp.cmp(
+                self.test_path / "text" / f"gso_{step}.out",
+                self.test_path / "binary" / f"gso_{step}.out",
+            )
+
+    @raises(GSOError)
+    def test_binary_output_not_docking(self):
+        builder = GSOBuilder()
+        gso = builder.create(
+            5,
+            MTGenerator(324324),
+            self.gso_parameters,
+            J1(),
+            BoundingBox([Boundary(-3.0, 3.0), Boundary(-3.0, 3.0)]),
+        )
+        append_to_trajectory(self.test_path / GSO_TRAJECTORY_FILE, gso.swarm, 0)
+
+    @raises(argparse.ArgumentTypeError)
+    def test_valid_lightdock_output_missing(self):
+        valid_lightdock_output(self.test_path / "text" / "gso_10.out")
+
+    @raises(GSOError)
+    def test_read_not_trajectory(self):
+        read_trajectory(self.golden_data_path / "initial_positions_1PPE.txt")
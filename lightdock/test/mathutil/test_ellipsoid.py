@@ -4,6 +4,7 @@ import os
 import shutil
 from pathlib import Path
 import numpy as np
+from numpy import linalg
 from nose.tools import assert_almost_equal, raises
 from lightdock.pdbutil.PDBIO import parse_complex_from_file
 from lightdock.structure.complex import Complex
@@ -12,6 +13,26 @@ from lightdock.error.lightdock_errors import MinimumVolumeEllipsoidError
 from lightdock.mathutil.constants import ERROR_TOLERANCE
 
 
+def dense_center(points, precision=0.01):
+    """Center of the minimum volume ellipsoid using dense N x N matrices"""
+    N, d = np.shape(points)
+    Q = np.vstack([np.copy(points.T), np.ones(N)])
+    QT = Q.T
+    err = 1.0 + precision
+    u = (1.0 / N) * np.ones(N)
+    while err > precision:
+        V = np.dot(Q, np.dot(np.diag(u), QT))
+        M = np.diag(np.dot(QT, np.dot(linalg.inv(V), Q)))
+        j = np.argmax(M)
+        maximum = M[j]
+        step_size = (maximum - d - 1.0) / ((d + 1.0) * (maximum - 1.0))
+        new_u = (1.0 - step_size) * u
+        new_u[j] += step_size
+        err = np.linalg.norm(new_u - u)
+        u = new_u
+    return np.dot(points.T, u)
+
+
 class TestEllipsoid:
     def __init__(self):
         self.path = Path(__file__).absolute().parent
@@ -75,3 +96,23 @@ class TestEllipsoid:
         ellipsoid = MinimumVolumeEllipsoid(coordinates)
 
         assert len(ellipsoid.poles) > 0
+
+    def test_hull_vertices(self):
+        corners = np.array(
+            [[x, y, z] for x in (0.0, 1.0) for y in (0.0, 1.0) for z in (0.0, 1.0)]
+        )
+        points = np.vstack([[[0.5, 0.5, 0.5], [0.2, 0.3, 0.4]], corners])
+
+        assert np.all(MinimumVolumeEllipsoid.hull_vertices(points) == np.arange(2, 10))
+        # Degenerated hulls use all the points
+        assert np.all(MinimumVolumeEllipsoid.hull_vertices(corners[:4]) == np.arange(4))
+
+    def test_same_center_as_dense_iterations(self):
+        atoms, _, chains = parse_complex_from_file(
+            self.golden_data_path / "1PPE_l_u.pdb"
+        )
+        coordinates = Complex(chains, atoms).atom_coordinates[0].coordinates
+
+        ellipsoid = MinimumVolumeEllipsoid(coordinates)
+
+        assert np.allclose(dense_center(coordinates), ellipsoid.center, atol=1e-9)
@@ -0,0 +1,65 @@
+"""Tests for geometry module"""
+
+from pathlib import Path
+import numpy as np
+from scipy.spatial import distance
+from lightdock.pdbutil.PDBIO import parse_complex_from_file
+from lightdock.structure.complex import Complex
+from lightdock.mathutil.geometry import (
+    max_diameter,
+    sphere_directions,
+    vector_norms,
+)
+
+
+class TestGeometry:
+    def __init__(self):
+        self.path = Path(__file__).absolute().parent
+        self.golden_data_path = self.path / "golden_data"
+
+    def read_coordinates(self, file_name):
+        atoms, _, chains = parse_complex_from_file(self.golden_data_path / file_name)
+        return Complex(chains, atoms).representative().coordinates
+
+    def test_vector_norms(self):
+        vectors = np.random.default_rng(1).normal(size=(100, 7)) * 20.0
+
+        norms = vector_norms(vectors)
+
+        assert np.all(norms == [np.linalg.norm(vector) for vector in vectors])
+
+    def test_sphere_directions(self):
+        directions = sphere_directions(32)
+
+        assert directions.shape == (32, 3)
+        assert np.allclose(np.linalg.norm(directions, axis=1), 1.0)
+        assert np.allclose(np.mean(directions, axis=0), 0.0, atol=0.05)
+
+    def test_max_diameter(self):
+        coordinates = self.read_coordinates("1PPE_l_u.pdb")
+
+        assert max_diameter(coordinates) == np.max(distance.pdist(coordinates))
+
+    def test_approximate_max_diameter(self):
+        coordinates = self.read_coordinates("1PPE_l_u.pdb")
+        exact = max_diameter(coordinates)
+        approximate = max_diameter(coordinates, approximate=True)
+
+        assert approximate <= exact
+        assert approximate > 0.99 * exact
+
+    def test_max_diameter_coplanar(self):
+        # No convex hull can be built, all the points are compared
+        points = np.array(
+            [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 2.0, 0.0], [1.0, 2.0, 0.0]]
+        )
+
+        assert max_diameter(points) == np.sqrt(5.0)
+        assert max_diameter(points[:2]) == 1.0
+
+    def test_max_diameter_single_point(self):
+        points = np.array([[1.0, 2.0, 3.0]] * 4)
+
+        assert max_diameter(points) == 0.0
+        assert max_diameter(points, approximate=True) == 0.0
+        assert max_diameter(points[:1]) == 0.0
@@ -63,3 +63,14 @@ class TestMTGenerator:
         gen = MTGenerator(25)
         for i in range(50):
             assert_almost_equals(self.generated[i], gen())
+
+    def test_state(self):
+        gen = MTGenerator(25)
+        for i in range(10):
+            gen()
+        state = gen.get_state()
+        other = MTGenerator(25)
+        other.set_state(state)
+
+        for i in range(10, 50):
+            assert self.generated[i] == other()
@@ -0,0 +1,82 @@
+"""Tests for the successive halving of swarms"""
+
+import filecmp
+from pathlib import Path
+from lightdock.parallel.halving import (
+    halving_rounds,
+    share_cores,
+    successive_halving,
+)
+from lightdock.util.analysis import read_lightdock_output
+from lightdock.test.gso.support import DockingFixture
+
+
+class TestSuccessiveHalving(DockingFixture):
+    def __init__(self):
+        super(TestSuccessiveHalving, self).__init__(
+            Path(__file__).absolute().parent / "scratch_halving"
+        )
+
+    def test_halving_rounds(self):
+        assert halving_rounds(100, 0.25) == [25, 50, 100]
+        assert halving_rounds(100, 0.1) == [10, 20, 40, 80, 100]
+        assert halving_rounds(3, 0.01) == [1, 2, 3]
+
+    def test_share_cores(self):
+        tasks = [self.create_task(i, "cores", 8) for i in range(4)]
+
+        # Enough swarms for the cores
+        assert share_cores(tasks, 4) == 4
+        assert [task.gso.swarm.scoring_threads for task in tasks] == [1] * 4
+        assert share_cores(tasks, 2, lockstep=2) == 2
+        assert [task.gso.swarm.scoring_threads for task in tasks] == [1] * 4
+
+        # Freed cores go to the scoring threads of the remaining swarms
+        assert share_cores(tasks, 64) == 4
+        assert [task.gso.swarm.scoring_threads for task in tasks] == [16] * 4
+        assert share_cores(tasks[:3], 64, lockstep=2) == 2
+        assert [task.gso.swarm.scoring_threads for task in tasks[:3]] == [32] * 3
+        assert share_cores(tasks[:2], 64, scoring_threads={0: 40}) == 2
+        assert [task.gso.swarm.scoring_threads for task in tasks[:2]] == [40, 32]
+
+    def best_scoring(self, task, step):
+        return max(
+            glowworm.scoring
+            for glowworm in read_lightdock_output(
+                Path(task.saving_path) / f"gso_{step}.out"
+            )
+        )
+
+    def test_successive_halving(self):
+        expected = [self.create_task(i, "full", 8) for i in range(4)]
+        for task in expected:
+            task.run()
+        tasks = [self.create_task(i, "halving", 8) for i in range(4)]
+
+        successive_halving(tasks, 8, 0.25, num_cpus=1)
+
+        # Rounds up to steps 2, 4 and 8
+        ranking = sorted(tasks, key=lambda task: -self.best_scoring(task, 2))
+        second_round = [
+            task for task in tasks if (Path(task.saving_path) / "gso_4.out").exists()
+        ]
+        assert second_round == sorted(ranking[:2], key=lambda task: task.id)
+        last, dropped = sorted(
+            second_round, key=lambda task: -self.best_scoring(task, 4)
+        )
+        for task in ranking[2:]:
+            assert filecmp.cmp(
+                Path(task.saving_path) / "gso_2.out",
+                Path(task.saving_path) / "gso_8.out",
+                shallow=False,
+            )
+        assert filecmp.cmp(
+            Path(dropped.saving_path) / "gso_4.out",
+            Path(dropped.saving_path) / "gso_8.out",
+            shallow=False,
+        )
+        assert filecmp.cmp(
+            Path(expected[last.id].saving_path) / "gso_8.out",
+            Path(last.saving_path) / "gso_8.out",
+            shallow=False,
+        )
@@ -0,0 +1,67 @@
+"""Tests for Kraken class"""
+
+import time
+from types import SimpleNamespace
+from lightdock.parallel.kraken import Kraken
+from lightdock.gso.timing import SimulationTimer
+
+
+class SleepingGSO(object):
+    def __init__(self):
+        self.swarm = SimpleNamespace(scoring_threads=1, timer=SimulationTimer())
+
+    def report(self):
+        return "report"
+
+
+class SleepingTask(object):
+    def __init__(self, id_task, seconds):
+        self.id = id_task
+        self.seconds = seconds
+        self.gso = SleepingGSO()
+
+    def run(self):
+        with self.gso.swarm.timer.phase("scoring"):
+            time.sleep(self.seconds)
+        self.gso.swarm.timer.count("steps")
+
+    def simulate(self):
+        time.sleep(self.seconds)
+        yield from ()
+
+
+class TestKraken:
+    def test_release(self):
+        tasks = [SleepingTask(i, 0.4 if i == 0 else 0.05) for i in range(6)]
+        kraken = Kraken(tasks, num_cpus=1)
+
+        reports = kraken.release()
+
+        assert reports == ["report"] * 6
+        assert sorted(kraken.task_times.keys()) == list(range(6))
+        assert kraken.task_times[0] >= 0.4
+        assert len(kraken.utilization) == kraken.num_processes
+        assert all(0.0 < value <= 1.0 for value in kraken.utilization.values())
+        # Timers of the tasks are sent back by the tentacles and summed
+        assert kraken.timings[0]["times"]["scoring"] >= 0.4
+        assert kraken.timing["times"]["scoring"] >= 0.65
+        assert kraken.timing["counters"]["steps"] == 6
+
+    def test_release_lockstep(self):
+        tasks = [SleepingTask(i, 0.05) for i in range(5)]
+        kraken = Kraken(tasks, num_cpus=1, lockstep=2)
+
+        reports = kraken.release()
+
+        assert reports == ["report"] * 5
+        assert sorted(kraken.task_times.keys()) == list(range(5))
+        # Tasks run in groups of two share their wall time
+        assert kraken.task_times[0] == kraken.task_times[1] >= 0.1
+        assert kraken.task_times[4] < 0.1
+
+    def test_release_no_tasks(self):
+        kraken = Kraken([], num_cpus=1)
+
+        assert kraken.release() == []
+        assert kraken.task_times == {}
+        assert len(kraken.utilization) == kraken.num_processes
@@ -0,0 +1,98 @@
+"""Tests for SharedModels class"""
+
+from pathlib import Path
+import numpy as np
+from lightdock.parallel.shared import SharedModels
+from lightdock.pdbutil.PDBIO import parse_complex_from_file
+from lightdock.structure.complex import Complex
+from lightdock.scoring.vdw.driver import VdW, VdWAdapter
+from lightdock.scoring.fastdfire.driver import DFIRE, DFIREAdapter
+
+
+class TestSharedModels:
+    def __init__(self):
+        self.path = Path(__file__).absolute().parent.parent
+        self.golden_data_path = self.path / "scoring" / "golden_data"
+
+    def test_share(self):
+        atoms, _, chains = parse_complex_from_file(
+            self.golden_data_path / "1PPErec.pdb"
+        )
+        receptor = Complex(chains, atoms)
+        atoms, _, chains = parse_complex_from_file(
+            self.golden_data_path / "1PPElig.pdb"
+        )
+        ligand = Complex(chains, atoms)
+        adapter = VdWAdapter(receptor, ligand)
+        scoring_function = VdW()
+        expected = scoring_function(
+            adapter.receptor_model,
+            adapter.receptor_model.coordinates[0],
+            adapter.ligand_model,
+            adapter.ligand_model.coordinates[0],
+        )
+        coordinates = adapter.receptor_model.coordinates[0].coordinates.copy()
+
+        shared_models = SharedModels()
+        shared_models.share([adapter, adapter])
+
+        # Coordinates, reference points and vdw arrays for each model
+        assert len(shared_models.blocks) == 8
+        shared = adapter.receptor_model.coordinates[0].coordinates
+        assert not shared.flags.writeable
+        assert np.array_equal(coordinates, shared)
+        assert not adapter.ligand_model.vdw_radii.flags.writeable
+        assert expected == scoring_function(
+            adapter.receptor_model,
+            adapter.receptor_model.coordinates[0].clone(),
+            adapter.ligand_model,
+            adapter.ligand_model.coordinates[0].clone(),
+        )
+
+        shared_models.release()
+        assert shared_models.blocks == []
+
+    def test_share_dfire_types(self):
+        atoms, _, chains = parse_complex_from_file(
+            self.golden_data_path / "1PPErec.pdb"
+        )
+        receptor = Complex(chains, atoms)
+        atoms, _, chains = parse_complex_from_file(
+            self.golden_data_path / "1PPElig.pdb"
+        )
+        ligand = Complex(chains, atoms)
+        adapter = DFIREAdapter(receptor, ligand)
+        scoring_function = DFIRE()
+        poses = np.array(
+            [
+                [0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0],
+                [2.0, -1.0, 0.5, 0.5, 0.5, 0.5, 0.5],
+            ]
+        )
+        expected = scoring_function.batch_score(
+            adapter.receptor_model, adapter.ligand_model, poses
+        )
+
+        shared_models = SharedModels()
+        shared_models.share([adapter])
+
+        # DFIRE atom types are shared with the coordinates, reference points and
+        # normal modes mask of each model
+        assert len(shared_models.blocks) == 8
+        for model in (adapter.receptor_model, adapter.ligand_model):
+            assert model.objects.dtype == np.uint32
+            assert not model.objects.flags.writeable
+        assert (
+            expected
+            == scoring_function.batch_score(
+                adapter.receptor_model, adapter.ligand_model, poses
+            )
+        ).all()
+        assert expected[0] == scoring_function(
+            adapter.receptor_model,
+            adapter.receptor_model.coordinates[0].clone(),
+            adapter.ligand_model,
+            adapter.ligand_model.coordinates[0].clone(),
+        )
+
+        shared_models.release()
@@ -0,0 +1,107 @@
+"""Tests for the GSO tasks run by the parallel schedulers"""
+
+import json
+import filecmp
+from pathlib import Path
+from lightdock.parallel.util import run_lockstep
+from lightdock.gso.cache import EnergyCache
+from lightdock.constants import GSO_TIMING_FILE
+from lightdock.scoring.mj3h.driver import MJ3h
+from lightdock.test.gso.support import DockingFixture
+
+
+class CountingMJ3h(MJ3h):
+    def __init__(self):
+        super(CountingMJ3h, self).__init__()
+        self.batches = 0
+
+    def batch_score(self, *args):
+        self.batches += 1
+        return super(CountingMJ3h, self).batch_score(*args)
+
+
+class TestRunLockstep(DockingFixture):
+    def __init__(self):
+        super(TestRunLockstep, self).__init__(
+            Path(__file__).absolute().parent / "scratch_lockstep"
+        )
+
+    def create_swarm_task(
+        self, id_task, folder, scoring_function, array_swarm=False, scoring_threads=1
+    ):
+        # Swarms of different lengths
+        task = self.create_task(
+            id_task,
+            folder,
+            20 + id_task,
+            num_glowworms=20,
+            positions_file=self.test_path / "initial_positions.txt",
+            scoring_functions=[scoring_function],
+            array_swarm=array_swarm,
+        )
+        if id_task == 1:
+            task.gso.swarm.energy_cache = EnergyCache(100)
+        task.gso.swarm.scoring_threads = scoring_threads
+        return task
+
+    def test_run_lockstep(self):
+        self.write_positions(20, 2.0)
+        sequential = CountingMJ3h()
+        expected = [
+            self.create_swarm_task(i, "sequential", sequential) for i in range(3)
+        ]
+        for task in expected:
+            task.run()
+        lockstep = CountingMJ3h()
+        tasks = [
+            self.create_swarm_task(i, "lockstep", lockstep, array_swarm=(i == 2))
+            for i in range(3)
+        ]
+
+        run_lockstep(tasks)
+
+        # At most one batch per step of the longest swarm, steps without moves
+        # are not scored
+        assert 1 < lockstep.batches <= 22
+        assert lockstep.batches < sequential.batches
+        for task, expected_task in zip(tasks, expected):
+            for step in (0, task.steps):
+                assert filecmp.cmp(
+                    Path(expected_task.saving_path) / f"gso_{step}.out",
+                    Path(task.saving_path) / f"gso_{step}.out",
+                    shallow=False,
+                )
+            with open(Path(task.saving_path) / GSO_TIMING_FILE) as timing_file:
+                timing = json.load(timing_file)
+            with open(Path(expected_task.saving_path) / GSO_TIMING_FILE) as timing_file:
+                expected_timing = json.load(timing_file)
+            assert timing["counters"] == expected_timing["counters"]
+            assert timing["counters"]["steps"] == task.steps
+            assert timing["times"]["scoring"] > 0.0
+        assert timing["counters"]["scored_poses"] > 0
+        assert timing["counters"]["neighbor_pairs"] > 0
+        assert tasks[1].gso.swarm.timer.counters["cache_misses"] > 0
+
+    def test_run_scoring_threads(self):
+        self.write_positions(20, 2.0)
+        expected = [self.create_swarm_task(i, "sequential", MJ3h()) for i in range(3)]
+        for task in expected:
+            task.run()
+        scoring_function = MJ3h()
+        tasks = [
+            self.create_swarm_task(
+                i, "threads", scoring_function, array_swarm=(i == 2), scoring_threads=3
+            )
+            for i in range(3)
+        ]
+
+        tasks[0].run()
+        run_lockstep(tasks[1:])
+
+        for task, expected_task in zip(tasks, expected):
+            for step in (0, task.steps):
+                assert filecmp.cmp(
+                    Path(expected_task.saving_path) / f"gso_{step}.out",
+                    Path(task.saving_path) / f"gso_{step}.out",
+                    shallow=False,
+                )
@@ -3,13 +3,18 @@
 import shutil
 import os
 import filecmp
+import io
+from contextlib import redirect_stdout
 from pathlib import Path
+import numpy as np
 from nose.tools import assert_almost_equals
 from nose.tools import raises
 from lightdock.pdbutil.PDBIO import (
     read_atom_line,
+    read_atom_table,
     parse_complex_from_file,
     write_pdb_to_file,
+    atom_table_cache_file,
 )
 from lightdock.structure.complex import Complex
 from lightdock.error.lightdock_errors import PDBParsingError
@@ -94,6 +99,20 @@ class TestPDBReader:
         assert len(residues) == 1
         assert len(chains) == 1
 
+    def test_parse_multi_model_warnings(self):
+        pdb_file = self.test_path / "multi_model.pdb"
+        shutil.copyfile(self.golden_data_path / "multi_model.pdb", pdb_file)
+
+        # Ignored atoms of the first model are reported before the other models
+        for cache in [False, True, True]:
+            output = io.StringIO()
+            with redirect_stdout(output):
+                parse_complex_from_file(pdb_file, ["CA"], verbose=True, cache=cache)
+            lines = output.getvalue().splitlines()
+
+            assert lines[0] == "[PDBParsingWarning] Ignored atom A.ARG.1 CA"
+            assert lines[1].startswith("[pdb] WARNING: Multiple models found")
+
     def test_write_pdb_to_file(self):
         atoms, _, chains = parse_complex_from_file(
             self.golden_data_path / "1PPE_l_u.pdb"
@@ -128,3 +147,62 @@ class TestPDBReader:
             self.golden_data_path / "parsed_1PPE_lig_with_H.pdb",
             self.test_path / "parsed_1PPE_lig_with_H.pdb",
         )
+
+    def test_read_atom_table(self):
+        lines = [
+            "ATOM     12  NH2 ARG A   1       2.559  16.752    1.00       14.90           N\n",
+            "HETATM   13 ZN    ZN B 101A     -1.000   2.000   3.5                          \n",
+        ]
+        table = read_atom_table(lines)
+
+        assert np.all(table["hetatm"] == [False, True])
+        assert np.all(table["number"] == [12, 13])
+        assert np.all(table["name"] == ["NH2", "ZN"])
+        assert np.all(table["residue_name"] == ["ARG", "ZN"])
+        assert np.all(table["chain_id"] == ["A", "B"])
+        assert np.all(table["residue_number"] == [1, 101])
+        assert np.all(table["residue_insertion"] == [" ", "A"])
+        assert np.all(table["coordinates"] == [[2.559, 16.752, 1.0], [-1.0, 2.0, 3.5]])
+        assert np.all(table["occupancy"] == [1.0, 1.0])
+        assert np.all(table["b_factor"] == [14.9, 0.0])
+        assert np.all(table["element"] == ["N", ""])
+
+    def test_read_atom_table_wrong_records(self):
+        line = "ATOM     11  NH2 ARG A   1       2.559  16.752     NaN  1.00 14.90           N"
+        assert read_atom_table([line]) is None
+        line = "ATOM     OO  NH2 ARG A   1       2.559  16.752    1.00  1.00 14.90           N"
+        assert read_atom_table([line]) is None
+
+    def test_parse_complex_from_file_cache(self):
+        pdb_file = self.test_path / "lightdock_1PPE_lig_with_H.pdb"
+        shutil.copyfile(self.golden_data_path / "1PPE_lig_with_H.pdb", pdb_file)
+        cache_file = atom_table_cache_file(pdb_file)
+        expected, _, _ = parse_complex_from_file(pdb_file, ["H"])
+
+        atoms, residues, chains = parse_complex_from_file(pdb_file, ["H"], cache=True)
+        assert cache_file.exists()
+        modified = cache_file.stat().st_mtime_ns
+        cached, cached_residues, cached_chains = parse_complex_from_file(
+            pdb_file, ["H"], cache=True
+        )
+
+        assert cache_file.stat().st_mtime_ns == modified
+        assert len(residues) == len(cached_residues)
+        assert len(chains) == len(cached_chains)
+        for atom, other in zip(expected, cached):
+            assert str(atom) == str(other)
+            assert atom.__class__ == other.__class__
+            assert (atom.x, atom.y, atom.z) == (other.x, other.y, other.z)
+        assert len(expected) == len(atoms) == len(cached)
+
+        # Ignored atoms are not part of the cache
+        all_atoms, _, _ = parse_complex_from_file(pdb_file, cache=True)
+        assert len(all_atoms) > len(cached)
+
+        # A modified file invalidates the cache
+        with open(pdb_file) as handle:
+            lines = handle.readlines()
+        with open(pdb_file, "w") as output:
+            output.writelines(lines[:10])
+        atoms, _, _ = parse_complex_from_file(pdb_file, cache=True)
+        assert len(atoms) == 10
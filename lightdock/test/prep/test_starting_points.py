@@ -4,8 +4,13 @@ import os
 import shutil
 import filecmp
 from pathlib import Path
+import numpy as np
 from nose.tools import assert_almost_equal
-from lightdock.prep.starting_points import points_on_sphere, calculate_surface_points
+from lightdock.prep.starting_points import (
+    points_on_sphere,
+    calculate_surface_points,
+    incompatible_points,
+)
 from lightdock.structure.complex import Complex
 from lightdock.pdbutil.PDBIO import parse_complex_from_file, create_pdb_from_points
 
@@ -50,6 +55,24 @@ class TestStartingPoints:
             self.golden_data_path / "100_points.pdb", self.test_path / "points.pdb"
         )
 
+    def test_incompatible_points(self):
+        rng = np.random.default_rng(1)
+        centroids = rng.uniform(0.0, 40.0, size=(30, 3))
+        sampling = np.array(points_on_sphere(20)) * 7.0 + centroids[:, None, :]
+
+        mask = incompatible_points(sampling, centroids, 7.0)
+
+        for i_centroid, points in enumerate(sampling):
+            for i_p, p in enumerate(points):
+                expected = any(
+                    n != i_centroid
+                    and np.linalg.norm(centroids[i_centroid] - centroid) <= 20.0
+                    and np.linalg.norm(p - centroid) <= 7.0
+                    for n, centroid in enumerate(centroids)
+                )
+                assert mask[i_centroid, i_p] == expected
+        assert 0 < np.count_nonzero(mask) < mask.size
+
     def test_calculate_starting_points(self):
         # Receptor
         file_name = self.golden_data_path / "1PPE_rec.pdb"
@@ -0,0 +1,125 @@
+"""Tests for the batches of docking poses scored together"""
+
+from pathlib import Path
+import numpy as np
+from lightdock.scoring.batch import ScoringRequest, score_requests, gather_energies
+from lightdock.scoring.mj3h.driver import MJ3h, MJ3hAdapter
+from lightdock.scoring.fastdfire.driver import DFIRE, DFIREAdapter
+from lightdock.mathutil.lrandom import MTGenerator
+from lightdock.mathutil.cython.quaternion import Quaternion
+from lightdock.pdbutil.PDBIO import parse_complex_from_file
+from lightdock.structure.complex import Complex
+
+
+class CountingMJ3h(MJ3h):
+    def __init__(self):
+        super(CountingMJ3h, self).__init__()
+        self.batches = []
+
+    def batch_score(self, receptor, ligand, poses, *args):
+        self.batches.append(len(poses))
+        return super(CountingMJ3h, self).batch_score(receptor, ligand, poses, *args)
+
+
+class TestScoreRequests:
+    def __init__(self):
+        self.path = Path(__file__).absolute().parent
+        self.golden_data_path = self.path / "golden_data"
+        atoms, _, chains = parse_complex_from_file(
+            self.golden_data_path / "1PPErec.pdb"
+        )
+        receptor = Complex(chains, atoms)
+        atoms, _, chains = parse_complex_from_file(
+            self.golden_data_path / "1PPElig.pdb"
+        )
+        ligand = Complex(chains, atoms)
+        self.adapter = MJ3hAdapter(receptor, ligand)
+        self.dfire_adapter = DFIREAdapter(receptor, ligand)
+        self.poses = np.array(
+            [
+                [20.0, 5.0, 0.0, 1.0, 0.0, 0.0, 0.0],
+                [18.0, 4.0, 2.0, 0.0, 1.0, 0.0, 0.0],
+                [22.0, 6.0, -2.0, 0.0, 0.0, 1.0, 0.0],
+                [19.0, 3.0, 1.0, 0.5, 0.5, 0.5, 0.5],
+                [21.0, 7.0, -1.0, 0.0, 0.0, 0.0, 1.0],
+            ]
+        )
+
+    def request(self, scoring_function, poses, adapter=None):
+        adapter = adapter or self.adapter
+        return ScoringRequest(
+            scoring_function,
+            adapter.receptor_model,
+            adapter.ligand_model,
+            poses,
+            0,
+            0,
+            [0] * len(poses),
+            [0] * len(poses),
+        )
+
+    def test_score_requests(self):
+        scoring_function = CountingMJ3h()
+        other_function = CountingMJ3h()
+        requests = [
+            self.request(scoring_function, self.poses[:2]),
+            self.request(other_function, self.poses[2:]),
+            self.request(scoring_function, self.poses[2:]),
+        ]
+
+        energies = score_requests(requests)
+
+        # Requests of the same scoring function and models share a batch
+        assert scoring_function.batches == [5]
+        assert other_function.batches == [3]
+        expected = MJ3h().batch_score(
+            self.adapter.receptor_model, self.adapter.ligand_model, self.poses
+        )
+        assert np.array_equal(energies[0], expected[:2])
+        assert np.array_equal(energies[1], expected[2:])
+        assert np.array_equal(energies[2], expected[2:])
+
+    def test_score_requests_threads(self):
+        scoring_function = CountingMJ3h()
+        requests = [
+            self.request(scoring_function, self.poses[:2]),
+            self.request(scoring_function, self.poses[2:]),
+        ]
+
+        energies = score_requests(requests, num_threads=2)
+
+        # The batch is split in a chunk per thread
+        assert sorted(scoring_function.batches) == [2, 3]
+        expected = score_requests(requests)
+        assert np.array_equal(energies[0], expected[0])
+        assert np.array_equal(energies[1], expected[1])
+
+    def test_score_requests_threads_native(self):
+        rng = MTGenerator(1234)
+        poses = []
+        for _ in range(40):
+            q = Quaternion.random(rng)
+            poses.append(
+                [rng(18.0, 22.0), rng(3.0, 7.0), rng(-2.0, 2.0), q.w, q.x, q.y, q.z]
+            )
+        requests = [
+            self.request(DFIRE(), np.array(poses[:15]), self.dfire_adapter),
+            self.request(DFIRE(), np.array(poses[15:]), self.dfire_adapter),
+        ]
+
+        expected = score_requests(requests)
+        energies = score_requests(requests, num_threads=4)
+
+        assert np.any(expected[0])
+        for request_energies, expected_energies in zip(energies, expected):
+            assert np.array_equal(request_energies, expected_energies)
+
+    def test_score_no_requests(self):
+        assert score_requests([]) == []
+
+    def test_gather_energies(self):
+        energies = gather_energies(
+            5, [np.array([0, 3]), np.array([1, 2, 4])], [[1.0, 4.0], [2.0, 3.0, 5.0]]
+        )
+
+        assert np.array_equal(energies, [1.0, 2.0, 3.0, 4.0, 5.0])
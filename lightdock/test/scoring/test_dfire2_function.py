@@ -1,8 +1,10 @@
 """Tests for DFIRE2 scoring function module"""
 
 from pathlib import Path
+import numpy as np
 from nose.tools import assert_almost_equal
 from lightdock.scoring.dfire2.driver import DFIRE2, DFIRE2Adapter
+from lightdock.scoring.functions import ScoringFunction
 from lightdock.pdbutil.PDBIO import parse_complex_from_file
 from lightdock.structure.complex import Complex
 
@@ -72,3 +74,36 @@ class TestDFIRE2:
                 adapter.ligand_model.coordinates[0],
             ),
         )
+
+    def test_batch_score_DFIRE2(self):
+        atoms, _, chains = parse_complex_from_file(
+            self.golden_data_path / "1PPErec.pdb"
+        )
+        receptor = Complex(chains, atoms)
+        atoms, _, chains = parse_complex_from_file(
+            self.golden_data_path / "1PPElig.pdb"
+        )
+        ligand = Complex(chains, atoms)
+        adapter = DFIRE2Adapter(receptor, ligand)
+        poses = np.array(
+            [
+                [0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0],
+                [2.0, -1.0, 0.5, 0.5, 0.5, 0.5, 0.5],
+                [-3.0, 1.5, 4.0, 0.0, 1.0, 0.0, 0.0],
+            ]
+        )
+
+        energies = self.dfire.batch_score(
+            adapter.receptor_model, adapter.ligand_model, poses
+        )
+
+        expected = [
+            self.dfire(
+                adapter.receptor_model, receptor_pose, adapter.ligand_model, ligand_pose
+            )
+            for receptor_pose, ligand_pose in ScoringFunction.build_poses(
+                adapter.receptor_model, adapter.ligand_model, poses
+            )
+        ]
+        assert len(energies) == 3
+        assert (energies == np.array(expected)).all()
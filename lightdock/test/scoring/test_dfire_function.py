@@ -1,8 +1,10 @@
 """Tests for DFIRE scoring function module"""
 
 from pathlib import Path
+import numpy as np
 from nose.tools import assert_almost_equal
 from lightdock.scoring.dfire.driver import DFIREPotential, DFIRE, DFIREAdapter
+from lightdock.scoring.functions import ScoringFunction
 from lightdock.pdbutil.PDBIO import parse_complex_from_file
 from lightdock.structure.complex import Complex
 
@@ -79,3 +81,36 @@ class TestDFIRE:
                 adapter.ligand_model.coordinates[0],
             ),
         )
+
+    def test_batch_score_DFIRE(self):
+        atoms, _, chains = parse_complex_from_file(
+            self.golden_data_path / "1PPErec.pdb"
+        )
+        receptor = Complex(chains, atoms)
+        atoms, _, chains = parse_complex_from_file(
+            self.golden_data_path / "1PPElig.pdb"
+        )
+        ligand = Complex(chains, atoms)
+        adapter = DFIREAdapter(receptor, ligand)
+        poses = np.array(
+            [
+                [0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0],
+                [2.0, -1.0, 0.5, 0.5, 0.5, 0.5, 0.5],
+                [-3.0, 1.5, 4.0, 0.0, 1.0, 0.0, 0.0],
+            ]
+        )
+
+        energies = self.dfire.batch_score(
+            adapter.receptor_model, adapter.ligand_model, poses
+        )
+
+        expected = [
+            self.dfire(
+                adapter.receptor_model, receptor_pose, adapter.ligand_model, ligand_pose
+            )
+            for receptor_pose, ligand_pose in ScoringFunction.build_poses(
+                adapter.receptor_model, adapter.ligand_model, poses
+            )
+        ]
+        assert len(energies) == 3
+        assert (energies == np.array(expected)).all()
@@ -1,8 +1,14 @@
 """Tests for C implementation of DFIRE scoring function module"""
 
 from pathlib import Path
-from nose.tools import assert_almost_equal
+import numpy as np
+from nose.tools import assert_almost_equal, assert_raises
 from lightdock.scoring.fastdfire.driver import DFIRE, DFIREAdapter
+from lightdock.scoring.fastdfire.c.cdfire import (
+    calculate_dfire,
+    calculate_dfire_batch,
+)
+from lightdock.scoring.functions import ScoringFunction
 from lightdock.pdbutil.PDBIO import parse_complex_from_file
 from lightdock.structure.complex import Complex
 
@@ -72,3 +78,138 @@ class TestFastDFIRE:
                 adapter.ligand_model.coordinates[0],
             ),
         )
+
+    def test_calculate_FastDFIRE_receptor_grid(self):
+        atoms, _, chains = parse_complex_from_file(
+            self.golden_data_path / "1PPErec.pdb"
+        )
+        receptor = Complex(chains, atoms)
+        atoms, _, chains = parse_complex_from_file(
+            self.golden_data_path / "1PPElig.pdb"
+        )
+        ligand = Complex(chains, atoms)
+        adapter = DFIREAdapter(receptor, ligand)
+        receptor_coordinates = adapter.receptor_model.coordinates[0]
+        ligand_coordinates = adapter.ligand_model.coordinates[0]
+
+        without_grid, interface_receptor, interface_ligand = calculate_dfire(
+            adapter.receptor_model,
+            adapter.ligand_model,
+            self.dfire.potential.dfire_energy,
+            receptor_coordinates,
+            ligand_coordinates,
+            3.9,
+        )
+        grid = self.dfire.get_receptor_grid(receptor_coordinates)
+        with_grid, grid_interface_receptor, grid_interface_ligand = calculate_dfire(
+            adapter.receptor_model,
+            adapter.ligand_model,
+            self.dfire.potential.dfire_energy,
+            receptor_coordinates,
+            ligand_coordinates,
+            3.9,
+            grid,
+        )
+
+        assert without_grid == with_grid
+        assert (interface_receptor == grid_interface_receptor).all()
+        assert (interface_ligand == grid_interface_ligand).all()
+        # Same receptor pose reuses the grid, a moved receptor rebuilds it
+        assert grid is self.dfire.get_receptor_grid(receptor_coordinates.clone())
+        moved = receptor_coordinates.clone()
+        moved.translate([1.0, 0.0, 0.0])
+        assert grid is not self.dfire.get_receptor_grid(moved)
+
+    def test_batch_score_FastDFIRE(self):
+        atoms, _, chains = parse_complex_from_file(
+            self.golden_data_path / "1PPErec.pdb"
+        )
+        receptor = Complex(chains, atoms)
+        atoms, _, chains = parse_complex_from_file(
+            self.golden_data_path / "1PPElig.pdb"
+        )
+        ligand = Complex(chains, atoms)
+        adapter = DFIREAdapter(receptor, ligand)
+        poses = np.array(
+            [
+                [0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0],
+                [2.0, -1.0, 0.5, 0.5, 0.5, 0.5, 0.5],
+                [-3.0, 1.5, 4.0, 0.0, 1.0, 0.0, 0.0],
+            ]
+        )
+
+        energies = self.dfire.batch_score(
+            adapter.receptor_model, adapter.ligand_model, poses
+        )
+
+        expected = [
+            self.dfire(
+                adapter.receptor_model, receptor_pose, adapter.ligand_model, ligand_pose
+            )
+            for receptor_pose, ligand_pose in ScoringFunction.build_poses(
+                adapter.receptor_model, adapter.ligand_model, poses
+            )
+        ]
+        assert len(energies) == 3
+        assert (energies == np.array(expected)).all()
+
+    def test_calculate_FastDFIRE_wrong_receptor_grid(self):
+        atoms, _, chains = parse_complex_from_file(
+            self.golden_data_path / "1PPErec.pdb"
+        )
+        receptor = Complex(chains, atoms)
+        atoms, _, chains = parse_complex_from_file(
+            self.golden_data_path / "1PPElig.pdb"
+        )
+        ligand = Complex(chains, atoms)
+        adapter = DFIREAdapter(receptor, ligand)
+        receptor_coordinates = adapter.receptor_model.coordinates[0]
+        grid = self.dfire.get_receptor_grid(receptor_coordinates)
+        wrong_grids = [
+            grid[:3],
+            (grid[0][:2],) + grid[1:],
+            grid[:3] + (grid[3][:-1],),
+            grid[:2] + (grid[2][:-1], grid[3]),
+        ]
+
+        for wrong_grid in wrong_grids:
+            assert_raises(
+                ValueError,
+                calculate_dfire,
+                adapter.receptor_model,
+                adapter.ligand_model,
+                self.dfire.potential.dfire_energy,
+                receptor_coordinates,
+                adapter.ligand_model.coordinates[0],
+                3.9,
+                wrong_grid,
+            )
+
+    def test_batch_score_FastDFIRE_wrong_arguments(self):
+        rec_types = np.zeros(10, dtype=np.uint32)
+        lig_types = np.zeros(5, dtype=np.uint32)
+        energy = self.dfire.potential.dfire_energy
+        rec_coords = np.zeros((2, 10, 3))
+        rec_index = np.array([0, 1, 1], dtype=np.int32)
+        lig_coords = np.ones((3, 5, 3))
+        arguments = [rec_types, lig_types, energy, rec_coords, rec_index, lig_coords]
+        wrong_arguments = [
+            (0, rec_types[:9]),
+            (1, np.full(5, 168, dtype=np.uint32)),
+            (2, energy[:100]),
+            (3, rec_coords[0]),
+            (3, rec_coords[:, :, :2]),
+            (4, rec_index[:2]),
+            (4, np.array([0, 2, 1], dtype=np.int32)),
+            (4, np.array([0, -1, 1], dtype=np.int32)),
+            (5, lig_coords[:, :4]),
+        ]
+
+        energies, _, _ = calculate_dfire_batch(*arguments)
+        assert len(energies) == 3
+        for position, wrong in wrong_arguments:
+            assert_raises(
+                ValueError,
+                calculate_dfire_batch,
+                *(arguments[:position] + [wrong] + arguments[position + 1 :])
+            )
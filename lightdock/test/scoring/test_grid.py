@@ -0,0 +1,138 @@
+"""Tests for the precomputed receptor potential grids"""
+
+import shutil
+import os
+import filecmp
+from pathlib import Path
+import numpy as np
+from nose.tools import assert_almost_equal, raises
+from lightdock.scoring.grid import PotentialMaps, load_grid, validation_report
+from lightdock.scoring.cpydock.driver import CPyDock, CPyDockAdapter
+from lightdock.scoring.dna.driver import DNA, DNAAdapter
+from lightdock.pdbutil.PDBIO import parse_complex_from_file
+from lightdock.structure.complex import Complex
+from lightdock.error.lightdock_errors import NotSupportedInScoringError
+
+
+class TestPotentialMaps:
+    def test_interpolate(self):
+        maps = np.arange(2 * 3 * 4 * 5, dtype=np.float64).reshape(2, 3, 4, 5)
+        potential = PotentialMaps([-1.0, 0.0, 1.0], 0.5, maps)
+        nodes = np.array([[-1.0, 0.0, 1.0], [-0.5, 1.0, 2.5], [-0.5, 0.5, 2.0]])
+        middle = np.array([[-0.75, 0.25, 1.25]])
+        outside = np.array([[-1.5, 0.0, 1.0], [0.0, 0.0, 1.0]])
+
+        assert np.allclose([0.0, 33.0, 27.0], potential.interpolate(nodes))
+        assert np.allclose([60.0, 93.0, 27.0], potential.interpolate(nodes, [1, 1, 0]))
+        assert np.allclose(
+            np.mean(maps[1, :2, :2, :2]), potential.interpolate(middle, [1])
+        )
+        assert np.allclose([0.0, 0.0], potential.interpolate(outside))
+
+
+class TestReceptorGrid:
+    def __init__(self):
+        self.path = Path(__file__).absolute().parent
+        self.test_path = self.path / "scratch_grid"
+        self.golden_data_path = self.path / "golden_data"
+        self.poses = np.array(
+            [
+                [0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0],
+                [1.0, -1.0, 0.5, 0.8, 0.6, 0.0, 0.0],
+                [-2.0, 0.5, 1.0, 0.6, 0.0, 0.8, 0.0],
+                [0.5, 2.0, -1.5, 0.0, 0.0, 0.6, 0.8],
+            ]
+        )
+
+    def setup(self):
+        try:
+            shutil.rmtree(self.test_path)
+        except OSError:
+            pass
+        os.mkdir(self.test_path)
+
+    def teardown(self):
+        try:
+            shutil.rmtree(self.test_path)
+        except OSError:
+            pass
+
+    def read_complex(self, file_name):
+        atoms, _, chains = parse_complex_from_file(self.golden_data_path / file_name)
+        return Complex(
+            chains, atoms, structure_file_name=(self.golden_data_path / file_name)
+        )
+
+    def test_pydock_grid_1AY7(self):
+        adapter = CPyDockAdapter(
+            self.read_complex("1AY7_rec.pdb"), self.read_complex("1AY7_lig.pdb")
+        )
+        receptor = adapter.receptor_model
+        ligand = adapter.ligand_model
+        pydock = CPyDock()
+        pydock.use_grid(receptor, ligand, 2.0)
+
+        report, (exact, interpolated) = validation_report(
+            pydock, receptor, ligand, self.poses
+        )
+        elec, vdw, solv_rec, solv_lig, interface_rec, interface_lig = (
+            pydock.grid_energy(
+                receptor, receptor.coordinates[0], ligand, ligand.coordinates[0]
+            )
+        )
+
+        assert_almost_equal(-15.923994756, exact[0])
+        assert np.all(np.abs(interpolated - exact) < 3.0)
+        assert np.corrcoef(exact, interpolated)[0, 1] > 0.9
+        assert len(report.splitlines()) == len(self.poses) + 2
+        # Contact terms are exact
+        assert_almost_equal(-2.366778306939172, solv_rec)
+        assert_almost_equal(-3.10545259385459, solv_lig)
+        assert len(interface_rec) == len(interface_lig) == 456
+
+    def test_dna_grid_3MFK(self):
+        adapter = DNAAdapter(
+            self.read_complex("3mfk_homodimer.pdb"), self.read_complex("3mfk_dna.pdb")
+        )
+        receptor = adapter.receptor_model
+        ligand = adapter.ligand_model
+        dna = DNA()
+        dna.use_grid(receptor, ligand, 2.0)
+
+        energy = dna(receptor, receptor.coordinates[0], ligand, ligand.coordinates[0])
+
+        assert abs(energy - -2716.68018700585) < 10.0
+
+    def test_load_grid(self):
+        adapter = DNAAdapter(
+            self.read_complex("3mfk_homodimer.pdb"), self.read_complex("3mfk_dna.pdb")
+        )
+        receptor = adapter.receptor_model
+        ligand = adapter.ligand_model
+        grid_file = self.test_path / "grid.npz"
+        backup_file = self.test_path / "backup.npz"
+
+        grid = load_grid(receptor, ligand, 3.0, grid_file)
+        shutil.copyfile(grid_file, backup_file)
+        loaded = load_grid(receptor, ligand, 3.0, grid_file)
+
+        assert filecmp.cmp(grid_file, backup_file)
+        assert loaded.checksum == grid.checksum
+        assert loaded.near_cutoff == grid.near_cutoff
+        assert np.all(loaded.electrostatics.maps == grid.electrostatics.maps)
+        assert np.all(loaded.vdw.maps == grid.vdw.maps)
+        assert np.all(loaded.ligand_types == grid.ligand_types)
+
+        # A different spacing does not match the saved grid
+        rebuilt = load_grid(receptor, ligand, 4.0, grid_file)
+        assert rebuilt.checksum != grid.checksum
+        assert not filecmp.cmp(grid_file, backup_file)
+
+    @raises(NotSupportedInScoringError)
+    def test_load_grid_multiple_structures(self):
+        receptor = self.read_complex("3mfk_homodimer.pdb")
+        ligand = self.read_complex("3mfk_dna.pdb")
+        adapter = DNAAdapter(receptor, ligand)
+        adapter.receptor_model.coordinates.append(adapter.receptor_model.coordinates[0])
+
+        load_grid(adapter.receptor_model, adapter.ligand_model, 3.0)
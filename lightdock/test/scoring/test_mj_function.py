@@ -43,6 +43,8 @@ class TestMJ3hAdapter:
         assert adapter.ligand_model.coordinates[0].coordinates.shape == (29, 3)
         assert len(adapter.receptor_model.objects) == 223
         assert len(adapter.ligand_model.objects) == 29
+        assert adapter.receptor_model.residue_types.shape == (223,)
+        assert (adapter.ligand_model.residue_types >= 0).all()
 
 
 class TestMJ3h:
@@ -0,0 +1,106 @@
+"""Tests for the persistent cache of docking models"""
+
+import shutil
+import os
+from pathlib import Path
+import numpy as np
+from lightdock.scoring.model_cache import model_cache_file, model_checksum
+from lightdock.scoring.fastdfire.driver import DFIRE, DFIREAdapter
+from lightdock.pdbutil.PDBIO import parse_complex_from_file
+from lightdock.structure.complex import Complex
+
+
+class TestModelCache:
+    def __init__(self):
+        self.path = Path(__file__).absolute().parent
+        self.test_path = self.path / "scratch_model_cache"
+        self.golden_data_path = self.path / "golden_data"
+        self.dfire = DFIRE()
+
+    def setup(self):
+        try:
+            shutil.rmtree(self.test_path)
+        except OSError:
+            pass
+        os.mkdir(self.test_path)
+        for file_name in ("1PPErec.pdb", "1PPElig.pdb"):
+            shutil.copyfile(
+                self.golden_data_path / file_name, self.test_path / file_name
+            )
+
+    def teardown(self):
+        try:
+            shutil.rmtree(self.test_path)
+        except OSError:
+            pass
+
+    def read_complex(self, file_name):
+        atoms, _, chains = parse_complex_from_file(self.test_path / file_name)
+        return Complex(chains, atoms, structure_file_name=(self.test_path / file_name))
+
+    def energy(self, adapter):
+        return self.dfire(
+            adapter.receptor_model,
+            adapter.receptor_model.coordinates[0],
+            adapter.ligand_model,
+            adapter.ligand_model.coordinates[0],
+        )
+
+    def test_cached_models(self):
+        receptor = self.read_complex("1PPErec.pdb")
+        ligand = self.read_complex("1PPElig.pdb")
+        adapter = DFIREAdapter(receptor, ligand, cache=True)
+        receptor_file = model_cache_file(adapter, receptor)
+        modified = os.stat(receptor_file).st_mtime_ns
+
+        cached = DFIREAdapter(receptor, ligand, cache=True)
+
+        assert receptor_file == str(self.test_path / "1PPErec_fastdfire_model.pkl")
+        assert os.path.exists(model_cache_file(adapter, ligand))
+        assert os.stat(receptor_file).st_mtime_ns == modified
+        assert np.all(
+            adapter.receptor_model.coordinates[0].coordinates
+            == cached.receptor_model.coordinates[0].coordinates
+        )
+        assert np.all(
+            adapter.receptor_model.reference_points.coordinates
+            == cached.receptor_model.reference_points.coordinates
+        )
+        assert self.energy(adapter) == self.energy(cached)
+
+    def test_checksum(self):
+        receptor = self.read_complex("1PPErec.pdb")
+        ligand = self.read_complex("1PPElig.pdb")
+        adapter = DFIREAdapter(receptor, ligand)
+        checksum = model_checksum(adapter, receptor, None)
+
+        assert checksum == model_checksum(adapter, receptor, None)
+        assert checksum != model_checksum(adapter, receptor, ["A.ILE.16"])
+        assert checksum != model_checksum(adapter, ligand, None)
+
+        # Auxiliary input files are part of the checksum
+        input_file = self.test_path / "input.dat"
+        adapter.input_files = lambda molecule: [input_file]
+        missing = model_checksum(adapter, receptor, None)
+        with open(input_file, "w") as output:
+            output.write("1.0")
+        assert missing != model_checksum(adapter, receptor, None)
+
+        receptor.translate([1.0, 0.0, 0.0])
+        moved = model_checksum(adapter, receptor, None)
+        assert moved != checksum
+
+    def test_stale_model(self):
+        receptor = self.read_complex("1PPErec.pdb")
+        ligand = self.read_complex("1PPElig.pdb")
+        DFIREAdapter(receptor, ligand, cache=True)
+
+        receptor.translate([1.0, 0.0, 0.0])
+        adapter = DFIREAdapter(receptor, ligand, cache=True)
+        expected = DFIREAdapter(receptor, ligand)
+
+        assert np.all(
+            adapter.receptor_model.coordinates[0].coordinates
+            == expected.receptor_model.coordinates[0].coordinates
+        )
+        assert self.energy(adapter) == self.energy(expected)
@@ -0,0 +1,52 @@
+"""Tests for VdW scoring function module"""
+
+from pathlib import Path
+import numpy as np
+from lightdock.scoring.vdw.driver import VdW, VdWAdapter
+from lightdock.scoring.functions import ScoringFunction
+from lightdock.pdbutil.PDBIO import parse_complex_from_file
+from lightdock.structure.complex import Complex
+
+
+class TestVdW:
+    def __init__(self):
+        self.path = Path(__file__).absolute().parent
+        self.golden_data_path = self.path / "golden_data"
+        self.vdw = VdW()
+
+    def test_batch_score_VdW(self):
+        atoms, _, chains = parse_complex_from_file(
+            self.golden_data_path / "1PPErec.pdb"
+        )
+        receptor = Complex(chains, atoms)
+        atoms, _, chains = parse_complex_from_file(
+            self.golden_data_path / "1PPElig.pdb"
+        )
+        ligand = Complex(chains, atoms)
+        adapter = VdWAdapter(receptor, ligand)
+        poses = np.array(
+            [
+                [0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0],
+                [2.0, -1.0, 0.5, 0.5, 0.5, 0.5, 0.5],
+                [-3.0, 1.5, 4.0, 0.0, 1.0, 0.0, 0.0],
+                [60.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0],
+            ]
+        )
+
+        energies = self.vdw.batch_score(
+            adapter.receptor_model, adapter.ligand_model, poses
+        )
+
+        expected = [
+            self.vdw(
+                adapter.receptor_model, receptor_pose, adapter.ligand_model, ligand_pose
+            )
+            for receptor_pose, ligand_pose in ScoringFunction.build_poses(
+                adapter.receptor_model, adapter.ligand_model, poses
+            )
+        ]
+        assert len(energies) == 4
+        assert (energies == np.array(expected)).all()
+        # Poses in contact and a ligand far from the receptor
+        assert energies[0] != 0.0
+        assert energies[3] == 0.0
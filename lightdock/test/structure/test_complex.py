@@ -137,6 +137,49 @@ class TestComplex:
         assert_almost_equals(0.0, cc[1])
         assert_almost_equals(0.0, cc[2])
 
+    def test_center_of_coordinates_ignores_hydrogens(self):
+        atoms = self.atoms1 + [Atom(5, "H", "", "A", "ALA", x=9.0, y=9.0, z=9.0)]
+        protein = Complex(chains=[Chain("A", [Residue("ALA", 1, "", atoms)])])
+        cc = protein.center_of_coordinates()
+        assert_almost_equals(1.5, cc[0])
+        assert_almost_equals(1.5, cc[1])
+        assert_almost_equals(1.5, cc[2])
+
+    def test_from_structures_with_coordinates(self):
+        structures = [
+            {
+                "atoms": self.atoms1,
+                "residues": self.residues[:1],
+                "chains": [Chain("A", self.residues[:1])],
+                "file_name": "first.pdb",
+            },
+            {
+                "coordinates": np.array([[0.0, 0.0, 0.0], [2.0, 4.0, 6.0]]),
+                "file_name": "second.pdb",
+            },
+        ]
+        protein = Complex.from_structures(structures)
+
+        assert protein.num_structures == 2
+        assert protein.structure_file_names == ["first.pdb", "second.pdb"]
+        assert np.allclose(
+            [[1.0, 1.0, 1.0], [2.0, 2.0, 2.0]], protein.atom_coordinates[0].coordinates
+        )
+        assert np.allclose([1.0, 2.0, 3.0], protein.center_of_coordinates(1))
+
+    def test_representative_membrane(self):
+        atoms = [
+            Atom(1, "CA", "", "A", "ALA", x=1.0, y=1.0, z=1.0),
+            Atom(2, "BJ", "", "A", "MMB", element="C", x=2.0, y=2.0, z=2.0),
+            Atom(3, "CA", "", "A", "HIS", x=3.0, y=3.0, z=3.0),
+        ]
+        protein = Complex(chains=[Chain("A", [Residue("ALA", 1, "", atoms)])])
+
+        assert np.allclose(
+            [[1.0, 1.0, 1.0], [3.0, 3.0, 3.0]], protein.representative(True).coordinates
+        )
+        assert len(protein.representative()) == 3
+
     def test_translate(self):
         atom1 = Atom(2, "C", "", "A", "ALA", x=2.0, y=2.0, z=2.0)
         atom2 = Atom(2, "C", "", "A", "ALA", x=0.0, y=0.0, z=0.0)
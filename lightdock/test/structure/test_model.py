@@ -128,3 +128,71 @@ class TestDockingModel:
         # Only center is used now
         expected_coordinates = SpacePoints([[0.6375, -0.125, 0.725]])
         assert expected_coordinates == docking_model.reference_points
+
+    def test_pose_coordinates(self):
+        coordinates = [[1.2, -1.0, 2.0], [0.0, 0.0, 0.0], [0.5, 3.0, 0.5]]
+        nm_mask = np.array([True, False, True])
+        n_modes = np.array(
+            [
+                [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]],
+                [[0.5, 0.5, 0.5], [-1.0, 0.0, 2.0]],
+            ]
+        )
+        docking_model = DockingModel(
+            [], SpacePoints(coordinates), n_modes=n_modes, nm_mask=nm_mask
+        )
+        extent = np.array([0.3, -2.0])
+
+        pose = docking_model.pose_coordinates(0, extent)
+
+        expected = np.array(coordinates)
+        for i in range(len(extent)):
+            expected[nm_mask, :] += n_modes[i] * extent[i]
+        assert np.allclose(expected, pose.coordinates)
+        assert docking_model.modes_tensor.shape == (2, 9)
+        assert (docking_model.coordinates[0].coordinates == coordinates).all()
+
+    def test_pose_coordinates_in_place(self):
+        coordinates = [[1.2, -1.0, 2.0], [0.0, 0.0, 0.0], [0.5, 3.0, 0.5]]
+        n_modes = np.ones((1, 3, 3))
+        docking_model = DockingModel([], SpacePoints(coordinates), n_modes=n_modes)
+        pose = SpacePoints(np.zeros((3, 3)))
+        buffer = pose.coordinates
+
+        result = docking_model.pose_coordinates(0, np.array([0.5]), pose)
+
+        assert result is pose and pose.coordinates is buffer
+        assert np.allclose(np.array(coordinates) + 0.5, pose.coordinates)
+        docking_model.pose_coordinates(0, np.array([]), pose)
+        assert (pose.coordinates == coordinates).all()
+
+    def test_crop(self):
+        atoms = self.atoms1 + self.atoms2
+        coordinates = [[atom.x, atom.y, atom.z] for atom in atoms]
+        docking_model = DockingModel(
+            objects=atoms,
+            coordinates=[
+                SpacePoints(coordinates),
+                SpacePoints(np.array(coordinates) + 1.0),
+            ],
+            restraints={"A.ALA.1": [0, 1], "A.HIS.2": [2]},
+            membrane={"A.HIS.2": [3]},
+            reference_points=[[0, 0, 0]],
+            n_modes=np.ones((2, 12)),
+        )
+        docking_model.charges = np.array([0.1, 0.2, 0.3, 0.4])
+
+        cropped = docking_model.crop([1, 3])
+
+        assert cropped.objects == [atoms[1], atoms[3]]
+        assert np.allclose([0.2, 0.4], cropped.charges)
+        assert len(cropped) == 2
+        assert np.allclose([[2.0, 2.0, 2.0], [2.9, 2.8, 2.7]], cropped.coordinates[0])
+        assert np.allclose([[3.0, 3.0, 3.0], [3.9, 3.8, 3.7]], cropped.coordinates[1])
+        assert cropped.restraints == {"A.ALA.1": [0], "A.HIS.2": []}
+        assert cropped.membrane == {"A.HIS.2": [1]}
+        assert cropped.n_modes is None
+        # The original model is kept
+        assert len(docking_model.objects) == 4
+        assert np.allclose([0.1, 0.2, 0.3, 0.4], docking_model.charges)
+        assert docking_model.restraints["A.ALA.1"] == [0, 1]
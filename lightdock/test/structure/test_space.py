@@ -0,0 +1,50 @@
+"""Tests for SpacePoints class and rotation functions"""
+
+import numpy as np
+from lightdock.structure.space import SpacePoints, rotation_matrices, rotate_points
+from lightdock.mathutil.cython.quaternion import Quaternion
+
+
+class TestSpacePoints:
+    def __init__(self):
+        self.coordinates = [
+            [1.0, 1.0, 1.0],
+            [2.0, -1.5, 0.3],
+            [-12.1, 4.2, 33.7],
+            [0.0, 0.0, 0.0],
+        ]
+        self.quaternions = [
+            Quaternion(),
+            Quaternion(0.0, 1.0, 0.0, 0.0),
+            Quaternion(0.5, 0.5, 0.5, 0.5),
+            Quaternion(0.710997408, -0.360544029, 0.594585399, 0.105395202),
+            # Not normalized
+            Quaternion(2.0, -1.0, 0.5, 3.0),
+        ]
+
+    def test_rotate(self):
+        for q in self.quaternions:
+            points = SpacePoints(self.coordinates)
+            points.rotate(q)
+
+            expected = [q.rotate(point) for point in self.coordinates]
+
+            assert np.allclose(expected, points.coordinates)
+
+    def test_rotation_matrices(self):
+        matrices = rotation_matrices([[1.0, 0.0, 0.0, 0.0], [0.0, 0.0, 0.0, 1.0]])
+
+        assert matrices.shape == (2, 3, 3)
+        assert np.allclose(np.eye(3), matrices[0])
+        assert np.allclose(np.diag([-1.0, -1.0, 1.0]), matrices[1])
+
+    def test_rotate_points(self):
+        quaternions = [[q.w, q.x, q.y, q.z] for q in self.quaternions]
+
+        rotated = rotate_points(quaternions, np.array(self.coordinates))
+
+        assert rotated.shape == (5, 4, 3)
+        for q, coordinates in zip(self.quaternions, rotated):
+            points = SpacePoints(self.coordinates)
+            points.rotate(q)
+            assert np.allclose(points.coordinates, coordinates)
@@ -1,13 +1,18 @@
 import numpy as np
 import operator
 import os
+import re
+from pathlib import Path
 from lightdock.mathutil.cython.quaternion import Quaternion
 from lightdock.constants import (
     RANKING_BY_LUCIFERIN_FILE,
     RANKING_BY_SCORING_FILE,
     RANKING_BY_RMSD_FILE,
     RANKING_FILE,
+    GSO_OUTPUT_FILE,
+    GSO_TRAJECTORY_FILE,
 )
+from lightdock.gso.trajectory import is_trajectory, read_trajectory, get_step
 from lightdock.util.logger import LoggingManager
 
 
@@ -85,8 +90,63 @@ def parse_coordinates(line):
     return coord, first, last
 
 
+def find_trajectory(file_name):
+    """Binary trajectory file and step to read instead of file_name.
+
+    If file_name is a trajectory, its last saved step is used. If file_name is a
+    gso_N.out file which does not exist but the trajectory of its swarm does, step N
+    is read from the trajectory. Returns (None, None) for text output files.
+    """
+    if is_trajectory(file_name):
+        return file_name, None
+    path = Path(file_name)
+    trajectory_file = path.parent / GSO_TRAJECTORY_FILE
+    match = re.match("^%s$" % (re.escape(GSO_OUTPUT_FILE) % r"(\d+)"), path.name)
+    if not path.exists() and match and is_trajectory(trajectory_file):
+        return trajectory_file, int(match.group(1))
+    return None, None
+
+
+def read_lightdock_trajectory(file_name, step=None, initial=None, final=None):
+    """Reads a step of a LightDock binary trajectory, the last saved one by default"""
+    pose_length, data = read_trajectory(file_name)
+    rows = get_step(data, step)
+    if not len(rows):
+        raise IOError("Step %s not found in %s" % (step, file_name))
+    results = []
+    for id_line, row in enumerate(rows):
+        if initial and final:
+            if (id_line + 2) > final:
+                break
+            if (id_line + 1) < initial:
+                continue
+        receptor_id, ligand_id, luciferin, num_neighbors, vision_range, scoring = row[
+            2 + pose_length :
+        ]
+        results.append(
+            DockingResult(
+                id_glowworm=int(row[1]),
+                receptor_id=int(receptor_id),
+                ligand_id=int(ligand_id),
+                luciferin=float(luciferin),
+                num_neighbors=int(num_neighbors),
+                vision_range=float(vision_range),
+                pose=[float(v) for v in row[2 : 2 + pose_length]],
+                scoring=float(scoring),
+            )
+        )
+    return results
+
+
 def read_lightdock_output(file_name, initial=None, final=None):
-    """Reads a LightDock output file and sorts it by energy"""
+    """Reads a LightDock output file and sorts it by energy.
+
+    Binary trajectories are read transparently, see find_trajectory.
+    """
+    trajectory_file, step = find_trajectory(file_name)
+    if trajectory_file:
+        return read_lightdock_trajectory(trajectory_file, step, initial, final)
+
     with open(file_name) as fin:
         raw_lines = [line for line in fin if line[0] != "#"]
         results = []
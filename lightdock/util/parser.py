@@ -21,6 +21,7 @@ from lightdock.constants import (
     DEFAULT_SWARMS_PER_RESTRAINT,
 )
 from lightdock.error.lightdock_errors import LightDockError
+from lightdock.util.analysis import find_trajectory
 from lightdock.version import CURRENT_VERSION
 
 
@@ -58,6 +59,14 @@ def valid_file(file_name):
     return file_name
 
 
+def valid_lightdock_output(file_name):
+    """A gso_N.out file or binary trajectory. A missing gso_N.out file is valid if its
+    swarm has a binary trajectory, see util.analysis.find_trajectory"""
+    if not os.path.exists(file_name) and find_trajectory(file_name)[0] is None:
+        raise argparse.ArgumentTypeError("The file does not exist")
+    return file_name
+
+
 def valid_integer_number(int_value):
     try:
         int_value = int(int_value)
@@ -88,6 +97,16 @@ def valid_float_number(float_value):
     return float_value
 
 
+def valid_fraction(float_value):
+    try:
+        float_value = float(float_value)
+    except:
+        raise argparse.ArgumentTypeError(f"{float_value} is an invalid value")
+    if float_value <= 0.0 or float_value >= 1.0:
+        raise argparse.ArgumentTypeError(f"{float_value} is an invalid value")
+    return float_value
+
+
 class SetupCommandLineParser(object):
     """Parses the command line of lightdock_setup"""
 
@@ -487,6 +506,102 @@ class CommandLineParser(object):
             type=int,
             required=False,
         )
+        # Binary output
+        parser.add_argument(
+            "-bin",
+            "--binary_output",
+            help="saves each swarm as a binary trajectory file instead of gso_N.out files",
+            dest="binary_output",
+            action="store_true",
+            default=False,
+        )
+        # Checkpoints
+        parser.add_argument(
+            "-checkpoint",
+            "--checkpoint_frequency",
+            help="saves a checkpoint of each swarm every given number of steps and "
+            "resumes from it if found, 0 disables it",
+            dest="checkpoint_frequency",
+            type=valid_natural_number,
+            default=0,
+        )
+        # Early stopping
+        parser.add_argument(
+            "-converge",
+            "--convergence_window",
+            help="stops a swarm once it has not improved over this number of steps, "
+            "0 disables it",
+            dest="convergence_window",
+            type=valid_natural_number,
+            default=0,
+        )
+        parser.add_argument(
+            "-halving",
+            "--successive_halving",
+            help="runs the swarms for this fraction of the steps and then keeps the "
+            "best half, doubling the steps at each round. Cores freed by the dropped "
+            "swarms are used as scoring threads of the remaining ones",
+            dest="successive_halving",
+            type=valid_fraction,
+            default=None,
+        )
+        # Energy cache
+        parser.add_argument(
+            "-cache",
+            "--energy_cache",
+            help="maximum number of poses in the energy cache of each swarm, 0 disables it",
+            dest="energy_cache",
+            type=valid_natural_number,
+            default=0,
+        )
+        # Receptor cropping
+        parser.add_argument(
+            "-crop",
+            "--crop_receptor",
+            help="scores the poses of each swarm against the receptor atoms within its reach",
+            dest="crop_receptor",
+            action="store_true",
+            default=False,
+        )
+        # Array swarms
+        parser.add_argument(
+            "-array",
+            "--array_swarm",
+            help="simulates the glowworms of each swarm as arrays instead of objects",
+            dest="array_swarm",
+            action="store_true",
+            default=False,
+        )
+        # Swarms in lockstep
+        parser.add_argument(
+            "-lockstep",
+            "--lockstep",
+            help="number of swarms simulated together by each core, scoring the poses "
+            "of all of them in the same batch calls",
+            dest="lockstep",
+            type=valid_integer_number,
+            default=1,
+        )
+        # Threads scoring the poses of a swarm
+        parser.add_argument(
+            "-threads",
+            "--scoring_threads",
+            help="number of threads scoring the poses of each swarm, only useful with "
+            "the scoring functions implemented in C",
+            dest="scoring_threads",
+            type=valid_integer_number,
+            default=1,
+        )
+        # Potential grids
+        parser.add_argument(
+            "-grid",
+            "--grid_spacing",
+            help="scores poses using precomputed receptor potential grids of this spacing "
+            "(in Angstroms), only for the cpydock and dna scoring functions",
+            dest="grid_spacing",
+            type=valid_float_number,
+            default=None,
+        )
         if input_args:
             self.args = parser.parse_args(input_args)
         else:
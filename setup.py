@@ -156,7 +156,7 @@ setuptools.setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://lightdock.org/",
-    packages=setuptools.find_namespace_packages(),
+    packages=setuptools.find_namespace_packages(exclude=["benchmarks"]),
     include_package_data=True,
     license="GPLv3 License",
     classifiers=[
@@ -196,6 +196,7 @@ setuptools.setup(
         "bin/lgd_copy_structures.py",
         "bin/lgd_create_membrane.py",
         "bin/lgd_dummify.py",
+        "bin/lgd_export_trajectory.py",
         "bin/lgd_filter_membrane.py",
         "bin/lgd_filter_restraints.py",
         "bin/lgd_flatten.py",